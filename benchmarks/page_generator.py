@@ -0,0 +1,151 @@
+"""
+產生模擬 Finlab 策略頁的測試頁面
+
+外層頁面內含 id="reportIframe" 的 iframe；iframe 內有 tablist 與
+Svelte 風格（svelte-1nx0ef2 class）的持股表格。點擊「選股」分頁後才顯示表格，
+與實際頁面的互動流程相同。外層頁也會載入圖片與字型，用來比較資源封鎖前後的傳輸量。
+"""
+import os
+import random
+from html import escape
+
+
+OUTER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8"><title>Finlab Strategy Benchmark</title>
+  <style>
+    @font-face {{ font-family: "Bench"; src: url("assets/bench.woff2") format("woff2"); }}
+    h1 {{ font-family: "Bench", sans-serif; }}
+  </style>
+</head>
+<body>
+  <img src="assets/banner.png" alt="" width="600" height="120">
+  <h1>Strategy ({row_count} rows)</h1>
+  <iframe id="reportIframe" src="{report_name}" width="1200" height="800"></iframe>
+</body>
+</html>
+"""
+
+REPORT_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"></head>
+<body>
+  <div role="tablist">
+    <a href="#" class="tab tab-active" aria-selected="true">績效</a>
+    <a href="#" class="tab" aria-selected="false">選股</a>
+  </div>
+  <div id="holdings" style="display: none">
+    <table class="svelte-1nx0ef2">
+      <thead><tr><th>股票</th><th>進場日期</th><th>獲利</th><th>權重</th></tr></thead>
+      <tbody>
+{rows}
+      </tbody>
+    </table>
+  </div>
+  <script>
+    var tabs = document.querySelectorAll("div[role='tablist'] > a");
+    tabs[tabs.length - 1].addEventListener('click', function (event) {{
+      event.preventDefault();
+      tabs.forEach(function (tab) {{
+        tab.setAttribute('aria-selected', 'false');
+        tab.classList.remove('tab-active');
+      }});
+      this.setAttribute('aria-selected', 'true');
+      this.classList.add('tab-active');
+      document.getElementById('holdings').style.display = 'block';
+    }});
+  </script>
+</body>
+</html>
+"""
+
+ROW_TEMPLATE = """        <tr class="svelte-1nx0ef2">
+          <td><div class="flex flex-col">
+            <span class="whitespace-nowrap font-bold text-base-content-300">{name}</span>
+            <span class="font-light text-base-content-200">{stock_id}</span>
+          </div></td>
+          <td><div slot="entryDate"><span class="lining-nums svelte-1nx0ef2">{entry_date}</span></div></td>
+          <td><span class="text-error svelte-1nx0ef2">{profit}</span></td>
+          <td><span class="text-error svelte-1nx0ef2">{weight}</span></td>
+        </tr>"""
+
+
+def generate_rows(row_count, seed=0):
+    """
+    產生確定性的合成持股資料
+
+    Args:
+        row_count (int): 列數
+        seed (int): 亂數種子
+
+    Returns:
+        list: 與 FinlabStrategyScraper.scrape 相同格式的字典列表
+    """
+    rng = random.Random(seed)
+    rows = []
+    for index in range(row_count):
+        profit = rng.uniform(-30, 80)
+        marker = "▴" if profit >= 0 else "▾"
+        rows.append({
+            "name": f"股票{index:05d}",
+            "stock_id": str(1000 + index),
+            "entry_date": f"2026/{rng.randint(1, 12)}/{rng.randint(1, 28)}",
+            "profit_percentage": f"{marker} {abs(profit):.2f}%",
+            "current_weight": f"{100 / max(row_count, 1):.1f}%",
+        })
+    return rows
+
+
+def render_report(rows):
+    """將持股資料轉為 iframe 內的報告頁 HTML"""
+    return REPORT_PAGE.format(rows="\n".join(
+        ROW_TEMPLATE.format(
+            name=escape(row["name"]),
+            stock_id=escape(row["stock_id"]),
+            entry_date=escape(row["entry_date"]),
+            profit=escape(row["profit_percentage"]),
+            weight=escape(row["current_weight"]),
+        )
+        for row in rows
+    ))
+
+
+# 模擬頁面上的圖片與字型（內容只需要有大小）
+ASSETS = {
+    "banner.png": 256 * 1024,
+    "bench.woff2": 64 * 1024,
+}
+
+
+def write_assets(directory, seed=0):
+    """在 assets/ 子目錄寫入固定大小的圖片與字型檔"""
+    asset_dir = os.path.join(directory, "assets")
+    os.makedirs(asset_dir, exist_ok=True)
+    rng = random.Random(seed)
+    for name, size in ASSETS.items():
+        with open(os.path.join(asset_dir, name), "wb") as f:
+            f.write(rng.randbytes(size))
+
+
+def write_strategy_pages(directory, row_count, seed=0):
+    """
+    在目錄中寫入外層頁與報告頁
+
+    Args:
+        directory (str): 輸出目錄
+        row_count (int): 列數
+        seed (int): 亂數種子
+
+    Returns:
+        tuple: (外層頁檔名, 預期的持股資料)
+    """
+    rows = generate_rows(row_count, seed)
+    write_assets(directory, seed)
+    report_name = f"report_{row_count}.html"
+    outer_name = f"strategy_{row_count}.html"
+    with open(os.path.join(directory, report_name), "w", encoding="utf-8") as f:
+        f.write(render_report(rows))
+    with open(os.path.join(directory, outer_name), "w", encoding="utf-8") as f:
+        f.write(OUTER_PAGE.format(row_count=row_count, report_name=report_name))
+    return outer_name, rows
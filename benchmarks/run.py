@@ -0,0 +1,262 @@
+"""
+離線效能基準測試
+
+以合成的 Finlab 風格頁面（10 ~ 10,000 列）在本機 HTTP server 上量測：
+- FinlabStrategyScraper.scrape 端對端時間（需要 Chrome，加上 --browser）
+- 每列擷取成本：單次 JavaScript 批次擷取 vs 逐欄查詢（需要 Chrome）
+- 頁面載入時間與傳輸量：完整 Chrome 設定 vs 精簡設定加資源封鎖（需要 Chrome）
+- HTTP 快速路徑的抓取與 HTML 解析
+- format_stock_message 與 print_scrape_results 的吞吐量
+
+結果與 benchmarks/baseline.json 比較，超過容許倍數即視為退化並以非 0 結束。
+
+用法:
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 10,1000 --browser
+    python -m benchmarks.run --update-baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+from benchmarks.page_generator import write_strategy_pages
+from benchmarks.server import LocalPageServer
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+# 逐欄擷取每列需多次 WebDriver 往返，大表格只量到這個列數
+PER_ELEMENT_MAX_ROWS = 1000
+
+
+def measure(func, repeat=5):
+    """
+    重複執行並回傳中位數秒數
+
+    Args:
+        func (callable): 要量測的函式
+        repeat (int): 執行次數
+
+    Returns:
+        float: 中位數秒數
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_formatting(rows):
+    """量測 format_stock_message 與 print_scrape_results"""
+    from src.line_notification import LineNotification
+    from src.utils.formatter import print_scrape_results
+
+    with patch("src.line_notification.LineBotApi"):
+        notifier = LineNotification("benchmark-token", "benchmark-user")
+
+    def print_results():
+        with contextlib.redirect_stdout(io.StringIO()):
+            print_scrape_results(rows)
+
+    return {
+        "format_stock_message": measure(lambda: notifier.format_stock_message(rows)),
+        "print_scrape_results": measure(print_results),
+    }
+
+
+def bench_http(base_url, outer_name, report_name, rows):
+    """量測 HTTP 快速路徑的端對端抓取與 HTML 解析"""
+    from src.http_scraper import HttpStrategyScraper, parse_holdings_html
+
+    scraper = HttpStrategyScraper()
+    url = f"{base_url}/{outer_name}"
+    result = scraper.scrape(url)
+    if len(result) != len(rows):
+        raise AssertionError(f"HTTP 快速路徑取得 {len(result)} 列，預期 {len(rows)} 列")
+
+    html = scraper.session.get(f"{base_url}/{report_name}").text
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "http_scrape": measure(lambda: scraper.scrape(url)),
+            "parse_holdings_html": measure(lambda: parse_holdings_html(html)),
+        }
+    scraper.session.close()
+    return results
+
+
+def bench_browser(pool, base_url, outer_name, rows):
+    """量測瀏覽器端對端抓取與兩種擷取方式的每列成本"""
+    from selenium.webdriver.common.by import By
+    from src.extraction import extract_rows_bulk, extract_rows_per_element
+    from src.scraper import FinlabStrategyScraper
+
+    url = f"{base_url}/{outer_name}"
+    scraper = FinlabStrategyScraper(pool=pool)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = scraper.scrape(url)
+        if len(result) != len(rows):
+            raise AssertionError(f"瀏覽器取得 {len(result)} 列，預期 {len(rows)} 列")
+        results = {"browser_scrape": measure(lambda: scraper.scrape(url), repeat=3)}
+
+        with pool.acquire() as driver:
+            driver.get(url)
+            driver.switch_to.frame("reportIframe")
+            driver.execute_script("arguments[0].click();", driver.find_element(
+                By.CSS_SELECTOR, "div[role='tablist'] > a:last-child"
+            ))
+            results["extract_bulk"] = measure(lambda: extract_rows_bulk(driver), repeat=3)
+            if len(rows) <= PER_ELEMENT_MAX_ROWS:
+                results["extract_per_element"] = measure(lambda: extract_rows_per_element(driver), repeat=1)
+    return results
+
+
+def bench_page_load(base_url, outer_name):
+    """
+    比較完整設定與精簡設定（含資源封鎖）的頁面載入時間與傳輸量
+
+    Returns:
+        dict: 設定名稱 -> collect_page_load_stats() 的結果
+    """
+    from src.browser_profile import BrowserProfile, collect_page_load_stats
+    from src.driver_pool import default_driver_factory
+
+    profiles = {
+        "full": BrowserProfile(lean=False, blocked_resource_types=(), blocked_url_patterns=()),
+        "lean": BrowserProfile(),
+    }
+    stats = {}
+    for name, profile in profiles.items():
+        driver = default_driver_factory(profile=profile)()
+        try:
+            driver.get(f"{base_url}/{outer_name}")
+            stats[name] = collect_page_load_stats(driver)
+        finally:
+            driver.quit()
+    return stats
+
+
+def print_page_load(size, stats):
+    """印出資源封鎖前後的載入時間與傳輸量"""
+    for name, page in stats.items():
+        if page:
+            print(f"  頁面載入[{size}] {name:<5} {page['load_ms']:>8.1f} ms "
+                  f"{page['transfer_bytes'] / 1024:>10.1f} KB {page['resource_count']:>4} 個資源")
+
+
+def run_benchmarks(sizes, browser=False):
+    """
+    執行所有基準測試
+
+    Args:
+        sizes (iterable): 表格列數
+        browser (bool): 是否執行需要 Chrome 的項目
+
+    Returns:
+        dict: "項目[列數]" -> 中位數秒數
+    """
+    results = {}
+    pool = None
+    if browser:
+        from src.driver_pool import DriverPool
+        pool = DriverPool(size=1)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            pages = {size: write_strategy_pages(directory, size) for size in sizes}
+            with LocalPageServer(directory) as base_url:
+                for size, (outer_name, rows) in pages.items():
+                    print(f"量測 {size} 列...")
+                    measured = {}
+                    measured.update(bench_formatting(rows))
+                    measured.update(bench_http(base_url, outer_name, f"report_{size}.html", rows))
+                    if pool is not None:
+                        measured.update(bench_browser(pool, base_url, outer_name, rows))
+                        page_stats = bench_page_load(base_url, outer_name)
+                        print_page_load(size, page_stats)
+                        for name, page in page_stats.items():
+                            if page:
+                                measured[f"page_load_{name}"] = page["load_ms"] / 1000
+                    for name, seconds in measured.items():
+                        results[f"{name}[{size}]"] = seconds
+    finally:
+        if pool is not None:
+            pool.close()
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance, min_delta=0.001):
+    """
+    與基準值比較
+
+    Args:
+        results (dict): 本次結果
+        baseline (dict): 基準值
+        tolerance (float): 容許倍數（例如 1.5 代表慢 50% 以內不算退化）
+        min_delta (float): 差距小於此秒數時視為量測雜訊
+
+    Returns:
+        list: 退化項目的 (名稱, 本次秒數, 基準秒數)
+    """
+    return [
+        (name, seconds, baseline[name])
+        for name, seconds in results.items()
+        if name in baseline
+        and seconds > baseline[name] * tolerance
+        and seconds - baseline[name] > min_delta
+    ]
+
+
+def print_report(results, baseline):
+    """印出結果表格（含每列成本與相對基準的比例）"""
+    print(f"\n{'項目':<36}{'秒數':>12}{'µs/列':>12}{'相對基準':>10}")
+    for name, seconds in results.items():
+        size = int(name.rsplit("[", 1)[1].rstrip("]"))
+        ratio = f"{seconds / baseline[name]:.2f}x" if baseline.get(name) else "-"
+        print(f"{name:<36}{seconds:>12.5f}{seconds / size * 1e6:>12.2f}{ratio:>10}")
+
+
+def main(argv=None):
+    """基準測試進入點"""
+    parser = argparse.ArgumentParser(description="Finlab 爬蟲與訊息格式化的離線效能基準測試")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="以逗號分隔的表格列數")
+    parser.add_argument("--browser", action="store_true", help="包含需要 Chrome 的項目")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基準值 JSON 檔")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="容許的退化倍數")
+    parser.add_argument("--update-baseline", action="store_true", help="以本次結果覆寫基準值")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run_benchmarks(sizes, browser=args.browser)
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    print_report(results, baseline)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n已更新基準值: {args.baseline}")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for name, seconds, expected in regressions:
+        print(f"退化: {name} {seconds:.5f}s > 基準 {expected:.5f}s x {args.tolerance}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
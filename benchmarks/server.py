@@ -0,0 +1,46 @@
+"""
+在本機以 HTTP 提供測試頁面
+"""
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """不記錄每個請求的靜態檔案 handler"""
+
+    extensions_map = {**SimpleHTTPRequestHandler.extensions_map, ".html": "text/html; charset=utf-8"}
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalPageServer:
+    """
+    在背景執行緒中提供目錄內的檔案
+
+    用法:
+        with LocalPageServer(directory) as base_url:
+            ...
+    """
+
+    def __init__(self, directory, host="127.0.0.1", port=0):
+        handler = functools.partial(_QuietHandler, directory=directory)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self.base_url
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
@@ -0,0 +1,195 @@
+"""
+webhook server 負載測試
+
+以簽章正確的合成 LINE webhook 事件同時打向 webhook server，量測回應 200 的延遲，
+並等待所有回覆送達本機的 stub LINE API。
+
+預設在同一個程序內啟動 webhook server（使用合成的持股快照）與 stub LINE API；
+指定 --url 與 --secret 時改打外部已啟動的 server（回覆由該 server 自行送出）。
+
+用法:
+    python -m benchmarks.webhook_load
+    python -m benchmarks.webhook_load --events 5000 --concurrency 500 --rows 1000
+    python -m benchmarks.webhook_load --url http://127.0.0.1:8000/callback --secret xxx
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import aiohttp
+from aiohttp import web
+from benchmarks.page_generator import generate_rows
+from src.snapshot_cache import SnapshotCache
+from src.webhook_server import HoldingsIndexLoader, WebhookServer, sign_body
+
+
+LOAD_TEST_SECRET = "load-test-secret"
+COMMANDS = ("持股", "changes today", "2330", "1005", "help")
+
+
+def synthetic_body(index, commands=COMMANDS):
+    """
+    Args:
+        index (int): 事件序號（決定 reply token 與指令）
+        commands (tuple): 輪流使用的指令
+
+    Returns:
+        bytes: webhook 請求內容
+    """
+    event = {
+        "type": "message",
+        "mode": "active",
+        "timestamp": int(time.time() * 1000),
+        "source": {"type": "user", "userId": f"U{index:032x}"},
+        "replyToken": f"{index:032x}",
+        "message": {"type": "text", "id": str(index), "text": commands[index % len(commands)]},
+    }
+    return json.dumps({"destination": "Ubench", "events": [event]}).encode("utf-8")
+
+
+class _ReplyCounter:
+    """只計算回覆次數的 stub LINE API"""
+
+    def __init__(self):
+        self.count = 0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def handle(self, request):
+        await request.read()
+        self.count += 1
+        if self.count >= self.expected:
+            self.done.set()
+        return web.json_response({})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/v2/bot/message/{kind}", self.handle)
+        return app
+
+
+async def _start(app, port=0):
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    return runner, runner.addresses[0][1]
+
+
+async def fire_events(url, secret, events, concurrency):
+    """
+    以固定的同時連線數送出事件
+
+    Returns:
+        tuple: (每個請求的延遲秒數列表, 失敗次數, 總秒數)
+    """
+    latencies = []
+    failures = 0
+    counter = itertools.count()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def worker():
+            nonlocal failures
+            while True:
+                index = next(counter)
+                if index >= events:
+                    return
+                body = synthetic_body(index)
+                headers = {"X-Line-Signature": sign_body(secret, body), "Content-Type": "application/json"}
+                start = time.perf_counter()
+                try:
+                    async with session.post(url, data=body, headers=headers) as response:
+                        await response.read()
+                        if response.status != 200:
+                            failures += 1
+                except aiohttp.ClientError:
+                    failures += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, failures, time.perf_counter() - start
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run_local(events, concurrency, rows):
+    """在同一個程序內啟動 stub LINE API 與 webhook server 後送出事件"""
+    counter = _ReplyCounter()
+    counter.expected = events
+    stub_runner, stub_port = await _start(counter.app())
+
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot_path = os.path.join(directory, "snapshots.json")
+        cache = SnapshotCache(snapshot_path)
+        cache.put("https://www.finlab.tw/strategy/bench", generate_rows(rows))
+        cache.save()
+
+        server = WebhookServer(
+            LOAD_TEST_SECRET,
+            "load-test-token",
+            HoldingsIndexLoader(snapshot_path),
+            api_base_url=f"http://127.0.0.1:{stub_port}",
+            refresh_interval=0,
+            max_concurrency=64,
+        )
+        server_runner, server_port = await _start(server.make_app())
+        try:
+            url = f"http://127.0.0.1:{server_port}{server.path}"
+            latencies, failures, elapsed = await fire_events(url, LOAD_TEST_SECRET, events, concurrency)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(counter.done.wait(), timeout=60)
+            except asyncio.TimeoutError:
+                pass
+            drain = time.perf_counter() - start
+        finally:
+            await server_runner.cleanup()
+            await stub_runner.cleanup()
+    return latencies, failures, elapsed, counter.count, drain
+
+
+def print_report(latencies, failures, elapsed, replies=None, drain=None):
+    print(f"事件: {len(latencies)}，失敗: {failures}，耗時 {elapsed:.2f}s（{len(latencies) / elapsed:.0f} req/s）")
+    print(
+        f"回應延遲 p50 {statistics.median(latencies) * 1000:.1f} ms，"
+        f"p95 {_percentile(latencies, 0.95) * 1000:.1f} ms，"
+        f"p99 {_percentile(latencies, 0.99) * 1000:.1f} ms，"
+        f"max {max(latencies) * 1000:.1f} ms"
+    )
+    if replies is not None:
+        print(f"stub LINE API 收到 {replies} 則回覆（送出完畢後再等待 {drain:.2f}s）")
+
+
+def main(argv=None):
+    """負載測試進入點"""
+    parser = argparse.ArgumentParser(description="以簽章正確的合成事件對 webhook server 做負載測試")
+    parser.add_argument("--events", type=int, default=2000, help="事件數")
+    parser.add_argument("--concurrency", type=int, default=200, help="同時進行的請求數")
+    parser.add_argument("--rows", type=int, default=200, help="合成快照的持股數（僅限本機模式）")
+    parser.add_argument("--url", help="外部 webhook server 的網址")
+    parser.add_argument("--secret", help="外部 webhook server 的 LINE_CHANNEL_SECRET")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        if not args.secret:
+            parser.error("--url 需要搭配 --secret")
+        latencies, failures, elapsed = asyncio.run(
+            fire_events(args.url, args.secret, args.events, args.concurrency)
+        )
+        print_report(latencies, failures, elapsed)
+    else:
+        print_report(*asyncio.run(run_local(args.events, args.concurrency, args.rows)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
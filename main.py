@@ -1,38 +1,348 @@
+import time
+
+# 啟動計時起點（--profile-startup 用）
+PROCESS_START = time.perf_counter()
+
+import argparse
 from src.utils.config import load_config
 from src.utils.formatter import print_scrape_results
-from src.scraper import FinlabStrategyScraper
-from src.line_notification import LineNotification
+from src.snapshot_cache import SnapshotCache
+from src.utils.metrics import metrics
 
+# selenium / requests / linebot / aiohttp 等較重的模組在實際需要時才載入，
+# 全部命中快照或未設定 LINE 的執行不必付出載入時間
 
-def main():
-    """主程式進入點"""
-    # 載入配置
-    config = load_config()
-    target_url = config["target_url"]
+
+def notify_strategy(line_notifier, data, previous_rows, strategy=None, full_report=False, profit_threshold=5.0,
+                    subscribers=None, diff=None):
+    """
+    發送單一策略的 LINE 通知：預設只送異動，首次執行或要求時送完整報告
+
+    Args:
+        line_notifier (LineNotification): LINE 通知物件
+        data (list): 本次持股資料
+        previous_rows (list | None): 前一次的持股資料，沒有時送完整報告
+        strategy (str, optional): 策略名稱或網址
+        full_report (bool): 是否強制送完整報告
+        profit_threshold (float): 獲利變動超過幾個百分點才通知
+        subscribers (list, optional): 訂閱此策略的 Subscriber；未提供時只發送給 LINE_USER_ID
+        diff (HoldingsDiff, optional): 抓取時已由 DiffStage 算好的差異，未提供時在此比對
+    """
+    from src.diff import diff_holdings
+    from src.subscribers import group_recipients, select_diff, select_report
+
+    if full_report or previous_rows is None:
+        print("\n準備發送完整持股報告到 LINE...")
+        if subscribers is None:
+            line_notifier.send_stock_data(data, strategy)
+        else:
+            groups = group_recipients(subscribers, select_report(data))
+            print(f"{len(subscribers)} 位訂閱者，依訂閱條件分成 {len(groups)} 組發送")
+            for rows, user_ids in groups:
+                line_notifier.send_stock_data(rows, strategy, recipients=user_ids)
+        print("LINE 訊息發送完成！")
+        return
+
+    if diff is None:
+        diff = diff_holdings(previous_rows, data, profit_threshold=profit_threshold)
+    if not diff.has_changes:
+        print("\n沒有達到門檻的持股異動，略過 LINE 通知")
+        return
+
+    print(f"\n準備發送 {len(diff)} 筆持股異動到 LINE...")
+    if subscribers is None:
+        line_notifier.send_diff(diff, strategy)
+    else:
+        groups = group_recipients(subscribers, select_diff(diff))
+        if not groups:
+            print("沒有訂閱者關注這些異動，略過 LINE 通知")
+            return
+        print(f"{len(subscribers)} 位訂閱者，依訂閱條件分成 {len(groups)} 組發送")
+        for filtered, user_ids in groups:
+            line_notifier.send_diff(filtered, strategy, recipients=user_ids)
+    print("LINE 訊息發送完成！")
+
+
+def save_history(history_db_path, fresh_results):
+    """
+    寫入持股歷史資料庫；寫入失敗只印出錯誤，不影響通知
+
+    Args:
+        history_db_path (str): SQLite 檔案路徑
+        fresh_results (dict): 策略 -> 持股列表
+    """
+    from src.history_store import HoldingsHistoryStore
+
+    try:
+        with metrics.span("history_write"), HoldingsHistoryStore(history_db_path) as history:
+            history.append_runs(fresh_results)
+        print(f"已寫入 {len(fresh_results)} 個策略的持股歷史")
+    except Exception as e:
+        print(f"寫入持股歷史失敗: {e}")
+
+
+def create_line_notifier(config, outbox=None):
+    """
+    Args:
+        config (dict): load_config() 的設定
+        outbox (Outbox, optional): 推播前先寫入的 outbox
+
+    Returns:
+        LineNotification
+    """
+    from src.line_notification import LineNotification
+
+    return LineNotification(
+        config["line_channel_access_token"],
+        config.get("line_user_id"),
+        async_delivery=config["line_async_delivery"],
+        api_base_url=config["line_api_base_url"],
+        flex_reports=config["line_flex_reports"],
+        outbox=outbox,
+    )
+
+
+def open_outbox(config):
+    """
+    開啟 LINE 訊息 outbox；無法開啟時只印出錯誤，改為直接推播
+
+    Args:
+        config (dict): load_config() 的設定
+
+    Returns:
+        Outbox | None
+    """
+    import sqlite3
+    from src.outbox import Outbox
+
+    try:
+        return Outbox(config["outbox_path"], max_attempts=config["outbox_max_attempts"])
+    except (OSError, sqlite3.Error) as e:
+        print(f"無法開啟 outbox，改為直接推播: {e}")
+        return None
+
+
+def retry_outbox(line_notifier):
+    """
+    重送上次執行留下的訊息；失敗只印出錯誤，不影響本次抓取
+
+    Args:
+        line_notifier (LineNotification): 已設定 outbox 的 LINE 通知物件
+    """
+    pending = line_notifier.outbox.pending_count()
+    if not pending:
+        return
+    print(f"outbox 有 {pending} 筆未送出的推播，先行重送...")
+    try:
+        with metrics.span("outbox_flush"):
+            result = line_notifier.flush_outbox()
+        print(f"重送完成：成功 {result['sent']}，待重送 {result['pending']}，dead-letter {len(result['dead'])}")
+    except Exception as e:
+        print(f"重送 outbox 失敗: {e}")
+
+
+def export_metrics(json_path=None, prom_path=None):
+    """
+    匯出本次執行的指標；寫入失敗只印出錯誤
+
+    Args:
+        json_path (str, optional): JSON 執行報告路徑
+        prom_path (str, optional): Prometheus textfile 路徑
+    """
+    try:
+        if json_path:
+            metrics.export_json(json_path)
+        if prom_path:
+            metrics.export_prometheus(prom_path)
+    except OSError as e:
+        print(f"無法寫入執行指標: {e}")
+
+
+def run_cycle(config, pool=None):
+    """
+    執行一次完整的抓取與通知
+
+    Args:
+        config (dict): load_config() 的設定
+        pool (DriverPool, optional): 常駐模式共用的瀏覽器池；未提供時每次建立新的瀏覽器
+    """
+    target_urls = config["target_urls"]
+    scraper_workers = config["scraper_workers"]
+    http_fast_path = config["http_fast_path"]
+    skip_unchanged = config["skip_unchanged"]
     line_channel_access_token = config.get("line_channel_access_token")
     line_user_id = config.get("line_user_id")
+    subscribers = config.get("subscribers")
+
+    print(f"準備抓取 {len(target_urls)} 個策略 (workers={scraper_workers})")
+    for target_url in target_urls:
+        print(f"  - {target_url}")
 
-    print(f"準備抓取目標網址: {target_url}")
+    metrics.enabled = bool(config["metrics_json_path"] or config["metrics_prom_path"])
+    metrics.reset()
+    snapshot_cache = SnapshotCache(config["snapshot_cache_path"], ttl=config["snapshot_ttl"])
+    succeeded = False
+    notify_enabled = bool(line_channel_access_token and (line_user_id or subscribers))
+    outbox = open_outbox(config) if notify_enabled and config["outbox_enabled"] else None
+    line_notifier = None
 
-    # 執行抓取
-    scraper = FinlabStrategyScraper()
     try:
-        data = scraper.scrape(target_url)
-        print_scrape_results(data)
-
-        # 發送到 LINE
-        if line_channel_access_token and line_user_id:
-            print("\n準備發送訊息到 LINE...")
-            line_notifier = LineNotification(line_channel_access_token, line_user_id)
-            line_notifier.send_stock_data(data)
-            print("LINE 訊息發送完成！")
+        # 先送出上次執行未送達的訊息（不需要重新抓取）
+        if outbox is not None and outbox.pending_count():
+            line_notifier = create_line_notifier(config, outbox)
+            retry_outbox(line_notifier)
+
+        # TTL 內的快照直接使用，不啟動瀏覽器
+        results = {}
+        for target_url in target_urls:
+            entry = snapshot_cache.get_fresh(target_url)
+            if entry:
+                results[target_url] = {"data": entry["rows"], "error": None, "cached": True}
+                metrics.increment("snapshot_cache_hits")
+
+        # 執行抓取（單一策略失敗不影響其他策略）
+        pending_urls = [url for url in target_urls if url not in results]
+        if pending_urls:
+            from src.browser_profile import BrowserProfile
+            from src.browser_supervisor import BrowserSupervisor
+            from src.multi_scraper import scrape_strategies
+            from src.pipeline import DiffStage
+
+            def diff_stages(url):
+                # 有前一次快照且要發送異動時，擷取的同時逐批比對
+                previous = snapshot_cache.get(url)
+                if not notify_enabled or config["full_report"] or previous is None:
+                    return []
+                return [DiffStage(previous["rows"], profit_threshold=config["profit_alert_threshold"])]
+
+            # 常駐模式的瀏覽器池自帶 supervisor；單次執行時在抓取前後清除遺留程序
+            owns_supervisor = pool is None
+            supervisor = BrowserSupervisor.from_config(config) if owns_supervisor else pool.supervisor
+            if owns_supervisor:
+                supervisor.start()
+            if supervisor is not None:
+                supervisor.begin_run()
+            try:
+                with metrics.span("scrape_all"):
+                    scraped = scrape_strategies(
+                        pending_urls,
+                        max_workers=scraper_workers,
+                        pool=pool,
+                        http_fast_path=http_fast_path,
+                        browser_profile=BrowserProfile.from_config(config),
+                        harvest=config["harvest_rows"],
+                        supervisor=supervisor,
+                        backend=config["scraper_backend"],
+                        stages=diff_stages,
+                    )
+            finally:
+                if supervisor is not None:
+                    supervisor.report()
+                if owns_supervisor:
+                    supervisor.stop()
+            results.update(scraped)
+        results = {url: results[url] for url in target_urls}
+
+        # 將本次新抓取的持股一次寫入歷史資料庫
+        if config["history_enabled"]:
+            fresh = {
+                url: result["data"]
+                for url, result in results.items()
+                if not result["error"] and not result.get("cached")
+            }
+            if fresh:
+                save_history(config["history_db_path"], fresh)
+
+        if notify_enabled:
+            line_notifier = line_notifier or create_line_notifier(config, outbox)
         else:
-            print("\n跳過 LINE 通知（未設定 LINE_CHANNEL_ACCESS_TOKEN 或 LINE_USER_ID）")
+            print("\n跳過 LINE 通知（未設定 LINE_CHANNEL_ACCESS_TOKEN 或 LINE_USER_ID / SUBSCRIBERS_FILE）")
+
+        failed_urls = []
+        for target_url, result in results.items():
+            print(f"\n### 策略: {target_url}")
+            if result["error"]:
+                print(f"抓取失敗: {result['error']}")
+                failed_urls.append(target_url)
+                continue
+
+            data = result["data"]
+            cached = result.get("cached", False)
+            if cached:
+                print("使用快取的快照（仍在 TTL 內）")
+            changed = not cached and snapshot_cache.has_changed(target_url, data)
+
+            if skip_unchanged and not changed:
+                print("持股與上次相同，略過輸出與 LINE 通知")
+            else:
+                print_scrape_results(data)
+
+                # 發送到 LINE；TTL 內的快照在存入時已通知過，不再重複推播
+                if cached and line_notifier:
+                    print("快照已於先前執行時通知，略過 LINE 通知")
+                elif line_notifier:
+                    previous = snapshot_cache.get(target_url)
+                    with metrics.span("notify", strategy=target_url):
+                        notify_strategy(
+                            line_notifier,
+                            data,
+                            previous["rows"] if previous else None,
+                            strategy=target_url if len(results) > 1 else None,
+                            full_report=config["full_report"],
+                            profit_threshold=config["profit_alert_threshold"],
+                            subscribers=subscribers.for_strategy(target_url) if subscribers is not None else None,
+                            diff=result["stages"][0] if result.get("stages") else None,
+                        )
+
+            # 推播成功後才更新快照，避免發送失敗的內容在下次被判定為未變更
+            if not cached:
+                snapshot_cache.put(target_url, data)
+
+        if failed_urls:
+            raise RuntimeError(f"{len(failed_urls)}/{len(results)} 個策略抓取失敗: {', '.join(failed_urls)}")
+        succeeded = True
 
     except Exception as e:
         print(f"執行發生錯誤: {e}")
         raise
 
+    finally:
+        try:
+            snapshot_cache.save()
+        except OSError as e:
+            print(f"無法寫入快照快取: {e}")
+        if outbox is not None:
+            outbox.purge_sent()
+            outbox.close()
+        metrics.set_gauge("run_success", 1 if succeeded else 0)
+        export_metrics(config["metrics_json_path"], config["metrics_prom_path"])
+
+
+def main(argv=None):
+    """主程式進入點"""
+    parser = argparse.ArgumentParser(description="抓取 Finlab 策略持股並推送到 LINE")
+    parser.add_argument("--daemon", action="store_true",
+                        help="常駐執行：保留瀏覽器並依台股交易日排程抓取")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="量測模組載入、driver 解析、瀏覽器啟動到第一次導覽的時間後結束")
+    parser.add_argument("--serve", action="store_true",
+                        help="啟動 LINE webhook server，以最近一次的快照回答聊天查詢")
+    args = parser.parse_args(argv)
+
+    # 載入配置
+    config = load_config()
+    if args.profile_startup:
+        from src.startup_profile import profile_startup
+        profile_startup(config, PROCESS_START)
+    elif args.serve:
+        from src.webhook_server import run_webhook_server
+        run_webhook_server(config)
+    elif args.daemon:
+        from src.daemon import run_daemon
+        run_daemon(config, run_cycle)
+    else:
+        run_cycle(config)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,27 @@
+"""
+可替換的瀏覽器後端
+
+- selenium: 既有的 Selenium WebDriver（經由 chromedriver）
+- cdp: 直接以 DevTools Protocol 的 WebSocket 控制 Chrome（src.backends.cdp_backend，需要 aiohttp，
+  只在選用時才載入）
+"""
+from src.backends.base import ScraperBackend
+from src.backends.selenium_backend import SeleniumBackend
+
+
+SELENIUM = "selenium"
+CDP = "cdp"
+BACKENDS = (SELENIUM, CDP)
+DEFAULT_BACKEND = SELENIUM
+
+
+def as_backend(driver):
+    """
+    Args:
+        driver: ScraperBackend 或 Selenium WebDriver（例如 DriverPool 借出的瀏覽器）
+
+    Returns:
+        ScraperBackend: 後端本身，或包裝 WebDriver 的 SeleniumBackend
+    """
+    return driver if isinstance(driver, ScraperBackend) else SeleniumBackend(driver)
+
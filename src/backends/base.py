@@ -0,0 +1,110 @@
+"""
+瀏覽器後端介面
+
+FinlabStrategyScraper 只透過這裡的操作控制瀏覽器：導覽、切換 frame、點擊與執行 JavaScript。
+execute_script / execute_async_script / quit 為與 Selenium WebDriver 同名的別名，
+讓 DriverPool、src.readiness、src.layout 等以 driver 為參數的模組可以直接使用任何後端。
+"""
+from abc import ABC, abstractmethod
+
+
+class ScraperBackend(ABC):
+    """
+    瀏覽器後端
+
+    腳本採用 Selenium execute_script 的慣例：script 為函式本體，以 arguments[i] 取得參數，
+    以 return 回傳可序列化為 JSON 的值；非同步腳本以最後一個參數作為完成時呼叫的 callback。
+    """
+
+    # 設定值 SCRAPER_BACKEND 對應的名稱
+    name = None
+
+    @abstractmethod
+    def navigate(self, url):
+        """
+        前往網址並等待頁面載入完成，之後的操作都在最上層文件進行
+
+        Args:
+            url (str): 目標網址
+        """
+
+    @abstractmethod
+    def switch_to_frame(self, selector):
+        """
+        切換至目前文件中符合 selector 的 iframe
+
+        Args:
+            selector (str): iframe 的 CSS selector
+        """
+
+    @abstractmethod
+    def switch_to_default(self):
+        """切換回最上層文件"""
+
+    @abstractmethod
+    def click(self, selector):
+        """
+        將符合 selector 的元素捲動至畫面中央並點擊
+
+        Args:
+            selector (str): CSS selector
+        """
+
+    @abstractmethod
+    def evaluate(self, script, *args):
+        """
+        在目前的 frame 執行腳本
+
+        Args:
+            script (str): 函式本體
+            *args: 可序列化為 JSON 的參數
+
+        Returns:
+            腳本的回傳值
+        """
+
+    @abstractmethod
+    def evaluate_async(self, script, *args):
+        """
+        在目前的 frame 執行非同步腳本，等待 callback 被呼叫
+
+        Args:
+            script (str): 函式本體，最後一個參數為 callback
+            *args: 可序列化為 JSON 的參數
+
+        Returns:
+            傳給 callback 的值
+        """
+
+    @abstractmethod
+    def close(self):
+        """關閉瀏覽器"""
+
+    @abstractmethod
+    def find_elements(self, by, selector):
+        """
+        逐元素查詢（src.extraction 的備援擷取）
+
+        Args:
+            by (str): 查詢方式（selenium.webdriver.common.by.By）
+            selector (str): selector
+
+        Returns:
+            list: 具有 text 屬性與 find_elements 方法的元素
+        """
+
+    def execute_script(self, script, *args):
+        return self.evaluate(script, *args)
+
+    def execute_async_script(self, script, *args):
+        return self.evaluate_async(script, *args)
+
+    def quit(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,536 @@
+"""
+直接以 Chrome DevTools Protocol (CDP) 的 WebSocket 控制瀏覽器
+
+- 不經過 chromedriver：每個指令只有一次 WebSocket 往返，省去 WebDriver HTTP 轉送
+- 指令以遞增 id 送出後不必等待回應，多個指令可同時在途（pipelining），回應依 id 配對
+- asyncio 事件迴圈在背景執行緒執行，對外提供與其他後端相同的同步介面
+- 跨來源 iframe（site isolation 下為獨立程序）以自動附加的子 session 執行腳本
+"""
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import aiohttp
+from selenium.webdriver.common.by import By
+from src.backends.base import ScraperBackend
+from src.browser_profile import LEAN_CHROME_ARGUMENTS, BrowserProfile
+from src.utils.driver_cache import find_chrome_binary
+
+
+# 單一指令等待回應的秒數（同 Selenium 預設的腳本逾時）
+DEFAULT_COMMAND_TIMEOUT = 30
+# 等待頁面 load 事件的秒數
+DEFAULT_PAGE_LOAD_TIMEOUT = 60
+# 等待 Chrome 開啟 DevTools 連接埠的秒數
+LAUNCH_TIMEOUT = 20
+
+CHROME_ARGUMENTS = (
+    "--headless=new",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--remote-debugging-port=0",
+)
+
+CLICK_SCRIPT = """
+var element = document.querySelector(arguments[0]);
+if (!element) { throw new Error('找不到元素: ' + arguments[0]); }
+element.scrollIntoView({block: 'center'});
+element.click();
+"""
+
+QUERY_SCRIPT = "return document.querySelector(arguments[0]);"
+
+# 由文件開始依 (selector, 索引) 路徑找到 CDPElement 代表的元素
+_ELEMENT_PATH_SCRIPT = """
+var element = document;
+for (var step of arguments[0]) {
+    element = element.querySelectorAll(step[0])[step[1]];
+    if (!element) { return null; }
+}
+"""
+COUNT_ELEMENTS_SCRIPT = _ELEMENT_PATH_SCRIPT + "return element.querySelectorAll(arguments[1]).length;"
+ELEMENT_TEXT_SCRIPT = _ELEMENT_PATH_SCRIPT + "return element.innerText;"
+
+
+def _function_declaration(script):
+    return "function () {\n" + script + "\n}"
+
+
+def _async_function_declaration(script):
+    """以 Promise 包裝非同步腳本：把 resolve 當作最後一個參數傳入"""
+    return (
+        "function () {\n"
+        "var args = Array.prototype.slice.call(arguments);\n"
+        "var self = this;\n"
+        "return new Promise(function (resolve, reject) {\n"
+        "args.push(resolve);\n"
+        "try { (function () {\n" + script + "\n}).apply(self, args); } catch (e) { reject(e); }\n"
+        "});\n"
+        "}"
+    )
+
+
+def _exception_message(details):
+    exception = details.get("exception") or {}
+    return exception.get("description") or details.get("text") or "JavaScript 執行失敗"
+
+
+class CDPError(RuntimeError):
+    """CDP 指令回傳錯誤，或腳本拋出例外"""
+
+    def __init__(self, message, method=None):
+        """
+        Args:
+            message (str): 錯誤訊息
+            method (str, optional): 失敗的 CDP 指令
+        """
+        self.method = method
+        super().__init__(f"{method}: {message}" if method else message)
+
+
+class CDPConnection:
+    """
+    單一 WebSocket 上的 CDP 連線（flatten 模式，所有 session 共用同一條連線）
+
+    必須在同一個事件迴圈中使用。
+    """
+
+    def __init__(self, ws_url, timeout=DEFAULT_COMMAND_TIMEOUT):
+        """
+        Args:
+            ws_url (str): 瀏覽器的 webSocketDebuggerUrl
+            timeout (float): 單一指令等待回應的秒數
+        """
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = {}
+        self._session = None
+        self._ws = None
+        self._reader = None
+
+    async def open(self):
+        self._session = aiohttp.ClientSession()
+        try:
+            self._ws = await self._session.ws_connect(self.ws_url, max_msg_size=0)
+        except Exception:
+            await self._session.close()
+            raise
+        self._reader = asyncio.ensure_future(self._read_loop())
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+        if self._session is not None:
+            await self._session.close()
+
+    def on(self, method, handler):
+        """
+        註冊事件處理函式
+
+        Args:
+            method (str): 事件名稱，例如 "Page.loadEventFired"
+            handler (callable): 以 (params, session_id) 呼叫
+        """
+        self._listeners.setdefault(method, []).append(handler)
+
+    async def send(self, method, params=None, session_id=None):
+        """
+        送出指令並等待回應；同時 await 多個 send 即可讓指令在途重疊
+
+        Args:
+            method (str): CDP 指令
+            params (dict, optional): 參數
+            session_id (str, optional): 目標 session，未提供時送往瀏覽器本身
+
+        Returns:
+            dict: 指令的 result
+
+        Raises:
+            CDPError: 指令回傳錯誤或連線中斷
+            asyncio.TimeoutError: 逾時未回應
+        """
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = (method, future)
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id is not None:
+            message["sessionId"] = session_id
+        try:
+            await self._ws.send_str(json.dumps(message))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    async def _read_loop(self):
+        async for message in self._ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            data = json.loads(message.data)
+            if "id" in data:
+                method, future = self._pending.get(data["id"], (None, None))
+                if future is None or future.done():
+                    continue
+                if "error" in data:
+                    future.set_exception(CDPError(data["error"].get("message", ""), method))
+                else:
+                    future.set_result(data.get("result", {}))
+                continue
+            for handler in self._listeners.get(data.get("method"), ()):
+                handler(data.get("params", {}), data.get("sessionId"))
+        for method, future in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(CDPError("DevTools 連線已中斷", method))
+
+
+def read_devtools_url(user_data_dir, process, timeout=LAUNCH_TIMEOUT):
+    """
+    等待 Chrome 寫出 DevToolsActivePort（以 --remote-debugging-port=0 隨機選擇連接埠）
+
+    Args:
+        user_data_dir (str): Chrome 的 --user-data-dir
+        process (subprocess.Popen): Chrome 程序
+        timeout (float): 等待秒數
+
+    Returns:
+        str: 瀏覽器的 WebSocket 位址
+
+    Raises:
+        RuntimeError: Chrome 提早結束或逾時
+    """
+    path = os.path.join(user_data_dir, "DevToolsActivePort")
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Chrome 啟動失敗 (exit code {process.returncode})")
+        try:
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().split()
+        except OSError:
+            lines = []
+        if len(lines) >= 2:
+            return f"ws://127.0.0.1:{lines[0]}{lines[1]}"
+        time.sleep(0.05)
+    raise RuntimeError("等待 Chrome DevTools 連接埠逾時")
+
+
+class CDPElement:
+    """
+    find_elements 回傳的元素
+
+    以從文件開始的 (selector, 索引) 路徑定位，每次存取都在目前的 frame 重新查詢，不保留遠端物件。
+    """
+
+    def __init__(self, backend, path):
+        """
+        Args:
+            backend (CDPBackend): 所屬的後端
+            path (list): [selector, 索引] 列表
+        """
+        self.backend = backend
+        self.path = path
+
+    @property
+    def text(self):
+        return self.backend.evaluate(ELEMENT_TEXT_SCRIPT, self.path) or ""
+
+    def find_elements(self, by, selector):
+        return self.backend._find_elements(self.path, by, selector)
+
+
+class CDPBackend(ScraperBackend):
+    """
+    以 DevTools Protocol 直接控制 Chrome 分頁
+
+    用法:
+        with CDPBackend.launch() as backend:
+            backend.navigate(url)
+            backend.switch_to_frame("#reportIframe")
+            rows = backend.evaluate("return document.querySelectorAll('tr').length;")
+    """
+
+    name = "cdp"
+
+    def __init__(self, ws_url, process=None, user_data_dir=None, timeout=DEFAULT_COMMAND_TIMEOUT,
+                 page_load_timeout=DEFAULT_PAGE_LOAD_TIMEOUT):
+        """
+        連線至瀏覽器並附加到第一個分頁（沒有分頁時建立一個）
+
+        Args:
+            ws_url (str): 瀏覽器的 webSocketDebuggerUrl
+            process (subprocess.Popen, optional): 由 launch() 啟動的 Chrome，關閉時一併結束
+            user_data_dir (str, optional): launch() 建立的暫存設定檔目錄，關閉時刪除
+            timeout (float): 單一指令等待回應的秒數
+            page_load_timeout (float): 等待頁面 load 事件的秒數
+        """
+        self.process = process
+        self.user_data_dir = user_data_dir
+        self.page_load_timeout = page_load_timeout
+        self._connection = CDPConnection(ws_url, timeout)
+        # (session_id, frame_id) -> 預設執行環境 id
+        self._contexts = {}
+        # 跨來源 iframe 的 frame_id -> 子 session
+        self._child_sessions = {}
+        self._load_waiters = []
+        self._page_session = None
+        self._main_frame = None
+        self._frame = None
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="cdp-backend", daemon=True)
+        self._thread.start()
+        try:
+            self._run(self._attach())
+        except Exception:
+            self._stop_loop()
+            raise
+
+    @classmethod
+    def launch(cls, chrome_path=None, profile=None, user_agent=None, timeout=LAUNCH_TIMEOUT):
+        """
+        啟動無頭 Chrome 並連線
+
+        Args:
+            chrome_path (str, optional): Chrome 執行檔路徑，未提供時在 PATH 中尋找
+            profile (BrowserProfile, optional): 啟動參數與請求封鎖設定，預設為精簡設定
+            user_agent (str, optional): 覆寫 User-Agent
+            timeout (float): 等待 DevTools 連接埠的秒數
+
+        Returns:
+            CDPBackend
+
+        Raises:
+            RuntimeError: 找不到 Chrome 或啟動失敗
+        """
+        chrome_path = chrome_path or find_chrome_binary()
+        if not chrome_path:
+            raise RuntimeError("找不到 Chrome 執行檔")
+        profile = profile or BrowserProfile()
+        user_data_dir = tempfile.mkdtemp(prefix="finlab-cdp-")
+        arguments = [chrome_path, *CHROME_ARGUMENTS, f"--user-data-dir={user_data_dir}"]
+        if user_agent:
+            arguments.append(f"--user-agent={user_agent}")
+        if profile.lean:
+            arguments.extend(LEAN_CHROME_ARGUMENTS)
+        arguments.append("about:blank")
+        process = subprocess.Popen(arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            backend = cls(read_devtools_url(user_data_dir, process, timeout), process, user_data_dir)
+        except Exception:
+            process.kill()
+            process.wait()
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        profile.install(backend)
+        return backend
+
+    def navigate(self, url):
+        self._run(self._navigate(url))
+
+    def switch_to_frame(self, selector):
+        self._run(self._switch_to_frame(selector))
+
+    def switch_to_default(self):
+        self._frame = (self._page_session, self._main_frame)
+
+    def click(self, selector):
+        self.evaluate(CLICK_SCRIPT, selector)
+
+    def evaluate(self, script, *args):
+        return self._run(self._call(_function_declaration(script), args, await_promise=False))
+
+    def evaluate_async(self, script, *args):
+        return self._run(self._call(_async_function_declaration(script), args, await_promise=True))
+
+    def find_elements(self, by, selector):
+        return self._find_elements([], by, selector)
+
+    def _find_elements(self, path, by, selector):
+        if by != By.CSS_SELECTOR:
+            raise CDPError(f"cdp 後端只支援 CSS selector 查詢: {by}")
+        count = self.evaluate(COUNT_ELEMENTS_SCRIPT, path, selector) or 0
+        return [CDPElement(self, [*path, [selector, index]]) for index in range(count)]
+
+    def execute_cdp_cmd(self, method, params):
+        """
+        在分頁的 session 送出任意 CDP 指令（BrowserProfile.install 以此啟用請求封鎖）
+
+        Returns:
+            dict: 指令的 result
+        """
+        return self._run(self._connection.send(method, params, self._page_session))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._run(self._shutdown())
+        except Exception as e:
+            print(f"關閉 DevTools 連線失敗: {e}")
+        self._stop_loop()
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.user_data_dir:
+            shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _attach(self):
+        connection = self._connection
+        await connection.open()
+        connection.on("Runtime.executionContextCreated", self._on_context_created)
+        connection.on("Runtime.executionContextDestroyed", self._on_context_destroyed)
+        connection.on("Runtime.executionContextsCleared", self._on_contexts_cleared)
+        connection.on("Page.loadEventFired", self._on_load)
+        connection.on("Target.attachedToTarget", self._on_attached)
+        connection.on("Target.detachedFromTarget", self._on_detached)
+
+        targets = await connection.send("Target.getTargets")
+        page = next((info for info in targets["targetInfos"] if info["type"] == "page"), None)
+        target_id = page["targetId"] if page else (await connection.send("Target.createTarget", {"url": "about:blank"}))["targetId"]
+        attached = await connection.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+        self._page_session = attached["sessionId"]
+        # 初始化指令彼此無關，同時送出
+        _, _, _, tree = await asyncio.gather(
+            connection.send("Page.enable", session_id=self._page_session),
+            connection.send("Runtime.enable", session_id=self._page_session),
+            connection.send("Target.setAutoAttach", self._auto_attach_params(), self._page_session),
+            connection.send("Page.getFrameTree", session_id=self._page_session),
+        )
+        self._main_frame = tree["frameTree"]["frame"]["id"]
+        self.switch_to_default()
+
+    async def _shutdown(self):
+        if self.process is not None:
+            try:
+                await asyncio.wait_for(self._connection.send("Browser.close"), 5)
+            except (CDPError, asyncio.TimeoutError):
+                pass
+        await self._connection.close()
+
+    async def _navigate(self, url):
+        self.switch_to_default()
+        loaded = self._loop.create_future()
+        self._load_waiters.append(loaded)
+        try:
+            result = await self._connection.send("Page.navigate", {"url": url}, self._page_session)
+            if result.get("errorText"):
+                raise CDPError(f"無法載入 {url}: {result['errorText']}", "Page.navigate")
+            self._main_frame = result.get("frameId", self._main_frame)
+            self.switch_to_default()
+            # 同一份文件內的導覽（例如只改變 hash）不會觸發 load 事件
+            if result.get("loaderId"):
+                await asyncio.wait_for(loaded, self.page_load_timeout)
+        finally:
+            if loaded in self._load_waiters:
+                self._load_waiters.remove(loaded)
+
+    async def _switch_to_frame(self, selector):
+        session_id, _ = self._frame
+        element = await self._call(_function_declaration(QUERY_SCRIPT), (selector,), False, by_value=False)
+        object_id = element.get("objectId")
+        if object_id is None:
+            raise CDPError(f"找不到 iframe: {selector}")
+        # describeNode 與 releaseObject 同時送出，Chrome 依序處理
+        node, _ = await asyncio.gather(
+            self._connection.send("DOM.describeNode", {"objectId": object_id}, session_id),
+            self._connection.send("Runtime.releaseObject", {"objectId": object_id}, session_id),
+        )
+        frame_id = node["node"].get("frameId")
+        if frame_id is None:
+            raise CDPError(f"{selector} 不是 iframe")
+        self._frame = (self._child_sessions.get(frame_id, session_id), frame_id)
+        await self._context_id()
+
+    async def _call(self, declaration, args, await_promise, by_value=True):
+        session_id, _ = self._frame
+        result = await self._connection.send("Runtime.callFunctionOn", {
+            "functionDeclaration": declaration,
+            "executionContextId": await self._context_id(),
+            "arguments": [{"value": arg} for arg in args],
+            "returnByValue": by_value,
+            "awaitPromise": await_promise,
+            "userGesture": True,
+        }, session_id)
+        if "exceptionDetails" in result:
+            raise CDPError(_exception_message(result["exceptionDetails"]))
+        return result["result"].get("value") if by_value else result["result"]
+
+    async def _context_id(self):
+        """等待目前 frame 的預設執行環境建立（導覽或切換 frame 後可能稍晚才出現）"""
+        deadline = time.monotonic() + self._connection.timeout
+        while self._frame not in self._contexts:
+            if time.monotonic() > deadline:
+                raise CDPError("等待 frame 執行環境逾時")
+            await asyncio.sleep(0.01)
+        return self._contexts[self._frame]
+
+    @staticmethod
+    def _auto_attach_params():
+        return {"autoAttach": True, "waitForDebuggerOnStart": False, "flatten": True}
+
+    def _on_context_created(self, params, session_id):
+        context = params["context"]
+        aux = context.get("auxData") or {}
+        if aux.get("isDefault") and aux.get("frameId"):
+            self._contexts[(session_id, aux["frameId"])] = context["id"]
+
+    def _on_context_destroyed(self, params, session_id):
+        context_id = params.get("executionContextId")
+        for key in [key for key, value in self._contexts.items() if key[0] == session_id and value == context_id]:
+            del self._contexts[key]
+
+    def _on_contexts_cleared(self, params, session_id):
+        for key in [key for key in self._contexts if key[0] == session_id]:
+            del self._contexts[key]
+
+    def _on_load(self, params, session_id):
+        if session_id != self._page_session:
+            return
+        for waiter in self._load_waiters:
+            if not waiter.done():
+                waiter.set_result(params.get("timestamp"))
+
+    def _on_attached(self, params, session_id):
+        info = params["targetInfo"]
+        if info.get("type") != "iframe":
+            return
+        child = params["sessionId"]
+        self._child_sessions[info["targetId"]] = child
+        asyncio.ensure_future(self._enable_child(child))
+
+    def _on_detached(self, params, session_id):
+        child = params.get("sessionId")
+        for frame_id in [frame_id for frame_id, value in self._child_sessions.items() if value == child]:
+            del self._child_sessions[frame_id]
+        self._on_contexts_cleared({}, child)
+
+    async def _enable_child(self, session_id):
+        try:
+            await asyncio.gather(
+                self._connection.send("Runtime.enable", session_id=session_id),
+                self._connection.send("Target.setAutoAttach", self._auto_attach_params(), session_id),
+            )
+        except (CDPError, asyncio.TimeoutError) as e:
+            print(f"無法啟用 iframe session: {e}")
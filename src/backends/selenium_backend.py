@@ -0,0 +1,53 @@
+"""
+以 Selenium WebDriver（經由 chromedriver）實作的瀏覽器後端
+"""
+from selenium.webdriver.common.by import By
+from src.backends.base import ScraperBackend
+
+
+class SeleniumBackend(ScraperBackend):
+    """
+    包裝既有的 WebDriver
+
+    用法:
+        backend = SeleniumBackend(create_chrome_driver(driver_path))
+        backend.navigate(url)
+    """
+
+    name = "selenium"
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver: Selenium WebDriver
+        """
+        self.driver = driver
+
+    def navigate(self, url):
+        self.driver.get(url)
+
+    def switch_to_frame(self, selector):
+        self.driver.switch_to.frame(self.driver.find_element(By.CSS_SELECTOR, selector))
+
+    def switch_to_default(self):
+        self.driver.switch_to.default_content()
+
+    def click(self, selector):
+        element = self.driver.find_element(By.CSS_SELECTOR, selector)
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        self.driver.execute_script("arguments[0].click();", element)
+
+    def evaluate(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def evaluate_async(self, script, *args):
+        return self.driver.execute_async_script(script, *args)
+
+    def close(self):
+        self.driver.quit()
+
+    def find_elements(self, by, selector):
+        return self.driver.find_elements(by, selector)
+
+    def execute_cdp_cmd(self, method, params):
+        return self.driver.execute_cdp_cmd(method, params)
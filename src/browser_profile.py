@@ -0,0 +1,221 @@
+"""
+精簡的 Chrome 啟動設定與資源封鎖
+
+只需要持股表格，圖片、字型、影音與分析追蹤腳本都不必下載：
+- 啟動參數關閉擴充功能、背景網路與圖片載入，並使用較小的視窗
+- 透過 DevTools Protocol 的 Network.setBlockedURLs 依網址樣式與資源類型封鎖請求
+- 以 Performance API 統計頁面載入時間與傳輸量，方便比較封鎖前後的差異
+"""
+
+
+# 依副檔名對應的資源類型（Network.setBlockedURLs 只能以網址樣式比對）
+RESOURCE_TYPE_PATTERNS = {
+    "image": ("*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"),
+    "font": ("*.woff*", "*.ttf*", "*.otf*", "*.eot*"),
+    "media": ("*.mp4*", "*.webm*", "*.mp3*", "*.m4a*", "*.ogg*"),
+    "stylesheet": ("*.css*",),
+}
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+
+# 常見的分析與追蹤服務
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+    "*segment.io*",
+    "*mixpanel.com*",
+)
+
+LEAN_CHROME_ARGUMENTS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+    "--window-size=1280,720",
+)
+
+# 2 = 封鎖
+LEAN_CHROME_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+}
+
+# 統計目前頁面與同源 iframe 的載入時間與傳輸量；跨來源資源沒有 Timing-Allow-Origin 時 transferSize 為 0
+PAGE_LOAD_STATS_SCRIPT = """
+function collect(win) {
+    var nav = win.performance.getEntriesByType('navigation')[0];
+    var resources = win.performance.getEntriesByType('resource');
+    var stats = {load_ms: 0, transfer_bytes: 0, resource_count: resources.length};
+    if (nav) {
+        stats.load_ms = nav.loadEventEnd || nav.domContentLoadedEventEnd || nav.duration;
+        stats.transfer_bytes += nav.transferSize || 0;
+    }
+    for (var i = 0; i < resources.length; i++) {
+        stats.transfer_bytes += resources[i].transferSize || 0;
+    }
+    return stats;
+}
+var total = collect(window);
+for (var i = 0; i < window.frames.length; i++) {
+    try {
+        var frame = collect(window.frames[i]);
+        total.transfer_bytes += frame.transfer_bytes;
+        total.resource_count += frame.resource_count;
+    } catch (e) {}
+}
+return total;
+"""
+
+
+def parse_resource_types(value):
+    """
+    解析以逗號分隔的資源類型
+
+    Args:
+        value (str | None): 例如 "image,font"；未設定時使用預設值，"none" 表示不封鎖
+
+    Returns:
+        tuple: 資源類型
+
+    Raises:
+        ValueError: 不支援的資源類型
+    """
+    if not value or not value.strip():
+        return DEFAULT_BLOCKED_RESOURCE_TYPES
+    types = tuple(dict.fromkeys(part.strip().lower() for part in value.split(",") if part.strip()))
+    if types == ("none",):
+        return ()
+    unknown = [t for t in types if t not in RESOURCE_TYPE_PATTERNS]
+    if unknown:
+        raise ValueError(f"不支援的資源類型: {', '.join(unknown)}（可用: {', '.join(RESOURCE_TYPE_PATTERNS)}）")
+    return types
+
+
+def parse_url_patterns(value):
+    """
+    解析以逗號或空白分隔的網址樣式
+
+    Args:
+        value (str | None): 例如 "*ads.example.com*"；未設定時使用預設值，"none" 表示不封鎖
+
+    Returns:
+        tuple: 網址樣式
+    """
+    patterns = tuple(dict.fromkeys((value or "").replace(",", " ").split()))
+    if not patterns:
+        return DEFAULT_BLOCKED_URL_PATTERNS
+    return () if patterns == ("none",) else patterns
+
+
+class BrowserProfile:
+    """
+    Chrome 啟動參數與請求封鎖設定
+
+    用法:
+        profile = BrowserProfile()
+        profile.apply_options(options)
+        driver = webdriver.Chrome(service=service, options=options)
+        profile.install(driver)
+    """
+
+    def __init__(self, lean=True, blocked_resource_types=DEFAULT_BLOCKED_RESOURCE_TYPES,
+                 blocked_url_patterns=DEFAULT_BLOCKED_URL_PATTERNS):
+        """
+        Args:
+            lean (bool): 是否使用精簡的啟動參數
+            blocked_resource_types (iterable): 要封鎖的資源類型（RESOURCE_TYPE_PATTERNS 的鍵）
+            blocked_url_patterns (iterable): 要封鎖的網址樣式（* 為萬用字元）
+        """
+        self.lean = lean
+        self.blocked_resource_types = tuple(blocked_resource_types)
+        self.blocked_url_patterns = tuple(blocked_url_patterns)
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Args:
+            config (dict): load_config() 的設定
+
+        Returns:
+            BrowserProfile
+        """
+        return cls(
+            lean=config["chrome_lean_profile"],
+            blocked_resource_types=config["blocked_resource_types"],
+            blocked_url_patterns=config["blocked_url_patterns"],
+        )
+
+    @property
+    def blocked_urls(self):
+        """
+        Returns:
+            list: 傳給 Network.setBlockedURLs 的網址樣式
+        """
+        patterns = list(self.blocked_url_patterns)
+        for resource_type in self.blocked_resource_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        return list(dict.fromkeys(patterns))
+
+    def apply_options(self, options):
+        """
+        將精簡設定加入 ChromeOptions
+
+        Args:
+            options: selenium.webdriver.chrome.options.Options
+        """
+        if not self.lean:
+            return
+        for argument in LEAN_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", dict(LEAN_CHROME_PREFS))
+
+    def install(self, driver):
+        """
+        在瀏覽器啟用請求封鎖；不支援 DevTools Protocol 時只印出警告
+
+        Args:
+            driver: Chrome WebDriver
+
+        Returns:
+            bool: 是否成功啟用
+        """
+        blocked_urls = self.blocked_urls
+        if not blocked_urls:
+            return False
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        except Exception as e:
+            print(f"無法啟用請求封鎖: {e}")
+            return False
+        return True
+
+
+def collect_page_load_stats(driver):
+    """
+    讀取目前頁面的載入時間與傳輸量
+
+    Args:
+        driver: WebDriver（需位於最上層文件）
+
+    Returns:
+        dict | None: {"load_ms", "transfer_bytes", "resource_count"}，無法取得時回傳 None
+    """
+    try:
+        stats = driver.execute_script(PAGE_LOAD_STATS_SCRIPT)
+    except Exception:
+        return None
+    if not isinstance(stats, dict):
+        return None
+    return {
+        "load_ms": float(stats.get("load_ms") or 0),
+        "transfer_bytes": int(stats.get("transfer_bytes") or 0),
+        "resource_count": int(stats.get("resource_count") or 0),
+    }
@@ -0,0 +1,368 @@
+"""
+瀏覽器程序監控
+
+追蹤每個 WebDriver 的程序樹（chromedriver 與其啟動的 Chrome 各程序），
+在背景定期取樣記憶體（RSS）與 CPU 時間：
+- 程序樹的 RSS 超過上限時，歸還瀏覽器後由 DriverPool 回收重建
+- 關閉瀏覽器後仍存活的程序（driver.quit() 失敗或當機）會被強制結束
+- 啟動與結束時清除先前執行遺留的 chrome / chromedriver 孤兒程序
+- 每次執行回報記憶體峰值與 CPU 時間
+"""
+import os
+import threading
+import psutil
+from src.utils.config import DEFAULT_RSS_LIMIT_MB
+from src.utils.metrics import metrics
+
+
+# 背景取樣間隔秒數
+DEFAULT_SAMPLE_INTERVAL = 0.5
+# 結束程序後等待的秒數，逾時改用 SIGKILL
+TERMINATE_TIMEOUT = 3
+
+BROWSER_PROCESS_NAMES = ("chromedriver", "chrome", "chromium", "chromium-browser", "google-chrome", "headless_shell")
+# 只清除由 WebDriver 啟動的 Chrome，不影響使用者自己開啟的瀏覽器
+WEBDRIVER_CHROME_FLAGS = ("--headless", "--test-type=webdriver", "--remote-debugging-port")
+
+MB = 1024 * 1024
+
+
+def service_pid(driver):
+    """
+    Args:
+        driver: Selenium WebDriver 或 CDPBackend
+
+    Returns:
+        int | None: chromedriver（CDPBackend 為 Chrome）的 PID，無法取得時回傳 None
+    """
+    process = getattr(getattr(driver, "service", None), "process", None) or getattr(driver, "process", None)
+    pid = getattr(process, "pid", None)
+    return pid if isinstance(pid, int) else None
+
+
+def process_tree(root):
+    """
+    Args:
+        root (psutil.Process): 根程序
+
+    Returns:
+        list: 仍存活的根程序與所有子孫程序
+    """
+    try:
+        return [root, *root.children(recursive=True)]
+    except psutil.Error:
+        return []
+
+
+def terminate_processes(processes, timeout=TERMINATE_TIMEOUT):
+    """
+    結束仍存活的程序：先 SIGTERM，逾時後 SIGKILL
+
+    Args:
+        processes (list): psutil.Process
+
+    Returns:
+        int: 結束的程序數
+    """
+    alive = [process for process in processes if process.is_running()]
+    for process in alive:
+        try:
+            process.terminate()
+        except psutil.Error:
+            pass
+    _, remaining = psutil.wait_procs(alive, timeout=timeout)
+    for process in remaining:
+        try:
+            process.kill()
+        except psutil.Error:
+            pass
+    return len(alive)
+
+
+def _is_webdriver_browser(info):
+    """由 WebDriver 啟動的 chromedriver 或 Chrome 主程序（不含 renderer 等子程序）"""
+    name = (info.get("name") or "").lower()
+    if not any(name.startswith(candidate) for candidate in BROWSER_PROCESS_NAMES):
+        return False
+    if name.startswith("chromedriver"):
+        return True
+    cmdline = info.get("cmdline") or []
+    if any(arg.startswith("--type=") for arg in cmdline):
+        return False
+    return any(arg.startswith(flag) for arg in cmdline for flag in WEBDRIVER_CHROME_FLAGS)
+
+
+class BrowserSupervisor:
+    """
+    WebDriver 程序樹的監控器
+
+    用法:
+        supervisor = BrowserSupervisor(rss_limit_mb=512)
+        supervisor.start()
+        with DriverPool(supervisor=supervisor) as pool:
+            ...
+        print(supervisor.run_stats())
+        supervisor.stop()
+    """
+
+    def __init__(self, rss_limit_mb=DEFAULT_RSS_LIMIT_MB, reap_orphans=True, interval=DEFAULT_SAMPLE_INTERVAL):
+        """
+        Args:
+            rss_limit_mb (float): 單一瀏覽器程序樹的 RSS 上限（MB），0 表示不限制
+            reap_orphans (bool): 啟動與結束時清除遺留的 chrome / chromedriver 程序
+            interval (float): 背景取樣間隔秒數
+        """
+        self.rss_limit = int(rss_limit_mb * MB) if rss_limit_mb else 0
+        self.reap_orphans_enabled = reap_orphans
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._roots = {}
+        self._over_limit = set()
+        self._cpu = {}
+        self._cpu_baseline = {}
+        self._peak_rss = 0
+        self._recycled = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Args:
+            config (dict): load_config() 的設定
+
+        Returns:
+            BrowserSupervisor
+        """
+        return cls(
+            rss_limit_mb=config.get("browser_rss_limit_mb", DEFAULT_RSS_LIMIT_MB),
+            reap_orphans=config.get("browser_reap_orphans", True),
+        )
+
+    def start(self):
+        """清除遺留程序並開始背景取樣（重複呼叫不會建立多個執行緒）"""
+        if self.reap_orphans_enabled:
+            self.reap_orphans()
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="browser-supervisor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """停止取樣，結束仍在追蹤的程序樹並清除遺留程序"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+        with self._lock:
+            roots = list(self._roots.values())
+            self._roots.clear()
+        for root in roots:
+            terminate_processes(process_tree(root))
+        if self.reap_orphans_enabled:
+            self.reap_orphans()
+
+    def track(self, driver):
+        """
+        開始追蹤新建立的 WebDriver
+
+        Args:
+            driver: Selenium WebDriver
+        """
+        pid = service_pid(driver)
+        if pid is None:
+            return
+        try:
+            root = psutil.Process(pid)
+        except psutil.Error:
+            return
+        with self._lock:
+            self._roots[id(driver)] = root
+
+    def untrack(self, driver):
+        """
+        停止追蹤，並回傳關閉前的程序樹（driver.quit() 後用來清除殘留程序）
+
+        Args:
+            driver: Selenium WebDriver
+
+        Returns:
+            list: psutil.Process
+        """
+        with self._lock:
+            root = self._roots.pop(id(driver), None)
+            self._over_limit.discard(id(driver))
+        return process_tree(root) if root is not None else []
+
+    def reap(self, processes):
+        """
+        結束 driver.quit() 後仍存活的程序
+
+        Args:
+            processes (list): untrack() 回傳的程序樹
+
+        Returns:
+            int: 結束的程序數
+        """
+        count = terminate_processes(processes)
+        if count:
+            print(f"瀏覽器關閉後仍有 {count} 個程序存活，已強制結束")
+            metrics.increment("browser_orphans_reaped", count)
+        return count
+
+    def rss(self, driver):
+        """
+        Args:
+            driver: Selenium WebDriver
+
+        Returns:
+            int: 程序樹的 RSS 總和（bytes）；Chrome 各程序共用的記憶體會重複計算，數值偏保守
+        """
+        with self._lock:
+            root = self._roots.get(id(driver))
+        if root is None:
+            return 0
+        return sum(self._sample_process(process)[0] for process in process_tree(root))
+
+    def over_limit(self, driver):
+        """
+        Args:
+            driver: Selenium WebDriver
+
+        Returns:
+            bool: 取樣期間或目前的 RSS 曾超過上限
+        """
+        if not self.rss_limit:
+            return False
+        with self._lock:
+            flagged = id(driver) in self._over_limit
+        return flagged or self.rss(driver) > self.rss_limit
+
+    def record_recycle(self):
+        """記錄因記憶體超過上限而回收的瀏覽器"""
+        with self._lock:
+            self._recycled += 1
+        metrics.increment("browser_recycled")
+        print(f"瀏覽器記憶體超過上限 ({self.rss_limit / MB:.0f} MB)，回收重建")
+
+    def sample(self):
+        """
+        取樣所有追蹤中的程序樹，更新記憶體峰值、CPU 時間與超過上限的瀏覽器
+
+        Returns:
+            int: 目前所有瀏覽器的 RSS 總和（bytes）
+        """
+        with self._lock:
+            roots = dict(self._roots)
+        total = 0
+        over_limit = set()
+        for key, root in roots.items():
+            tree_rss = 0
+            for process in process_tree(root):
+                rss, cpu = self._sample_process(process)
+                tree_rss += rss
+                if cpu is not None:
+                    with self._lock:
+                        self._cpu[process.pid] = cpu
+            total += tree_rss
+            if self.rss_limit and tree_rss > self.rss_limit:
+                over_limit.add(key)
+        with self._lock:
+            self._peak_rss = max(self._peak_rss, total)
+            self._over_limit |= over_limit
+        return total
+
+    def begin_run(self):
+        """重設本次執行的記憶體峰值與 CPU 時間"""
+        self.sample()
+        with self._lock:
+            self._peak_rss = 0
+            self._recycled = 0
+            self._cpu_baseline = dict(self._cpu)
+
+    def run_stats(self):
+        """
+        Returns:
+            dict: {"peak_rss_bytes": 記憶體峰值, "cpu_seconds": CPU 時間, "recycled": 回收次數}
+        """
+        self.sample()
+        with self._lock:
+            cpu_seconds = sum(
+                max(0.0, cpu - self._cpu_baseline.get(pid, 0.0)) for pid, cpu in self._cpu.items()
+            )
+            return {"peak_rss_bytes": self._peak_rss, "cpu_seconds": cpu_seconds, "recycled": self._recycled}
+
+    def report(self):
+        """
+        印出並匯出本次執行的瀏覽器資源用量
+
+        Returns:
+            dict: run_stats() 的結果
+        """
+        stats = self.run_stats()
+        print(
+            f"瀏覽器資源用量: 記憶體峰值 {stats['peak_rss_bytes'] / MB:.0f} MB，"
+            f"CPU 時間 {stats['cpu_seconds']:.2f}s，回收 {stats['recycled']} 次"
+        )
+        metrics.set_gauge("browser_peak_rss_bytes", stats["peak_rss_bytes"])
+        metrics.set_gauge("browser_cpu_seconds", stats["cpu_seconds"])
+        return stats
+
+    def find_orphans(self):
+        """
+        找出遺留的 chrome / chromedriver 程序
+
+        只包含目前使用者、由 WebDriver 啟動、且原本的父程序已結束（被 init 或本程序收養）的程序，
+        並排除追蹤中的瀏覽器。
+
+        Returns:
+            list: psutil.Process
+        """
+        uid = os.getuid() if hasattr(os, "getuid") else None
+        adopters = {1, os.getpid()}
+        with self._lock:
+            tracked = {root.pid for root in self._roots.values()}
+        orphans = []
+        for process in psutil.process_iter(["pid", "ppid", "name", "cmdline", "uids"]):
+            info = process.info
+            if info["pid"] in tracked or info["ppid"] not in adopters or not _is_webdriver_browser(info):
+                continue
+            if uid is not None and info.get("uids") is not None and info["uids"].real != uid:
+                continue
+            orphans.append(process)
+        return orphans
+
+    def reap_orphans(self):
+        """
+        結束遺留的 chrome / chromedriver 程序（連同其子程序）
+
+        Returns:
+            int: 結束的程序數
+        """
+        processes = [process for orphan in self.find_orphans() for process in process_tree(orphan)]
+        if not processes:
+            return 0
+        count = terminate_processes(processes)
+        print(f"已清除 {count} 個遺留的瀏覽器程序")
+        metrics.increment("browser_orphans_reaped", count)
+        return count
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"瀏覽器資源取樣失敗: {e}")
+
+    @staticmethod
+    def _sample_process(process):
+        """
+        Returns:
+            tuple: (RSS bytes, 累計 CPU 秒數 | None)
+        """
+        try:
+            with process.oneshot():
+                cpu = process.cpu_times()
+                return process.memory_info().rss, cpu.user + cpu.system
+        except psutil.Error:
+            return 0, None
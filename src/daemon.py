@@ -0,0 +1,176 @@
+"""
+常駐模式
+
+設定只載入一次並保留暖機完成的瀏覽器，依 MarketSchedule 在程式內排程執行，
+每次執行都有逾時上限；逾時或執行一定次數後會重建瀏覽器池。
+逾時的執行在結束前不會開始下一次執行，避免兩次執行同時推播或寫入快照。
+"""
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+from src.browser_profile import BrowserProfile
+from src.browser_supervisor import BrowserSupervisor
+from src.driver_pool import DriverPool
+from src.scheduler import MarketSchedule
+
+
+class StrategyDaemon:
+    """
+    依排程重複執行抓取與通知
+
+    用法:
+        daemon = StrategyDaemon(config, run_cycle, schedule)
+        daemon.run_forever()
+    """
+
+    def __init__(self, config, run_cycle, schedule, pool_factory=None, run_timeout=600, recycle_cycles=20,
+                 supervisor=None):
+        """
+        Args:
+            config (dict): load_config() 的設定
+            run_cycle (callable): 以 (config, pool) 呼叫，執行一次抓取與通知
+            schedule (MarketSchedule): 執行排程
+            pool_factory (callable, optional): 建立 DriverPool 的函式
+            run_timeout (float): 單次執行的逾時秒數
+            recycle_cycles (int): 每執行幾次重建瀏覽器池（0 表示不主動重建）
+            supervisor (BrowserSupervisor, optional): 追蹤瀏覽器程序；建立瀏覽器池時啟動、關閉時清除殘留程序
+        """
+        self.config = config
+        self.run_cycle = run_cycle
+        self.schedule = schedule
+        self.supervisor = supervisor
+        self.pool_factory = pool_factory or (
+            lambda: DriverPool(
+                size=config["scraper_workers"],
+                profile=BrowserProfile.from_config(config),
+                supervisor=self.supervisor,
+                backend=config["scraper_backend"],
+            )
+        )
+        self.run_timeout = run_timeout
+        self.recycle_cycles = recycle_cycles
+        self.pool = None
+        self.cycles = 0
+        # 逾時後仍在背景執行的 run_cycle
+        self._abandoned = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """建立瀏覽器池並預先啟動瀏覽器；啟動失敗時延後到第一次抓取再建立"""
+        if self.supervisor is not None:
+            self.supervisor.start()
+        self.pool = self.pool_factory()
+        try:
+            self.pool.warm_up()
+            print(f"已預先啟動 {self.pool.size} 個瀏覽器")
+        except Exception as e:
+            print(f"瀏覽器暖機失敗，將於抓取時再啟動: {e}")
+
+    def stop(self):
+        """要求結束排程迴圈（可由 signal handler 呼叫）"""
+        self._stop.set()
+
+    def close(self):
+        """關閉所有瀏覽器"""
+        if self.pool is not None:
+            self.pool.close(force=True)
+            self.pool = None
+        if self.supervisor is not None:
+            self.supervisor.stop()
+
+    def recycle_pool(self):
+        """關閉目前的瀏覽器池（含卡住的瀏覽器）並建立新的"""
+        print("重建瀏覽器池")
+        self.close()
+        self.start()
+
+    def run_once(self):
+        """
+        在逾時限制內執行一次；上一次逾時的執行仍未結束時略過本次
+
+        Returns:
+            bool: 是否成功完成
+        """
+        self.cycles += 1
+        print(f"\n=== 第 {self.cycles} 次執行 ({datetime.now(self.schedule.tz):%Y-%m-%d %H:%M:%S}) ===")
+        if self._abandoned is not None:
+            if not self._abandoned.done():
+                print("上一次逾時的執行仍未結束，略過本次執行")
+                return False
+            self._abandoned = None
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cycle")
+        future = executor.submit(self.run_cycle, self.config, self.pool)
+        succeeded = False
+        try:
+            future.result(timeout=self.run_timeout)
+            succeeded = True
+        except FutureTimeoutError:
+            print(f"執行超過 {self.run_timeout} 秒，中止並重建瀏覽器")
+            self._abandoned = future
+            # 關閉借出中的瀏覽器會讓卡住的 WebDriver 呼叫拋出例外而結束
+            self.recycle_pool()
+        except Exception as e:
+            print(f"本次執行失敗: {e}")
+        finally:
+            executor.shutdown(wait=False)
+
+        if succeeded and self.recycle_cycles and self.cycles % self.recycle_cycles == 0:
+            self.recycle_pool()
+        return succeeded
+
+    def run_forever(self, max_cycles=None, now=None):
+        """
+        依排程執行直到 stop() 被呼叫
+
+        Args:
+            max_cycles (int, optional): 執行幾次後結束（測試用）
+            now (callable, optional): 回傳目前時間的函式（測試用）
+        """
+        now = now or (lambda: datetime.now(self.schedule.tz))
+        if self.pool is None:
+            self.start()
+        try:
+            while not self._stop.is_set():
+                next_run = self.schedule.next_run(now())
+                wait_seconds = max(0.0, (next_run - now()).total_seconds())
+                print(f"下次執行時間: {next_run:%Y-%m-%d %H:%M} ({wait_seconds / 60:.1f} 分鐘後)")
+                if self._stop.wait(wait_seconds):
+                    break
+                self.run_once()
+                if max_cycles is not None and self.cycles >= max_cycles:
+                    break
+        finally:
+            self.close()
+            print("常駐模式已結束")
+
+
+def run_daemon(config, run_cycle):
+    """
+    以設定建立排程並常駐執行，收到 SIGINT / SIGTERM 時結束
+
+    Args:
+        config (dict): load_config() 的設定
+        run_cycle (callable): 以 (config, pool) 呼叫，執行一次抓取與通知
+    """
+    schedule = MarketSchedule(
+        run_times=config["daemon_run_times"],
+        interval_minutes=config["daemon_interval_minutes"],
+        holidays=config["market_holidays"],
+    )
+    daemon = StrategyDaemon(
+        config,
+        run_cycle,
+        schedule,
+        run_timeout=config["daemon_run_timeout"],
+        recycle_cycles=config["daemon_recycle_cycles"],
+        supervisor=BrowserSupervisor.from_config(config),
+    )
+
+    def handle_signal(signum, frame):
+        print(f"\n收到訊號 {signum}，準備結束")
+        daemon.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    daemon.run_forever()
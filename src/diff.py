@@ -0,0 +1,185 @@
+"""
+持股差異比對
+
+以 stock_id 建立前後兩次持股的索引，將每檔股票分類為
+新進場、出場、權重變動或獲利變動超過門檻，所有操作皆為線性時間。
+"""
+from src.utils.parsing import parse_percentage
+
+
+ENTRY = "entry"
+EXIT = "exit"
+WEIGHT_CHANGE = "weight_change"
+PROFIT_MOVE = "profit_move"
+
+CHANGE_TYPES = (ENTRY, EXIT, WEIGHT_CHANGE, PROFIT_MOVE)
+
+
+def holding_key(row):
+    """取得持股的索引鍵：優先使用 stock_id，缺少時退回股票名稱"""
+    stock_id = row.get("stock_id")
+    if stock_id and stock_id != "N/A":
+        return stock_id
+    return row.get("name") or "N/A"
+
+
+class HoldingChange:
+    """
+    單一持股的異動
+    """
+
+    __slots__ = ("kind", "key", "previous", "current")
+
+    def __init__(self, kind, key, previous=None, current=None):
+        """
+        Args:
+            kind (str): 異動類型 (ENTRY / EXIT / WEIGHT_CHANGE / PROFIT_MOVE)
+            key (str): 持股索引鍵（通常為 stock_id）
+            previous (dict, optional): 前一次的持股資料
+            current (dict, optional): 本次的持股資料
+        """
+        self.kind = kind
+        self.key = key
+        self.previous = previous
+        self.current = current
+
+    @property
+    def row(self):
+        """用於顯示的持股資料（出場時為前一次的資料）"""
+        return self.current if self.current is not None else self.previous
+
+    def __repr__(self):
+        return f"HoldingChange({self.kind!r}, {self.key!r})"
+
+
+class HoldingsDiff:
+    """
+    兩次持股之間的差異
+    """
+
+    def __init__(self, entries=None, exits=None, weight_changes=None, profit_moves=None):
+        self.entries = entries or []
+        self.exits = exits or []
+        self.weight_changes = weight_changes or []
+        self.profit_moves = profit_moves or []
+
+    def by_kind(self):
+        """
+        Returns:
+            dict: 異動類型 -> HoldingChange 列表
+        """
+        return {
+            ENTRY: self.entries,
+            EXIT: self.exits,
+            WEIGHT_CHANGE: self.weight_changes,
+            PROFIT_MOVE: self.profit_moves,
+        }
+
+    @property
+    def has_changes(self):
+        return bool(self.entries or self.exits or self.weight_changes or self.profit_moves)
+
+    def __len__(self):
+        return len(self.entries) + len(self.exits) + len(self.weight_changes) + len(self.profit_moves)
+
+
+def _compare(diff, key, old, row, profit_threshold, weight_threshold):
+    """比較同一檔持股的前後資料，將權重與獲利變動加入 diff"""
+    old_weight = parse_percentage(old.get("current_weight"))
+    new_weight = parse_percentage(row.get("current_weight"))
+    if old_weight is not None and new_weight is not None:
+        if abs(new_weight - old_weight) > weight_threshold:
+            diff.weight_changes.append(HoldingChange(WEIGHT_CHANGE, key, old, row))
+    elif old.get("current_weight") != row.get("current_weight"):
+        diff.weight_changes.append(HoldingChange(WEIGHT_CHANGE, key, old, row))
+
+    old_profit = parse_percentage(old.get("profit_percentage"))
+    new_profit = parse_percentage(row.get("profit_percentage"))
+    if old_profit is not None and new_profit is not None and abs(new_profit - old_profit) >= profit_threshold:
+        diff.profit_moves.append(HoldingChange(PROFIT_MOVE, key, old, row))
+
+
+def diff_holdings(previous, current, profit_threshold=5.0, weight_threshold=0.0):
+    """
+    比對前後兩次持股
+
+    Args:
+        previous (list): 前一次的持股資料字典列表
+        current (list): 本次的持股資料字典列表
+        profit_threshold (float): 獲利變動超過幾個百分點才列入
+        weight_threshold (float): 權重變動超過幾個百分點才列入
+
+    Returns:
+        HoldingsDiff: 差異結果，各類別依本次（出場依前一次）的列表順序排列
+    """
+    previous_index = {holding_key(row): row for row in previous}
+    current_index = {holding_key(row): row for row in current}
+
+    diff = HoldingsDiff()
+    for key, row in current_index.items():
+        old = previous_index.get(key)
+        if old is None:
+            diff.entries.append(HoldingChange(ENTRY, key, current=row))
+            continue
+        _compare(diff, key, old, row, profit_threshold, weight_threshold)
+
+    for key, row in previous_index.items():
+        if key not in current_index:
+            diff.exits.append(HoldingChange(EXIT, key, previous=row))
+
+    return diff
+
+
+class HoldingsDiffer:
+    """
+    逐批比對本次持股，不需保留本次的完整列表
+
+    用法:
+        differ = HoldingsDiffer(previous_rows)
+        for batch in batches:
+            differ.add(batch)
+        diff = differ.result()
+    """
+
+    def __init__(self, previous, profit_threshold=5.0, weight_threshold=0.0):
+        """
+        Args:
+            previous (list): 前一次的持股資料字典列表
+            profit_threshold (float): 獲利變動超過幾個百分點才列入
+            weight_threshold (float): 權重變動超過幾個百分點才列入
+        """
+        self.previous_index = {holding_key(row): row for row in previous}
+        self.profit_threshold = profit_threshold
+        self.weight_threshold = weight_threshold
+        self.diff = HoldingsDiff()
+        self._seen = set()
+
+    def add(self, rows):
+        """
+        比對一批本次的持股；重複的索引鍵以第一次出現的為準
+
+        Args:
+            rows (iterable): 持股資料（字典或 Holding）
+        """
+        for row in rows:
+            key = holding_key(row)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            old = self.previous_index.get(key)
+            if old is None:
+                self.diff.entries.append(HoldingChange(ENTRY, key, current=row))
+            else:
+                _compare(self.diff, key, old, row, self.profit_threshold, self.weight_threshold)
+
+    def result(self):
+        """
+        Returns:
+            HoldingsDiff: 加上出場持股後的差異結果
+        """
+        self.diff.exits = [
+            HoldingChange(EXIT, key, previous=row)
+            for key, row in self.previous_index.items()
+            if key not in self._seen
+        ]
+        return self.diff
@@ -0,0 +1,201 @@
+"""
+可重複使用的 Chrome WebDriver 池
+
+保留 N 個已啟動的瀏覽器，讓多次抓取只需付出頁面導覽的時間。
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from src.backends import DEFAULT_BACKEND, ScraperBackend
+from src.scraper import launch_browser
+from src.utils.driver_cache import DEFAULT_DRIVER_CACHE_PATH
+
+
+def default_driver_factory(cache_path=DEFAULT_DRIVER_CACHE_PATH, profile=None, backend=DEFAULT_BACKEND):
+    """
+    建立使用快取 chromedriver 路徑的 driver 工廠
+
+    Args:
+        cache_path (str): chromedriver 路徑快取檔
+        profile (BrowserProfile, optional): 啟動參數與請求封鎖設定
+        backend (str): 瀏覽器後端，"selenium" 或 "cdp"（見 src.backends）
+
+    Returns:
+        callable: 呼叫後回傳新的 WebDriver（cdp 後端為 CDPBackend）
+    """
+    def factory():
+        return launch_browser(backend, cache_path, profile)
+    return factory
+
+
+class DriverPool:
+    """
+    WebDriver 池
+
+    用法:
+        with DriverPool(size=2) as pool:
+            with pool.acquire() as driver:
+                driver.get(url)
+    """
+
+    def __init__(self, size=1, max_uses=20, factory=None, profile=None, supervisor=None, backend=DEFAULT_BACKEND):
+        """
+        Args:
+            size (int): 同時可借出的瀏覽器數量上限
+            max_uses (int): 單一瀏覽器使用幾次後回收重建
+            factory (callable, optional): 建立 WebDriver 的函式
+            profile (BrowserProfile, optional): 未提供 factory 時，預設工廠使用的啟動設定
+            supervisor (BrowserSupervisor, optional): 追蹤瀏覽器程序樹；記憶體超過上限的瀏覽器
+                歸還時回收重建，關閉後殘留的程序會被強制結束
+            backend (str): 未提供 factory 時，預設工廠使用的瀏覽器後端
+        """
+        if size < 1:
+            raise ValueError("size 必須至少為 1")
+        self.size = size
+        self.max_uses = max_uses
+        self.factory = factory or default_driver_factory(profile=profile, backend=backend)
+        self.supervisor = supervisor
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._uses = {}
+        self._borrowed = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @staticmethod
+    def is_healthy(driver):
+        """
+        檢查瀏覽器是否仍可回應
+
+        Args:
+            driver: WebDriver
+
+        Returns:
+            bool: 可正常執行腳本時回傳 True
+        """
+        try:
+            driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self):
+        """預先啟動瀏覽器直到閒置數量達到 size"""
+        while self._idle.qsize() < self.size:
+            self._idle.put(self._create())
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        借出一個 WebDriver，離開區塊時歸還
+
+        Args:
+            timeout (float, optional): 等待可用瀏覽器的秒數
+
+        Yields:
+            WebDriver
+        """
+        if self._closed:
+            raise RuntimeError("DriverPool 已關閉")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("等待可用瀏覽器逾時")
+        try:
+            driver = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        try:
+            yield driver
+        finally:
+            self._checkin(driver)
+            self._slots.release()
+
+    def close(self, force=False):
+        """
+        關閉所有閒置的瀏覽器；借出中的瀏覽器會在歸還時關閉
+
+        Args:
+            force (bool): 連同借出中的瀏覽器一併關閉（用於中止卡住的抓取）
+        """
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+        if force:
+            with self._lock:
+                borrowed = list(self._borrowed.values())
+            for driver in borrowed:
+                self._discard(driver)
+
+    def _create(self):
+        driver = self.factory()
+        if self.supervisor is not None:
+            self.supervisor.track(driver)
+        with self._lock:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _checkout(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._create()
+                break
+            if self.is_healthy(driver):
+                break
+            print("瀏覽器已無回應，重新建立")
+            self._discard(driver)
+        with self._lock:
+            self._borrowed[id(driver)] = driver
+        return driver
+
+    def _checkin(self, driver):
+        with self._lock:
+            if self._borrowed.pop(id(driver), None) is None:
+                # 已被 close(force=True) 關閉
+                return
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            uses = self._uses[id(driver)]
+
+        if self._closed or uses >= self.max_uses or not self.is_healthy(driver):
+            self._discard(driver)
+            return
+
+        if self.supervisor is not None and self.supervisor.over_limit(driver):
+            self.supervisor.record_recycle()
+            self._discard(driver)
+            return
+
+        try:
+            if isinstance(driver, ScraperBackend):
+                driver.switch_to_default()
+            else:
+                driver.switch_to.default_content()
+        except Exception:
+            self._discard(driver)
+            return
+        self._idle.put(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._borrowed.pop(id(driver), None)
+        # quit 前先記下程序樹，chromedriver 結束後 Chrome 會被其他程序收養而無法再追溯
+        processes = self.supervisor.untrack(driver) if self.supervisor is not None else []
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"關閉瀏覽器失敗: {e}")
+        if processes:
+            self.supervisor.reap(processes)
@@ -0,0 +1,217 @@
+"""
+持股表格資料擷取
+
+提供兩種擷取方式：
+- extract_rows_bulk: 在頁面內執行一次 JavaScript，一次取回所有列
+- extract_rows_per_element: 逐列逐欄透過 WebDriver 查詢（備援用）
+兩者都可只擷取 [start, end) 範圍的列，iter_row_batches 以此分批擷取大型表格。
+所有函式都可傳入 src.layout 探測到的 selector；探測後不存在的欄位（None）直接填入 N/A。
+"""
+from selenium.webdriver.common.by import By
+
+
+ROW_SELECTOR = "table tbody tr"
+NAME_SELECTOR = ".whitespace-nowrap.font-bold.text-base-content-300"
+STOCK_ID_SELECTOR = ".font-light.text-base-content-200"
+ENTRY_DATE_SELECTOR = "div[slot='entryDate'] .lining-nums.svelte-1nx0ef2"
+# 獲利與權重通常都是紅色字體，順序為: 獲利 -> 權重
+ERROR_TEXT_SELECTOR = ".text-error.svelte-1nx0ef2"
+
+MISSING = "N/A"
+
+EXTRACT_ROWS_SCRIPT = """
+var sel = arguments[0];
+var missing = arguments[1];
+function text(el) {
+    if (!el) { return missing; }
+    return (el.innerText || el.textContent || '').trim();
+}
+function first(row, selector) {
+    return selector ? row.querySelector(selector) : null;
+}
+var rows = document.querySelectorAll(sel.row);
+var start = arguments[2] || 0;
+var end = arguments[3] == null ? rows.length : Math.min(arguments[3], rows.length);
+var result = [];
+for (var i = start; i < end; i++) {
+    var row = rows[i];
+    var errors = sel.errorText ? row.querySelectorAll(sel.errorText) : [];
+    result.push({
+        name: text(first(row, sel.name)),
+        stock_id: text(first(row, sel.stockId)),
+        entry_date: text(first(row, sel.entryDate)),
+        profit_percentage: text(errors[0]),
+        current_weight: text(errors[1])
+    });
+}
+return result;
+"""
+
+# EXTRACT_ROWS_SCRIPT 使用的 selector，鍵值同 src.layout.SELECTOR_STRATEGIES
+DEFAULT_SELECTORS = {
+    "row": ROW_SELECTOR,
+    "name": NAME_SELECTOR,
+    "stockId": STOCK_ID_SELECTOR,
+    "entryDate": ENTRY_DATE_SELECTOR,
+    "errorText": ERROR_TEXT_SELECTOR,
+}
+
+COUNT_ROWS_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+ROW_KEYS = ("name", "stock_id", "entry_date", "profit_percentage", "current_weight")
+
+# iter_row_batches 每批擷取的列數
+DEFAULT_BATCH_SIZE = 200
+
+
+def extract_rows_bulk(driver, start=0, end=None, selectors=None):
+    """
+    以單次 execute_script 在目前的 frame 內取回所有列
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe）
+        start (int): 起始列（含）
+        end (int, optional): 結束列（不含），預設為最後一列
+        selectors (dict, optional): 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Returns:
+        list | None: 持股資料字典列表；若腳本回傳格式不符則回傳 None
+    """
+    rows = driver.execute_script(EXTRACT_ROWS_SCRIPT, selectors or DEFAULT_SELECTORS, MISSING, start, end)
+    if not isinstance(rows, list):
+        return None
+
+    data_list = []
+    for row in rows:
+        if not isinstance(row, dict):
+            return None
+        data_list.append({
+            key: MISSING if row.get(key) is None else str(row.get(key)) for key in ROW_KEYS
+        })
+    return data_list
+
+
+def _find_texts(row, selector):
+    """
+    取得 row 內所有符合 selector 元素的文字
+
+    以 find_elements 查詢，缺少的欄位回傳空列表而不是拋出例外；selector 為 None 時不查詢。
+    """
+    if not selector:
+        return []
+    try:
+        return [element.text.strip() for element in row.find_elements(By.CSS_SELECTOR, selector)]
+    except Exception:
+        return []
+
+
+def _find_text(row, selector):
+    """取得 row 內第一個符合 selector 元素的文字，找不到時回傳 N/A"""
+    texts = _find_texts(row, selector)
+    return texts[0] if texts else MISSING
+
+
+def extract_rows_per_element(driver, start=0, end=None, selectors=None):
+    """
+    逐列逐欄查詢表格資料（每列多次 WebDriver 往返，作為備援）
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe）
+        start (int): 起始列（含）
+        end (int, optional): 結束列（不含），預設為最後一列
+        selectors (dict, optional): 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Returns:
+        list: 持股資料字典列表
+    """
+    sel = selectors or DEFAULT_SELECTORS
+    rows = driver.find_elements(By.CSS_SELECTOR, sel["row"])[start:end]
+    print(f"找到 {len(rows)} 行資料")
+
+    data_list = []
+    for row in rows:
+        error_items = _find_texts(row, sel["errorText"])
+        data_list.append({
+            'name': _find_text(row, sel["name"]),
+            'stock_id': _find_text(row, sel["stockId"]),
+            'entry_date': _find_text(row, sel["entryDate"]),
+            'profit_percentage': error_items[0] if len(error_items) >= 1 else MISSING,
+            'current_weight': error_items[1] if len(error_items) >= 2 else MISSING,
+        })
+
+    return data_list
+
+
+def extract_rows(driver, selectors=None):
+    """
+    擷取表格資料：優先使用單次 JavaScript 擷取，失敗時退回逐欄查詢
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe）
+        selectors (dict, optional): 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Returns:
+        list: 持股資料字典列表
+    """
+    try:
+        data_list = extract_rows_bulk(driver, selectors=selectors)
+    except Exception as e:
+        print(f"批次擷取失敗，改用逐欄擷取: {e}")
+        data_list = None
+
+    if data_list is not None:
+        print(f"批次擷取 {len(data_list)} 行資料")
+        return data_list
+
+    return extract_rows_per_element(driver, selectors=selectors)
+
+
+def count_rows(driver, selectors=None):
+    """
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe）
+        selectors (dict, optional): 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Returns:
+        int | None: 表格列數，無法取得時回傳 None
+    """
+    try:
+        total = driver.execute_script(COUNT_ROWS_SCRIPT, (selectors or DEFAULT_SELECTORS)["row"])
+    except Exception:
+        return None
+    if isinstance(total, bool) or not isinstance(total, int):
+        return None
+    return total
+
+
+def iter_row_batches(driver, batch_size=DEFAULT_BATCH_SIZE, selectors=None):
+    """
+    分批擷取表格資料，每批只在記憶體中保留 batch_size 列
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe）
+        batch_size (int): 每批的列數
+        selectors (dict, optional): 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Yields:
+        list: 持股資料字典列表
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size 必須至少為 1")
+
+    total = count_rows(driver, selectors)
+    if total is None:
+        # 無法得知列數時一次擷取全部
+        yield extract_rows(driver, selectors)
+        return
+
+    for start in range(0, total, batch_size):
+        end = min(start + batch_size, total)
+        try:
+            batch = extract_rows_bulk(driver, start, end, selectors)
+        except Exception as e:
+            print(f"批次擷取失敗，改用逐欄擷取: {e}")
+            batch = None
+        if batch is None:
+            batch = extract_rows_per_element(driver, start, end, selectors)
+        yield batch
@@ -0,0 +1,234 @@
+"""
+以 LINE Flex Message 呈現持股報告
+
+每個 bubble 是一張精簡表格：四個欄位各是一個多行的 text 元件，
+每檔持股只增加四個儲存格的文字，不必為每一列建立元件，
+因此 payload 比逐檔排版的文字報告更小。
+
+bubble 的 JSON 骨架在模組載入時編譯成格式字串，渲染時只填入各欄文字；
+依 LINE 的限制自動分頁（carousel 最多 12 個 bubble、bubble 30 KB、carousel 50 KB）。
+"""
+import json
+import re
+
+
+ROWS_PER_BUBBLE = 25
+BUBBLES_PER_CAROUSEL = 12
+BUBBLE_SIZE_LIMIT = 30_000
+CAROUSEL_SIZE_LIMIT = 50_000
+ALT_TEXT_LIMIT = 400
+
+# 名稱過長會換行，使各欄對不齊
+NAME_MAX_LENGTH = 5
+
+PROFIT_UP_COLOR = "#D32F2F"
+PROFIT_DOWN_COLOR = "#2E7D32"
+MUTED_COLOR = "#888888"
+
+
+def _heading(text, flex, align="start"):
+    return {"type": "text", "text": text, "size": "xxs", "color": MUTED_COLOR, "flex": flex, "align": align}
+
+
+def _column(slot, flex, align="start", spans=False):
+    column = {"type": "text", "size": "xs", "wrap": True, "flex": flex, "align": align}
+    column["contents" if spans else "text"] = f"@{slot}@"
+    return column
+
+
+BUBBLE_SKELETON = {
+    "type": "bubble",
+    "header": {
+        "type": "box",
+        "layout": "vertical",
+        "paddingAll": "12px",
+        "contents": [
+            {"type": "text", "text": "📊 Finlab 策略持股", "weight": "bold", "size": "sm"},
+            {"type": "text", "text": "@subtitle@", "size": "xxs", "color": MUTED_COLOR, "wrap": True},
+        ],
+    },
+    "body": {
+        "type": "box",
+        "layout": "vertical",
+        "paddingAll": "12px",
+        "spacing": "sm",
+        "contents": [
+            {
+                "type": "box",
+                "layout": "horizontal",
+                "contents": [
+                    _heading("股票", 6),
+                    _heading("進場", 4, "end"),
+                    _heading("獲利", 4, "end"),
+                    _heading("權重", 3, "end"),
+                ],
+            },
+            {"type": "separator"},
+            {
+                "type": "box",
+                "layout": "horizontal",
+                "contents": [
+                    _column("names", 6),
+                    _column("dates", 4, "end"),
+                    _column("profits", 4, "end", spans=True),
+                    _column("weights", 3, "end"),
+                ],
+            },
+        ],
+    },
+}
+
+
+def compile_template(skeleton):
+    """
+    將 JSON 骨架編譯成格式字串，"@slot@" 字串值會成為 {slot} 欄位
+
+    Args:
+        skeleton (dict): Flex 元件骨架
+
+    Returns:
+        str: 可用 str.format 填入（已序列化為 JSON 的）值的樣板
+    """
+    text = json.dumps(skeleton, separators=(",", ":"))
+    text = text.replace("{", "{{").replace("}", "}}")
+    return re.sub(r'"@(\w+)@"', r"{\1}", text)
+
+
+BUBBLE_TEMPLATE = compile_template(BUBBLE_SKELETON)
+CAROUSEL_TEMPLATE = '{{"type":"carousel","contents":[{bubbles}]}}'
+MESSAGE_TEMPLATE = '{{"type":"flex","altText":{alt_text},"contents":{contents}}}'
+
+
+def _cell(stock, key):
+    value = stock.get(key)
+    return "N/A" if value is None else str(value)
+
+
+def _profit_color(profit):
+    if profit.startswith(("▴", "+")):
+        return PROFIT_UP_COLOR
+    if profit.startswith(("▾", "-")):
+        return PROFIT_DOWN_COLOR
+    return None
+
+
+def _profit_spans(profits):
+    """連續同色的獲利合併成一個 span，只在漲跌變化處增加元件"""
+    spans = []
+    for profit in profits:
+        color = _profit_color(profit)
+        if spans and spans[-1][0] == color:
+            spans[-1][1].append(profit)
+        else:
+            spans.append((color, [profit]))
+
+    contents = []
+    for index, (color, lines) in enumerate(spans):
+        text = "\n".join(lines) + ("\n" if index < len(spans) - 1 else "")
+        span = {"type": "span", "text": text}
+        if color:
+            span["color"] = color
+        contents.append(span)
+    return contents
+
+
+def render_bubble(rows, first_index, total, strategy=None):
+    """
+    將一段持股填入 bubble 樣板
+
+    Args:
+        rows (list): 持股資料（字典或 src.models.Holding）
+        first_index (int): 第一檔持股的序號（從 1 開始）
+        total (int): 報告的持股總數
+        strategy (str, optional): 策略名稱或網址
+
+    Returns:
+        str: bubble 的 JSON 字串
+    """
+    names, dates, profits, weights = [], [], [], []
+    for stock in rows:
+        name = _cell(stock, "name")
+        if len(name) > NAME_MAX_LENGTH:
+            name = name[:NAME_MAX_LENGTH - 1] + "…"
+        names.append(f"{_cell(stock, 'stock_id')} {name}")
+        dates.append(_cell(stock, "entry_date"))
+        profits.append(_cell(stock, "profit_percentage"))
+        weights.append(_cell(stock, "current_weight"))
+
+    subtitle = f"{first_index}–{first_index + len(rows) - 1} / 共 {total} 檔"
+    if strategy:
+        subtitle = f"{subtitle}\n{strategy}"
+    return BUBBLE_TEMPLATE.format(
+        subtitle=json.dumps(subtitle),
+        names=json.dumps("\n".join(names)),
+        dates=json.dumps("\n".join(dates)),
+        profits=json.dumps(_profit_spans(profits), separators=(",", ":")),
+        weights=json.dumps("\n".join(weights)),
+    )
+
+
+def _fit_bubbles(rows, first_index, total, strategy):
+    """超過 bubble 大小上限時對半切分"""
+    bubble = render_bubble(rows, first_index, total, strategy)
+    if len(bubble) <= BUBBLE_SIZE_LIMIT:
+        return [bubble]
+    if len(rows) == 1:
+        raise ValueError(f"第 {first_index} 檔持股超過 Flex bubble 大小上限")
+    half = len(rows) // 2
+    return (_fit_bubbles(rows[:half], first_index, total, strategy)
+            + _fit_bubbles(rows[half:], first_index + half, total, strategy))
+
+
+def _pack_carousels(bubbles):
+    """依 bubble 數與 payload 大小上限將 bubble 分組"""
+    overhead = len(CAROUSEL_TEMPLATE.format(bubbles=""))
+    carousels = []
+    current, size = [], overhead
+    for bubble in bubbles:
+        added = len(bubble) + (1 if current else 0)
+        if current and (len(current) == BUBBLES_PER_CAROUSEL or size + added > CAROUSEL_SIZE_LIMIT):
+            carousels.append(current)
+            current, size = [], overhead
+            added = len(bubble)
+        current.append(bubble)
+        size += added
+    if current:
+        carousels.append(current)
+    return carousels
+
+
+def render_flex_report(data, strategy=None, rows_per_bubble=ROWS_PER_BUBBLE):
+    """
+    將持股資料渲染成 Flex carousel 訊息
+
+    Args:
+        data (list): 持股資料（字典或 src.models.Holding）
+        strategy (str, optional): 策略名稱或網址
+        rows_per_bubble (int): 每個 bubble 的持股數上限
+
+    Returns:
+        list: LINE Messaging API 的 flex 訊息物件；沒有持股時為空列表
+
+    Raises:
+        ValueError: 單檔持股的內容超過 bubble 大小上限
+    """
+    data = list(data)
+    total = len(data)
+    bubbles = []
+    for offset in range(0, total, rows_per_bubble):
+        bubbles.extend(_fit_bubbles(data[offset:offset + rows_per_bubble], offset + 1, total, strategy))
+
+    carousels = _pack_carousels(bubbles)
+    messages = []
+    for page, carousel in enumerate(carousels, 1):
+        alt_text = f"Finlab 策略持股報告，共 {total} 檔"
+        if len(carousels) > 1:
+            alt_text = f"{alt_text} ({page}/{len(carousels)})"
+        if strategy:
+            alt_text = f"{alt_text}\n{strategy}"
+        message = MESSAGE_TEMPLATE.format(
+            alt_text=json.dumps(alt_text[:ALT_TEXT_LIMIT]),
+            contents=CAROUSEL_TEMPLATE.format(bubbles=",".join(carousel)),
+        )
+        messages.append(json.loads(message))
+    return messages
@@ -0,0 +1,158 @@
+"""
+虛擬化或分頁表格的逐步擷取
+
+有些 Svelte 表格只渲染畫面內的列，或將持股分頁顯示，
+單次讀取 DOM 只會拿到部分持股。這裡在 iframe 內反覆：
+擷取目前的列 → 以 stock_id 去除重複 → 捲動表格容器（無法捲動時按「下一頁」），
+直到沒有出現新的持股為止。
+"""
+from selenium.common.exceptions import TimeoutException
+from src.diff import holding_key
+from src.extraction import DEFAULT_SELECTORS, extract_rows
+from src.readiness import ReadinessCondition, ReadinessWaiter, rows_stable
+
+
+# 最多捲動 / 換頁次數，避免無限捲動的頁面永遠不結束
+DEFAULT_MAX_STEPS = 100
+# 換頁後等待表格內容改變的秒數
+DEFAULT_SETTLE_TIMEOUT = 3
+
+NEXT_PAGE_LABELS = ("下一頁", "next", "next page", "›", "»", ">")
+
+# 找到表格所在的捲動容器並捲動約一個可視高度（保留一列重疊，避免漏列）
+SCROLL_STEP_SCRIPT = """
+var rowSelector = arguments[0];
+var rows = document.querySelectorAll(rowSelector);
+if (!rows.length) { return false; }
+var el = rows[0].parentElement;
+while (el && el !== document.body && el !== document.documentElement) {
+    var style = window.getComputedStyle(el);
+    if (/(auto|scroll)/.test(style.overflowY) && el.scrollHeight > el.clientHeight + 1) { break; }
+    el = el.parentElement;
+}
+if (!el || el === document.body || el === document.documentElement) {
+    el = document.scrollingElement || document.documentElement;
+}
+var rowHeight = rows[rows.length - 1].getBoundingClientRect().height || 1;
+var before = el.scrollTop;
+el.scrollTop = before + Math.max(el.clientHeight - rowHeight, rowHeight);
+el.dispatchEvent(new Event('scroll'));
+return el.scrollTop > before;
+"""
+
+# 點擊未停用的「下一頁」按鈕
+NEXT_PAGE_SCRIPT = """
+var labels = arguments[0];
+var candidates = document.querySelectorAll('button, a, [role="button"]');
+for (var i = 0; i < candidates.length; i++) {
+    var el = candidates[i];
+    var text = (el.innerText || el.textContent || '').trim().toLowerCase();
+    var aria = (el.getAttribute('aria-label') || '').trim().toLowerCase();
+    if (labels.indexOf(text) === -1 && labels.indexOf(aria) === -1) { continue; }
+    if (el.disabled || el.getAttribute('aria-disabled') === 'true' || el.classList.contains('disabled')) {
+        return false;
+    }
+    el.click();
+    return true;
+}
+return false;
+"""
+
+# 以列數與首尾列的文字判斷表格內容是否改變
+ROWS_SIGNATURE_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+if (!rows.length) { return '0'; }
+return rows.length + '|' + rows[0].textContent + '|' + rows[rows.length - 1].textContent;
+"""
+
+
+def _rows_signature(driver, row_selector):
+    return driver.execute_script(ROWS_SIGNATURE_SCRIPT, row_selector)
+
+
+def rows_changed(previous_signature, timeout, row_selector=DEFAULT_SELECTORS["row"]):
+    """表格內容與 previous_signature 不同"""
+    def predicate(driver):
+        return _rows_signature(driver, row_selector) != previous_signature
+    return ReadinessCondition("rows_changed", predicate, timeout)
+
+
+def _advance(driver, waiter, settle_timeout, row_selector):
+    """
+    捲動表格；無法再捲動時嘗試換頁
+
+    Returns:
+        bool: 是否移動到新的位置
+    """
+    if driver.execute_script(SCROLL_STEP_SCRIPT, row_selector) is True:
+        # 虛擬化表格在 scroll 事件後的下一個 frame 內重新渲染
+        try:
+            waiter.wait_for(rows_stable(row_selector, settle_timeout))
+        except TimeoutException:
+            # 尚未穩定時仍以目前的列繼續擷取；其他錯誤（例如瀏覽器已關閉）往外拋出
+            pass
+        return True
+
+    signature = _rows_signature(driver, row_selector)
+    if driver.execute_script(NEXT_PAGE_SCRIPT, list(NEXT_PAGE_LABELS)) is not True:
+        return False
+    try:
+        waiter.wait_for(rows_changed(signature, settle_timeout, row_selector))
+        waiter.wait_for(rows_stable(row_selector, settle_timeout))
+    except TimeoutException:
+        print("換頁後表格沒有變化")
+        return False
+    return True
+
+
+def iter_harvest_batches(driver, max_steps=DEFAULT_MAX_STEPS, settle_timeout=DEFAULT_SETTLE_TIMEOUT,
+                         selectors=None):
+    """
+    逐步捲動 / 換頁，每一步只產生新出現的持股
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe 並顯示持股表格）
+        max_steps (int): 最多捲動 / 換頁次數
+        settle_timeout (float): 每一步等待表格更新的秒數
+        selectors (dict, optional): src.layout 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Yields:
+        list: 本步新出現的持股資料字典
+    """
+    selectors = selectors or DEFAULT_SELECTORS
+    seen = set()
+    waiter = ReadinessWaiter(driver)
+    for step in range(max_steps + 1):
+        new_rows = []
+        for row in extract_rows(driver, selectors):
+            key = holding_key(row)
+            if key not in seen:
+                seen.add(key)
+                new_rows.append(row)
+
+        if step > 0 and not new_rows:
+            break
+        if new_rows:
+            yield new_rows
+        if step == max_steps:
+            print(f"已達最大捲動次數 {max_steps}，持股可能不完整")
+            break
+        if not _advance(driver, waiter, settle_timeout, selectors["row"]):
+            break
+    print(f"逐步擷取完成: {len(seen)} 檔持股，{step} 次捲動 / 換頁")
+
+
+def harvest_rows(driver, max_steps=DEFAULT_MAX_STEPS, settle_timeout=DEFAULT_SETTLE_TIMEOUT, selectors=None):
+    """
+    擷取虛擬化或分頁表格的所有持股
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe 並顯示持股表格）
+        max_steps (int): 最多捲動 / 換頁次數
+        settle_timeout (float): 每一步等待表格更新的秒數
+        selectors (dict, optional): src.layout 探測到的 selector，預設為 DEFAULT_SELECTORS
+
+    Returns:
+        list: 去除重複後、依出現順序排列的持股資料字典
+    """
+    return [row for batch in iter_harvest_batches(driver, max_steps, settle_timeout, selectors) for row in batch]
@@ -0,0 +1,255 @@
+"""
+持股歷史資料庫
+
+以 SQLite（WAL 模式）追加保存每次抓取的持股，
+並以 stock_id、策略與抓取時間建立索引，提供時間區間與個股查詢。
+"""
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time as dt_time, timezone
+from src.models import parse_holdings
+
+
+DEFAULT_HISTORY_DB_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "finlab-strategy-linebot", "history.sqlite3"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    strategy TEXT NOT NULL,
+    scraped_at INTEGER NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    strategy TEXT NOT NULL,
+    scraped_at INTEGER NOT NULL,
+    stock_id TEXT NOT NULL,
+    name TEXT,
+    entry_date TEXT,
+    profit_percentage REAL,
+    current_weight REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_strategy_time ON runs(strategy, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_holdings_stock_time ON holdings(stock_id, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_holdings_strategy_time ON holdings(strategy, scraped_at);
+CREATE INDEX IF NOT EXISTS idx_holdings_run ON holdings(run_id);
+"""
+
+_HOLDING_COLUMNS = "strategy, scraped_at, stock_id, name, entry_date, profit_percentage, current_weight"
+
+
+def _to_timestamp(value, end_of_day=False):
+    """將 datetime / date / epoch 秒數轉為 epoch 秒數；date 視為 UTC 當天的開始或結束"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    if isinstance(value, date):
+        moment = dt_time.max if end_of_day else dt_time.min
+        return int(datetime.combine(value, moment, tzinfo=timezone.utc).timestamp())
+    raise TypeError(f"不支援的時間格式: {value!r}")
+
+
+def _holding_row(row):
+    """將資料庫列轉為字典，scraped_at 轉為 UTC datetime、entry_date 轉為 date"""
+    strategy, scraped_at, stock_id, name, entry_date, profit, weight = row
+    return {
+        "strategy": strategy,
+        "scraped_at": datetime.fromtimestamp(scraped_at, tz=timezone.utc),
+        "stock_id": stock_id,
+        "name": name,
+        "entry_date": date.fromisoformat(entry_date) if entry_date else None,
+        "profit_percentage": profit,
+        "current_weight": weight,
+    }
+
+
+class HoldingsHistoryStore:
+    """
+    追加式持股歷史資料庫
+
+    用法:
+        with HoldingsHistoryStore(path) as store:
+            store.append_runs({url: rows})
+            store.stock_history("2330")
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_DB_PATH):
+        """
+        Args:
+            path (str): SQLite 檔案路徑（":memory:" 可用於測試）
+        """
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        """關閉資料庫連線"""
+        self._conn.close()
+
+    def append_runs(self, results, scraped_at=None):
+        """
+        在單一交易中寫入本次執行所有策略的持股
+
+        Args:
+            results (dict): 策略 -> 持股列表（字典或 Holding）
+            scraped_at (datetime, optional): 抓取時間，預設為現在
+
+        Returns:
+            dict: 策略 -> run id
+        """
+        timestamp = _to_timestamp(scraped_at or datetime.now(timezone.utc))
+        run_ids = {}
+        with self._lock, self._conn:
+            for strategy, rows in results.items():
+                holdings = parse_holdings(rows)
+                cursor = self._conn.execute(
+                    "INSERT INTO runs (strategy, scraped_at, row_count) VALUES (?, ?, ?)",
+                    (strategy, timestamp, len(holdings)),
+                )
+                run_id = cursor.lastrowid
+                self._conn.executemany(
+                    f"INSERT INTO holdings (run_id, {_HOLDING_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            run_id,
+                            strategy,
+                            timestamp,
+                            h.stock_id,
+                            h.name,
+                            h.entry_date.isoformat() if h.entry_date else None,
+                            h.profit_percentage,
+                            h.current_weight,
+                        )
+                        for h in holdings
+                    ),
+                )
+                run_ids[strategy] = run_id
+        return run_ids
+
+    def append_run(self, strategy, rows, scraped_at=None):
+        """
+        寫入單一策略的一次抓取
+
+        Returns:
+            int: run id
+        """
+        return self.append_runs({strategy: rows}, scraped_at)[strategy]
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def stock_history(self, stock_id, start=None, end=None, strategy=None):
+        """
+        查詢個股在時間區間內的所有紀錄
+
+        Args:
+            stock_id (str): 股票代號
+            start (datetime | date, optional): 起始時間（含）
+            end (datetime | date, optional): 結束時間（含）
+            strategy (str, optional): 只查詢指定策略
+
+        Returns:
+            list: 依抓取時間排序的紀錄字典
+        """
+        sql = f"SELECT {_HOLDING_COLUMNS} FROM holdings WHERE stock_id = ?"
+        params = [stock_id]
+        if start is not None:
+            sql += " AND scraped_at >= ?"
+            params.append(_to_timestamp(start))
+        if end is not None:
+            sql += " AND scraped_at <= ?"
+            params.append(_to_timestamp(end, end_of_day=True))
+        if strategy is not None:
+            sql += " AND strategy = ?"
+            params.append(strategy)
+        sql += " ORDER BY scraped_at"
+        return [_holding_row(row) for row in self._query(sql, params)]
+
+    def first_seen(self, stock_id, strategy=None):
+        """
+        查詢個股第一次出現在策略中的紀錄（例如「2330 何時進入這個策略」）
+
+        Returns:
+            dict | None: 最早的紀錄
+        """
+        sql = f"SELECT {_HOLDING_COLUMNS} FROM holdings WHERE stock_id = ?"
+        params = [stock_id]
+        if strategy is not None:
+            sql += " AND strategy = ?"
+            params.append(strategy)
+        sql += " ORDER BY scraped_at LIMIT 1"
+        rows = self._query(sql, params)
+        return _holding_row(rows[0]) if rows else None
+
+    def holdings_at(self, strategy, when=None):
+        """
+        查詢策略在某時間點（含）之前最後一次抓取的持股
+
+        Args:
+            strategy (str): 策略
+            when (datetime | date, optional): 時間點，預設為最新
+
+        Returns:
+            list: 紀錄字典
+        """
+        sql = "SELECT id FROM runs WHERE strategy = ?"
+        params = [strategy]
+        if when is not None:
+            sql += " AND scraped_at <= ?"
+            params.append(_to_timestamp(when, end_of_day=True))
+        sql += " ORDER BY scraped_at DESC, id DESC LIMIT 1"
+        runs = self._query(sql, params)
+        if not runs:
+            return []
+        rows = self._query(f"SELECT {_HOLDING_COLUMNS} FROM holdings WHERE run_id = ?", (runs[0][0],))
+        return [_holding_row(row) for row in rows]
+
+    def runs(self, strategy=None, start=None, end=None):
+        """
+        列出抓取紀錄
+
+        Returns:
+            list: {"id", "strategy", "scraped_at", "row_count"} 字典，依時間排序
+        """
+        sql = "SELECT id, strategy, scraped_at, row_count FROM runs WHERE 1 = 1"
+        params = []
+        if strategy is not None:
+            sql += " AND strategy = ?"
+            params.append(strategy)
+        if start is not None:
+            sql += " AND scraped_at >= ?"
+            params.append(_to_timestamp(start))
+        if end is not None:
+            sql += " AND scraped_at <= ?"
+            params.append(_to_timestamp(end, end_of_day=True))
+        sql += " ORDER BY scraped_at, id"
+        return [
+            {
+                "id": run_id,
+                "strategy": run_strategy,
+                "scraped_at": datetime.fromtimestamp(scraped_at, tz=timezone.utc),
+                "row_count": row_count,
+            }
+            for run_id, run_strategy, scraped_at, row_count in self._query(sql, params)
+        ]
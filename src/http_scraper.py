@@ -0,0 +1,307 @@
+"""
+不啟動瀏覽器的 HTTP 快速路徑
+
+直接以連線池化的 HTTP client 取得 reportIframe 的文件，
+解析其中的持股表格（或 JSON 資料），回傳與 FinlabStrategyScraper.scrape 相同格式。
+快速路徑沒有取得任何資料時，自動退回 Selenium。
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from src.extraction import (
+    ENTRY_DATE_SELECTOR,
+    ERROR_TEXT_SELECTOR,
+    MISSING,
+    NAME_SELECTOR,
+    ROW_KEYS,
+    STOCK_ID_SELECTOR,
+)
+from src.scraper import USER_AGENT
+from src.utils.metrics import metrics
+
+
+REPORT_IFRAME_ID = "reportIframe"
+
+# HTML 中沒有內容的元素，不會出現結束標籤
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+})
+
+
+def _class_set(selector):
+    """取出 CSS selector 最後一段的 class 集合，例如 '.a.b' -> {'a', 'b'}"""
+    return frozenset(part for part in selector.split()[-1].split(".") if part)
+
+
+def _slot_name(selector):
+    """取出 selector 中祖先元素的 slot 名稱，例如 "div[slot='entryDate'] .x" -> 'entryDate'"""
+    match = re.search(r"\[slot='([^']+)'\]", selector)
+    return match.group(1) if match else None
+
+
+_NAME_CLASSES = _class_set(NAME_SELECTOR)
+_STOCK_ID_CLASSES = _class_set(STOCK_ID_SELECTOR)
+_ENTRY_DATE_CLASSES = _class_set(ENTRY_DATE_SELECTOR)
+_ENTRY_DATE_SLOT = _slot_name(ENTRY_DATE_SELECTOR)
+_ERROR_TEXT_CLASSES = _class_set(ERROR_TEXT_SELECTOR)
+
+
+class IframeSourceParser(HTMLParser):
+    """找出指定 id 的 iframe src"""
+
+    def __init__(self, frame_id=REPORT_IFRAME_ID):
+        super().__init__()
+        self.frame_id = frame_id
+        self.src = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "iframe" and self.src is None:
+            attrs = dict(attrs)
+            if attrs.get("id") == self.frame_id and attrs.get("src"):
+                self.src = attrs["src"]
+
+
+class HoldingsTableParser(HTMLParser):
+    """
+    解析 `table tbody tr` 內的持股欄位
+
+    與 src.extraction 使用相同的 selector：每列第一個符合的元素為該欄位值，
+    `.text-error` 元素依序為獲利與權重。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._table_depth = 0
+        self._tbody_depth = 0
+        self._row = None
+        # 列內開啟中的元素: (tag, 是否為 entryDate slot)；_captures 以堆疊深度對應擷取中的欄位
+        self._stack = []
+        self._captures = {}
+        self._slot_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._table_depth += 1
+        elif tag == "tbody" and self._table_depth:
+            self._tbody_depth += 1
+        elif tag == "tr" and self._tbody_depth and self._row is None:
+            self._row = {"errors": []}
+            self._stack = []
+            return
+
+        if self._row is None or tag in _VOID_TAGS:
+            return
+
+        attrs = dict(attrs)
+        classes = frozenset((attrs.get("class") or "").split())
+        is_slot = attrs.get("slot") == _ENTRY_DATE_SLOT
+        if is_slot:
+            self._slot_depth += 1
+
+        field = None
+        if _NAME_CLASSES <= classes and "name" not in self._row:
+            field = "name"
+        elif _STOCK_ID_CLASSES <= classes and "stock_id" not in self._row:
+            field = "stock_id"
+        elif self._slot_depth and _ENTRY_DATE_CLASSES <= classes and "entry_date" not in self._row:
+            field = "entry_date"
+        elif _ERROR_TEXT_CLASSES <= classes:
+            field = "errors"
+
+        if field:
+            self._captures[len(self._stack)] = (field, [])
+        self._stack.append((tag, is_slot))
+
+    def handle_data(self, data):
+        for _, chunks in self._captures.values():
+            chunks.append(data)
+
+    def handle_endtag(self, tag):
+        if self._row is not None and tag == "tr" and not any(t == "tr" for t, _ in self._stack):
+            self._finish_row()
+            return
+
+        if self._row is not None and self._stack:
+            # 向上找到對應的開啟標籤（容忍未關閉的子元素）
+            for index in range(len(self._stack) - 1, -1, -1):
+                if self._stack[index][0] == tag:
+                    for depth in range(len(self._stack) - 1, index - 1, -1):
+                        self._close(depth)
+                    del self._stack[index:]
+                    break
+            return
+
+        if tag == "tbody" and self._tbody_depth:
+            self._tbody_depth -= 1
+        elif tag == "table" and self._table_depth:
+            self._table_depth -= 1
+
+    def _close(self, depth):
+        _, is_slot = self._stack[depth]
+        if is_slot:
+            self._slot_depth -= 1
+        capture = self._captures.pop(depth, None)
+        if capture:
+            field, chunks = capture
+            text = " ".join("".join(chunks).split())
+            if field == "errors":
+                self._row["errors"].append(text)
+            else:
+                self._row[field] = text
+
+    def _finish_row(self):
+        for depth in range(len(self._stack) - 1, -1, -1):
+            self._close(depth)
+        errors = self._row.pop("errors")
+        row = {key: self._row.get(key, MISSING) for key in ("name", "stock_id", "entry_date")}
+        row["profit_percentage"] = errors[0] if len(errors) >= 1 else MISSING
+        row["current_weight"] = errors[1] if len(errors) >= 2 else MISSING
+        self.rows.append(row)
+        self._row = None
+        self._stack = []
+        self._captures = {}
+        self._slot_depth = 0
+
+
+def _is_holding(row):
+    """名稱與股票代號至少有一個時才是持股列（其他表格的列兩者皆為 N/A）"""
+    return any(row.get(key) not in (None, "", MISSING) for key in ("name", "stock_id"))
+
+
+def parse_holdings_html(html):
+    """
+    解析 HTML 中的持股表格
+
+    沒有名稱也沒有股票代號的列不是持股列，會被略過。
+
+    Args:
+        html (str): 頁面原始碼
+
+    Returns:
+        list: 持股資料字典列表
+    """
+    parser = HoldingsTableParser()
+    parser.feed(html)
+    parser.close()
+    return [row for row in parser.rows if _is_holding(row)]
+
+
+def parse_holdings_json(payload):
+    """
+    解析 JSON 形式的持股資料
+
+    接受持股列表，或包含 "holdings" / "data" 列表的物件；沒有名稱也沒有股票代號的項目會被略過。
+
+    Args:
+        payload: 已解碼的 JSON
+
+    Returns:
+        list: 持股資料字典列表
+    """
+    if isinstance(payload, dict):
+        payload = payload.get("holdings") or payload.get("data") or []
+    if not isinstance(payload, list):
+        return []
+    rows = (
+        {key: MISSING if item.get(key) is None else str(item.get(key)) for key in ROW_KEYS}
+        for item in payload
+        if isinstance(item, dict)
+    )
+    return [row for row in rows if _is_holding(row)]
+
+
+def create_session(pool_maxsize=10):
+    """
+    建立共用連線池的 requests Session
+
+    Args:
+        pool_maxsize (int): 每個 host 保留的連線數
+
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+class HttpStrategyScraper:
+    """
+    以 HTTP 直接抓取持股資料的爬蟲，取不到資料時退回 fallback（通常為 Selenium）
+    """
+
+    def __init__(self, session=None, timeout=10, fallback=None):
+        """
+        Args:
+            session (requests.Session, optional): 共用的 HTTP Session
+            timeout (float): 每個 HTTP 請求的逾時秒數
+            fallback (optional): 具有 scrape(url) 方法的備援爬蟲
+        """
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.fallback = fallback
+
+    def _get(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            # 未宣告編碼時 requests 會預設 ISO-8859-1，Finlab 頁面實際為 UTF-8
+            response.encoding = "utf-8"
+        return response
+
+    def fetch_holdings(self, url):
+        """
+        以 HTTP 取得並解析持股資料
+
+        Args:
+            url (str): 策略頁網址
+
+        Returns:
+            list: 持股資料字典列表（頁面為前端渲染或不是持股表格時為空）
+        """
+        response = self._get(url)
+        if "json" in response.headers.get("Content-Type", ""):
+            return parse_holdings_json(response.json())
+
+        finder = IframeSourceParser()
+        finder.feed(response.text)
+        if finder.src:
+            response = self._get(urljoin(response.url, finder.src))
+            if "json" in response.headers.get("Content-Type", ""):
+                return parse_holdings_json(response.json())
+
+        return parse_holdings_html(response.text)
+
+    def scrape(self, url):
+        """
+        抓取持股資料：先走 HTTP 快速路徑，沒有任何有效持股列時退回 fallback
+
+        Args:
+            url (str): 策略頁網址
+
+        Returns:
+            list: 包含持股資料的字典列表
+        """
+        try:
+            with metrics.span("http_fetch", strategy=url):
+                data_list = self.fetch_holdings(url)
+        except (requests.RequestException, ValueError) as e:
+            print(f"HTTP 快速路徑失敗: {e}")
+            data_list = []
+
+        if data_list:
+            print(f"HTTP 快速路徑抓取 {len(data_list)} 筆資料")
+            return data_list
+
+        if self.fallback is None:
+            return data_list
+
+        print("HTTP 快速路徑無資料，改用瀏覽器抓取")
+        return self.fallback.scrape(url)
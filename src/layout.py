@@ -0,0 +1,240 @@
+"""
+頁面結構探測
+
+每個欄位登記一組依序嘗試的 selector（第一個為目前的版面，其後為備援）。
+在頁面內執行一次 PROBE_SCRIPT 即可得知每個欄位實際符合的 selector，
+取代逐一 WebDriverWait 與逐列逐欄的例外處理。
+
+頁面已載入完成且網路閒置，關鍵 selector 卻全部找不到時，代表 Finlab 版面已改變：
+立即拋出 LayoutChangedError，而不是依序等待每個條件逾時後回傳空資料。
+"""
+import time
+from src.extraction import (
+    ENTRY_DATE_SELECTOR,
+    ERROR_TEXT_SELECTOR,
+    NAME_SELECTOR,
+    ROW_SELECTOR,
+    STOCK_ID_SELECTOR,
+)
+from src.readiness import NETWORK_QUIET_MS, ReadinessCondition
+
+
+# 欄位 -> 依序嘗試的 selector；Svelte 的 class hash 會隨重新建置改變，備援 selector 不依賴 hash
+SELECTOR_STRATEGIES = {
+    "iframe": ("#reportIframe", "iframe[src*='report']"),
+    "tab": ("div[role='tablist'] > a:last-child", "[role='tablist'] > [role='tab']:last-child"),
+    "row": (ROW_SELECTOR, "table tr:has(> td)", "[role='rowgroup'] [role='row']"),
+    "name": (NAME_SELECTOR, ".whitespace-nowrap.font-bold"),
+    "stockId": (STOCK_ID_SELECTOR, ".text-base-content-200"),
+    "entryDate": (ENTRY_DATE_SELECTOR, "div[slot='entryDate'] .lining-nums", "div[slot='entryDate']"),
+    "errorText": (ERROR_TEXT_SELECTOR, ".text-error"),
+}
+
+# 在持股列內探測的欄位（其餘欄位在整份文件內探測）
+CELL_FIELDS = ("name", "stockId", "entryDate", "errorText")
+# 持股列存在但這些欄位全部找不到時視為版面改變
+KEY_CELL_FIELDS = ("name", "stockId")
+
+# 探測儲存格 selector 時取樣的列數
+PROBE_SAMPLE_ROWS = 5
+
+PROBE_SCRIPT = """
+var strategies = arguments[0];
+var fields = arguments[1];
+var cellFields = arguments[2];
+var quietMs = arguments[3];
+var sampleRows = arguments[4];
+function matches(root, selector) {
+    try { return root.querySelectorAll(selector); } catch (e) { return []; }
+}
+var rowSelector = null;
+var rows = [];
+var rowCandidates = strategies.row || [];
+for (var i = 0; i < rowCandidates.length && rowSelector === null; i++) {
+    var found = matches(document, rowCandidates[i]);
+    if (found.length) { rowSelector = rowCandidates[i]; rows = found; }
+}
+var samples = Array.prototype.slice.call(rows, 0, sampleRows);
+var result = {};
+fields.forEach(function (field) {
+    var candidates = strategies[field] || [];
+    result[field] = null;
+    if (field === 'row') { result[field] = rowSelector; return; }
+    var cell = cellFields.indexOf(field) >= 0;
+    for (var i = 0; i < candidates.length && result[field] === null; i++) {
+        if (!cell) {
+            if (matches(document, candidates[i]).length) { result[field] = candidates[i]; }
+            continue;
+        }
+        for (var j = 0; j < samples.length; j++) {
+            if (matches(samples[j], candidates[i]).length) { result[field] = candidates[i]; break; }
+        }
+    }
+});
+var entries = performance.getEntriesByType('resource');
+var lastEnd = 0;
+for (var k = 0; k < entries.length; k++) {
+    if (entries[k].responseEnd > lastEnd) { lastEnd = entries[k].responseEnd; }
+}
+var settled = document.readyState === 'complete' && (performance.now() - lastEnd) >= quietMs;
+return {matches: result, settled: settled};
+"""
+
+
+class LayoutChangedError(RuntimeError):
+    """頁面已載入完成，關鍵 selector 卻全部找不到"""
+
+    def __init__(self, missing, probe=None):
+        """
+        Args:
+            missing (iterable): 找不到的欄位
+            probe (LayoutProbe, optional): 探測結果
+        """
+        self.missing = list(missing)
+        self.matches = dict(probe.matches) if probe is not None and probe.known else {}
+        super().__init__(f"頁面結構已改變，找不到: {', '.join(self.missing)}")
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: {"missing": 找不到的欄位, "matches": 各欄位符合的 selector}
+        """
+        return {"missing": list(self.missing), "matches": dict(self.matches)}
+
+
+class LayoutProbe:
+    """
+    一次探測的結果
+
+    matches 為 None 表示無法探測（例如腳本回傳格式不符），此時一律使用各欄位的主要 selector，
+    也不會判定版面改變。
+    """
+
+    __slots__ = ("matches", "settled")
+
+    def __init__(self, matches=None, settled=False):
+        """
+        Args:
+            matches (dict, optional): 欄位 -> 符合的 selector（找不到為 None）
+            settled (bool): 探測時文件已載入完成且網路閒置
+        """
+        self.matches = matches
+        self.settled = settled
+
+    @property
+    def known(self):
+        return self.matches is not None
+
+    def selector(self, field):
+        """
+        Returns:
+            str | None: 欄位符合的 selector；未探測的欄位回傳主要 selector，探測後找不到回傳 None
+        """
+        if self.matches is None or field not in self.matches:
+            return SELECTOR_STRATEGIES[field][0]
+        return self.matches[field]
+
+    def missing(self, fields):
+        """
+        Returns:
+            list: 探測後找不到的欄位（無法探測時為空列表）
+        """
+        if self.matches is None:
+            return []
+        return [field for field in fields if field in self.matches and not self.matches[field]]
+
+    def extraction_selectors(self):
+        """
+        Returns:
+            dict: 給 src.extraction 使用的 selector（鍵值同 EXTRACT_ROWS_SCRIPT）
+        """
+        return {field: self.selector(field) for field in ("row", *CELL_FIELDS)}
+
+
+def probe_layout(driver, fields, quiet_ms=NETWORK_QUIET_MS, strategies=SELECTOR_STRATEGIES):
+    """
+    以單次 execute_script 探測目前文件中每個欄位符合的 selector
+
+    Args:
+        driver: Selenium WebDriver（位於要探測的 frame）
+        fields (iterable): 要探測的欄位（SELECTOR_STRATEGIES 的鍵）
+        quiet_ms (int): 判定網路閒置所需的安靜毫秒數
+        strategies (dict): 欄位 -> 依序嘗試的 selector
+
+    Returns:
+        LayoutProbe
+    """
+    fields = list(fields)
+    try:
+        result = driver.execute_script(
+            PROBE_SCRIPT,
+            {field: list(selectors) for field, selectors in strategies.items()},
+            fields,
+            list(CELL_FIELDS),
+            quiet_ms,
+            PROBE_SAMPLE_ROWS,
+        )
+    except Exception:
+        return LayoutProbe()
+    if not isinstance(result, dict) or not isinstance(result.get("matches"), dict):
+        return LayoutProbe()
+    matches = {}
+    for field in fields:
+        selector = result["matches"].get(field)
+        matches[field] = selector if selector in strategies.get(field, ()) else None
+    return LayoutProbe(matches, result.get("settled") is True)
+
+
+def layout_ready(fields, timeout, name="layout_probe", quiet_ms=NETWORK_QUIET_MS):
+    """
+    fields 中任一欄位出現即就緒
+
+    文件已載入完成、網路閒置至少 quiet_ms，且從開始等待起已經過 quiet_ms，
+    fields 卻全部找不到時立即拋出 LayoutChangedError，不再等到逾時。
+
+    Args:
+        fields (tuple): 關鍵欄位
+        timeout (float): 逾時秒數
+        name (str): 條件名稱（計時報告的階段名稱）
+        quiet_ms (int): 判定網路閒置所需的安靜毫秒數
+
+    Returns:
+        ReadinessCondition: 就緒時回傳 LayoutProbe
+    """
+    started = None
+
+    def predicate(driver):
+        nonlocal started
+        now = time.perf_counter()
+        if started is None:
+            started = now
+        probe = probe_layout(driver, fields, quiet_ms)
+        missing = probe.missing(fields)
+        if len(missing) < len(fields):
+            return probe
+        if probe.settled and now - started >= quiet_ms / 1000:
+            raise LayoutChangedError(missing, probe)
+        return False
+
+    return ReadinessCondition(name, predicate, timeout)
+
+
+def check_cells(driver):
+    """
+    探測持股列與儲存格的 selector
+
+    Args:
+        driver: Selenium WebDriver（已切換至 iframe，表格已穩定）
+
+    Returns:
+        LayoutProbe: 供擷取使用的探測結果
+
+    Raises:
+        LayoutChangedError: 有持股列，但關鍵欄位全部找不到
+    """
+    probe = probe_layout(driver, ("row", *CELL_FIELDS))
+    if probe.known and probe.matches["row"]:
+        missing = probe.missing(KEY_CELL_FIELDS)
+        if len(missing) == len(KEY_CELL_FIELDS):
+            raise LayoutChangedError(missing, probe)
+    return probe
@@ -0,0 +1,226 @@
+"""
+以 asyncio 實作的 LINE Messaging API 傳送 client
+
+- 共用連線池的 aiohttp session，並限制同時進行的請求數
+- 遇到 429 / 5xx / 連線錯誤時以指數退避加隨機抖動重試，並遵守 Retry-After
+- 以 X-Line-Retry-Key 確保重試不會重複送達
+- 記錄每個請求的延遲
+"""
+import asyncio
+import random
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+import aiohttp
+
+
+LINE_API_BASE_URL = "https://api.line.me"
+
+PUSH_PATH = "/v2/bot/message/push"
+MULTICAST_PATH = "/v2/bot/message/multicast"
+REPLY_PATH = "/v2/bot/message/reply"
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class LineDeliveryError(Exception):
+    """LINE API 回傳無法重試的錯誤，或重試次數用盡"""
+
+    def __init__(self, message, status=None, body=None, recipients=None):
+        """
+        Args:
+            message (str): 錯誤訊息
+            status (int, optional): HTTP 狀態碼
+            body (str, optional): 回應內容
+            recipients (list, optional): 訊息被拒絕的收件者 User ID（經由 outbox 發送時）
+        """
+        super().__init__(message)
+        self.status = status
+        self.body = body
+        self.recipients = recipients
+
+
+def text_message(text):
+    """建立 LINE 文字訊息物件"""
+    return {"type": "text", "text": text}
+
+
+def parse_retry_after(value, now=None):
+    """
+    解析 Retry-After 標頭
+
+    Args:
+        value (str): 秒數或 HTTP-date
+        now (float, optional): 目前時間（測試用）
+
+    Returns:
+        float | None: 需等待的秒數，無法解析時回傳 None
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, retry_at - now)
+
+
+class AsyncLineClient:
+    """
+    非同步 LINE Messaging API client
+
+    用法:
+        async with AsyncLineClient(token) as client:
+            await client.push_message(user_id, [text_message("hi")])
+    """
+
+    def __init__(
+        self,
+        channel_access_token,
+        base_url=LINE_API_BASE_URL,
+        max_concurrency=4,
+        max_retries=5,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        timeout=10,
+    ):
+        """
+        Args:
+            channel_access_token (str): LINE Channel Access Token
+            base_url (str): API 位址（測試時可指向本機 stub server）
+            max_concurrency (int): 同時進行的請求數上限（亦為連線池大小）
+            max_retries (int): 最多重試次數
+            backoff_base (float): 指數退避的基準秒數
+            backoff_max (float): 單次等待的上限秒數
+            timeout (float): 單一請求的逾時秒數
+        """
+        self.channel_access_token = channel_access_token
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        # 每個請求的 (path, status, 秒數)，status 為 None 表示連線錯誤
+        self.latencies = []
+        self.retry_count = 0
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+
+    async def open(self):
+        """建立 HTTP session（已開啟時不重複建立）"""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Authorization": f"Bearer {self.channel_access_token}"},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """關閉 HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _backoff(self, attempt):
+        """第 attempt 次重試的等待秒數（full jitter）"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def request(self, path, payload, retry_key=None):
+        """
+        送出 POST 請求，必要時重試
+
+        Args:
+            path (str): API 路徑
+            payload (dict): JSON 內容
+            retry_key (str, optional): X-Line-Retry-Key，重試時沿用同一個值
+
+        Returns:
+            dict: 回應的 JSON（沒有內容時為空字典）
+
+        Raises:
+            LineDeliveryError: 無法重試的錯誤或重試次數用盡
+        """
+        await self.open()
+        headers = {"X-Line-Retry-Key": retry_key} if retry_key else {}
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(self.max_retries + 1):
+            delay = None
+            start = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with self._session.post(url, json=payload, headers=headers) as response:
+                        status = response.status
+                        body = await response.text()
+                        self.latencies.append((path, status, time.perf_counter() - start))
+
+                        if status < 300:
+                            return await response.json(content_type=None) if body else {}
+                        if status == 409 and retry_key:
+                            # 相同 retry key 的請求已被接受，視為成功
+                            return {}
+                        if status not in RETRYABLE_STATUS:
+                            raise LineDeliveryError(f"LINE API 錯誤 {status}: {body}", status, body)
+                        delay = parse_retry_after(response.headers.get("Retry-After"))
+                        error = LineDeliveryError(f"LINE API 暫時性錯誤 {status}: {body}", status, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.latencies.append((path, None, time.perf_counter() - start))
+                error = LineDeliveryError(f"LINE API 連線錯誤: {e}")
+
+            if attempt == self.max_retries:
+                raise error
+            if delay is None:
+                delay = self._backoff(attempt)
+            self.retry_count += 1
+            print(f"LINE API 請求失敗，{delay:.2f} 秒後重試 ({attempt + 1}/{self.max_retries}): {error}")
+            await asyncio.sleep(delay)
+
+    async def push_message(self, to, messages, retry_key=None):
+        """
+        推送訊息給單一使用者
+
+        Args:
+            to (str): User ID
+            messages (list): 訊息物件列表（最多 5 則）
+            retry_key (str, optional): 未提供時自動產生
+        """
+        payload = {"to": to, "messages": messages}
+        return await self.request(PUSH_PATH, payload, retry_key or str(uuid.uuid4()))
+
+    async def multicast(self, to, messages, retry_key=None):
+        """
+        推送相同訊息給多位使用者
+
+        Args:
+            to (list): User ID 列表（最多 500 個）
+            messages (list): 訊息物件列表（最多 5 則）
+            retry_key (str, optional): 未提供時自動產生
+        """
+        payload = {"to": list(to), "messages": messages}
+        return await self.request(MULTICAST_PATH, payload, retry_key or str(uuid.uuid4()))
+
+    async def reply_message(self, reply_token, messages):
+        """
+        以 reply token 回覆訊息
+
+        Args:
+            reply_token (str): webhook 事件中的 reply token
+            messages (list): 訊息物件列表（最多 5 則）
+        """
+        return await self.request(REPLY_PATH, {"replyToken": reply_token, "messages": messages})
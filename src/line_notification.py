@@ -1,9 +1,220 @@
 """
 LINE Bot notification module for sending scraped stock data
 """
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
 from linebot import LineBotApi
-from linebot.models import TextSendMessage
+from linebot.models import FlexSendMessage, TextSendMessage
 from linebot.exceptions import LineBotApiError
+from src.diff import ENTRY, EXIT, PROFIT_MOVE, WEIGHT_CHANGE
+from src.flex_report import render_flex_report
+from src.line_delivery import LINE_API_BASE_URL, RETRYABLE_STATUS, AsyncLineClient, LineDeliveryError, text_message
+from src.outbox import DEAD
+from src.utils.message_packer import LINE_MULTICAST_LIMIT, batch_messages, pack_blocks
+from src.utils.metrics import metrics
+
+
+def format_stock_block(index, stock):
+    """
+    單一持股的訊息區塊
+
+    Args:
+        index (int): 序號（從 1 開始）
+        stock: 持股資料（字典或 src.models.Holding）
+
+    Returns:
+        str: 訊息區塊
+    """
+    return "\n".join([
+        f"[{index}] {stock.get('name', 'N/A')} ({stock.get('stock_id', 'N/A')})",
+        f"  📅 進場日期: {stock.get('entry_date', 'N/A')}",
+        f"  💰 獲利: {stock.get('profit_percentage', 'N/A')}",
+        f"  ⚖️  權重: {stock.get('current_weight', 'N/A')}",
+        "",
+    ])
+
+
+def stock_report_blocks(stock_blocks, strategy=None):
+    """
+    為持股區塊加上標題與總計
+
+    Args:
+        stock_blocks (list): format_stock_block 產生的區塊
+        strategy (str, optional): 策略名稱或網址
+
+    Returns:
+        list: 完整報告的文字區塊
+    """
+    if not stock_blocks:
+        return [report_footer(0, strategy)]
+    return [report_header(strategy), *stock_blocks, report_footer(len(stock_blocks), strategy)]
+
+
+def report_header(strategy=None):
+    """
+    Args:
+        strategy (str, optional): 策略名稱或網址
+
+    Returns:
+        str: 完整報告的標題區塊
+    """
+    if strategy:
+        return f"📊 Finlab 策略持股報告\n策略: {strategy}\n"
+    return "📊 Finlab 策略持股報告\n"
+
+
+def report_footer(count, strategy=None):
+    """
+    Args:
+        count (int): 持股檔數
+        strategy (str, optional): 策略名稱或網址
+
+    Returns:
+        str: 完整報告的總計區塊；沒有持股時為整份報告唯一的區塊
+    """
+    if not count:
+        return f"目前無持股資料\n策略: {strategy}" if strategy else "目前無持股資料"
+    return f"總計: {count} 檔股票"
+
+
+def format_diff_text(diff, strategy=None):
+    """
+    將持股差異格式化為精簡的異動訊息
+
+    Args:
+        diff (HoldingsDiff): diff_holdings 的結果
+        strategy (str, optional): 策略名稱或網址
+
+    Returns:
+        str: 格式化後的訊息
+    """
+    message_lines = ["🔔 Finlab 策略持股異動"]
+    if strategy:
+        message_lines.append(f"策略: {strategy}")
+
+    if not diff.has_changes:
+        message_lines.append("持股無異動")
+        return "\n".join(message_lines)
+
+    sections = (
+        (ENTRY, "🟢 新進場"),
+        (EXIT, "🔴 出場"),
+        (WEIGHT_CHANGE, "⚖️  權重變動"),
+        (PROFIT_MOVE, "💰 獲利變動"),
+    )
+    changes_by_kind = diff.by_kind()
+    for kind, title in sections:
+        changes = changes_by_kind[kind]
+        if not changes:
+            continue
+        message_lines.append(f"\n{title} ({len(changes)})")
+        for change in changes:
+            row = change.row
+            label = f"  {row.get('name', 'N/A')} ({row.get('stock_id', 'N/A')})"
+            if kind == ENTRY:
+                message_lines.append(f"{label} 權重 {row.get('current_weight', 'N/A')}")
+            elif kind == EXIT:
+                message_lines.append(f"{label} 獲利 {row.get('profit_percentage', 'N/A')}")
+            elif kind == WEIGHT_CHANGE:
+                message_lines.append(
+                    f"{label} {change.previous.get('current_weight', 'N/A')} → {row.get('current_weight', 'N/A')}"
+                )
+            else:
+                message_lines.append(
+                    f"{label} {change.previous.get('profit_percentage', 'N/A')} → {row.get('profit_percentage', 'N/A')}"
+                )
+
+    return "\n".join(message_lines)
+
+
+def _to_send_message(message):
+    """將 Messaging API 的訊息物件轉成 line-bot-sdk 的 SendMessage"""
+    if message["type"] == "flex":
+        return FlexSendMessage(alt_text=message["altText"], contents=message["contents"])
+    return TextSendMessage(text=message["text"])
+
+
+def _flex_rejected(error):
+    """Flex 訊息無法渲染或被 LINE 以 400 拒絕（可改送文字）"""
+    if isinstance(error, ValueError):
+        return True
+    if isinstance(error, LineBotApiError):
+        return error.status_code == 400
+    return isinstance(error, LineDeliveryError) and error.status == 400
+
+
+def _as_list(to):
+    """push 的單一 User ID 或 multicast 的 User ID 列表"""
+    return to if isinstance(to, list) else [to]
+
+
+def _error_status(error):
+    """LINE API 錯誤的 HTTP 狀態碼，連線錯誤等情況為 None"""
+    if isinstance(error, LineBotApiError):
+        return error.status_code
+    if isinstance(error, LineDeliveryError):
+        return error.status
+    return None
+
+
+def _run_coroutine(coro):
+    """
+    在同步流程中執行 coroutine 並回傳結果
+
+    asyncio.run 不能在執行中的事件迴圈內呼叫（例如 webhook server 的 handler），
+    此時改在背景執行緒的新事件迴圈執行並等待完成；呼叫端的事件迴圈會等到發送結束。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+def _group_by_target(items, target_key):
+    """
+    依收件者分組，保持各組內的原始順序
+
+    Args:
+        items (list): API 呼叫或 outbox 訊息
+        target_key (callable): 取得收件者鍵值的函式
+
+    Returns:
+        list: 每位收件者（或 multicast 群組）一個列表
+    """
+    groups = {}
+    for item in items:
+        groups.setdefault(target_key(item), []).append(item)
+    return list(groups.values())
+
+
+async def _gather_groups(send_group, groups):
+    """
+    同時發送各組訊息（並行數量由 AsyncLineClient 的 semaphore 限制）
+
+    所有組別都會執行完畢後才拋出第一個例外，不會留下未完成的請求。
+    """
+    results = await asyncio.gather(*(send_group(group) for group in groups), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def _delivery_outcome(error):
+    """
+    判斷 outbox 訊息發送失敗後的處理方式
+
+    Returns:
+        str: "sent"（409：相同 retry key 已被接受）、"retry"（429 / 5xx / 連線錯誤）或 "dead"（其他 4xx）
+    """
+    status = _error_status(error)
+    if status == 409:
+        return "sent"
+    if status is None or status in RETRYABLE_STATUS or status >= 500:
+        return "retry"
+    return "dead"
 
 
 class LineNotification:
@@ -11,49 +222,95 @@ class LineNotification:
     處理 LINE Bot 訊息推送的類別
     """
 
-    def __init__(self, channel_access_token, user_id):
+    def __init__(self, channel_access_token, user_id, async_delivery=False, api_base_url=LINE_API_BASE_URL,
+                 flex_reports=False, outbox=None):
         """
         初始化 LINE Bot API
 
         Args:
             channel_access_token (str): LINE Channel Access Token
             user_id (str): LINE User ID
+            async_delivery (bool): 改用 AsyncLineClient 傳送（連線池、429 退避重試）
+            api_base_url (str): async 傳送使用的 API 位址（None 時使用預設位址）
+            flex_reports (bool): 完整報告改用 Flex Message 表格，失敗時退回文字
+            outbox (Outbox, optional): 發送前先寫入 outbox，失敗的訊息留待下次重送
         """
         self.line_bot_api = LineBotApi(channel_access_token)
         self.user_id = user_id
+        self.channel_access_token = channel_access_token
+        self.async_delivery = async_delivery
+        self.api_base_url = api_base_url or LINE_API_BASE_URL
+        self.flex_reports = flex_reports
+        self.outbox = outbox
+        # async 傳送時每個請求的 (path, status, 秒數)
+        self.delivery_latencies = []
 
-    def format_stock_message(self, data):
+    def format_stock_message(self, data, strategy=None):
         """
         將股票資料格式化為 LINE 訊息
 
         Args:
-            data (list): 股票資料列表
+            data (list): 股票資料列表（字典或 src.models.Holding）
+            strategy (str, optional): 策略名稱或網址，多策略時用於標示來源
 
         Returns:
             str: 格式化後的訊息
         """
-        if not data:
-            return "目前無持股資料"
+        return "\n".join(self._stock_message_blocks(data, strategy))
 
-        message_lines = ["📊 Finlab 策略持股報告\n"]
+    def _stock_message_blocks(self, data, strategy=None):
+        """
+        將股票資料切成訊息區塊：標題、每檔持股一個區塊、總計
 
-        for index, stock in enumerate(data, 1):
-            message_lines.append(f"[{index}] {stock.get('name', 'N/A')} ({stock.get('stock_id', 'N/A')})")
-            message_lines.append(f"  📅 進場日期: {stock.get('entry_date', 'N/A')}")
-            message_lines.append(f"  💰 獲利: {stock.get('profit_percentage', 'N/A')}")
-            message_lines.append(f"  ⚖️  權重: {stock.get('current_weight', 'N/A')}")
-            message_lines.append("")
+        以 "\n" 串接所有區塊即為 format_stock_message 的結果，
+        分段時只會在區塊邊界切開。
 
-        message_lines.append(f"總計: {len(data)} 檔股票")
+        Args:
+            data (list): 股票資料列表
+            strategy (str, optional): 策略名稱或網址
 
-        return "\n".join(message_lines)
+        Returns:
+            list: 文字區塊列表
+        """
+        return stock_report_blocks(
+            [format_stock_block(index, stock) for index, stock in enumerate(data, 1)], strategy
+        )
 
-    def send_stock_data(self, data):
+    def format_diff_message(self, diff, strategy=None):
+        """
+        將持股差異格式化為精簡的異動訊息
+
+        Args:
+            diff (HoldingsDiff): diff_holdings 的結果
+            strategy (str, optional): 策略名稱或網址
+
+        Returns:
+            str: 格式化後的訊息
+        """
+        return format_diff_text(diff, strategy)
+
+    def send_diff(self, diff, strategy=None, recipients=None):
+        """
+        發送持股異動訊息到 LINE
+
+        Args:
+            diff (HoldingsDiff): diff_holdings 的結果
+            strategy (str, optional): 策略名稱或網址
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
+
+        Returns:
+            bool: 發送成功返回 True
+        """
+        return self.send_text_message(self.format_diff_message(diff, strategy), recipients)
+
+    def send_stock_data(self, data, strategy=None, recipients=None):
         """
         發送股票資料到 LINE
 
         Args:
             data (list): 股票資料列表
+            strategy (str, optional): 策略名稱或網址
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
 
         Returns:
             bool: 發送成功返回 True，失敗返回 False
@@ -61,12 +318,59 @@ class LineNotification:
         Raises:
             LineBotApiError: LINE API 錯誤
         """
-        try:
-            message_text = self.format_stock_message(data)
-            message = TextSendMessage(text=message_text)
+        if self.flex_reports and data:
+            try:
+                return self.send_flex_report(data, strategy, recipients)
+            except (ValueError, LineBotApiError, LineDeliveryError) as e:
+                if not _flex_rejected(e):
+                    raise
+                print(f"Flex 訊息無法發送，改用文字訊息: {e}")
+                # 經由 outbox 發送時只有被拒絕的收件者需要改送文字，其餘已收到 Flex 報告
+                if recipients is not None and getattr(e, "recipients", None) is not None:
+                    recipients = e.recipients
+        return self.send_report_blocks(self._stock_message_blocks(data, strategy), recipients)
+
+    def send_flex_report(self, data, strategy=None, recipients=None):
+        """
+        以 Flex Message 表格發送完整持股報告
+
+        Args:
+            data (list): 股票資料列表
+            strategy (str, optional): 策略名稱或網址
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
+
+        Returns:
+            bool: 發送成功返回 True
+
+        Raises:
+            ValueError: 持股內容超過 Flex 大小上限
+            LineBotApiError: LINE API 錯誤
+        """
+        messages = render_flex_report(data, strategy)
+        push_count = self._push_messages(messages, recipients)
+        print(f"成功發送 Flex 訊息到 LINE ({self._recipient_label(recipients)}, "
+              f"{len(messages)} 則訊息 / {push_count} 次推送)")
+        return True
+
+    def send_report_blocks(self, blocks, recipients=None):
+        """
+        將已切好的報告區塊打包後發送（供逐批處理的 pipeline 使用）
+
+        Args:
+            blocks (list): stock_report_blocks 的結果
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
 
-            self.line_bot_api.push_message(self.user_id, message)
-            print(f"成功發送訊息到 LINE (User ID: {self.user_id})")
+        Returns:
+            bool: 發送成功返回 True，失敗返回 False
+
+        Raises:
+            LineBotApiError: LINE API 錯誤
+        """
+        try:
+            texts = pack_blocks(blocks)
+            push_count = self._push_texts(texts, recipients)
+            print(f"成功發送訊息到 LINE ({self._recipient_label(recipients)}, "
+                  f"{len(texts)} 則訊息 / {push_count} 次推送)")
             return True
 
         except LineBotApiError as e:
@@ -77,19 +381,19 @@ class LineNotification:
             print(f"發送訊息時發生錯誤: {e}")
             raise
 
-    def send_text_message(self, text):
+    def send_text_message(self, text, recipients=None):
         """
         發送純文字訊息到 LINE
 
         Args:
             text (str): 要發送的文字訊息
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
 
         Returns:
             bool: 發送成功返回 True，失敗返回 False
         """
         try:
-            message = TextSendMessage(text=text)
-            self.line_bot_api.push_message(self.user_id, message)
+            self._push_texts(pack_blocks(text.split("\n")), recipients)
             print(f"成功發送文字訊息到 LINE")
             return True
 
@@ -100,3 +404,178 @@ class LineNotification:
         except Exception as e:
             print(f"發送訊息時發生錯誤: {e}")
             raise
+
+    def _recipient_label(self, recipients):
+        if recipients is None:
+            return f"User ID: {self.user_id}"
+        return f"{len(recipients)} 位訂閱者"
+
+    def _push_texts(self, texts, recipients=None):
+        """
+        以最少的 API 呼叫次數送出多則文字訊息（每次最多 5 則）
+
+        Args:
+            texts (list): 已分段的訊息文字
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
+
+        Returns:
+            int: API 呼叫次數
+        """
+        return self._push_messages([text_message(text) for text in texts], recipients)
+
+    def _push_messages(self, messages, recipients=None):
+        """
+        以最少的 API 呼叫次數送出多則訊息
+
+        每次呼叫最多 5 則訊息；多位收件者時以 multicast 每次送給最多 500 位，
+        單一收件者時使用 push_message。
+
+        Args:
+            messages (list): Messaging API 的訊息物件（text_message 或 flex 訊息）
+            recipients (list, optional): 收件者 User ID，未提供時發送給 self.user_id
+
+        Returns:
+            int: API 呼叫次數
+        """
+        targets = [self.user_id] if recipients is None else list(recipients)
+        calls = [
+            (chunk[0] if len(chunk) == 1 else chunk, batch)
+            for chunk in batch_messages(targets, LINE_MULTICAST_LIMIT)
+            for batch in batch_messages(messages)
+        ]
+        if self.outbox is not None:
+            return self._enqueue_and_flush(calls)
+        with metrics.span("line_push"):
+            if self.async_delivery:
+                _run_coroutine(self._push_batches_async(calls))
+            else:
+                for to, batch in calls:
+                    self._send_call(to, batch)
+        metrics.increment("line_messages_sent", len(messages) * len(targets))
+        metrics.increment("line_push_calls", len(calls))
+        return len(calls)
+
+    def _send_call(self, to, batch, retry_key=None):
+        """以 line-bot-sdk 送出一次 push_message / multicast"""
+        send_messages = [_to_send_message(message) for message in batch]
+        payload = send_messages[0] if len(send_messages) == 1 else send_messages
+        kwargs = {"retry_key": retry_key} if retry_key else {}
+        if isinstance(to, list):
+            self.line_bot_api.multicast(to, payload, **kwargs)
+        else:
+            self.line_bot_api.push_message(to, payload, **kwargs)
+
+    async def _push_batches_async(self, calls):
+        """以 AsyncLineClient 同時送出不同收件者的訊息，同一收件者依序發送以保持訊息順序"""
+        async with AsyncLineClient(self.channel_access_token, base_url=self.api_base_url) as client:
+            async def send_group(group):
+                for to, batch in group:
+                    send = client.multicast if isinstance(to, list) else client.push_message
+                    await send(to, batch)
+
+            try:
+                await _gather_groups(send_group, _group_by_target(calls, lambda call: json.dumps(call[0])))
+            finally:
+                self.delivery_latencies.extend(client.latencies)
+                metrics.increment("line_retries", client.retry_count)
+
+    def _enqueue_and_flush(self, calls):
+        """
+        將 API 呼叫寫入 outbox 後立即發送
+
+        暫時性錯誤不會拋出例外：訊息留在 outbox，下次執行時先行重送，
+        不需要重新爬取。
+
+        Returns:
+            int: API 呼叫次數
+
+        Raises:
+            LineDeliveryError: 新訊息被 LINE 以 400 拒絕（讓 Flex 報告可以改送文字），
+                recipients 為被拒絕的收件者
+        """
+        ids = self.outbox.enqueue(calls)
+        result = self.flush_outbox()
+        rejected = {json.dumps(to) for (to, _), entry_id in zip(calls, ids) if result["dead"].get(entry_id) == 400}
+        if rejected:
+            # 被拒絕收件者的這批訊息（含為保持順序而未送出的）改由呼叫端以其他形式重送，不再留在 outbox
+            replaced = [entry_id for (to, _), entry_id in zip(calls, ids) if json.dumps(to) in rejected]
+            self.outbox.mark_replaced(replaced, "改由呼叫端重送")
+            recipients = [user_id for key in rejected for user_id in _as_list(json.loads(key))]
+            raise LineDeliveryError(f"LINE API 拒絕 {len(recipients)} 位收件者的訊息 (400)", status=400,
+                                    recipients=recipients)
+        if result["pending"]:
+            print(f"⚠️  {result['pending']} 次推送暫時失敗，已保留在 outbox，下次執行時重送")
+        return len(calls)
+
+    def flush_outbox(self):
+        """
+        依寫入順序發送 outbox 中到期的訊息
+
+        每筆訊息以固定的 idempotency key 作為 X-Line-Retry-Key，重送不會重複送達。
+        同一收件者的訊息發送失敗後，本輪不再發送該收件者較新的訊息，以保持順序。
+        async 傳送時不同收件者的訊息同時發送，同一收件者仍依序發送。
+
+        Returns:
+            dict: {"sent": 送出筆數, "pending": 留待重送筆數, "dead": {資料列 id: HTTP 狀態碼}}
+        """
+        result = {"sent": 0, "pending": 0, "dead": {}}
+        entries = self.outbox.due()
+        if not entries:
+            return result
+        with metrics.span("line_push"):
+            if self.async_delivery:
+                _run_coroutine(self._flush_outbox_async(entries, result))
+            else:
+                blocked = set()
+                for entry in entries:
+                    if entry.target_key in blocked:
+                        result["pending"] += 1
+                        continue
+                    try:
+                        self._send_call(entry.to, entry.messages, entry.key)
+                        error = None
+                    except Exception as e:
+                        error = e
+                    self._record_delivery(entry, error, blocked, result)
+        return result
+
+    async def _flush_outbox_async(self, entries, result):
+        """以 AsyncLineClient 發送 outbox 訊息：不同收件者同時發送，同一收件者依寫入順序發送"""
+        async with AsyncLineClient(self.channel_access_token, base_url=self.api_base_url) as client:
+            blocked = set()
+
+            async def send_group(group):
+                for entry in group:
+                    if entry.target_key in blocked:
+                        result["pending"] += 1
+                        continue
+                    send = client.multicast if isinstance(entry.to, list) else client.push_message
+                    try:
+                        await send(entry.to, entry.messages, entry.key)
+                        error = None
+                    except LineDeliveryError as e:
+                        error = e
+                    self._record_delivery(entry, error, blocked, result)
+
+            try:
+                await _gather_groups(send_group, _group_by_target(entries, lambda entry: entry.target_key))
+            finally:
+                self.delivery_latencies.extend(client.latencies)
+                metrics.increment("line_retries", client.retry_count)
+
+    def _record_delivery(self, entry, error, blocked, result):
+        """依發送結果更新 outbox 與統計"""
+        if error is None or _delivery_outcome(error) == "sent":
+            self.outbox.mark_sent(entry.id)
+            result["sent"] += 1
+            metrics.increment("line_messages_sent", entry.message_count)
+            metrics.increment("line_push_calls")
+            return
+        blocked.add(entry.target_key)
+        status = self.outbox.mark_failed(entry.id, str(error), retryable=_delivery_outcome(error) == "retry")
+        if status == DEAD:
+            result["dead"][entry.id] = _error_status(error)
+            print(f"❌ outbox 訊息 #{entry.id} 無法發送，已移到 dead-letter: {error}")
+        else:
+            result["pending"] += 1
+            print(f"outbox 訊息 #{entry.id} 發送失敗，稍後重送: {error}")
@@ -0,0 +1,194 @@
+"""
+持股資料的型別化紀錄
+
+Holding 在擷取時一次解析百分比與日期，並以 __slots__ 減少記憶體用量。
+仍提供 get() 讓既有以字典存取的格式化函式可直接使用。
+"""
+from src.utils.parsing import parse_date, parse_percentage
+
+
+MISSING = "N/A"
+
+_TEXT_FIELDS = ("entry_date", "profit_percentage", "current_weight")
+_NO_KEY = object()
+
+
+class Holding:
+    """
+    單一持股紀錄
+
+    Attributes:
+        name (str): 股票名稱
+        stock_id (str): 股票代號
+        entry_date (date | None): 進場日期
+        profit_percentage (float | None): 獲利百分比（10.0 代表 10%）
+        current_weight (float | None): 目前權重百分比
+    """
+
+    __slots__ = ("name", "stock_id", "entry_date", "profit_percentage", "current_weight", "_text")
+
+    def __init__(self, name, stock_id, entry_date=None, profit_percentage=None, current_weight=None, text=None):
+        """
+        Args:
+            name (str): 股票名稱
+            stock_id (str): 股票代號
+            entry_date (date, optional): 進場日期
+            profit_percentage (float, optional): 獲利百分比
+            current_weight (float, optional): 權重百分比
+            text (tuple, optional): (進場日期, 獲利, 權重) 的原始文字，用於顯示
+        """
+        self.name = name
+        self.stock_id = stock_id
+        self.entry_date = entry_date
+        self.profit_percentage = profit_percentage
+        self.current_weight = current_weight
+        self._text = text
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        由抓取結果的字典建立 Holding（一次解析所有數值欄位）
+
+        Args:
+            row (dict): 含 name/stock_id/entry_date/profit_percentage/current_weight 的字典
+
+        Returns:
+            Holding
+        """
+        entry_date = row.get("entry_date", MISSING)
+        profit = row.get("profit_percentage", MISSING)
+        weight = row.get("current_weight", MISSING)
+        return cls(
+            row.get("name", MISSING),
+            row.get("stock_id", MISSING),
+            parse_date(entry_date),
+            parse_percentage(profit),
+            parse_percentage(weight),
+            (entry_date, profit, weight),
+        )
+
+    def _display(self, field):
+        if self._text is not None:
+            return self._text[_TEXT_FIELDS.index(field)]
+        value = getattr(self, field)
+        if value is None:
+            return MISSING
+        if field == "entry_date":
+            return f"{value.year}/{value.month}/{value.day}"
+        return f"{value:.2f}%"
+
+    def get(self, key, default=None):
+        """
+        以字典方式取得顯示用文字（與抓取結果的字典相容）
+
+        Args:
+            key (str): 欄位名稱
+            default: 欄位不存在時的回傳值
+
+        Returns:
+            str: 顯示用文字
+        """
+        if key in ("name", "stock_id"):
+            value = getattr(self, key)
+            return default if value is None else value
+        if key in _TEXT_FIELDS:
+            return self._display(key)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _NO_KEY)
+        if value is _NO_KEY:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: 與 FinlabStrategyScraper.scrape 相同格式的字典
+        """
+        return {
+            "name": self.name,
+            "stock_id": self.stock_id,
+            "entry_date": self._display("entry_date"),
+            "profit_percentage": self._display("profit_percentage"),
+            "current_weight": self._display("current_weight"),
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Holding):
+            return NotImplemented
+        return (
+            self.name, self.stock_id, self.entry_date, self.profit_percentage, self.current_weight
+        ) == (
+            other.name, other.stock_id, other.entry_date, other.profit_percentage, other.current_weight
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"Holding(name={self.name!r}, stock_id={self.stock_id!r}, entry_date={self.entry_date!r}, "
+            f"profit_percentage={self.profit_percentage!r}, current_weight={self.current_weight!r})"
+        )
+
+
+def parse_holdings(rows):
+    """
+    將抓取結果轉為 Holding 列表
+
+    Args:
+        rows (list): 持股資料字典列表
+
+    Returns:
+        list: Holding 列表
+    """
+    return [row if isinstance(row, Holding) else Holding.from_row(row) for row in rows]
+
+
+def holdings_to_arrays(holdings):
+    """
+    將持股轉為以欄位為單位的 NumPy 陣列
+
+    數值欄位為 float64（缺值為 NaN），日期為 datetime64[D]（缺值為 NaT）。
+
+    Args:
+        holdings (list): Holding 或字典列表
+
+    Returns:
+        dict: 欄位名稱 -> numpy.ndarray
+    """
+    import numpy as np
+
+    holdings = parse_holdings(holdings)
+    count = len(holdings)
+    nan = float("nan")
+    return {
+        "name": np.array([h.name for h in holdings], dtype=object),
+        "stock_id": np.array([h.stock_id for h in holdings], dtype=object),
+        "entry_date": np.array(
+            [h.entry_date if h.entry_date is not None else "NaT" for h in holdings], dtype="datetime64[D]"
+        ),
+        "profit_percentage": np.fromiter(
+            (nan if h.profit_percentage is None else h.profit_percentage for h in holdings), dtype=np.float64, count=count
+        ),
+        "current_weight": np.fromiter(
+            (nan if h.current_weight is None else h.current_weight for h in holdings), dtype=np.float64, count=count
+        ),
+    }
+
+
+def holdings_to_dataframe(holdings):
+    """
+    將持股轉為 pandas DataFrame
+
+    數值欄位直接沿用 holdings_to_arrays 產生的 float64 陣列，不另外複製。
+
+    Args:
+        holdings (list): Holding 或字典列表
+
+    Returns:
+        pandas.DataFrame
+    """
+    import pandas as pd
+
+    return pd.DataFrame(holdings_to_arrays(holdings), copy=False)
@@ -0,0 +1,100 @@
+"""
+多策略並行抓取
+
+以有上限的執行緒池搭配 DriverPool，同時抓取多個策略網址。
+單一策略失敗不會中斷其他策略。
+"""
+from concurrent.futures import ThreadPoolExecutor
+from src.backends import DEFAULT_BACKEND
+from src.driver_pool import DriverPool
+from src.http_scraper import HttpStrategyScraper, create_session
+from src.layout import LayoutChangedError
+from src.models import parse_holdings
+from src.pipeline import CollectStage, run_pipeline
+from src.scraper import FinlabStrategyScraper
+from src.utils.metrics import metrics
+
+
+def scrape_strategies(urls, max_workers=1, pool=None, http_fast_path=False, browser_profile=None,
+                      harvest=False, supervisor=None, backend=DEFAULT_BACKEND, stages=None, collect=True):
+    """
+    並行抓取多個策略
+
+    持股經由 FinlabStrategyScraper.iter_holdings 逐批交給 stages 建立的 PipelineStage，
+    比對等處理與擷取同時進行。
+
+    Args:
+        urls (list): 策略網址列表
+        max_workers (int): 同時運作的瀏覽器數量
+        pool (DriverPool, optional): 共用的瀏覽器池；未提供時建立並於結束時關閉
+        http_fast_path (bool): 先以 HTTP 直接抓取，沒有資料時才使用瀏覽器
+        browser_profile (BrowserProfile, optional): 自行建立瀏覽器池時的啟動參數與請求封鎖設定
+        harvest (bool): 以逐步捲動 / 換頁的方式擷取表格
+        supervisor (BrowserSupervisor, optional): 自行建立瀏覽器池時用來追蹤瀏覽器程序
+        backend (str): 自行建立瀏覽器池時使用的瀏覽器後端（見 src.backends）
+        stages (callable, optional): 以網址為參數、回傳該策略 PipelineStage 列表的函式
+        collect (bool): 是否保留完整的持股列表；只需要 stages 的結果時設為 False，
+            記憶體用量就不會隨表格大小成長
+
+    Returns:
+        dict: 以網址為鍵、依輸入順序排列的結果，
+            每筆為 {"data": list | None, "error": str | None}（collect=False 時 data 為 None）；
+            提供 stages 時另有 "stages": 各 stage 的結果；
+            頁面結構改變時另有 "layout_changed": LayoutChangedError.to_dict()
+    """
+    urls = list(dict.fromkeys(urls))
+    results = {url: {"data": None, "error": None} for url in urls}
+    if not urls:
+        return results
+
+    max_workers = max(1, min(max_workers, len(urls)))
+    owns_pool = pool is None
+    if owns_pool:
+        pool = DriverPool(size=max_workers, profile=browser_profile, supervisor=supervisor, backend=backend)
+
+    # 瀏覽器只在快速路徑失敗時才會向 pool 借用並啟動
+    session = create_session(pool_maxsize=max_workers) if http_fast_path else None
+
+    def scrape_one(url):
+        batches = None
+        if session is not None:
+            rows = HttpStrategyScraper(session=session).scrape(url)
+            if rows:
+                batches = [parse_holdings(rows)]
+            else:
+                print("HTTP 快速路徑無資料，改用瀏覽器抓取")
+        if batches is None:
+            batches = FinlabStrategyScraper(pool=pool, harvest=harvest).iter_holdings(url)
+        pipeline = list(stages(url)) if stages else []
+        if collect:
+            pipeline.append(CollectStage())
+        stage_results = run_pipeline(batches, pipeline)
+        if not collect:
+            return None, stage_results
+        return stage_results[-1], stage_results[:-1]
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {url: executor.submit(scrape_one, url) for url in urls}
+            for url, future in futures.items():
+                try:
+                    results[url]["data"], stage_results = future.result()
+                    if stages:
+                        results[url]["stages"] = stage_results
+                except LayoutChangedError as e:
+                    print(f"策略頁面結構已改變 ({url}): {e}")
+                    metrics.increment("strategy_failures", strategy=url)
+                    metrics.increment("layout_changed", strategy=url)
+                    results[url]["error"] = str(e)
+                    results[url]["layout_changed"] = e.to_dict()
+                except Exception as e:
+                    print(f"策略抓取失敗 ({url}): {e}")
+                    metrics.increment("strategy_failures", strategy=url)
+                    results[url]["error"] = str(e) or type(e).__name__
+    finally:
+        if session is not None:
+            session.close()
+        if owns_pool:
+            pool.close()
+
+    return results
@@ -0,0 +1,272 @@
+"""
+LINE 訊息的持久化 outbox
+
+每次 API 呼叫（收件者 + 最多 5 則已渲染的訊息）在發送前先寫入 SQLite（WAL 模式），
+發送成功才標記為已送出。暫時性錯誤以指數退避延後重送，
+無法重試的錯誤或超過重試次數的訊息移到 dead-letter 保留；
+已改用其他形式重送（例如 Flex 被拒絕後改送文字）的訊息標記為 replaced。
+
+每筆訊息有固定的 idempotency key，重送時作為 X-Line-Retry-Key，
+LINE 已接受過的請求不會重複送達。
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+DEFAULT_OUTBOX_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "finlab-strategy-linebot", "outbox.sqlite3"
+)
+
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"
+REPLACED = "replaced"
+
+# 已送出的紀錄保留天數
+SENT_RETENTION = 7 * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    recipient TEXT NOT NULL,
+    messages TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, next_attempt_at, id);
+"""
+
+
+class OutboxEntry:
+    """
+    outbox 中的一次 API 呼叫
+    """
+
+    __slots__ = ("id", "key", "to", "messages", "attempts")
+
+    def __init__(self, entry_id, key, to, messages, attempts=0):
+        """
+        Args:
+            entry_id (int): 資料列 id
+            key (str): idempotency key（UUID）
+            to (str | list): 單一 User ID（push）或 User ID 列表（multicast）
+            messages (list): Messaging API 的訊息物件
+            attempts (int): 已嘗試次數
+        """
+        self.id = entry_id
+        self.key = key
+        self.to = to
+        self.messages = messages
+        self.attempts = attempts
+
+    @property
+    def target_key(self):
+        """同一收件者的訊息需依序送達"""
+        return json.dumps(self.to)
+
+    @property
+    def message_count(self):
+        """送達的訊息總數（訊息數 x 收件者數）"""
+        return len(self.messages) * (len(self.to) if isinstance(self.to, list) else 1)
+
+
+class Outbox:
+    """
+    以 SQLite 保存待發送的 LINE 訊息
+
+    用法:
+        with Outbox(path) as outbox:
+            outbox.enqueue([(user_id, messages)])
+            for entry in outbox.due():
+                ...
+                outbox.mark_sent(entry.id)
+    """
+
+    def __init__(self, path=DEFAULT_OUTBOX_PATH, max_attempts=10, backoff_base=30, backoff_max=3600):
+        """
+        Args:
+            path (str): SQLite 檔案路徑（":memory:" 可用於測試）
+            max_attempts (int): 超過幾次失敗移到 dead-letter
+            backoff_base (float): 重送的基準等待秒數（每次失敗加倍）
+            backoff_max (float): 重送等待秒數上限
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # 寫入後立即落盤：outbox 的目的就是在當機後仍保有訊息
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        """關閉資料庫連線"""
+        self._conn.close()
+
+    def enqueue(self, calls, now=None):
+        """
+        在單一交易中寫入多次 API 呼叫
+
+        Args:
+            calls (list): (收件者, 訊息物件列表)
+            now (float, optional): 目前時間（測試用）
+
+        Returns:
+            list: 新資料列的 id
+        """
+        now = time.time() if now is None else now
+        ids = []
+        with self._lock, self._conn:
+            for to, messages in calls:
+                cursor = self._conn.execute(
+                    "INSERT INTO outbox (idempotency_key, recipient, messages, status, next_attempt_at, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (str(uuid.uuid4()), json.dumps(to), json.dumps(messages, ensure_ascii=False), PENDING, now, now),
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def due(self, now=None, limit=None):
+        """
+        Args:
+            now (float, optional): 目前時間（測試用）
+            limit (int, optional): 最多取幾筆
+
+        Returns:
+            list: 到期的 OutboxEntry，依寫入順序排列
+        """
+        now = time.time() if now is None else now
+        sql = (
+            "SELECT id, idempotency_key, recipient, messages, attempts FROM outbox"
+            " WHERE status = ? AND next_attempt_at <= ? ORDER BY id"
+        )
+        params = [PENDING, now]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            OutboxEntry(entry_id, key, json.loads(recipient), json.loads(messages), attempts)
+            for entry_id, key, recipient, messages, attempts in rows
+        ]
+
+    def pending_count(self):
+        """
+        Returns:
+            int: 尚未送出（含等待重送）的筆數
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE status = ?", (PENDING,)).fetchone()[0]
+
+    def mark_sent(self, entry_id, now=None):
+        """標記為已送出"""
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (SENT, now, entry_id),
+            )
+
+    def mark_failed(self, entry_id, error, retryable=True, now=None):
+        """
+        記錄發送失敗
+
+        Args:
+            entry_id (int): 資料列 id
+            error (str): 錯誤訊息
+            retryable (bool): 是否可重送
+            now (float, optional): 目前時間（測試用）
+
+        Returns:
+            str: 新的狀態（PENDING 或 DEAD）
+        """
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            attempts = self._conn.execute("SELECT attempts FROM outbox WHERE id = ?", (entry_id,)).fetchone()[0] + 1
+            status = PENDING if retryable and attempts < self.max_attempts else DEAD
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (status, attempts, now + delay, error, entry_id),
+            )
+        return status
+
+    def mark_replaced(self, entry_ids, note):
+        """
+        標記已改用其他形式重送的訊息：不再重送，也不列入 dead-letter（已送出的不受影響）
+
+        Args:
+            entry_ids (list): 資料列 id
+            note (str): 附加在 last_error 的說明
+
+        Returns:
+            int: 標記的筆數
+        """
+        if not entry_ids:
+            return 0
+        placeholders = ", ".join("?" * len(entry_ids))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, last_error = COALESCE(last_error || ' / ', '') || ?"
+                f" WHERE id IN ({placeholders}) AND status != ?",
+                (REPLACED, note, *entry_ids, SENT),
+            )
+        return cursor.rowcount
+
+    def dead_letters(self):
+        """
+        Returns:
+            list: {"id", "to", "messages", "attempts", "last_error", "created_at"} 字典
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, recipient, messages, attempts, last_error, created_at FROM outbox"
+                " WHERE status = ? ORDER BY id",
+                (DEAD,),
+            ).fetchall()
+        return [
+            {
+                "id": entry_id,
+                "to": json.loads(recipient),
+                "messages": json.loads(messages),
+                "attempts": attempts,
+                "last_error": last_error,
+                "created_at": created_at,
+            }
+            for entry_id, recipient, messages, attempts, last_error, created_at in rows
+        ]
+
+    def purge_sent(self, older_than=SENT_RETENTION, now=None):
+        """
+        刪除超過保留期限的已送出紀錄
+
+        Returns:
+            int: 刪除筆數
+        """
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status = ? AND sent_at < ?", (SENT, now - older_than)
+            )
+        return cursor.rowcount
@@ -0,0 +1,138 @@
+"""
+逐批處理持股的 pipeline
+
+FinlabStrategyScraper.iter_holdings 每產生一批持股，就依序交給各個 stage 處理，
+輸出、比對與訊息格式化都不需要等整張表格擷取完。
+只有加入 CollectStage 時才會保留完整的持股列表；main.run_cycle 的快照快取與歷史資料庫需要完整列表，
+因此目前的排程流程仍會保留每個策略的所有持股，記憶體用量隨表格大小成長。
+
+用法:
+    blocks = []
+    differ, report = DiffStage(previous_rows), ReportStage(blocks.append, strategy)
+    run_pipeline(scraper.iter_holdings(url), [PrintStage(), differ, report])
+    diff = differ.result
+"""
+from abc import ABC, abstractmethod
+from src.diff import HoldingsDiffer
+from src.utils.formatter import print_holding
+
+
+class PipelineStage(ABC):
+    """
+    Pipeline 的處理階段，子類別實作 consume，需要在結束時彙整結果的再覆寫 finish
+    """
+
+    result = None
+
+    @abstractmethod
+    def consume(self, batch):
+        """
+        處理一批持股
+
+        Args:
+            batch (list): Holding 或持股字典列表
+        """
+
+    def finish(self):
+        """所有批次處理完後呼叫，結果存放在 self.result"""
+
+
+class PrintStage(PipelineStage):
+    """逐筆印出持股，與 print_scrape_results 的格式相同"""
+
+    def __init__(self):
+        self.count = 0
+
+    def consume(self, batch):
+        for row in batch:
+            self.count += 1
+            print_holding(self.count, row)
+
+    def finish(self):
+        print(f"=== 抓取完成，共 {self.count} 筆資料 ===" if self.count else "無資料")
+        self.result = self.count
+
+
+class DiffStage(PipelineStage):
+    """逐批與前一次的持股比對，結果為 HoldingsDiff"""
+
+    def __init__(self, previous_rows, profit_threshold=5.0, weight_threshold=0.0):
+        """
+        Args:
+            previous_rows (list): 前一次的持股資料
+            profit_threshold (float): 獲利變動超過幾個百分點才列入
+            weight_threshold (float): 權重變動超過幾個百分點才列入
+        """
+        self.differ = HoldingsDiffer(previous_rows, profit_threshold, weight_threshold)
+
+    def consume(self, batch):
+        self.differ.add(batch)
+
+    def finish(self):
+        self.result = self.differ.result()
+
+
+class ReportStage(PipelineStage):
+    """
+    逐批產生 LINE 報告的文字區塊，每產生一個就交給 emit，不保留已產生的區塊
+
+    區塊依序為標題、每檔持股與總計，與 stock_report_blocks 的結果相同；結果為持股檔數。
+    """
+
+    def __init__(self, emit, strategy=None):
+        """
+        Args:
+            emit (callable): 接收每個文字區塊的函式（例如 BlockPacker.add）
+            strategy (str, optional): 策略名稱或網址
+        """
+        self.emit = emit
+        self.strategy = strategy
+        self.count = 0
+
+    def consume(self, batch):
+        # 在此才載入 LINE SDK，只抓取不通知的流程（例如 multi_scraper）不必載入
+        from src.line_notification import format_stock_block, report_header
+
+        for row in batch:
+            if not self.count:
+                self.emit(report_header(self.strategy))
+            self.count += 1
+            self.emit(format_stock_block(self.count, row))
+
+    def finish(self):
+        from src.line_notification import report_footer
+
+        self.emit(report_footer(self.count, self.strategy))
+        self.result = self.count
+
+
+class CollectStage(PipelineStage):
+    """保留所有持股字典（快照快取與歷史資料庫需要完整列表時使用）"""
+
+    def __init__(self):
+        self.rows = []
+
+    def consume(self, batch):
+        self.rows.extend(row.to_dict() if hasattr(row, "to_dict") else row for row in batch)
+
+    def finish(self):
+        self.result = self.rows
+
+
+def run_pipeline(batches, stages):
+    """
+    將每一批持股依序交給所有 stage
+
+    Args:
+        batches (iterable): 持股批次（例如 iter_holdings 的 generator）
+        stages (list): PipelineStage 列表
+
+    Returns:
+        list: 各 stage 的結果，順序與 stages 相同
+    """
+    for batch in batches:
+        for stage in stages:
+            stage.consume(batch)
+    for stage in stages:
+        stage.finish()
+    return [stage.result for stage in stages]
@@ -0,0 +1,161 @@
+"""
+頁面就緒條件與等待計時
+
+以明確的就緒條件取代固定秒數的 time.sleep：
+每個條件各自擁有逾時設定，並記錄實際等待的時間。
+"""
+import time
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# 各階段的預設逾時秒數
+DEFAULT_TIMEOUTS = {
+    "network_idle": 5,
+    "iframe_attached": 8,
+    "layout_probe": 8,
+    "tab_active": 5,
+    "rows_stable": 8,
+}
+
+# 網路閒置判定：最後一個資源載入完成後需安靜的毫秒數
+NETWORK_QUIET_MS = 500
+
+_NETWORK_IDLE_FUNCTION = """
+function networkIdle(quietMs) {
+    if (document.readyState !== 'complete') { return false; }
+    var entries = performance.getEntriesByType('resource');
+    var lastEnd = 0;
+    for (var i = 0; i < entries.length; i++) {
+        if (entries[i].responseEnd > lastEnd) { lastEnd = entries[i].responseEnd; }
+    }
+    return (performance.now() - lastEnd) >= quietMs;
+}
+"""
+
+NETWORK_IDLE_SCRIPT = _NETWORK_IDLE_FUNCTION + "return networkIdle(arguments[0]);"
+
+# 分頁帶有 aria-selected / active / tab-active 標記即為作用中；
+# 分頁所在的 tablist 完全沒有這些標記時無從判斷，視為已就緒而不等到逾時
+TAB_ACTIVE_SCRIPT = """
+var tab = document.querySelector(arguments[0]);
+if (!tab) { return false; }
+if (tab.getAttribute('aria-selected') === 'true') { return true; }
+if (tab.classList.contains('active') || tab.classList.contains('tab-active')) { return true; }
+var list = tab.closest('[role="tablist"]') || tab.parentElement || document;
+return !list.querySelector('[aria-selected], .active, .tab-active');
+"""
+
+# 連續兩個 animation frame 的列數相同且大於 0 才視為穩定，回傳列數；
+# 列數維持 0 且網路已閒置時（策略沒有持股）回傳 true，不必等到逾時。
+# 傳入多個 selector 時以第一個有符合元素的 selector 計算
+ROWS_STABLE_SCRIPT = _NETWORK_IDLE_FUNCTION + """
+var selectors = [].concat(arguments[0]);
+var quietMs = arguments[1];
+var done = arguments[arguments.length - 1];
+function count() {
+    for (var i = 0; i < selectors.length; i++) {
+        var n = document.querySelectorAll(selectors[i]).length;
+        if (n) { return n; }
+    }
+    return 0;
+}
+var before = count();
+requestAnimationFrame(function () {
+    requestAnimationFrame(function () {
+        var after = count();
+        if (after !== before) { done(false); }
+        else { done(after > 0 ? after : networkIdle(quietMs)); }
+    });
+});
+"""
+
+
+class ReadinessCondition:
+    """
+    單一就緒條件
+    """
+
+    def __init__(self, name, predicate, timeout, poll_frequency=0.1):
+        """
+        Args:
+            name (str): 條件名稱（同時作為計時報告的階段名稱）
+            predicate (callable): 接收 driver，就緒時回傳 truthy 值
+            timeout (float): 此條件的逾時秒數
+            poll_frequency (float): 輪詢間隔秒數
+        """
+        self.name = name
+        self.predicate = predicate
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+
+
+def network_idle(timeout, quiet_ms=NETWORK_QUIET_MS):
+    """文件載入完成且最近 quiet_ms 毫秒內沒有資源完成下載"""
+    def predicate(driver):
+        return driver.execute_script(NETWORK_IDLE_SCRIPT, quiet_ms)
+    return ReadinessCondition("network_idle", predicate, timeout)
+
+
+def tab_active(tab_selector, timeout):
+    """指定的分頁已成為作用中分頁"""
+    def predicate(driver):
+        return driver.execute_script(TAB_ACTIVE_SCRIPT, tab_selector)
+    return ReadinessCondition("tab_active", predicate, timeout)
+
+
+def rows_stable(row_selector, timeout, quiet_ms=NETWORK_QUIET_MS):
+    """
+    表格列數在連續兩個 animation frame 間維持不變（row_selector 可為 selector 或依序嘗試的 selector 列表）
+
+    沒有任何列時，要等最近 quiet_ms 毫秒內沒有資源完成下載才視為就緒（空的持股表格）。
+    """
+    def predicate(driver):
+        return driver.execute_async_script(ROWS_STABLE_SCRIPT, row_selector, quiet_ms)
+    return ReadinessCondition("rows_stable", predicate, timeout)
+
+
+class ReadinessWaiter:
+    """
+    依序等待就緒條件，並記錄每個階段實際等待的時間
+    """
+
+    def __init__(self, driver):
+        """
+        Args:
+            driver: Selenium WebDriver
+        """
+        self.driver = driver
+        self.timings = {}
+        self.failed = set()
+
+    def wait_for(self, condition):
+        """
+        等待條件成立
+
+        Args:
+            condition (ReadinessCondition): 就緒條件
+
+        Returns:
+            條件成立時 predicate 的回傳值
+
+        Raises:
+            TimeoutException: 超過條件的逾時時間
+        """
+        wait = WebDriverWait(self.driver, condition.timeout, poll_frequency=condition.poll_frequency)
+        start = time.perf_counter()
+        try:
+            return wait.until(condition.predicate)
+        except Exception:
+            self.failed.add(condition.name)
+            raise
+        finally:
+            self.timings[condition.name] = time.perf_counter() - start
+
+    def report(self):
+        """
+        產生各階段等待時間的摘要
+
+        Returns:
+            str: 例如 "network_idle=0.42s, iframe_attached=0.03s"
+        """
+        return ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.timings.items())
@@ -0,0 +1,153 @@
+"""
+台股交易日曆排程
+
+以台北時間計算下一次執行時間：只在週一至週五、非休市日執行，
+可指定固定時間點（例如開盤前與收盤後），並可在盤中每隔 N 分鐘執行一次。
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    TAIPEI_TZ = ZoneInfo("Asia/Taipei")
+except (ImportError, ZoneInfoNotFoundError):
+    # 系統沒有 tz 資料庫時（例如未安裝 tzdata 的 Windows）改用固定時差；台灣沒有日光節約時間
+    TAIPEI_TZ = timezone(timedelta(hours=8), "Asia/Taipei")
+
+
+# 證交所一般交易時段
+MARKET_OPEN = time(9, 0)
+MARKET_CLOSE = time(13, 30)
+
+# 開盤前與收盤後各執行一次
+DEFAULT_RUN_TIMES = "08:30,13:45"
+
+TRADING_WEEKDAYS = frozenset(range(5))
+
+# 最多往後找幾天（連假也不會超過）
+_MAX_LOOKAHEAD_DAYS = 370
+
+
+def parse_run_times(value):
+    """
+    解析以逗號分隔的 HH:MM 時間
+
+    Args:
+        value (str): 例如 "08:30,13:45"
+
+    Returns:
+        list: 排序後的 datetime.time
+
+    Raises:
+        ValueError: 格式錯誤
+    """
+    run_times = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        hour, _, minute = part.partition(":")
+        run_times.add(time(int(hour), int(minute or 0)))
+    return sorted(run_times)
+
+
+def parse_holidays(value):
+    """
+    解析以逗號或空白分隔的休市日
+
+    Args:
+        value (str): 例如 "2026-01-01,2026-02-16"
+
+    Returns:
+        set: datetime.date
+
+    Raises:
+        ValueError: 日期格式錯誤
+    """
+    return {date.fromisoformat(part) for part in (value or "").replace(",", " ").split()}
+
+
+class MarketSchedule:
+    """
+    依台股交易日計算執行時間
+    """
+
+    def __init__(self, run_times=None, interval_minutes=0, holidays=(), tz=TAIPEI_TZ):
+        """
+        Args:
+            run_times (list, optional): 每個交易日固定執行的 datetime.time，預設為開盤前與收盤後
+            interval_minutes (int): 大於 0 時，盤中每隔幾分鐘額外執行一次
+            holidays (iterable): 休市日（datetime.date）
+            tz (tzinfo): 排程使用的時區
+        """
+        self.run_times = list(run_times) if run_times is not None else parse_run_times(DEFAULT_RUN_TIMES)
+        self.interval_minutes = interval_minutes
+        self.holidays = set(holidays)
+        self.tz = tz
+
+    def is_trading_day(self, day):
+        """
+        Args:
+            day (date): 日期
+
+        Returns:
+            bool: 週一至週五且不是休市日
+        """
+        return day.weekday() in TRADING_WEEKDAYS and day not in self.holidays
+
+    def is_market_open(self, moment):
+        """
+        Args:
+            moment (datetime): 時間（無時區時視為排程時區）
+
+        Returns:
+            bool: 是否在交易時段內
+        """
+        local = self._localize(moment)
+        return self.is_trading_day(local.date()) and MARKET_OPEN <= local.time() <= MARKET_CLOSE
+
+    def slots(self, day):
+        """
+        Args:
+            day (date): 日期
+
+        Returns:
+            list: 當天所有執行時間（含時區的 datetime），非交易日為空
+        """
+        if not self.is_trading_day(day):
+            return []
+        slot_times = set(self.run_times)
+        if self.interval_minutes > 0:
+            moment = datetime.combine(day, MARKET_OPEN)
+            close = datetime.combine(day, MARKET_CLOSE)
+            step = timedelta(minutes=self.interval_minutes)
+            while moment <= close:
+                slot_times.add(moment.time())
+                moment += step
+        return [datetime.combine(day, slot, tzinfo=self.tz) for slot in sorted(slot_times)]
+
+    def next_run(self, now=None):
+        """
+        計算下一次執行時間
+
+        Args:
+            now (datetime, optional): 目前時間，預設為現在
+
+        Returns:
+            datetime: 晚於 now 的第一個執行時間（排程時區）
+
+        Raises:
+            ValueError: 找不到任何執行時間（例如沒有設定時間點）
+        """
+        now = self._localize(now or datetime.now(self.tz))
+        day = now.date()
+        for _ in range(_MAX_LOOKAHEAD_DAYS):
+            for slot in self.slots(day):
+                if slot > now:
+                    return slot
+            day += timedelta(days=1)
+        raise ValueError("排程中沒有任何可執行的時間")
+
+    def _localize(self, moment):
+        if moment.tzinfo is None:
+            return moment.replace(tzinfo=self.tz)
+        return moment.astimezone(self.tz)
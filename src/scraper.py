@@ -1,11 +1,82 @@
 import time
+from contextlib import ExitStack
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import SessionNotCreatedException
+from src.backends import CDP, DEFAULT_BACKEND, as_backend
+from src.browser_profile import BrowserProfile, collect_page_load_stats
+from src.extraction import DEFAULT_BATCH_SIZE, extract_rows, iter_row_batches
+from src.harvest import harvest_rows, iter_harvest_batches
+from src.layout import SELECTOR_STRATEGIES, LayoutChangedError, LayoutProbe, check_cells, layout_ready
+from src.models import parse_holdings
+from src.utils.driver_cache import DEFAULT_DRIVER_CACHE_PATH, clear_driver_cache, resolve_browser_paths
+from src.utils.metrics import metrics
+from src.readiness import (
+    DEFAULT_TIMEOUTS,
+    ReadinessWaiter,
+    network_idle,
+    rows_stable,
+    tab_active,
+)
+
+
+# 模擬一般使用者 User-Agent，避免被簡單擋下
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def create_chrome_driver(driver_path, chrome_path=None, profile=None):
+    """
+    以指定的 chromedriver 啟動無頭 Chrome
+
+    Args:
+        driver_path (str): chromedriver 執行檔路徑
+        chrome_path (str, optional): Chrome 執行檔路徑，未提供時由 chromedriver 自行尋找
+        profile (BrowserProfile, optional): 啟動參數與請求封鎖設定，預設為精簡設定
+
+    Returns:
+        webdriver.Chrome: 新的 WebDriver
+    """
+    options = Options()
+    options.add_argument('--headless')  # 無頭模式
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument(f"user-agent={USER_AGENT}")
+    if chrome_path:
+        options.binary_location = chrome_path
+    profile = profile or BrowserProfile()
+    profile.apply_options(options)
+
+    service = Service(driver_path)
+    driver = webdriver.Chrome(service=service, options=options)
+    profile.install(driver)
+    return driver
+
+
+def launch_browser(backend=DEFAULT_BACKEND, cache_path=DEFAULT_DRIVER_CACHE_PATH, profile=None):
+    """
+    啟動指定後端的無頭 Chrome
+
+    Args:
+        backend (str): "selenium" 或 "cdp"（見 src.backends）
+        cache_path (str): chromedriver 路徑快取檔（cdp 後端不需要 chromedriver）
+        profile (BrowserProfile, optional): 啟動參數與請求封鎖設定
+
+    Returns:
+        webdriver.Chrome | CDPBackend: 新的瀏覽器
+    """
+    if backend == CDP:
+        from src.backends.cdp_backend import CDPBackend
+        return CDPBackend.launch(profile=profile, user_agent=USER_AGENT)
+    driver_path, chrome_path = resolve_browser_paths(cache_path=cache_path)
+    try:
+        return create_chrome_driver(driver_path, chrome_path, profile)
+    except SessionNotCreatedException as e:
+        # 多半是 chromedriver 與 Chrome 版本不符：清除快取重新解析後再試一次
+        print(f"無法建立瀏覽器工作階段，重新解析 chromedriver: {e.msg}")
+        clear_driver_cache(cache_path)
+        driver_path, chrome_path = resolve_browser_paths(cache_path=cache_path)
+        return create_chrome_driver(driver_path, chrome_path, profile)
 
 
 class FinlabStrategyScraper:
@@ -13,21 +84,48 @@ class FinlabStrategyScraper:
     用於抓取 Finlab 策略持股資料的爬蟲類別
     """
 
-    def __init__(self):
-        """初始化 Scraper"""
+    def __init__(self, timeouts=None, pool=None, driver_cache_path=None, browser_profile=None, harvest=False,
+                 backend=DEFAULT_BACKEND):
+        """
+        初始化 Scraper
+
+        Args:
+            timeouts (dict, optional): 覆寫各就緒條件的逾時秒數，
+                鍵值同 src.readiness.DEFAULT_TIMEOUTS
+            pool (DriverPool, optional): 共用的瀏覽器池；提供時重複使用
+                已啟動的 Chrome，抓取結束後不關閉瀏覽器
+            driver_cache_path (str, optional): Chrome / chromedriver 路徑快取檔
+            browser_profile (BrowserProfile, optional): 自行啟動瀏覽器時的啟動參數與請求封鎖設定
+            harvest (bool): 逐步捲動 / 換頁擷取虛擬化或分頁的表格（見 src.harvest）
+            backend (str): 自行啟動瀏覽器時使用的後端，"selenium" 或 "cdp"（見 src.backends）
+        """
         self.driver = None
+        # 操作 self.driver 的後端；WebDriver 以 SeleniumBackend 包裝
+        self.backend = None
+        self.backend_name = backend
+        self.pool = pool
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.phase_timings = {}
+        self.driver_cache_path = driver_cache_path or DEFAULT_DRIVER_CACHE_PATH
+        self.browser_profile = browser_profile
+        self.page_stats = None
+        self.harvest = harvest
+        # 最近一次探測到的擷取用 selector（見 src.layout）
+        self.selectors = None
 
     def _setup_driver(self):
         """設定 Chrome WebDriver"""
-        options = Options()
-        options.add_argument('--headless')  # 無頭模式
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        # 模擬一般使用者 User-Agent，避免被簡單擋下
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        with metrics.span("driver_setup"):
+            self._attach(launch_browser(self.backend_name, self.driver_cache_path, self.browser_profile))
 
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
+    def _attach(self, driver):
+        """使用指定的瀏覽器（自行啟動或由瀏覽器池借出）"""
+        self.driver = driver
+        self.backend = as_backend(driver)
+
+    def _detach(self):
+        self.driver = None
+        self.backend = None
 
     def scrape(self, url):
         """
@@ -39,122 +137,233 @@ class FinlabStrategyScraper:
         Returns:
             list: 包含持股資料的字典列表
         """
-        data_list = []
+        if self.pool is not None:
+            with self.pool.acquire() as driver:
+                self._attach(driver)
+                try:
+                    return self._scrape_page(url)
+                except Exception as e:
+                    print(f"抓取過程發生錯誤: {e}")
+                    raise
+                finally:
+                    self._detach()
+
         try:
             # 設定 WebDriver
             self._setup_driver()
+            return self._scrape_page(url)
+
+        except Exception as e:
+            print(f"抓取過程發生錯誤: {e}")
+            raise
 
-            print(f"正在訪問: {url}")
-            self.driver.get(url)
+        finally:
+            self._quit_driver()
 
-            # 等待頁面載入
-            print("等待頁面載入...")
-            time.sleep(5)
+    def _quit_driver(self):
+        """關閉自行啟動的瀏覽器"""
+        if self.driver:
+            self.backend.close()
+            self._detach()
+            print("瀏覽器已關閉")
 
-            # 建立 WebDriverWait 物件
-            wait = WebDriverWait(self.driver, 8)
+    def scrape_holdings(self, url):
+        """
+        抓取持股資料並於擷取時一次解析為 Holding
 
-            # 切換進入 Iframe (關鍵修正)
-            print("正在尋找並切換至 iframe...")
-            try:
-                # 等待 id="reportIframe" 出現，並且自動切換進去
-                # 這是 Selenium 專門處理 iframe 的等待條件
-                wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, "reportIframe")))
-                print("成功切換進入 iframe Context")
-            except Exception as e:
-                print(f"切換 iframe 失敗 (可能網頁結構改變或載入過慢): {e}")
-                # 如果切換失敗，後面的動作大概率會錯，但我們還是讓它繼續嘗試
+        Args:
+            url (str): 目標網址
 
-            # 點擊「選股」Tab (現在我們已經在 iframe 裡了)
-            try:
-                print("正在尋找 '選股' 分頁按鈕...")
+        Returns:
+            list: Holding 列表
+        """
+        return parse_holdings(self.scrape(url))
 
-                # 這裡維持上一版的邏輯，抓取 tablist 裡的第二個 a
-                stock_tab_locator = (By.CSS_SELECTOR, "div[role='tablist'] > a:last-child")
+    def iter_holdings(self, url, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        逐批抓取並解析持股資料
 
-                stock_tab = wait.until(EC.presence_of_element_located(stock_tab_locator))
+        每次只向頁面取回 batch_size 列（harvest 模式則為每次捲動新出現的列），下游可邊讀邊處理；
+        最後一批擷取完成後、交給呼叫端之前就會釋放瀏覽器。
+        提早停止迭代（或 generator 被關閉）時同樣會釋放瀏覽器。
 
-                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", stock_tab)
-                time.sleep(1)
+        用法:
+            for batch in scraper.iter_holdings(url):
+                ...
 
-                print("嘗試點擊 '選股'...")
-                self.driver.execute_script("arguments[0].click();", stock_tab)
+        Args:
+            url (str): 目標網址
+            batch_size (int): 每批的列數
 
-                print("已觸發點擊，等待資料載入...")
-                time.sleep(3)
+        Yields:
+            list: Holding 列表
+        """
+        with ExitStack() as browser:
+            if self.pool is not None:
+                self._attach(browser.enter_context(self.pool.acquire()))
+                browser.callback(self._detach)
+            else:
+                browser.callback(self._quit_driver)
+                self._setup_driver()
 
+            try:
+                self._load_page(url)
+                if self.harvest:
+                    batches = iter_harvest_batches(self.backend, selectors=self.selectors)
+                else:
+                    batches = iter_row_batches(self.backend, batch_size, self.selectors)
+
+                def finish(row_count):
+                    # 擷取完成（含沒有任何列的表格）：記錄結果並在交出最後一批之前釋放瀏覽器
+                    print(f"成功抓取 {row_count} 筆資料")
+                    self._report_page_stats(url)
+                    browser.close()
+
+                batch = next(batches, None)
+                if batch is None:
+                    finish(0)
+                row_count = 0
+                while batch is not None:
+                    # 先取下一批，才知道目前這批是否為最後一批
+                    following = next(batches, None)
+                    row_count += len(batch)
+                    metrics.increment("rows_scraped", len(batch), strategy=url)
+                    if following is None:
+                        finish(row_count)
+                    yield parse_holdings(batch)
+                    batch = following
             except Exception as e:
-                print(f"點擊 '選股' 分頁失敗: {e}")
+                print(f"抓取過程發生錯誤: {e}")
+                raise
 
-            # 等待表格資料出現
-            print("正在等待表格資料載入...")
-            try:
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
-                print("表格資料已載入")
-            except:
-                print("表格載入超時，嘗試直接抓取...")
+    def _scrape_page(self, url):
+        """
+        以目前的 driver 訪問網址並擷取持股資料
 
-            print("抓取資料中...")
+        Args:
+            url (str): 目標網址
 
-            # 定位表格列 (Rows)
-            rows = self.driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
-            print(f"找到 {len(rows)} 行資料")
+        Returns:
+            list: 包含持股資料的字典列表
+        """
+        self._load_page(url)
 
-            for row in rows:
-                item = {}
+        print("抓取資料中...")
 
-                # 1. 股票名稱 (whitespace-nowrap font-bold text-base-content-300)
-                try:
-                    el = row.find_element(By.CSS_SELECTOR, ".whitespace-nowrap.font-bold.text-base-content-300")
-                    item['name'] = el.text.strip()
-                except:
-                    item['name'] = "N/A"
+        with metrics.span("extract", strategy=url):
+            if self.harvest:
+                data_list = harvest_rows(self.backend, selectors=self.selectors)
+            else:
+                data_list = extract_rows(self.backend, self.selectors)
+        metrics.increment("rows_scraped", len(data_list), strategy=url)
 
-                # 2. 股票代號 (font-light text-base-content-200)
-                try:
-                    el = row.find_element(By.CSS_SELECTOR, ".font-light.text-base-content-200")
-                    item['stock_id'] = el.text.strip()
-                except:
-                    item['stock_id'] = "N/A"
+        print(f"成功抓取 {len(data_list)} 筆資料")
+        self._report_page_stats(url)
+        return data_list
 
-                # 3. lining-nums svelte-1nx0ef2 (這裡特指 entryDate 下的)
-                try:
-                    # 使用 slot='entryDate' 定位比較準確
-                    el = row.find_element(By.CSS_SELECTOR, "div[slot='entryDate'] .lining-nums.svelte-1nx0ef2")
-                    item['entry_date'] = el.text.strip()
-                except:
-                    # 若抓不到，嘗試抓該行所有的 lining-nums
-                    item['entry_date'] = "N/A"
-
-                # 4. text-error svelte-1nx0ef2 (獲利趴數 & 權重)
-                try:
-                    # 這兩個通常都是紅色字體，順序通常是: 獲利 -> 權重
-                    error_items = row.find_elements(By.CSS_SELECTOR, ".text-error.svelte-1nx0ef2")
+    def _load_page(self, url):
+        """
+        訪問網址、切換進 iframe、點擊「選股」分頁並等待表格穩定
 
-                    if len(error_items) >= 1:
-                        item['profit_percentage'] = error_items[0].text.strip()
-                    else:
-                        item['profit_percentage'] = "N/A"
+        Args:
+            url (str): 目標網址
+        """
+        print(f"正在訪問: {url}")
+        start = time.perf_counter()
+        with metrics.span("navigate", strategy=url):
+            self.backend.navigate(url)
+        waiter = ReadinessWaiter(self.backend)
+        self.selectors = None
+        try:
+            self._wait_for_table(waiter)
+        finally:
+            self.phase_timings = dict(waiter.timings)
+            for phase, seconds in waiter.timings.items():
+                error = "TimeoutException" if phase in waiter.failed else None
+                metrics.record(phase, seconds, error=error, strategy=url)
+            print(f"就緒等待時間: {waiter.report()} (總計 {time.perf_counter() - start:.2f}s)")
 
-                    if len(error_items) >= 2:
-                        item['current_weight'] = error_items[1].text.strip()
-                    else:
-                        item['current_weight'] = "N/A"
-                except:
-                    item['profit_percentage'] = "N/A"
-                    item['current_weight'] = "N/A"
+    def _wait_for_table(self, waiter):
+        """
+        依序等待頁面、iframe、「選股」分頁與表格，並探測擷取用的 selector
+
+        頁面已閒置而關鍵 selector 全部找不到時立即停止，不再逐一等待後續條件逾時。
 
-                data_list.append(item)
+        Args:
+            waiter (ReadinessWaiter): 記錄各階段等待時間
 
-            print(f"成功抓取 {len(data_list)} 筆資料")
-            return data_list
+        Raises:
+            LayoutChangedError: 頁面結構已改變
+            RuntimeError: 無法切換進入 iframe
+        """
+        # 等待頁面網路閒置（取代固定的 sleep）
+        print("等待頁面載入...")
+        try:
+            waiter.wait_for(network_idle(self.timeouts["network_idle"]))
+        except Exception as e:
+            print(f"等待網路閒置逾時，繼續執行: {e}")
 
+        # 切換進入 Iframe (關鍵修正)
+        print("正在尋找並切換至 iframe...")
+        try:
+            page = waiter.wait_for(layout_ready(("iframe",), self.timeouts["iframe_attached"], "iframe_attached"))
+            self.backend.switch_to_frame(page.selector("iframe"))
+            print("成功切換進入 iframe Context")
+        except LayoutChangedError:
+            raise
         except Exception as e:
-            print(f"抓取過程發生錯誤: {e}")
+            # 沒有 iframe 時後面的等待都不會成功，不再逐一等到逾時
+            raise RuntimeError(f"切換 iframe 失敗 (可能網頁結構改變或載入過慢): {e}") from e
+
+        # 一次探測分頁與表格；iframe 內容已載入卻兩者皆無時拋出 LayoutChangedError
+        try:
+            frame_layout = waiter.wait_for(layout_ready(("tab", "row"), self.timeouts["layout_probe"]))
+        except LayoutChangedError:
             raise
+        except Exception as e:
+            print(f"等待 iframe 內容逾時，繼續執行: {e}")
+            frame_layout = LayoutProbe()
+
+        # 點擊「選股」Tab (現在我們已經在 iframe 裡了)
+        stock_tab_selector = frame_layout.selector("tab")
+        if stock_tab_selector is None:
+            print("找不到 '選股' 分頁按鈕，直接讀取目前的表格")
+        else:
+            try:
+                print("嘗試點擊 '選股'...")
+                self.backend.click(stock_tab_selector)
 
-        finally:
-            # 關閉瀏覽器
-            if self.driver:
-                self.driver.quit()
-                print("瀏覽器已關閉")
+                print("已觸發點擊，等待分頁切換...")
+                waiter.wait_for(tab_active(stock_tab_selector, self.timeouts["tab_active"]))
+
+            except Exception as e:
+                print(f"點擊 '選股' 分頁失敗: {e}")
+
+        # 等待表格資料出現並穩定（探測時尚未出現列則依序嘗試所有備援 selector）
+        print("正在等待表格資料載入...")
+        row_selector = frame_layout.selector("row") or list(SELECTOR_STRATEGIES["row"])
+        try:
+            waiter.wait_for(rows_stable(row_selector, self.timeouts["rows_stable"]))
+            print("表格資料已載入")
+        except Exception:
+            print("表格載入超時，嘗試直接抓取...")
+
+        # 有持股列但名稱與代號都找不到時判定版面改變；其餘缺少的欄位擷取時填入 N/A
+        self.selectors = check_cells(self.backend).extraction_selectors()
+
+    def _report_page_stats(self, url):
+        """回到最上層文件，記錄頁面載入時間與傳輸量"""
+        try:
+            self.backend.switch_to_default()
+        except Exception:
+            return
+        self.page_stats = collect_page_load_stats(self.backend)
+        if self.page_stats is None:
+            return
+        print(
+            f"頁面載入 {self.page_stats['load_ms']:.0f} ms，"
+            f"傳輸 {self.page_stats['transfer_bytes'] / 1024:.1f} KB"
+            f"（{self.page_stats['resource_count']} 個資源）"
+        )
+        metrics.set_gauge("page_load_seconds", self.page_stats["load_ms"] / 1000, strategy=url)
+        metrics.set_gauge("page_transfer_bytes", self.page_stats["transfer_bytes"], strategy=url)
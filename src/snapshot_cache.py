@@ -0,0 +1,150 @@
+"""
+持股快照快取
+
+以目標網址為鍵保存最近一次抓取的資料、內容雜湊與時間戳記：
+- 內容雜湊相同時可略過格式化與 LINE 推播
+- TTL 內的重複讀取直接回傳快取，不必啟動瀏覽器
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+DEFAULT_SNAPSHOT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "finlab-strategy-linebot", "snapshots.json"
+)
+
+
+def content_hash(rows):
+    """
+    計算持股資料的內容雜湊（與欄位順序無關）
+
+    Args:
+        rows (list): 持股資料字典列表
+
+    Returns:
+        str: SHA-256 十六進位字串
+    """
+    payload = json.dumps(rows, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SnapshotCache:
+    """
+    以 JSON 檔保存的快照快取
+    """
+
+    def __init__(self, path=DEFAULT_SNAPSHOT_CACHE_PATH, ttl=300, max_entries=100, max_age=30 * 86400):
+        """
+        Args:
+            path (str): 快取檔路徑
+            ttl (float): 快照在幾秒內視為新鮮，可直接取代抓取
+            max_entries (int): 最多保留幾個網址，超過時淘汰最舊的
+            max_age (float): 超過幾秒的快照會被淘汰
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, url):
+        """
+        取得網址最近一次的快照（不論是否過期）
+
+        Args:
+            url (str): 目標網址
+
+        Returns:
+            dict | None: {"rows": list, "hash": str, "timestamp": float}
+        """
+        with self._lock:
+            return self._entries.get(url)
+
+    def entries(self):
+        """
+        Returns:
+            dict: 網址 -> 快照（由舊到新，為目前內容的淺層複本）
+        """
+        with self._lock:
+            return dict(self._entries)
+
+    def get_fresh(self, url, now=None):
+        """
+        取得 TTL 內的快照
+
+        Args:
+            url (str): 目標網址
+            now (float, optional): 目前時間（測試用）
+
+        Returns:
+            dict | None: 新鮮的快照，沒有或已過期時回傳 None
+        """
+        entry = self.get(url)
+        now = time.time() if now is None else now
+        if entry and now - entry["timestamp"] <= self.ttl:
+            return entry
+        return None
+
+    def has_changed(self, url, rows):
+        """
+        比對持股資料與最近一次快照是否不同
+
+        Args:
+            url (str): 目標網址
+            rows (list): 持股資料字典列表
+
+        Returns:
+            bool: 沒有快照或內容雜湊不同時回傳 True
+        """
+        entry = self.get(url)
+        return entry is None or entry["hash"] != content_hash(rows)
+
+    def put(self, url, rows, now=None):
+        """
+        寫入快照
+
+        Args:
+            url (str): 目標網址
+            rows (list): 持股資料字典列表
+            now (float, optional): 目前時間（測試用）
+
+        Returns:
+            bool: 內容與前一次快照不同（或沒有前一次快照）時回傳 True
+        """
+        digest = content_hash(rows)
+        now = time.time() if now is None else now
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            # 重新插入，讓 dict 順序維持由舊到新
+            self._entries[url] = {"rows": rows, "hash": digest, "timestamp": now}
+            self._evict(now)
+        return previous is None or previous["hash"] != digest
+
+    def _evict(self, now):
+        expired = [url for url, entry in self._entries.items() if now - entry["timestamp"] > self.max_age]
+        for url in expired:
+            del self._entries[url]
+        while len(self._entries) > self.max_entries:
+            del self._entries[next(iter(self._entries))]
+
+    def save(self):
+        """將快取寫回磁碟（先寫暫存檔再取代）"""
+        with self._lock:
+            payload = json.dumps(self._entries, ensure_ascii=False)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,114 @@
+"""
+冷啟動時間分析（python main.py --profile-startup）
+
+依序量測實際抓取前的每個步驟：
+模組載入 → chromedriver / Chrome 路徑解析 → 啟動瀏覽器 → 第一次導覽。
+"""
+import importlib
+import sys
+import time
+from src.utils.driver_cache import DEFAULT_DRIVER_CACHE_PATH, install_chromedriver, resolve_browser_paths
+
+
+# 抓取與通知路徑上較重的模組
+HEAVY_MODULES = (
+    "requests",
+    "selenium.webdriver",
+    "aiohttp",
+    "linebot",
+)
+
+
+class StartupProfile:
+    """
+    依序記錄各步驟的耗時
+    """
+
+    def __init__(self):
+        self.timings = []
+
+    def measure(self, name, func):
+        """
+        執行並記錄耗時，例外會往外拋出但仍記錄已花費的時間
+
+        Args:
+            name (str): 步驟名稱
+            func (callable): 要執行的函式
+
+        Returns:
+            func 的回傳值
+        """
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            self.timings.append((name, time.perf_counter() - start))
+
+    def report(self):
+        """
+        Returns:
+            str: 每個步驟一行的報告
+        """
+        lines = [f"  {name:<32}{seconds * 1000:>10.1f} ms" for name, seconds in self.timings]
+        total = sum(seconds for _, seconds in self.timings)
+        lines.append(f"  {'合計':<32}{total * 1000:>10.1f} ms")
+        return "\n".join(lines)
+
+
+def profile_startup(config, process_start=None, cache_path=DEFAULT_DRIVER_CACHE_PATH, navigate=True):
+    """
+    量測啟動到第一次導覽的時間並印出報告
+
+    Args:
+        config (dict): load_config() 的設定
+        process_start (float, optional): main.py 載入時的 time.perf_counter()
+        cache_path (str): Chrome / chromedriver 路徑快取檔
+        navigate (bool): 是否啟動瀏覽器並導覽到第一個策略
+
+    Returns:
+        StartupProfile: 量測結果
+    """
+    profile = StartupProfile()
+    if process_start is not None:
+        profile.timings.append(("main.py 載入與設定", time.perf_counter() - process_start))
+
+    # 先逐一量測較重的模組，再載入抓取模組（它會連帶載入 selenium），否則載入成本不會被記錄
+    for module in HEAVY_MODULES:
+        if module in sys.modules:
+            continue
+        try:
+            profile.measure(f"import {module}", lambda: importlib.import_module(module))
+        except ImportError as e:
+            print(f"無法載入 {module}: {e}")
+    profile.measure("import src.scraper", lambda: importlib.import_module("src.scraper"))
+
+    from src.browser_profile import BrowserProfile
+    from src.scraper import create_chrome_driver
+
+    installed = []
+
+    def installer():
+        installed.append(True)
+        return install_chromedriver()
+
+    driver = None
+    try:
+        driver_path, chrome_path = profile.measure(
+            "解析 chromedriver / Chrome", lambda: resolve_browser_paths(installer, cache_path)
+        )
+        print(f"chromedriver: {driver_path} ({'重新解析' if installed else '使用快取'})")
+        print(f"Chrome: {chrome_path or '由 chromedriver 自行尋找'}")
+        if navigate:
+            driver = profile.measure("啟動瀏覽器", lambda: create_chrome_driver(
+                driver_path, chrome_path, BrowserProfile.from_config(config)
+            ))
+            profile.measure("第一次導覽", lambda: driver.get(config["target_url"]))
+    except Exception as e:
+        print(f"啟動分析中斷: {e}")
+    finally:
+        if driver is not None:
+            driver.quit()
+
+    print("\n=== 啟動時間分析 ===")
+    print(profile.report())
+    return profile
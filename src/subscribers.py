@@ -0,0 +1,220 @@
+"""
+訂閱者與過濾條件
+
+每位訂閱者可以只接收特定策略、特定股票或特定異動類型。
+發送時先依過濾結果將訂閱者分組：內容相同的訂閱者共用同一次渲染，
+並以 multicast 一次送給最多 500 位，API 呼叫次數只隨不同的內容增加。
+
+訂閱者清單檔（SUBSCRIBERS_FILE）為 JSON 列表，省略的欄位表示不過濾：
+    [
+        {"user_id": "U1234..."},
+        {"user_id": "U5678...", "strategies": ["https://..."], "stock_ids": ["2330"],
+         "change_types": ["entry", "exit"]}
+    ]
+"""
+import json
+from src.diff import CHANGE_TYPES, HoldingsDiff, holding_key
+
+
+class Subscriber:
+    """
+    單一 LINE 訂閱者與其過濾條件
+    """
+
+    __slots__ = ("user_id", "strategies", "stock_ids", "change_types")
+
+    def __init__(self, user_id, strategies=None, stock_ids=None, change_types=None):
+        """
+        Args:
+            user_id (str): LINE User ID
+            strategies (iterable, optional): 只接收這些策略網址，None 表示全部
+            stock_ids (iterable, optional): 只接收這些股票代號，None 表示全部
+            change_types (iterable, optional): 只接收這些異動類型（src.diff.CHANGE_TYPES），None 表示全部
+
+        Raises:
+            ValueError: 缺少 user_id 或異動類型不支援
+        """
+        if not user_id:
+            raise ValueError("訂閱者缺少 user_id")
+        self.user_id = user_id
+        self.strategies = None if strategies is None else frozenset(strategies)
+        self.stock_ids = None if stock_ids is None else frozenset(str(stock_id) for stock_id in stock_ids)
+        self.change_types = None if change_types is None else frozenset(change_types)
+        if self.change_types is not None:
+            unknown = sorted(self.change_types - set(CHANGE_TYPES))
+            if unknown:
+                raise ValueError(f"不支援的異動類型: {', '.join(unknown)}（可用: {', '.join(CHANGE_TYPES)}）")
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Args:
+            data (dict): 訂閱者清單檔中的一筆資料
+
+        Returns:
+            Subscriber
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"訂閱者格式錯誤: {data!r}")
+        return cls(
+            data.get("user_id"),
+            strategies=data.get("strategies"),
+            stock_ids=data.get("stock_ids"),
+            change_types=data.get("change_types"),
+        )
+
+    @property
+    def filter_key(self):
+        """過濾條件相同的訂閱者一定收到相同的內容"""
+        return (self.stock_ids, self.change_types)
+
+    def wants_strategy(self, strategy):
+        return self.strategies is None or strategy in self.strategies
+
+    def filter_rows(self, rows):
+        """
+        Args:
+            rows (list): 持股資料
+
+        Returns:
+            list: 訂閱的股票
+        """
+        if self.stock_ids is None:
+            return list(rows)
+        return [row for row in rows if holding_key(row) in self.stock_ids]
+
+    def filter_diff(self, diff):
+        """
+        Args:
+            diff (HoldingsDiff): 完整的持股差異
+
+        Returns:
+            HoldingsDiff: 只包含訂閱的股票與異動類型
+        """
+        filtered = {}
+        for kind, changes in diff.by_kind().items():
+            if self.change_types is not None and kind not in self.change_types:
+                filtered[kind] = []
+            elif self.stock_ids is None:
+                filtered[kind] = list(changes)
+            else:
+                filtered[kind] = [change for change in changes if change.key in self.stock_ids]
+        return HoldingsDiff(*(filtered[kind] for kind in CHANGE_TYPES))
+
+    def __repr__(self):
+        return f"Subscriber({self.user_id!r})"
+
+
+class SubscriberRegistry:
+    """
+    訂閱者清單
+
+    用法:
+        registry = SubscriberRegistry.from_file(path, default_user_id)
+        for payload, user_ids in group_recipients(registry.for_strategy(url), select):
+            ...
+    """
+
+    def __init__(self, subscribers=()):
+        """
+        Args:
+            subscribers (iterable): Subscriber；同一個 user_id 只保留第一筆
+        """
+        unique = {}
+        for subscriber in subscribers:
+            unique.setdefault(subscriber.user_id, subscriber)
+        self.subscribers = list(unique.values())
+
+    @classmethod
+    def from_file(cls, path, default_user_id=None):
+        """
+        讀取訂閱者清單檔
+
+        Args:
+            path (str): JSON 檔路徑
+            default_user_id (str, optional): LINE_USER_ID，加入為不過濾的訂閱者（清單中已有時以清單為準）
+
+        Returns:
+            SubscriberRegistry
+
+        Raises:
+            OSError: 無法讀取檔案
+            ValueError: 格式錯誤
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("訂閱者清單檔必須是 JSON 列表")
+        subscribers = [Subscriber.from_dict(item) for item in data]
+        if default_user_id:
+            subscribers.append(Subscriber(default_user_id))
+        return cls(subscribers)
+
+    def for_strategy(self, strategy):
+        """
+        Args:
+            strategy (str): 策略網址
+
+        Returns:
+            list: 訂閱此策略的 Subscriber
+        """
+        return [subscriber for subscriber in self.subscribers if subscriber.wants_strategy(strategy)]
+
+    def __len__(self):
+        return len(self.subscribers)
+
+
+def group_recipients(subscribers, select):
+    """
+    依內容將訂閱者分組，每組只需渲染與發送一次
+
+    Args:
+        subscribers (list): Subscriber
+        select (callable): 接收 Subscriber，回傳 (分組鍵, 內容)；不需發送時回傳 None。
+            過濾條件相同的訂閱者只會呼叫一次
+
+    Returns:
+        list: (內容, user_id 列表)，依第一位訂閱者的順序排列
+    """
+    selected = {}
+    groups = {}
+    for subscriber in subscribers:
+        if subscriber.filter_key not in selected:
+            selected[subscriber.filter_key] = select(subscriber)
+        result = selected[subscriber.filter_key]
+        if result is None:
+            continue
+        key, payload = result
+        groups.setdefault(key, (payload, []))[1].append(subscriber.user_id)
+    return list(groups.values())
+
+
+def select_report(rows):
+    """
+    完整報告的分組方式：訂閱到的股票相同即內容相同；訂閱的股票都不在持股中時不發送
+
+    Returns:
+        callable: 給 group_recipients 使用的 select
+    """
+    def select(subscriber):
+        filtered = subscriber.filter_rows(rows)
+        if rows and not filtered:
+            return None
+        return tuple(holding_key(row) for row in filtered), filtered
+    return select
+
+
+def select_diff(diff):
+    """
+    異動通知的分組方式：過濾後的異動相同即內容相同，沒有異動的訂閱者不發送
+
+    Returns:
+        callable: 給 group_recipients 使用的 select
+    """
+    def select(subscriber):
+        filtered = subscriber.filter_diff(diff)
+        if not filtered.has_changes:
+            return None
+        key = tuple((kind, change.key) for kind, changes in filtered.by_kind().items() for change in changes)
+        return key, filtered
+    return select
@@ -2,8 +2,111 @@
 配置與環境變數管理
 """
 import os
+import re
 import sys
 from dotenv import load_dotenv
+from src.snapshot_cache import DEFAULT_SNAPSHOT_CACHE_PATH
+from src.history_store import DEFAULT_HISTORY_DB_PATH
+from src.outbox import DEFAULT_OUTBOX_PATH
+from src.browser_profile import parse_resource_types, parse_url_patterns
+from src.scheduler import DEFAULT_RUN_TIMES, parse_holidays, parse_run_times
+from src.subscribers import SubscriberRegistry
+
+
+# 可用的瀏覽器後端（見 src.backends；這裡不匯入以免載入 selenium 與 aiohttp）
+SCRAPER_BACKENDS = ("selenium", "cdp")
+# 預設的瀏覽器程序樹 RSS 上限（MB），0 表示不限制（src.browser_supervisor 也使用此值；這裡不匯入以免載入 psutil）
+DEFAULT_RSS_LIMIT_MB = 1024
+
+
+def _get_env(key):
+    """優先從 OS 環境變數讀取，若為 None 則從 .env 讀取"""
+    return os.environ.get(key) or os.getenv(key)
+
+
+def _parse_bool(value, default=False):
+    """將 "1"/"true"/"yes"/"on" 等字串轉為布林值，未設定時回傳 default"""
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _parse_number(key, value, default, cast=int):
+    """
+    將環境變數轉為數字，未設定時回傳 default
+
+    Raises:
+        SystemExit: 格式錯誤
+    """
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"錯誤：{key} 必須為數字，目前為 '{value}'")
+        sys.exit(1)
+
+
+def _parse_with(key, value, parser):
+    """
+    以 parser 解析環境變數
+
+    Raises:
+        SystemExit: 格式錯誤
+    """
+    try:
+        return parser(value)
+    except ValueError:
+        print(f"錯誤：{key} 格式錯誤，目前為 '{value}'")
+        sys.exit(1)
+
+
+def parse_target_urls(value):
+    """
+    解析 TARGET_URL，支援以逗號、空白或換行分隔的多個網址
+
+    Args:
+        value (str): TARGET_URL 原始字串
+
+    Returns:
+        list: 去除重複後、保留原順序的網址列表
+    """
+    if not value:
+        return []
+    urls = [url for url in re.split(r"[,\s]+", value) if url]
+    return list(dict.fromkeys(urls))
+
+
+def parse_scraper_backend(value):
+    """
+    Args:
+        value (str | None): "selenium" 或 "cdp"，未設定時為 selenium
+
+    Returns:
+        str: 後端名稱
+
+    Raises:
+        ValueError: 不支援的後端
+    """
+    backend = (value or SCRAPER_BACKENDS[0]).strip().lower()
+    if backend not in SCRAPER_BACKENDS:
+        raise ValueError(f"不支援的瀏覽器後端: {backend}（可用: {', '.join(SCRAPER_BACKENDS)}）")
+    return backend
+
+
+def load_strategies_file(path):
+    """
+    讀取策略清單檔，每行一個網址，# 開頭為註解
+
+    Args:
+        path (str): 策略清單檔路徑
+
+    Returns:
+        list: 網址列表
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    return parse_target_urls("\n".join(lines))
 
 
 def load_config():
@@ -20,20 +123,110 @@ def load_config():
     # 載入 .env 檔案（作為後備）
     load_dotenv()
 
-    # 優先從 OS 環境變數讀取，若為 None 則從 .env 讀取
-    target_url = os.environ.get('TARGET_URL') or os.getenv("TARGET_URL")
-    line_channel_access_token = os.environ.get('LINE_CHANNEL_ACCESS_TOKEN') or os.getenv("LINE_CHANNEL_ACCESS_TOKEN")
-    line_user_id = os.environ.get('LINE_USER_ID') or os.getenv("LINE_USER_ID")
-    line_webhook_url = os.environ.get('LINE_WEBHOOK_URL') or os.getenv("LINE_WEBHOOK_URL")
+    target_url = _get_env("TARGET_URL")
+    strategies_file = _get_env("STRATEGIES_FILE")
+    scraper_workers = _get_env("SCRAPER_WORKERS")
+    http_fast_path = _parse_bool(_get_env("HTTP_FAST_PATH"), default=True)
+    snapshot_cache_path = _get_env("SNAPSHOT_CACHE_PATH") or DEFAULT_SNAPSHOT_CACHE_PATH
+    snapshot_ttl = _parse_number("SNAPSHOT_TTL", _get_env("SNAPSHOT_TTL"), 300, float)
+    skip_unchanged = _parse_bool(_get_env("SKIP_UNCHANGED"), default=True)
+    history_enabled = _parse_bool(_get_env("HISTORY_ENABLED"), default=True)
+    history_db_path = _get_env("HISTORY_DB_PATH") or DEFAULT_HISTORY_DB_PATH
+    full_report = _parse_bool(_get_env("FULL_REPORT"), default=False)
+    profit_alert_threshold = _parse_number("PROFIT_ALERT_THRESHOLD", _get_env("PROFIT_ALERT_THRESHOLD"), 5.0, float)
+    line_channel_access_token = _get_env("LINE_CHANNEL_ACCESS_TOKEN")
+    line_user_id = _get_env("LINE_USER_ID")
+    subscribers_file = _get_env("SUBSCRIBERS_FILE")
+    line_webhook_url = _get_env("LINE_WEBHOOK_URL")
+    line_channel_secret = _get_env("LINE_CHANNEL_SECRET")
+    webhook_port = _parse_number("WEBHOOK_PORT", _get_env("WEBHOOK_PORT"), 8000)
+    line_async_delivery = _parse_bool(_get_env("LINE_ASYNC_DELIVERY"), default=True)
+    line_flex_reports = _parse_bool(_get_env("LINE_FLEX_REPORTS"), default=True)
+    # 未設定時由 LineNotification 使用預設位址（config 不載入 aiohttp）
+    line_api_base_url = _get_env("LINE_API_BASE_URL")
+    outbox_enabled = _parse_bool(_get_env("OUTBOX_ENABLED"), default=True)
+    outbox_path = _get_env("OUTBOX_PATH") or DEFAULT_OUTBOX_PATH
+    outbox_max_attempts = max(1, _parse_number("OUTBOX_MAX_ATTEMPTS", _get_env("OUTBOX_MAX_ATTEMPTS"), 10))
+    metrics_json_path = _get_env("METRICS_JSON_PATH")
+    metrics_prom_path = _get_env("METRICS_PROM_PATH")
+    daemon_run_times = _parse_with(
+        "DAEMON_RUN_TIMES", _get_env("DAEMON_RUN_TIMES") or DEFAULT_RUN_TIMES, parse_run_times
+    )
+    daemon_interval_minutes = _parse_number("DAEMON_INTERVAL_MINUTES", _get_env("DAEMON_INTERVAL_MINUTES"), 0)
+    daemon_run_timeout = _parse_number("DAEMON_RUN_TIMEOUT", _get_env("DAEMON_RUN_TIMEOUT"), 600, float)
+    daemon_recycle_cycles = _parse_number("DAEMON_RECYCLE_CYCLES", _get_env("DAEMON_RECYCLE_CYCLES"), 20)
+    market_holidays = _parse_with("MARKET_HOLIDAYS", _get_env("MARKET_HOLIDAYS"), parse_holidays)
+    chrome_lean_profile = _parse_bool(_get_env("CHROME_LEAN_PROFILE"), default=True)
+    blocked_resource_types = _parse_with(
+        "BLOCK_RESOURCE_TYPES", _get_env("BLOCK_RESOURCE_TYPES"), parse_resource_types
+    )
+    blocked_url_patterns = parse_url_patterns(_get_env("BLOCK_URL_PATTERNS"))
+    harvest_rows = _parse_bool(_get_env("HARVEST_ROWS"), default=False)
+    browser_rss_limit_mb = max(0, _parse_number(
+        "BROWSER_RSS_LIMIT_MB", _get_env("BROWSER_RSS_LIMIT_MB"), DEFAULT_RSS_LIMIT_MB, float
+    ))
+    browser_reap_orphans = _parse_bool(_get_env("BROWSER_REAP_ORPHANS"), default=True)
+    scraper_backend = _parse_with("SCRAPER_BACKEND", _get_env("SCRAPER_BACKEND"), parse_scraper_backend)
+
+    target_urls = parse_target_urls(target_url)
+    if strategies_file:
+        try:
+            target_urls = list(dict.fromkeys(target_urls + load_strategies_file(strategies_file)))
+        except OSError as e:
+            print(f"錯誤：無法讀取策略清單檔 '{strategies_file}': {e}")
+            sys.exit(1)
 
-    if not target_url:
+    subscribers = None
+    if subscribers_file:
+        try:
+            subscribers = SubscriberRegistry.from_file(subscribers_file, line_user_id)
+        except (OSError, ValueError) as e:
+            print(f"錯誤：無法讀取訂閱者清單檔 '{subscribers_file}': {e}")
+            sys.exit(1)
+
+    if not target_urls:
         print("錯誤：未在環境變數或 .env 檔案中找到 'TARGET_URL'。")
         print("請確認已設定 TARGET_URL 環境變數或 .env 檔案存在且包含 TARGET_URL")
         sys.exit(1)
 
+    scraper_workers = max(1, _parse_number("SCRAPER_WORKERS", scraper_workers, 1))
+
     return {
-        "target_url": target_url,
+        "target_url": target_urls[0],
+        "target_urls": target_urls,
+        "scraper_workers": scraper_workers,
+        "http_fast_path": http_fast_path,
+        "snapshot_cache_path": snapshot_cache_path,
+        "snapshot_ttl": snapshot_ttl,
+        "skip_unchanged": skip_unchanged,
+        "history_enabled": history_enabled,
+        "history_db_path": history_db_path,
+        "full_report": full_report,
+        "profit_alert_threshold": profit_alert_threshold,
         "line_channel_access_token": line_channel_access_token,
         "line_user_id": line_user_id,
-        "line_webhook_url": line_webhook_url
+        "subscribers": subscribers,
+        "line_webhook_url": line_webhook_url,
+        "line_channel_secret": line_channel_secret,
+        "webhook_port": webhook_port,
+        "line_async_delivery": line_async_delivery,
+        "line_flex_reports": line_flex_reports,
+        "line_api_base_url": line_api_base_url,
+        "outbox_enabled": outbox_enabled,
+        "outbox_path": outbox_path,
+        "outbox_max_attempts": outbox_max_attempts,
+        "metrics_json_path": metrics_json_path,
+        "metrics_prom_path": metrics_prom_path,
+        "daemon_run_times": daemon_run_times,
+        "daemon_interval_minutes": daemon_interval_minutes,
+        "daemon_run_timeout": daemon_run_timeout,
+        "daemon_recycle_cycles": daemon_recycle_cycles,
+        "market_holidays": market_holidays,
+        "chrome_lean_profile": chrome_lean_profile,
+        "blocked_resource_types": blocked_resource_types,
+        "blocked_url_patterns": blocked_url_patterns,
+        "harvest_rows": harvest_rows,
+        "browser_rss_limit_mb": browser_rss_limit_mb,
+        "browser_reap_orphans": browser_reap_orphans,
+        "scraper_backend": scraper_backend
     }
@@ -0,0 +1,175 @@
+"""
+Chrome 與 chromedriver 路徑的磁碟快取
+
+ChromeDriverManager().install() 每次都會檢查版本，
+將解析後的執行檔路徑存到磁碟，後續啟動直接沿用。
+chromedriver 以 SHA-256 驗證沒有被替換或損毀；Chrome 執行檔太大，
+改以檔案大小與修改時間判斷是否仍是同一個檔案。
+"""
+import hashlib
+import json
+import os
+import shutil
+
+
+DEFAULT_DRIVER_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "finlab-strategy-linebot", "chromedriver.json"
+)
+
+# 依序尋找的 Chrome 執行檔名稱
+CHROME_BINARY_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+
+def _read_cache(cache_path):
+    """讀取快取檔，檔案不存在或損毀時回傳空字典"""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        return cached if isinstance(cached, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache_path, entry):
+    """寫入快取檔（先寫暫存檔再取代，避免寫到一半被讀取）"""
+    os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, cache_path)
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def file_checksum(path):
+    """
+    計算檔案的 SHA-256
+
+    Args:
+        path (str): 檔案路徑
+
+    Returns:
+        str: 十六進位摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_signature(path):
+    """檔案大小與修改時間，檔案不存在時回傳 None"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def install_chromedriver():
+    """以 webdriver_manager 下載或檢查 chromedriver（只在快取失效時才載入此套件）"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def find_chrome_binary():
+    """
+    在 PATH 中尋找 Chrome / Chromium
+
+    Returns:
+        str | None: 執行檔路徑，找不到時回傳 None（交由 chromedriver 自行尋找）
+    """
+    for name in CHROME_BINARY_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def resolve_browser_paths(installer=install_chromedriver, cache_path=DEFAULT_DRIVER_CACHE_PATH,
+                          chrome_finder=find_chrome_binary):
+    """
+    取得 chromedriver 與 Chrome 的路徑，優先使用磁碟快取
+
+    Args:
+        installer (callable): chromedriver 快取失效時呼叫，回傳 chromedriver 路徑
+        cache_path (str): 快取檔路徑
+        chrome_finder (callable): Chrome 快取失效時呼叫，回傳 Chrome 路徑或 None
+
+    Chrome 更新後（大小或修改時間改變）或先前找不到、之後才安裝時，一併重新解析 chromedriver，避免版本不符。
+
+    Returns:
+        tuple: (chromedriver 路徑, Chrome 路徑或 None)
+    """
+    cached = _read_cache(cache_path)
+
+    chrome_path = cached.get("chrome_path")
+    chrome_changed = chrome_path is not None and _file_signature(chrome_path) != cached.get("chrome_signature")
+    # 上次找不到 Chrome 時每次都重新尋找，之後安裝的 Chrome 才會被使用
+    if chrome_path is None or chrome_changed:
+        chrome_path = chrome_finder()
+        # 舊版快取沒有 Chrome 欄位，不視為變更
+        chrome_changed = chrome_changed or ("chrome_path" in cached and chrome_path is not None)
+
+    driver_path = cached.get("driver_path")
+    driver_checksum = None
+    if _is_executable(driver_path):
+        driver_checksum = file_checksum(driver_path)
+        # 舊版快取沒有 checksum，沿用並補上
+        if cached.get("driver_sha256", driver_checksum) != driver_checksum:
+            print("chromedriver 檔案已變更，重新解析")
+            driver_checksum = None
+    if chrome_changed and driver_checksum is not None:
+        print("Chrome 已變更，重新檢查 chromedriver 版本")
+        driver_checksum = None
+    if driver_checksum is None:
+        driver_path = installer()
+        if driver_path and os.path.isfile(driver_path):
+            driver_checksum = file_checksum(driver_path)
+
+    # 只快取實際存在的 chromedriver
+    if driver_checksum is not None:
+        entry = {
+            "driver_path": driver_path,
+            "driver_sha256": driver_checksum,
+            "chrome_path": chrome_path,
+            "chrome_signature": _file_signature(chrome_path) if chrome_path else None,
+        }
+        if entry != cached:
+            try:
+                _write_cache(cache_path, entry)
+            except OSError as e:
+                print(f"無法寫入 chromedriver 快取: {e}")
+    return driver_path, chrome_path
+
+
+def clear_driver_cache(cache_path=DEFAULT_DRIVER_CACHE_PATH):
+    """
+    刪除路徑快取（例如 chromedriver 與 Chrome 版本不符時），下次解析會重新下載或檢查
+
+    Args:
+        cache_path (str): 快取檔路徑
+    """
+    try:
+        os.remove(cache_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"無法刪除 chromedriver 快取: {e}")
+
+
+def resolve_chromedriver_path(installer=install_chromedriver, cache_path=DEFAULT_DRIVER_CACHE_PATH):
+    """
+    取得 chromedriver 路徑，優先使用磁碟快取
+
+    Args:
+        installer (callable): 快取失效時呼叫，回傳 chromedriver 路徑
+        cache_path (str): 快取檔路徑
+
+    Returns:
+        str: chromedriver 執行檔路徑
+    """
+    return resolve_browser_paths(installer, cache_path)[0]
@@ -8,7 +8,7 @@ def print_scrape_results(data):
     格式化並印出抓取結果
 
     Args:
-        data (list): 持股資料列表
+        data (list): 持股資料列表（字典或 src.models.Holding）
     """
     print(f"\n=== 抓取完成，共 {len(data)} 筆資料 ===")
 
@@ -17,10 +17,21 @@ def print_scrape_results(data):
         return
 
     for index, row in enumerate(data, 1):
-        print(f"[{index}]")
-        print(f"  股票名稱: {row.get('name')}")
-        print(f"  股票代號: {row.get('stock_id')}")
-        print(f"  進場數值: {row.get('entry_date')}")
-        print(f"  獲利趴數: {row.get('profit_percentage')}")
-        print(f"  目前權重: {row.get('current_weight')}")
-        print("-" * 30)
+        print_holding(index, row)
+
+
+def print_holding(index, row):
+    """
+    印出單一持股
+
+    Args:
+        index (int): 序號（從 1 開始）
+        row: 持股資料（字典或 src.models.Holding）
+    """
+    print(f"[{index}]")
+    print(f"  股票名稱: {row.get('name')}")
+    print(f"  股票代號: {row.get('stock_id')}")
+    print(f"  進場數值: {row.get('entry_date')}")
+    print(f"  獲利趴數: {row.get('profit_percentage')}")
+    print(f"  目前權重: {row.get('current_weight')}")
+    print("-" * 30)
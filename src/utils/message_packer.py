@@ -0,0 +1,152 @@
+"""
+LINE 文字訊息的分段與打包
+
+LINE 單則文字訊息上限 5000 字元，單次 push 最多 5 則訊息，單次 multicast 最多 500 位收件者。
+依持股區塊邊界切分報告，盡量塞滿每則訊息，以減少 API 呼叫次數。
+"""
+
+
+LINE_TEXT_LIMIT = 5000
+LINE_MESSAGES_PER_PUSH = 5
+LINE_MULTICAST_LIMIT = 500
+
+# 預留給分頁標示 "\n(12/34)" 的字元數
+_PAGE_LABEL_RESERVE = 16
+
+
+def _split_oversized(block, limit):
+    """將超過上限的單一區塊依行切分，單行仍過長時依字元切分"""
+    pieces = []
+    current = ""
+    for line in block.split("\n"):
+        while len(line) > limit:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            pieces.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def pack_blocks(blocks, limit=LINE_TEXT_LIMIT, separator="\n"):
+    """
+    依區塊邊界將文字打包成不超過上限的訊息
+
+    區塊順序保持不變，相同輸入永遠得到相同的分頁結果。
+    分成多則時，每則結尾加上 "(頁數/總頁數)"。
+
+    Args:
+        blocks (list): 文字區塊（例如每檔持股一個區塊）
+        limit (int): 單則訊息的字元上限
+        separator (str): 區塊之間的分隔字串
+
+    Returns:
+        list: 訊息文字列表
+    """
+    text = separator.join(blocks)
+    if len(text) <= limit:
+        return [text]
+
+    body_limit = limit - _PAGE_LABEL_RESERVE
+    messages = []
+    current = None
+    for block in blocks:
+        if len(block) > body_limit:
+            pieces = _split_oversized(block, body_limit)
+        else:
+            pieces = [block]
+        for piece in pieces:
+            if current is None:
+                current = piece
+            elif len(current) + len(separator) + len(piece) <= body_limit:
+                current = f"{current}{separator}{piece}"
+            else:
+                messages.append(current)
+                current = piece
+    if current is not None:
+        messages.append(current)
+
+    total = len(messages)
+    return [f"{message.rstrip()}\n({index}/{total})" for index, message in enumerate(messages, 1)]
+
+
+class BlockPacker:
+    """
+    pack_blocks 的串流版本：逐一加入區塊，訊息塞滿時立即交給 emit，只保留尚未塞滿的那一則
+
+    總頁數要到最後才知道，因此分成多則時中間的訊息標示 "(頁數)"，最後一則標示 "(頁數/總頁數)"；
+    只有一則時不加標示。
+
+    用法:
+        packer = BlockPacker(messages.append)
+        run_pipeline(batches, [ReportStage(packer.add, strategy)])
+        packer.finish()
+    """
+
+    def __init__(self, emit, limit=LINE_TEXT_LIMIT, separator="\n"):
+        """
+        Args:
+            emit (callable): 接收每則完成訊息的函式
+            limit (int): 單則訊息的字元上限
+            separator (str): 區塊之間的分隔字串
+        """
+        self.emit = emit
+        self.separator = separator
+        self.body_limit = limit - _PAGE_LABEL_RESERVE
+        self.count = 0
+        self._current = None
+
+    def add(self, block):
+        """
+        Args:
+            block (str): 文字區塊
+        """
+        pieces = _split_oversized(block, self.body_limit) if len(block) > self.body_limit else [block]
+        for piece in pieces:
+            if self._current is None:
+                self._current = piece
+            elif len(self._current) + len(self.separator) + len(piece) <= self.body_limit:
+                self._current = f"{self._current}{self.separator}{piece}"
+            else:
+                self.count += 1
+                self.emit(f"{self._current.rstrip()}\n({self.count})")
+                self._current = piece
+
+    def finish(self):
+        """
+        送出最後一則訊息
+
+        Returns:
+            int: 總訊息數
+        """
+        if self._current is not None:
+            if self.count:
+                self.count += 1
+                self.emit(f"{self._current.rstrip()}\n({self.count}/{self.count})")
+            else:
+                self.count = 1
+                self.emit(self._current)
+            self._current = None
+        return self.count
+
+
+def batch_messages(messages, size=LINE_MESSAGES_PER_PUSH):
+    """
+    將訊息分組，每組對應一次 push_message
+
+    Args:
+        messages (list): 訊息列表
+        size (int): 每次 push 的訊息數上限
+
+    Returns:
+        list: 訊息分組列表
+    """
+    return [messages[start:start + size] for start in range(0, len(messages), size)]
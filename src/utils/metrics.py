@@ -0,0 +1,230 @@
+"""
+輕量的執行階段計時與指標匯出
+
+以 span 量測每個階段（driver 啟動、導覽、iframe、分頁、擷取、LINE 推送...），
+並記錄列數、重試次數等計數，可匯出為 JSON 執行報告與
+node_exporter textfile collector 可讀取的 Prometheus 文字格式。
+
+未啟用時 span() 直接回傳共用的空 context manager，幾乎沒有額外成本。
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+METRIC_PREFIX = "finlab"
+
+_NOOP_SPAN = contextlib.nullcontext()
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape_label_value(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(label_key):
+    if not label_key:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in label_key) + "}"
+
+
+def _atomic_write(path, content):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class RunMetrics:
+    """
+    單次執行的計時與計數
+    """
+
+    def __init__(self, enabled=False):
+        """
+        Args:
+            enabled (bool): 是否記錄
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清除所有紀錄並重新開始計時"""
+        with self._lock:
+            self.started_at = time.time()
+            self.spans = []
+            self.counters = {}
+            self.gauges = {}
+
+    def span(self, name, **labels):
+        """
+        量測一個階段的耗時
+
+        用法:
+            with metrics.span("navigate", strategy=url):
+                driver.get(url)
+
+        Args:
+            name (str): 階段名稱
+            **labels: 標籤（例如 strategy）
+
+        Returns:
+            context manager
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return self._span(name, labels)
+
+    @contextlib.contextmanager
+    def _span(self, name, labels):
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, error=error, **labels)
+
+    def record(self, name, seconds, error=None, **labels):
+        """
+        記錄一個已量測好的階段耗時（例如 ReadinessWaiter 的等待時間）
+
+        Args:
+            name (str): 階段名稱
+            seconds (float): 耗時秒數
+            error (str, optional): 發生錯誤時的例外名稱
+            **labels: 標籤
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.spans.append({"name": name, "labels": labels, "seconds": seconds, "error": error})
+
+    def increment(self, name, value=1, **labels):
+        """
+        累加計數（例如列數、重試次數）
+
+        Args:
+            name (str): 指標名稱
+            value (float): 增加量
+            **labels: 標籤
+        """
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """
+        設定量測值（例如成功與否、峰值記憶體）
+
+        Args:
+            name (str): 指標名稱
+            value (float): 數值
+            **labels: 標籤
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON 執行報告
+        """
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": time.time() - self.started_at,
+                "spans": [dict(span) for span in self.spans],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.gauges.items()
+                ],
+            }
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: Prometheus text exposition format
+        """
+        with self._lock:
+            durations = {}
+            counts = {}
+            errors = {}
+            for span in self.spans:
+                key = _label_key({"phase": span["name"], **span["labels"]})
+                durations[key] = durations.get(key, 0.0) + span["seconds"]
+                counts[key] = counts.get(key, 0) + 1
+                if span["error"]:
+                    errors[key] = errors.get(key, 0) + 1
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            started_at = self.started_at
+
+        lines = [
+            f"# HELP {METRIC_PREFIX}_phase_duration_seconds Total seconds spent in each phase during the last run.",
+            f"# TYPE {METRIC_PREFIX}_phase_duration_seconds gauge",
+        ]
+        lines += [f"{METRIC_PREFIX}_phase_duration_seconds{_format_labels(k)} {v:.6f}" for k, v in durations.items()]
+        lines += [
+            f"# HELP {METRIC_PREFIX}_phase_runs Number of times each phase ran during the last run.",
+            f"# TYPE {METRIC_PREFIX}_phase_runs gauge",
+        ]
+        lines += [f"{METRIC_PREFIX}_phase_runs{_format_labels(k)} {v}" for k, v in counts.items()]
+        if errors:
+            lines += [
+                f"# HELP {METRIC_PREFIX}_phase_errors Number of failed phase runs during the last run.",
+                f"# TYPE {METRIC_PREFIX}_phase_errors gauge",
+            ]
+            lines += [f"{METRIC_PREFIX}_phase_errors{_format_labels(k)} {v}" for k, v in errors.items()]
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines += [
+                f"{METRIC_PREFIX}_{name}{_format_labels(labels)} {value}"
+                for (metric, labels), value in counters.items()
+                if metric == name
+            ]
+        for name in sorted({name for name, _ in gauges}):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+            lines += [
+                f"{METRIC_PREFIX}_{name}{_format_labels(labels)} {value}"
+                for (metric, labels), value in gauges.items()
+                if metric == name
+            ]
+
+        lines += [
+            f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge",
+            f"{METRIC_PREFIX}_last_run_timestamp_seconds {started_at:.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export_json(self, path):
+        """將 JSON 執行報告寫入檔案"""
+        _atomic_write(path, json.dumps(self.to_dict(), ensure_ascii=False, indent=2))
+
+    def export_prometheus(self, path):
+        """
+        將指標寫入 .prom 檔（先寫暫存檔再取代，避免 textfile collector 讀到一半的檔案）
+        """
+        _atomic_write(path, self.to_prometheus())
+
+
+# 全域共用的指標物件，由 main() 依設定啟用
+metrics = RunMetrics()
@@ -0,0 +1,66 @@
+"""
+持股欄位的數值解析
+"""
+import re
+from datetime import date
+
+
+_NUMBER_PATTERN = re.compile(r"[-+]?\d+(?:,\d{3})*(?:\.\d+)?")
+# Finlab 以三角形標示漲跌方向
+_DOWN_MARKERS = ("▾", "▼", "↓")
+
+
+def parse_percentage(value):
+    """
+    將百分比字串轉為浮點數
+
+    例如 "▴ 10.00%" -> 10.0、"▾ 3.5%" -> -3.5、"N/A" -> None
+
+    Args:
+        value (str): 百分比字串
+
+    Returns:
+        float | None: 百分比數值（不除以 100），無法解析時回傳 None
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    match = _NUMBER_PATTERN.search(value)
+    if not match:
+        return None
+
+    number = float(match.group().replace(",", ""))
+    if number > 0 and any(marker in value for marker in _DOWN_MARKERS):
+        number = -number
+    return number
+
+
+_DATE_PATTERN = re.compile(r"(\d{4})[/\-.](\d{1,2})[/\-.](\d{1,2})")
+
+
+def parse_date(value):
+    """
+    將日期字串轉為 datetime.date
+
+    例如 "2026/2/6" -> date(2026, 2, 6)、"N/A" -> None
+
+    Args:
+        value (str): 日期字串
+
+    Returns:
+        date | None: 日期，無法解析時回傳 None
+    """
+    if value is None:
+        return None
+    if isinstance(value, date):
+        return value
+
+    match = _DATE_PATTERN.search(value)
+    if not match:
+        return None
+    try:
+        return date(*(int(part) for part in match.groups()))
+    except ValueError:
+        return None
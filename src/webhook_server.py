@@ -0,0 +1,412 @@
+"""
+LINE webhook server（python main.py --serve）
+
+以 aiohttp 接收 LINE webhook，驗證 X-Line-Signature 後立即回應 200，
+再以共用連線池的 AsyncLineClient 回覆聊天指令：
+- 「持股」/ holdings：各策略目前的持股
+- 股票代號或名稱（例如 2330）：該股在各策略中的持股資料
+- 「今日異動」/ changes today：目前持股與今天之前最後一次抓取的差異
+
+回覆內容全部來自記憶體中的 HoldingsIndex（由快照快取與持股歷史建立），
+處理請求時不啟動瀏覽器也不讀取磁碟；快照檔或日期改變時才在背景重建索引。
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import re
+from datetime import datetime, time as dt_time
+from urllib.parse import urlparse
+from aiohttp import web
+from src.diff import diff_holdings
+from src.flex_report import render_flex_report
+from src.line_delivery import LINE_API_BASE_URL, AsyncLineClient, LineDeliveryError, text_message
+from src.line_notification import format_diff_text
+from src.scheduler import TAIPEI_TZ
+from src.snapshot_cache import SnapshotCache
+from src.utils.message_packer import LINE_MESSAGES_PER_PUSH, pack_blocks
+from src.utils.metrics import metrics
+
+
+DEFAULT_WEBHOOK_PATH = "/callback"
+DEFAULT_WEBHOOK_HOST = "0.0.0.0"
+DEFAULT_REFRESH_INTERVAL = 30
+
+HOLDINGS_COMMANDS = frozenset({"holdings", "持股", "持股清單"})
+CHANGES_COMMANDS = frozenset({"changes today", "changes", "今日異動", "異動"})
+HELP_TEXT = (
+    "可用指令:\n"
+    "持股 / holdings：目前持股\n"
+    "股票代號或名稱（例如 2330）：個股持股資料\n"
+    "今日異動 / changes today：今天的持股異動"
+)
+
+_STOCK_ID_PATTERN = re.compile(r"^[0-9]{4,6}[A-Z]?$")
+
+
+def sign_body(channel_secret, body):
+    """
+    計算 X-Line-Signature
+
+    Args:
+        channel_secret (str): LINE Channel Secret
+        body (bytes): 請求內容
+
+    Returns:
+        str: Base64 編碼的 HMAC-SHA256
+    """
+    digest = hmac.new(channel_secret.encode("utf-8"), body, hashlib.sha256).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def verify_signature(channel_secret, body, signature):
+    """
+    驗證 X-Line-Signature（固定時間比較）
+
+    Args:
+        channel_secret (str): LINE Channel Secret
+        body (bytes): 請求內容
+        signature (str | None): X-Line-Signature 標頭
+
+    Returns:
+        bool: 簽章是否正確
+    """
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_body(channel_secret, body), signature)
+
+
+def webhook_path(webhook_url):
+    """
+    由 LINE_WEBHOOK_URL 取得路由路徑
+
+    Args:
+        webhook_url (str | None): 例如 https://bot.example.com/line/callback
+
+    Returns:
+        str: 路徑，未設定時為 /callback
+    """
+    path = urlparse(webhook_url).path if webhook_url else ""
+    return path.rstrip("/") or DEFAULT_WEBHOOK_PATH
+
+
+def _history_row(row):
+    """將持股歷史的數值欄位轉回與快照相同的百分比字串"""
+    profit = row.get("profit_percentage")
+    weight = row.get("current_weight")
+    entry_date = row.get("entry_date")
+    return {
+        "name": row.get("name"),
+        "stock_id": row.get("stock_id"),
+        "entry_date": f"{entry_date.year}/{entry_date.month}/{entry_date.day}" if entry_date else "N/A",
+        "profit_percentage": "N/A" if profit is None else f"{'▾' if profit < 0 else '▴'} {abs(profit):.2f}%",
+        "current_weight": "N/A" if weight is None else f"{weight:.1f}%",
+    }
+
+
+def _stock_line(stock):
+    return (
+        f"{stock.get('stock_id', 'N/A')} {stock.get('name', 'N/A')}"
+        f"  獲利 {stock.get('profit_percentage', 'N/A')}  權重 {stock.get('current_weight', 'N/A')}"
+    )
+
+
+def _text_messages(blocks):
+    """打包成文字訊息，超過單次回覆上限的部分以提示取代"""
+    texts = pack_blocks(blocks)
+    if len(texts) > LINE_MESSAGES_PER_PUSH:
+        texts = texts[:LINE_MESSAGES_PER_PUSH - 1] + [f"…其餘 {len(texts) - LINE_MESSAGES_PER_PUSH + 1} 則省略"]
+    return [text_message(text) for text in texts]
+
+
+class HoldingsIndex:
+    """
+    webhook 查詢用的記憶體索引，回覆在建立時就預先算好
+
+    用法:
+        index = HoldingsIndex(snapshot_cache.entries(), baselines)
+        messages = index.answer("2330")
+    """
+
+    def __init__(self, snapshots, baselines=None, flex=False):
+        """
+        Args:
+            snapshots (dict): 策略 -> {"rows": list, "timestamp": float}（SnapshotCache.entries()）
+            baselines (dict, optional): 策略 -> 今天之前最後一次的持股，用於「今日異動」
+            flex (bool): 持股清單以 Flex Message 回覆
+        """
+        self.strategies = {url: entry["rows"] for url, entry in snapshots.items()}
+        self.updated_at = max((entry["timestamp"] for entry in snapshots.values()), default=None)
+        labelled = len(self.strategies) > 1
+
+        self._holdings = self._render_holdings(flex, labelled)
+        self._changes = self._render_changes(baselines, labelled)
+        self._stocks = {}
+        stock_lines = {}
+        for url, rows in self.strategies.items():
+            for stock in rows:
+                line = f"{url}\n{_stock_line(stock)}" if labelled else _stock_line(stock)
+                for key in (stock.get("stock_id"), stock.get("name")):
+                    if key and key != "N/A":
+                        stock_lines.setdefault(key.lower(), []).append(line)
+        for key, lines in stock_lines.items():
+            self._stocks[key] = _text_messages(lines)
+
+    def _render_holdings(self, flex, labelled):
+        if not self.strategies:
+            return [text_message("目前沒有持股快照，請等待下一次抓取")]
+        messages = []
+        for url, rows in self.strategies.items():
+            strategy = url if labelled else None
+            if flex and rows:
+                messages.extend(render_flex_report(rows, strategy))
+            else:
+                lines = [_stock_line(stock) for stock in rows] or ["目前無持股資料"]
+                messages.extend(_text_messages([f"📊 {url}" if labelled else "📊 目前持股", *lines]))
+        if len(messages) > LINE_MESSAGES_PER_PUSH:
+            messages = messages[:LINE_MESSAGES_PER_PUSH - 1] + [text_message("…持股過多，其餘省略")]
+        return messages
+
+    def _render_changes(self, baselines, labelled):
+        if baselines is None:
+            return [text_message("沒有持股歷史，無法比較今日異動（請啟用 HISTORY_ENABLED）")]
+        texts = []
+        for url, rows in self.strategies.items():
+            if url not in baselines:
+                continue
+            diff = diff_holdings(baselines[url], rows)
+            texts.append(format_diff_text(diff, url if labelled else None))
+        if not texts:
+            return [text_message("今天之前沒有持股紀錄，無法比較")]
+        return _text_messages(texts)
+
+    def answer(self, text):
+        """
+        回答聊天指令
+
+        Args:
+            text (str): 使用者傳送的文字
+
+        Returns:
+            list: 回覆用的訊息物件（最多 5 則）
+        """
+        command = " ".join(text.split()).lower()
+        if command in HOLDINGS_COMMANDS:
+            return self._holdings
+        if command in CHANGES_COMMANDS:
+            return self._changes
+        messages = self._stocks.get(command)
+        if messages:
+            return messages
+        if _STOCK_ID_PATTERN.match(command.upper()):
+            return [text_message(f"目前持股中沒有 {text.strip()}")]
+        return [text_message(HELP_TEXT)]
+
+
+class HoldingsIndexLoader:
+    """
+    由快照快取與持股歷史建立 HoldingsIndex，並提供判斷來源是否改變的簽章
+    """
+
+    def __init__(self, snapshot_cache_path, history_db_path=None, flex=False, tz=TAIPEI_TZ):
+        """
+        Args:
+            snapshot_cache_path (str): 快照快取檔
+            history_db_path (str, optional): 持股歷史資料庫（「今日異動」使用）
+            flex (bool): 持股清單以 Flex Message 回覆
+            tz (tzinfo): 判斷「今天」的時區
+        """
+        self.snapshot_cache_path = snapshot_cache_path
+        self.history_db_path = history_db_path
+        self.flex = flex
+        self.tz = tz
+
+    def signature(self, now=None):
+        """
+        Returns:
+            tuple: 快照檔、歷史資料庫的修改時間與今天的日期，改變時需重建索引
+        """
+        today = (now or datetime.now(self.tz)).date()
+        stamps = []
+        for path in (self.snapshot_cache_path, self.history_db_path):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns if path else None)
+            except OSError:
+                stamps.append(None)
+        return (*stamps, today)
+
+    def load(self, now=None):
+        """
+        Returns:
+            HoldingsIndex: 新的索引
+        """
+        snapshots = SnapshotCache(self.snapshot_cache_path).entries()
+        baselines = None
+        if self.history_db_path and os.path.exists(self.history_db_path):
+            from src.history_store import HoldingsHistoryStore
+
+            start_of_day = datetime.combine((now or datetime.now(self.tz)).date(), dt_time.min, tzinfo=self.tz)
+            before_today = int(start_of_day.timestamp()) - 1
+            with HoldingsHistoryStore(self.history_db_path) as history:
+                baselines = {}
+                for url in snapshots:
+                    rows = history.holdings_at(url, before_today)
+                    if rows:
+                        baselines[url] = [_history_row(row) for row in rows]
+        return HoldingsIndex(snapshots, baselines, flex=self.flex)
+
+
+class WebhookServer:
+    """
+    LINE webhook 的 aiohttp 應用程式
+
+    用法:
+        server = WebhookServer(secret, token, loader)
+        web.run_app(server.make_app(), port=8000)
+    """
+
+    def __init__(self, channel_secret, channel_access_token, loader, path=DEFAULT_WEBHOOK_PATH,
+                 api_base_url=LINE_API_BASE_URL, refresh_interval=DEFAULT_REFRESH_INTERVAL, max_concurrency=16):
+        """
+        Args:
+            channel_secret (str): LINE Channel Secret（驗證簽章）
+            channel_access_token (str): LINE Channel Access Token（回覆訊息）
+            loader (HoldingsIndexLoader): 建立索引的 loader
+            path (str): webhook 路徑
+            api_base_url (str): LINE API 位址（測試時可指向本機 stub server）
+            refresh_interval (float): 檢查快照是否更新的間隔秒數
+            max_concurrency (int): 同時進行的回覆請求數上限
+        """
+        self.channel_secret = channel_secret
+        self.channel_access_token = channel_access_token
+        self.loader = loader
+        self.path = path
+        self.api_base_url = api_base_url or LINE_API_BASE_URL
+        self.refresh_interval = refresh_interval
+        self.max_concurrency = max_concurrency
+        self.index = None
+        self.client = None
+        self._signature = None
+        self._tasks = set()
+        self._refresher = None
+
+    def make_app(self):
+        """
+        Returns:
+            web.Application: 已註冊路由與啟動 / 關閉流程的應用程式
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_callback)
+        app.router.add_get("/health", self.handle_health)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        return app
+
+    async def _on_startup(self, app):
+        self.client = AsyncLineClient(
+            self.channel_access_token, base_url=self.api_base_url, max_concurrency=self.max_concurrency
+        )
+        await self.client.open()
+        await self.refresh_index()
+        if self.refresh_interval:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def _on_cleanup(self, app):
+        if self._refresher is not None:
+            self._refresher.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.client.close()
+
+    async def refresh_index(self, force=False):
+        """
+        來源改變時在執行緒中重建索引，完成後才替換（處理中的請求不受影響）
+
+        Returns:
+            bool: 是否重建
+        """
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(None, self.loader.signature)
+        if not force and signature == self._signature and self.index is not None:
+            return False
+        try:
+            self.index = await loop.run_in_executor(None, self.loader.load)
+        except Exception as e:
+            print(f"建立持股索引失敗: {e}")
+            if self.index is None:
+                self.index = HoldingsIndex({})
+            return False
+        self._signature = signature
+        print(f"持股索引已更新: {len(self.index.strategies)} 個策略")
+        return True
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_index()
+            # 常駐執行時不保留每個請求的延遲紀錄
+            self.client.latencies.clear()
+
+    async def handle_health(self, request):
+        return web.json_response({"status": "ok", "strategies": len(self.index.strategies) if self.index else 0})
+
+    async def handle_callback(self, request):
+        """驗證簽章、排入回覆後立即回應 200"""
+        body = await request.read()
+        if not verify_signature(self.channel_secret, body, request.headers.get("X-Line-Signature")):
+            metrics.increment("webhook_rejected")
+            return web.Response(status=400, text="Invalid signature")
+        try:
+            events = json.loads(body)["events"]
+        except (ValueError, KeyError, TypeError):
+            return web.Response(status=400, text="Invalid payload")
+
+        for event in events:
+            message = event.get("message") or {}
+            reply_token = event.get("replyToken")
+            if event.get("type") != "message" or message.get("type") != "text" or not reply_token:
+                continue
+            metrics.increment("webhook_queries")
+            task = asyncio.create_task(self._reply(reply_token, self.index.answer(message.get("text", ""))))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return web.Response(text="OK")
+
+    async def _reply(self, reply_token, messages):
+        try:
+            await self.client.reply_message(reply_token, messages)
+        except LineDeliveryError as e:
+            print(f"回覆訊息失敗: {e}")
+        except Exception as e:
+            print(f"回覆訊息時發生錯誤: {e}")
+
+
+def run_webhook_server(config):
+    """
+    以設定啟動 webhook server（阻塞直到收到 SIGINT / SIGTERM）
+
+    Args:
+        config (dict): load_config() 的設定
+    """
+    secret = config.get("line_channel_secret")
+    token = config.get("line_channel_access_token")
+    if not secret or not token:
+        print("錯誤：webhook server 需要 LINE_CHANNEL_SECRET 與 LINE_CHANNEL_ACCESS_TOKEN")
+        raise SystemExit(1)
+
+    loader = HoldingsIndexLoader(
+        config["snapshot_cache_path"],
+        config["history_db_path"] if config["history_enabled"] else None,
+        flex=config["line_flex_reports"],
+    )
+    server = WebhookServer(
+        secret,
+        token,
+        loader,
+        path=webhook_path(config["line_webhook_url"]),
+        api_base_url=config["line_api_base_url"],
+    )
+    print(f"webhook server 啟動於 port {config['webhook_port']}，路徑 {server.path}")
+    web.run_app(server.make_app(), host=DEFAULT_WEBHOOK_HOST, port=config["webhook_port"], print=None)
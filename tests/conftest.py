@@ -0,0 +1,39 @@
+"""
+Shared pytest fixtures
+"""
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler that does not log every request"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    """Serve tests/fixtures over HTTP on a random local port and yield its base URL"""
+    handler = functools.partial(_QuietHandler, directory=FIXTURES_DIR)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_driver_cache(tmp_path, monkeypatch):
+    """Keep tests away from the real Chrome / chromedriver path cache in the home directory"""
+    monkeypatch.setattr("src.scraper.DEFAULT_DRIVER_CACHE_PATH", str(tmp_path / "chromedriver.json"))
+    monkeypatch.setattr("src.utils.driver_cache.shutil.which", lambda name: None)
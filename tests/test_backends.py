@@ -0,0 +1,439 @@
+"""
+Unit tests for the browser backends
+
+TestCDPProtocol drives CDPBackend against an in-process fake DevTools endpoint.
+TestFakeBackendContract runs the shared checks against every backend without a browser: SeleniumBackend
+wraps a fake WebDriver and CDPBackend talks to the fake DevTools endpoint, both answering from one FakePage.
+TestBackendContract runs the same kind of checks with a real headless Chrome and the pages in
+tests/fixtures; it is skipped when Chrome (or chromedriver, for Selenium) is missing.
+"""
+import asyncio
+import contextlib
+import json
+import shutil
+import subprocess
+import sys
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from selenium.common.exceptions import JavascriptException
+from selenium.webdriver.common.by import By
+from src.backends import BACKENDS, CDP, SeleniumBackend, as_backend
+from src.backends.cdp_backend import CDPBackend, CDPError
+from src.driver_pool import DriverPool
+from src.extraction import extract_rows
+from src.readiness import ROWS_STABLE_SCRIPT, TAB_ACTIVE_SCRIPT
+from src.scraper import FinlabStrategyScraper, create_chrome_driver
+from src.utils.driver_cache import find_chrome_binary
+
+
+# Resolved at import time: the autouse isolated_driver_cache fixture hides binaries on PATH
+CHROME_PATH = find_chrome_binary()
+CHROMEDRIVER_PATH = shutil.which('chromedriver')
+
+
+class ScriptError(Exception):
+    """A JavaScript exception raised inside FakePage"""
+
+
+class FakePage:
+    """
+    A page with a '#reportIframe' frame that answers the contract scripts
+
+    Both the fake WebDriver and FakeChrome run scripts here, so the two backends are held to the same answers.
+    """
+
+    TITLES = {'MAIN': 'Finlab Strategy', 'CHILD': 'Report'}
+    FRAMES = {'#reportIframe': 'CHILD'}
+    ELEMENTS = {'CHILD': {'td.stock': ['4542', '5386']}}
+
+    def __init__(self):
+        self.clicks = []
+
+    def texts(self, frame, selector):
+        return self.ELEMENTS.get(frame, {}).get(selector, [])
+
+    def run(self, script, frame, args):
+        """Answer a script by recognising it; CDPBackend sends it wrapped in a function declaration"""
+        if "'boom'" in script:
+            raise ScriptError('Error: boom')
+        if 'innerText' in script:
+            (selector, index), = args[0]
+            return self.texts(frame, selector)[index]
+        if 'querySelectorAll(arguments[1]).length' in script:
+            return len(self.texts(frame, args[1]))
+        if 'click()' in script:
+            target = args[0]
+            self.clicks.append((frame, target if isinstance(target, str) else target.selector))
+            return None
+        if 'scrollIntoView' in script:
+            return None
+        if 'document.title' in script:
+            return self.TITLES[frame]
+        if 'arguments[0] + arguments[1]' in script:
+            return args[0] + args[1]
+        if 'arguments[arguments.length - 1]' in script:
+            return args[0] * 2
+        raise AssertionError(f'unexpected script: {script}')
+
+
+class FakeElement:
+    def __init__(self, selector=None, text=''):
+        self.selector = selector
+        self.text = text
+
+
+class FakeWebDriver:
+    """WebDriver double that keeps track of the current frame and runs scripts on a FakePage"""
+
+    def __init__(self, page):
+        self.page = page
+        self.frame = 'MAIN'
+        self.switch_to = SimpleNamespace(frame=self._switch_to_frame, default_content=self._switch_to_default)
+
+    def _switch_to_frame(self, element):
+        self.frame = self.page.FRAMES[element.selector]
+
+    def _switch_to_default(self):
+        self.frame = 'MAIN'
+
+    def get(self, url):
+        self.frame = 'MAIN'
+
+    def find_element(self, by, selector):
+        return FakeElement(selector)
+
+    def find_elements(self, by, selector):
+        return [FakeElement(selector, text) for text in self.page.texts(self.frame, selector)]
+
+    def execute_script(self, script, *args):
+        try:
+            return self.page.run(script, self.frame, args)
+        except ScriptError as e:
+            raise JavascriptException(str(e))
+
+    execute_async_script = execute_script
+
+    def quit(self):
+        pass
+
+
+class FakeChrome:
+    """
+    DevTools endpoint with one page and one iframe
+
+    Without a FakePage, scripts are answered with their context and arguments.
+    """
+
+    CONTEXT_FRAMES = {1: 'MAIN', 2: 'MAIN', 3: 'CHILD'}
+
+    def __init__(self, page=None):
+        self.page = page
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.methods = []
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            data = json.loads(message.data)
+            self.methods.append(data['method'])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            asyncio.ensure_future(self.reply(ws, data))
+        return ws
+
+    async def reply(self, ws, data):
+        # Every command takes a round trip, so commands sent together overlap here
+        await asyncio.sleep(0.05)
+        self.in_flight -= 1
+        result, events = self.answer(data['method'], data['params'])
+        await ws.send_str(json.dumps({'id': data['id'], 'result': result, 'sessionId': data.get('sessionId')}))
+        for method, params in events:
+            await ws.send_str(json.dumps({'method': method, 'params': params, 'sessionId': 'S1'}))
+
+    @staticmethod
+    def context(context_id, frame_id):
+        return ('Runtime.executionContextCreated',
+                {'context': {'id': context_id, 'auxData': {'frameId': frame_id, 'isDefault': True}}})
+
+    def answer(self, method, params):
+        if method == 'Target.getTargets':
+            return {'targetInfos': [{'targetId': 'T1', 'type': 'page'}]}, []
+        if method == 'Target.attachToTarget':
+            return {'sessionId': 'S1'}, []
+        if method == 'Runtime.enable':
+            return {}, [self.context(1, 'MAIN')]
+        if method == 'Page.getFrameTree':
+            return {'frameTree': {'frame': {'id': 'MAIN'}}}, []
+        if method == 'Page.navigate':
+            return {'frameId': 'MAIN', 'loaderId': 'L1'}, [
+                ('Runtime.executionContextsCleared', {}),
+                self.context(2, 'MAIN'),
+                self.context(3, 'CHILD'),
+                ('Page.loadEventFired', {'timestamp': 1}),
+            ]
+        if method == 'DOM.describeNode':
+            return {'node': {'frameId': 'CHILD'}}, []
+        if method == 'Runtime.callFunctionOn':
+            if self.page is not None and params['returnByValue']:
+                return self.run_on_page(params), []
+            if 'throw' in params['functionDeclaration']:
+                return {'result': {'type': 'object'},
+                        'exceptionDetails': {'text': 'Uncaught', 'exception': {'description': 'Error: boom'}}}, []
+            if not params['returnByValue']:
+                return {'result': {'type': 'object', 'objectId': 'OBJ'}}, []
+            value = {
+                'context': params['executionContextId'],
+                'args': [argument['value'] for argument in params['arguments']],
+                'awaited': params['awaitPromise'],
+            }
+            return {'result': {'type': 'object', 'value': value}}, []
+        return {}, []
+
+    def run_on_page(self, params):
+        frame = self.CONTEXT_FRAMES[params['executionContextId']]
+        args = [argument['value'] for argument in params['arguments']]
+        try:
+            value = self.page.run(params['functionDeclaration'], frame, args)
+        except ScriptError as e:
+            return {'result': {'type': 'object'}, 'exceptionDetails': {'text': 'Uncaught', 'exception': {'description': str(e)}}}
+        return {'result': {'type': 'object', 'value': value}}
+
+
+@contextlib.contextmanager
+def serve(chrome):
+    """Run FakeChrome on a background event loop and yield its browser WebSocket URL"""
+    app = web.Application()
+    app.router.add_get('/devtools/browser/fake', chrome.handle)
+    loop = asyncio.new_event_loop()
+    server = TestServer(app, loop=loop)
+    loop.run_until_complete(server.start_server())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    url = str(server.make_url('/devtools/browser/fake')).replace('http://', 'ws://')
+    try:
+        yield url
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+@pytest.fixture
+def fake_chrome():
+    """Yield a FakeChrome with its browser WebSocket URL"""
+    chrome = FakeChrome()
+    with serve(chrome) as url:
+        yield chrome, url
+
+
+class TestCDPProtocol:
+    """Test suite for CDPBackend against a fake DevTools endpoint"""
+
+    def test_setup_commands_are_pipelined(self, fake_chrome):
+        """Test that independent setup commands are in flight together on one socket"""
+        # Arrange
+        chrome, url = fake_chrome
+
+        # Act
+        with CDPBackend(url) as backend:
+            value = backend.evaluate('return arguments;', 1, 'a')
+
+        # Assert
+        assert chrome.max_in_flight >= 4
+        assert value == {'context': 1, 'args': [1, 'a'], 'awaited': False}
+
+    def test_frames_follow_navigation_and_script_errors_raise(self, fake_chrome):
+        """Test that scripts run in the selected frame's context and JS exceptions become CDPError"""
+        # Arrange
+        chrome, url = fake_chrome
+        backend = CDPBackend(url)
+
+        # Act
+        backend.navigate('https://example.com')
+        top = backend.evaluate('return 1;')['context']
+        backend.switch_to_frame('#reportIframe')
+        framed = backend.evaluate_async(ROWS_STABLE_SCRIPT, ['tr'])
+        backend.switch_to_default()
+        with pytest.raises(CDPError, match='boom'):
+            backend.evaluate("throw new Error('boom');")
+        backend.close()
+
+        # Assert
+        assert top == 2
+        assert framed == {'context': 3, 'args': [['tr']], 'awaited': True}
+        assert 'Runtime.releaseObject' in chrome.methods
+
+    def test_pool_uses_backend_interface(self, fake_chrome):
+        """Test that DriverPool resets a backend with switch_to_default and Selenium drivers are wrapped"""
+        # Arrange
+        _, url = fake_chrome
+        backend = CDPBackend(url)
+        pool = DriverPool(size=1, factory=lambda: backend)
+
+        # Act
+        with pool.acquire() as driver:
+            driver.navigate('https://example.com')
+            driver.switch_to_frame('#reportIframe')
+        with pool.acquire() as driver:
+            context = driver.evaluate('return 1;')['context']
+        pool.close()
+
+        # Assert
+        assert context == 2
+        assert as_backend(backend) is backend
+        assert isinstance(as_backend(Mock()), SeleniumBackend)
+
+
+class TestBackendLoading:
+    """Test suite for backend imports"""
+
+    def test_cdp_backend_is_loaded_only_when_selected(self):
+        """Test that importing the scraper does not import the CDP backend or aiohttp"""
+        code = "import sys, src.scraper; print('src.backends.cdp_backend' in sys.modules, 'aiohttp' in sys.modules)"
+
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+        assert output.split() == ['False', 'False']
+
+
+@pytest.fixture(params=BACKENDS)
+def fake_backend(request):
+    """Yield each backend with the FakePage it is driving"""
+    page = FakePage()
+    if request.param == CDP:
+        with serve(FakeChrome(page)) as url:
+            backend = CDPBackend(url)
+            yield backend, page
+            backend.close()
+    else:
+        yield SeleniumBackend(FakeWebDriver(page)), page
+
+
+class TestFakeBackendContract:
+    """Shared test suite every backend must pass against FakePage, without a browser"""
+
+    def test_navigate_evaluate_and_frames(self, fake_backend):
+        """Test script arguments, async scripts and switching into and out of the iframe"""
+        # Arrange
+        backend, _ = fake_backend
+        backend.navigate('https://example.com')
+
+        # Act
+        top = backend.evaluate('return document.title;')
+        total = backend.evaluate('return arguments[0] + arguments[1];', 2, 3)
+        backend.switch_to_frame('#reportIframe')
+        framed = backend.evaluate('return document.title;')
+        doubled = backend.evaluate_async('arguments[arguments.length - 1](arguments[0] * 2);', 21)
+        backend.switch_to_default()
+
+        # Assert
+        assert (top, total, framed, doubled) == ('Finlab Strategy', 5, 'Report', 42)
+        assert backend.evaluate('return document.title;') == 'Finlab Strategy'
+
+    def test_click_and_find_elements_in_frame(self, fake_backend):
+        """Test that clicks and element queries run in the selected frame"""
+        # Arrange
+        backend, page = fake_backend
+        backend.navigate('https://example.com')
+        backend.switch_to_frame('#reportIframe')
+
+        # Act
+        backend.click('a.tab')
+        texts = [element.text for element in backend.find_elements(By.CSS_SELECTOR, 'td.stock')]
+
+        # Assert
+        assert page.clicks == [('CHILD', 'a.tab')]
+        assert texts == ['4542', '5386']
+
+    def test_script_errors_raise(self, fake_backend):
+        """Test that a JavaScript exception is raised to the caller"""
+        backend, _ = fake_backend
+        backend.navigate('https://example.com')
+
+        with pytest.raises(Exception, match='boom'):
+            backend.evaluate("throw new Error('boom');")
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    """Launch a real headless Chrome through each backend"""
+    if CHROME_PATH is None:
+        pytest.skip('Chrome is not installed')
+    if request.param == CDP:
+        browser = CDPBackend.launch(CHROME_PATH)
+    else:
+        if CHROMEDRIVER_PATH is None:
+            pytest.skip('chromedriver is not installed')
+        browser = SeleniumBackend(create_chrome_driver(CHROMEDRIVER_PATH, CHROME_PATH))
+    yield browser
+    browser.close()
+
+
+class TestBackendContract:
+    """Shared test suite every backend must pass against the local fixture pages"""
+
+    def test_navigate_and_evaluate(self, backend, fixture_server):
+        """Test navigation, script arguments and return values"""
+        backend.navigate(f'{fixture_server}/strategy_page.html')
+
+        assert backend.evaluate('return document.title;') == 'Finlab Strategy'
+        assert backend.evaluate('return arguments[0] + arguments[1];', 2, 3) == 5
+        assert backend.evaluate('return {a: [1, null]};') == {'a': [1, None]}
+
+    def test_frame_click_and_extract(self, backend, fixture_server):
+        """Test switching into the report iframe, clicking and extracting rows"""
+        # Arrange
+        backend.navigate(f'{fixture_server}/strategy_page.html')
+
+        # Act
+        backend.switch_to_frame('#reportIframe')
+        backend.click("div[role='tablist'] > a:last-child")
+        rows = extract_rows(backend)
+        stable = backend.evaluate_async(ROWS_STABLE_SCRIPT, ['table tbody tr'])
+        backend.switch_to_default()
+
+        # Assert
+        assert [row['stock_id'] for row in rows] == ['4542', '5386']
+        assert stable == 2
+        assert backend.evaluate('return document.title;') == 'Finlab Strategy'
+
+    def test_empty_table_and_unmarked_tabs_are_ready(self, backend, fixture_server):
+        """Test that readiness does not wait for rows or tab markers the page will never have"""
+        # Arrange
+        tab = "div[role='tablist'] > a:last-child"
+        backend.navigate(f'{fixture_server}/report.html')
+        selected = backend.evaluate(TAB_ACTIVE_SCRIPT, tab)
+
+        # Act
+        backend.evaluate("""
+            document.querySelectorAll('table tbody tr').forEach(function (row) { row.remove(); });
+            document.querySelectorAll('[aria-selected]').forEach(function (a) { a.removeAttribute('aria-selected'); });
+        """)
+
+        # Assert
+        assert selected is False
+        assert backend.evaluate(TAB_ACTIVE_SCRIPT, tab) is True
+        assert backend.evaluate_async(ROWS_STABLE_SCRIPT, ['table tbody tr'], 0) is True
+
+    def test_script_errors_raise(self, backend, fixture_server):
+        """Test that a JavaScript exception is raised to the caller"""
+        backend.navigate(f'{fixture_server}/strategy_page.html')
+
+        with pytest.raises(Exception, match='boom'):
+            backend.evaluate("throw new Error('boom');")
+
+    def test_scraper_end_to_end(self, backend, fixture_server):
+        """Test that FinlabStrategyScraper scrapes the fixture page through the backend"""
+        pool = DriverPool(size=1, factory=lambda: backend)
+        scraper = FinlabStrategyScraper(pool=pool, timeouts={'tab_active': 0.5})
+
+        holdings = scraper.scrape(f'{fixture_server}/strategy_page.html')
+
+        assert [row['name'] for row in holdings] == ['科嶠', '青雲']
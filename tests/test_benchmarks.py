@@ -0,0 +1,38 @@
+"""
+Unit tests for the benchmark page generator and baseline comparison
+"""
+from benchmarks.page_generator import generate_rows, write_strategy_pages
+from benchmarks.run import compare_to_baseline
+from benchmarks.server import LocalPageServer
+from src.http_scraper import HttpStrategyScraper
+
+
+class TestPageGenerator:
+    """Test suite for the synthetic Finlab page generator"""
+
+    def test_generated_rows_are_deterministic(self):
+        """Test the same seed produces the same holdings"""
+        assert generate_rows(20, seed=1) == generate_rows(20, seed=1)
+        assert generate_rows(20, seed=1) != generate_rows(20, seed=2)
+
+    def test_generated_pages_match_scraper_selectors(self, tmp_path):
+        """Test a generated strategy page scrapes back to the generated rows"""
+        outer_name, rows = write_strategy_pages(str(tmp_path), 25)
+
+        with LocalPageServer(str(tmp_path)) as base_url:
+            result = HttpStrategyScraper().scrape(f"{base_url}/{outer_name}")
+
+        assert result == rows
+
+
+class TestCompareToBaseline:
+    """Test suite for regression detection"""
+
+    def test_flags_only_regressions_beyond_tolerance(self):
+        """Test slowdowns past the tolerance and noise floor are reported"""
+        baseline = {'a[10]': 0.010, 'b[10]': 0.010, 'c[10]': 0.00001}
+        results = {'a[10]': 0.020, 'b[10]': 0.012, 'c[10]': 0.0001, 'new[10]': 1.0}
+
+        regressions = compare_to_baseline(results, baseline, tolerance=1.5)
+
+        assert regressions == [('a[10]', 0.020, 0.010)]
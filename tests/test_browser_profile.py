@@ -0,0 +1,82 @@
+"""
+Unit tests for the lean Chrome profile and resource blocking
+"""
+import pytest
+from unittest.mock import Mock
+from selenium.webdriver.chrome.options import Options
+from src.browser_profile import (
+    BrowserProfile,
+    collect_page_load_stats,
+    parse_resource_types,
+    parse_url_patterns,
+)
+
+
+class TestBrowserProfile:
+    """Test suite for BrowserProfile"""
+
+    def test_blocked_urls_combine_patterns_and_types(self):
+        """Test that resource types expand to URL patterns after the explicit patterns"""
+        profile = BrowserProfile(blocked_resource_types=('font',), blocked_url_patterns=('*tracker.example*',))
+
+        assert profile.blocked_urls[0] == '*tracker.example*'
+        assert '*.woff*' in profile.blocked_urls
+        assert '*.png*' not in profile.blocked_urls
+
+    def test_lean_options(self):
+        """Test that the lean profile disables extensions, background networking and images"""
+        options = Options()
+
+        BrowserProfile().apply_options(options)
+
+        assert '--disable-extensions' in options.arguments
+        assert '--disable-background-networking' in options.arguments
+        assert any(arg.startswith('--window-size=') for arg in options.arguments)
+        assert options.experimental_options['prefs']['profile.managed_default_content_settings.images'] == 2
+
+    def test_full_profile_leaves_options_alone(self):
+        """Test that lean=False adds nothing"""
+        options = Options()
+
+        BrowserProfile(lean=False).apply_options(options)
+
+        assert options.arguments == []
+
+    def test_install_sets_blocked_urls(self):
+        """Test that blocking is enabled over the DevTools Protocol"""
+        driver = Mock()
+        profile = BrowserProfile(blocked_resource_types=('image',), blocked_url_patterns=())
+
+        assert profile.install(driver) is True
+
+        driver.execute_cdp_cmd.assert_any_call('Network.enable', {})
+        driver.execute_cdp_cmd.assert_any_call('Network.setBlockedURLs', {'urls': profile.blocked_urls})
+
+    def test_install_without_cdp_support(self):
+        """Test that drivers without CDP support only produce a warning"""
+        driver = Mock()
+        driver.execute_cdp_cmd.side_effect = AttributeError("no cdp")
+
+        assert BrowserProfile().install(driver) is False
+        assert BrowserProfile(blocked_resource_types=(), blocked_url_patterns=()).install(Mock()) is False
+
+    def test_parse_blocklists(self):
+        """Test parsing the environment variable blocklists"""
+        assert parse_resource_types(None) == ('image', 'font', 'media')
+        assert parse_resource_types('') == ('image', 'font', 'media')
+        assert parse_resource_types('Image, stylesheet') == ('image', 'stylesheet')
+        assert parse_resource_types('none') == ()
+        assert parse_url_patterns('*a.com*, *b.com*') == ('*a.com*', '*b.com*')
+        assert parse_url_patterns('none') == ()
+        with pytest.raises(ValueError):
+            parse_resource_types('image,scripts')
+
+    def test_collect_page_load_stats(self):
+        """Test reading page load stats and ignoring unusable script results"""
+        driver = Mock()
+        driver.execute_script.return_value = {'load_ms': 812.5, 'transfer_bytes': 20480, 'resource_count': 7}
+
+        assert collect_page_load_stats(driver) == {'load_ms': 812.5, 'transfer_bytes': 20480, 'resource_count': 7}
+
+        driver.execute_script.return_value = Mock()
+        assert collect_page_load_stats(driver) is None
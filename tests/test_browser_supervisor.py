@@ -0,0 +1,87 @@
+"""
+Unit tests for BrowserSupervisor
+"""
+import subprocess
+import sys
+import time
+import psutil
+import pytest
+from unittest.mock import Mock
+from src.browser_supervisor import BrowserSupervisor, _is_webdriver_browser, process_tree
+from src.driver_pool import DriverPool
+
+
+# Stands in for chromedriver: a parent process that launches a child, like Chrome under chromedriver
+TREE_SCRIPT = (
+    "import subprocess, sys, time; "
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+    "time.sleep(60)"
+)
+
+
+@pytest.fixture
+def fake_driver():
+    """A Mock driver whose service process is a real two-level process tree"""
+    process = subprocess.Popen([sys.executable, '-c', TREE_SCRIPT])
+    root = psutil.Process(process.pid)
+    deadline = time.monotonic() + 5
+    while not root.children() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    driver = Mock()
+    driver.service.process.pid = process.pid
+    driver.tree = process_tree(root)
+    yield driver
+    for leftover in driver.tree:
+        try:
+            leftover.kill()
+        except psutil.Error:
+            pass
+    process.wait()
+
+
+class TestBrowserSupervisor:
+    """Test suite for process tree tracking and resource reporting"""
+
+    def test_run_stats_cover_the_whole_tree(self, fake_driver):
+        """Test that RSS sums every process in the tree and run stats report the peak"""
+        # Arrange
+        supervisor = BrowserSupervisor(rss_limit_mb=0, reap_orphans=False)
+        supervisor.track(fake_driver)
+
+        # Act
+        supervisor.begin_run()
+        stats = supervisor.run_stats()
+
+        # Assert
+        assert supervisor.rss(fake_driver) > 0
+        assert stats['peak_rss_bytes'] > 0
+        assert stats['cpu_seconds'] >= 0
+        assert supervisor.over_limit(fake_driver) is False
+
+    def test_pool_recycles_driver_over_the_limit_and_reaps_survivors(self, fake_driver):
+        """Test that a driver over the RSS ceiling is discarded and processes surviving quit() are killed"""
+        # Arrange
+        supervisor = BrowserSupervisor(rss_limit_mb=0.001, reap_orphans=False)
+        drivers = iter([fake_driver, Mock()])
+        pool = DriverPool(size=1, factory=lambda: next(drivers), supervisor=supervisor)
+        with pool.acquire():
+            pass
+
+        # Act
+        with pool.acquire() as second:
+            pass
+
+        # Assert
+        assert second is not fake_driver
+        fake_driver.quit.assert_called_once()
+        assert supervisor.run_stats()['recycled'] == 1
+        assert len(fake_driver.tree) == 2
+        assert not any(process.is_running() and process.status() != 'zombie' for process in fake_driver.tree)
+
+    def test_orphan_filter_only_matches_webdriver_browsers(self):
+        """Test that only chromedriver and webdriver-launched Chrome main processes are reaped"""
+        assert _is_webdriver_browser({'name': 'chromedriver', 'cmdline': []})
+        assert _is_webdriver_browser({'name': 'chrome', 'cmdline': ['chrome', '--headless=new']})
+        assert not _is_webdriver_browser({'name': 'chrome', 'cmdline': ['chrome', '--type=renderer', '--headless']})
+        assert not _is_webdriver_browser({'name': 'chrome', 'cmdline': ['chrome']})
+        assert not _is_webdriver_browser({'name': 'python', 'cmdline': ['--headless']})
@@ -109,3 +109,155 @@ class TestConfig:
         assert config['line_channel_access_token'] is None
         assert config['line_user_id'] is None
         assert config['line_webhook_url'] is None
+
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {'TARGET_URL': 'https://a.com/1, https://a.com/2\nhttps://a.com/1'}, clear=True)
+    def test_target_url_accepts_list(self, mock_load_dotenv):
+        """Test that TARGET_URL may list several strategies"""
+        # Act
+        config = load_config()
+
+        # Assert
+        assert config['target_urls'] == ['https://a.com/1', 'https://a.com/2']
+        assert config['target_url'] == 'https://a.com/1'
+        assert config['scraper_workers'] == 1
+
+    @patch('src.utils.config.load_dotenv')
+    def test_strategies_file(self, mock_load_dotenv, tmp_path):
+        """Test loading strategies from a file with comments"""
+        # Arrange
+        strategies_file = tmp_path / "strategies.txt"
+        strategies_file.write_text("# my strategies\nhttps://b.com/1\n\nhttps://b.com/2  # second\n")
+
+        with patch.dict(os.environ, {'STRATEGIES_FILE': str(strategies_file), 'SCRAPER_WORKERS': '4'}, clear=True):
+            # Act
+            config = load_config()
+
+        # Assert
+        assert config['target_urls'] == ['https://b.com/1', 'https://b.com/2']
+        assert config['scraper_workers'] == 4
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {'TARGET_URL': 'https://a.com', 'SCRAPER_WORKERS': 'many'}, clear=True)
+    def test_invalid_scraper_workers(self, mock_load_dotenv):
+        """Test that a non-integer SCRAPER_WORKERS raises SystemExit"""
+        with pytest.raises(SystemExit):
+            load_config()
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {
+        'TARGET_URL': 'https://a.com',
+        'DAEMON_RUN_TIMES': '13:45, 8:30',
+        'MARKET_HOLIDAYS': '2026-10-09,2026-10-26',
+    }, clear=True)
+    def test_daemon_schedule(self, mock_load_dotenv):
+        """Test parsing the daemon run times and market holidays"""
+        # Act
+        config = load_config()
+
+        # Assert
+        assert [t.strftime('%H:%M') for t in config['daemon_run_times']] == ['08:30', '13:45']
+        assert {d.isoformat() for d in config['market_holidays']} == {'2026-10-09', '2026-10-26'}
+        assert config['daemon_run_timeout'] == 600
+        assert config['daemon_recycle_cycles'] == 20
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {'TARGET_URL': 'https://a.com', 'DAEMON_RUN_TIMES': 'noon'}, clear=True)
+    def test_invalid_daemon_run_times(self, mock_load_dotenv):
+        """Test that a malformed DAEMON_RUN_TIMES raises SystemExit"""
+        with pytest.raises(SystemExit):
+            load_config()
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {
+        'TARGET_URL': 'https://a.com',
+        'CHROME_LEAN_PROFILE': 'false',
+        'BLOCK_RESOURCE_TYPES': 'image,stylesheet',
+        'BLOCK_URL_PATTERNS': 'none',
+        'HARVEST_ROWS': 'true',
+    }, clear=True)
+    def test_browser_profile_settings(self, mock_load_dotenv):
+        """Test parsing the Chrome profile and resource blocking settings"""
+        # Act
+        config = load_config()
+
+        # Assert
+        assert config['chrome_lean_profile'] is False
+        assert config['blocked_resource_types'] == ('image', 'stylesheet')
+        assert config['blocked_url_patterns'] == ()
+        assert config['harvest_rows'] is True
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {'TARGET_URL': 'https://a.com', 'BLOCK_RESOURCE_TYPES': 'scripts'}, clear=True)
+    def test_invalid_block_resource_types(self, mock_load_dotenv):
+        """Test that an unknown resource type raises SystemExit"""
+        with pytest.raises(SystemExit):
+            load_config()
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {
+        'TARGET_URL': 'https://a.com',
+        'LINE_CHANNEL_SECRET': 'secret',
+        'WEBHOOK_PORT': '9000',
+    }, clear=True)
+    def test_webhook_settings(self, mock_load_dotenv):
+        """Test parsing the webhook server settings"""
+        # Act
+        config = load_config()
+
+        # Assert
+        assert config['line_channel_secret'] == 'secret'
+        assert config['webhook_port'] == 9000
+
+    @patch('src.utils.config.load_dotenv')
+    def test_subscribers_file(self, mock_load_dotenv, tmp_path):
+        """Test that SUBSCRIBERS_FILE is loaded with LINE_USER_ID as an extra subscriber"""
+        # Arrange
+        path = tmp_path / 'subscribers.json'
+        path.write_text('[{"user_id": "U1", "stock_ids": ["2330"]}]', encoding='utf-8')
+        env = {'TARGET_URL': 'https://a.com', 'LINE_USER_ID': 'U2', 'SUBSCRIBERS_FILE': str(path)}
+
+        # Act
+        with patch.dict(os.environ, env, clear=True):
+            config = load_config()
+
+        # Assert
+        assert [s.user_id for s in config['subscribers'].subscribers] == ['U1', 'U2']
+
+    @patch('src.utils.config.load_dotenv')
+    def test_invalid_subscribers_file(self, mock_load_dotenv, tmp_path):
+        """Test that a malformed SUBSCRIBERS_FILE raises SystemExit"""
+        path = tmp_path / 'subscribers.json'
+        path.write_text('{"user_id": "U1"}', encoding='utf-8')
+
+        with patch.dict(os.environ, {'TARGET_URL': 'https://a.com', 'SUBSCRIBERS_FILE': str(path)}, clear=True):
+            with pytest.raises(SystemExit):
+                load_config()
+
+    @patch('src.utils.config.load_dotenv')
+    @patch.dict(os.environ, {
+        'TARGET_URL': 'https://a.com',
+        'OUTBOX_PATH': '/tmp/outbox.sqlite3',
+        'OUTBOX_MAX_ATTEMPTS': '3',
+    }, clear=True)
+    def test_outbox_settings(self, mock_load_dotenv):
+        """Test parsing the delivery outbox settings"""
+        # Act
+        config = load_config()
+
+        # Assert
+        assert config['outbox_enabled'] is True
+        assert config['outbox_path'] == '/tmp/outbox.sqlite3'
+        assert config['outbox_max_attempts'] == 3
+
+    @patch('src.utils.config.load_dotenv')
+    def test_scraper_backend(self, mock_load_dotenv):
+        """Test that SCRAPER_BACKEND defaults to selenium and rejects unknown backends"""
+        with patch.dict(os.environ, {'TARGET_URL': 'https://a.com'}, clear=True):
+            assert load_config()['scraper_backend'] == 'selenium'
+        with patch.dict(os.environ, {'TARGET_URL': 'https://a.com', 'SCRAPER_BACKEND': 'CDP'}, clear=True):
+            assert load_config()['scraper_backend'] == 'cdp'
+        with patch.dict(os.environ, {'TARGET_URL': 'https://a.com', 'SCRAPER_BACKEND': 'playwright'}, clear=True):
+            with pytest.raises(SystemExit):
+                load_config()
@@ -0,0 +1,126 @@
+"""
+Unit tests for StrategyDaemon
+"""
+import threading
+from datetime import datetime
+from unittest.mock import Mock
+from src.daemon import StrategyDaemon
+from src.scheduler import TAIPEI_TZ
+
+
+def immediate_schedule():
+    """A schedule whose next run is always 'now'"""
+    schedule = Mock()
+    schedule.tz = TAIPEI_TZ
+    schedule.next_run.side_effect = lambda now: now
+    return schedule
+
+
+class TestStrategyDaemon:
+    """Test suite for StrategyDaemon"""
+
+    def test_reuses_warm_pool_across_cycles(self):
+        """Test that every cycle receives the same pre-warmed pool"""
+        # Arrange
+        pool = Mock(size=1)
+        run_cycle = Mock()
+        daemon = StrategyDaemon({'scraper_workers': 1}, run_cycle, immediate_schedule(),
+                                pool_factory=lambda: pool, recycle_cycles=0)
+
+        # Act
+        daemon.run_forever(max_cycles=3)
+
+        # Assert
+        pool.warm_up.assert_called_once()
+        assert run_cycle.call_count == 3
+        assert all(call.args[1] is pool for call in run_cycle.call_args_list)
+        pool.close.assert_called_once_with(force=True)
+
+    def test_failed_cycle_does_not_stop_daemon(self):
+        """Test that an exception in one cycle is reported and the loop continues"""
+        # Arrange
+        run_cycle = Mock(side_effect=[RuntimeError("boom"), None])
+        daemon = StrategyDaemon({'scraper_workers': 1}, run_cycle, immediate_schedule(),
+                                pool_factory=lambda: Mock(size=1), recycle_cycles=0)
+
+        # Act
+        daemon.run_forever(max_cycles=2)
+
+        # Assert
+        assert run_cycle.call_count == 2
+
+    def test_timeout_recycles_pool(self):
+        """Test that a hung cycle is abandoned and the browsers are rebuilt"""
+        # Arrange
+        release = threading.Event()
+        pools = [Mock(size=1), Mock(size=1)]
+        factory = Mock(side_effect=pools)
+        daemon = StrategyDaemon({'scraper_workers': 1}, lambda config, pool: release.wait(5),
+                                immediate_schedule(), pool_factory=factory, run_timeout=0.05)
+        daemon.start()
+
+        # Act
+        succeeded = daemon.run_once()
+        release.set()
+
+        # Assert
+        assert succeeded is False
+        pools[0].close.assert_called_once_with(force=True)
+        assert daemon.pool is pools[1]
+
+    def test_next_cycle_waits_for_abandoned_run(self):
+        """Test that no cycle starts while a timed-out run_cycle is still running"""
+        # Arrange
+        release = threading.Event()
+        calls = []
+
+        def run_cycle(config, pool):
+            calls.append(pool)
+            if len(calls) == 1:
+                release.wait(5)
+
+        daemon = StrategyDaemon({'scraper_workers': 1}, run_cycle, immediate_schedule(),
+                                pool_factory=lambda: Mock(size=1), run_timeout=0.05, recycle_cycles=0)
+        daemon.start()
+        daemon.run_once()
+
+        # Act
+        skipped = daemon.run_once()
+        release.set()
+        daemon._abandoned.result(timeout=2)
+        resumed = daemon.run_once()
+
+        # Assert
+        assert skipped is False
+        assert resumed is True
+        assert len(calls) == 2
+
+    def test_recycles_pool_every_n_cycles(self):
+        """Test that the pool is rebuilt after recycle_cycles successful runs"""
+        # Arrange
+        factory = Mock(side_effect=lambda: Mock(size=1))
+        daemon = StrategyDaemon({'scraper_workers': 1}, Mock(), immediate_schedule(),
+                                pool_factory=factory, recycle_cycles=2)
+
+        # Act
+        daemon.run_forever(max_cycles=4)
+
+        # Assert
+        assert factory.call_count == 3
+
+    def test_stop_ends_wait(self):
+        """Test that stop() interrupts the wait for the next run"""
+        # Arrange
+        schedule = immediate_schedule()
+        schedule.next_run.side_effect = lambda now: now.replace(year=now.year + 1)
+        daemon = StrategyDaemon({'scraper_workers': 1}, Mock(), schedule, pool_factory=lambda: Mock(size=1))
+        thread = threading.Thread(target=daemon.run_forever)
+
+        # Act
+        thread.start()
+        daemon.stop()
+        thread.join(timeout=2)
+
+        # Assert
+        assert not thread.is_alive()
+        assert daemon.cycles == 0
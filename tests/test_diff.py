@@ -0,0 +1,79 @@
+"""
+Unit tests for the holdings diff engine
+"""
+from src.diff import diff_holdings
+from src.utils.parsing import parse_percentage
+
+
+def _row(stock_id, weight='20.0%', profit='▴ 10.00%', name=None):
+    return {
+        'name': name or f'股票{stock_id}',
+        'stock_id': stock_id,
+        'entry_date': '2026/2/6',
+        'profit_percentage': profit,
+        'current_weight': weight,
+    }
+
+
+class TestParsePercentage:
+    """Test suite for parse_percentage"""
+
+    def test_parse_up_and_down_markers(self):
+        """Test Finlab's triangle markers set the sign"""
+        assert parse_percentage('▴ 10.00%') == 10.0
+        assert parse_percentage('▾ 3.5%') == -3.5
+        assert parse_percentage('-1,234.5%') == -1234.5
+
+    def test_parse_missing(self):
+        """Test unparseable values become None"""
+        assert parse_percentage('N/A') is None
+        assert parse_percentage(None) is None
+
+
+class TestDiffHoldings:
+    """Test suite for diff_holdings"""
+
+    def test_entries_and_exits(self):
+        """Test new and removed stock_ids are classified"""
+        previous = [_row('2330'), _row('2317')]
+        current = [_row('2330'), _row('4542')]
+
+        diff = diff_holdings(previous, current)
+
+        assert [c.key for c in diff.entries] == ['4542']
+        assert [c.key for c in diff.exits] == ['2317']
+        assert diff.exits[0].row['stock_id'] == '2317'
+        assert diff.weight_changes == []
+
+    def test_weight_change(self):
+        """Test weight changes are detected"""
+        diff = diff_holdings([_row('2330', weight='20.0%')], [_row('2330', weight='25.0%')])
+
+        assert len(diff.weight_changes) == 1
+        assert diff.weight_changes[0].previous['current_weight'] == '20.0%'
+
+    def test_profit_move_threshold(self):
+        """Test profit moves are only reported past the threshold"""
+        previous = [_row('2330', profit='▴ 10.00%'), _row('2317', profit='▴ 10.00%')]
+        current = [_row('2330', profit='▴ 12.00%'), _row('2317', profit='▾ 1.00%')]
+
+        diff = diff_holdings(previous, current, profit_threshold=5.0)
+
+        assert [c.key for c in diff.profit_moves] == ['2317']
+
+    def test_no_changes(self):
+        """Test identical holdings produce an empty diff"""
+        diff = diff_holdings([_row('2330')], [_row('2330')])
+
+        assert not diff.has_changes
+        assert len(diff) == 0
+
+    def test_scales_to_thousands_of_holdings(self):
+        """Test a large diff completes and classifies every holding"""
+        previous = [_row(str(i)) for i in range(5000)]
+        current = [_row(str(i)) for i in range(2500, 7500)]
+
+        diff = diff_holdings(previous, current)
+
+        assert len(diff.entries) == 2500
+        assert len(diff.exits) == 2500
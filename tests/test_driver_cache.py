@@ -0,0 +1,132 @@
+"""
+Unit tests for the chromedriver path cache
+"""
+import json
+import os
+from unittest.mock import Mock
+from src.utils.driver_cache import file_checksum, resolve_browser_paths, resolve_chromedriver_path
+
+
+def _make_executable(path):
+    path.write_text("#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    return str(path)
+
+
+class TestDriverCache:
+    """Test suite for resolve_chromedriver_path"""
+
+    def test_installs_and_writes_cache_on_miss(self, tmp_path):
+        """Test that a cache miss calls the installer and stores the path"""
+        # Arrange
+        driver_path = _make_executable(tmp_path / "chromedriver")
+        cache_path = tmp_path / "cache" / "chromedriver.json"
+        installer = Mock(return_value=driver_path)
+
+        # Act
+        result = resolve_chromedriver_path(installer, str(cache_path))
+
+        # Assert
+        assert result == driver_path
+        installer.assert_called_once()
+        assert json.loads(cache_path.read_text())['driver_path'] == driver_path
+
+    def test_uses_cache_on_hit(self, tmp_path):
+        """Test that a cached, existing binary skips the installer"""
+        # Arrange
+        driver_path = _make_executable(tmp_path / "chromedriver")
+        cache_path = tmp_path / "chromedriver.json"
+        cache_path.write_text(json.dumps({'driver_path': driver_path}))
+        installer = Mock()
+
+        # Act
+        result = resolve_chromedriver_path(installer, str(cache_path))
+
+        # Assert
+        assert result == driver_path
+        installer.assert_not_called()
+
+    def test_stale_cache_is_ignored(self, tmp_path):
+        """Test that a cached path that no longer exists triggers reinstall"""
+        # Arrange
+        cache_path = tmp_path / "chromedriver.json"
+        cache_path.write_text(json.dumps({'driver_path': str(tmp_path / "gone")}))
+        installer = Mock(return_value='/path/to/chromedriver')
+
+        # Act
+        result = resolve_chromedriver_path(installer, str(cache_path))
+
+        # Assert
+        assert result == '/path/to/chromedriver'
+        installer.assert_called_once()
+
+    def test_changed_binary_is_reinstalled(self, tmp_path):
+        """Test that a cached chromedriver whose checksum changed triggers reinstall"""
+        # Arrange
+        driver_path = _make_executable(tmp_path / "chromedriver")
+        cache_path = tmp_path / "chromedriver.json"
+        resolve_chromedriver_path(Mock(return_value=driver_path), str(cache_path))
+        (tmp_path / "chromedriver").write_text("#!/bin/sh\necho replaced\n")
+        installer = Mock(return_value=driver_path)
+
+        # Act
+        resolve_chromedriver_path(installer, str(cache_path))
+
+        # Assert
+        installer.assert_called_once()
+        assert json.loads(cache_path.read_text())['driver_sha256'] == file_checksum(driver_path)
+
+    def test_legacy_cache_gets_checksum(self, tmp_path):
+        """Test that a cache entry written before checksums existed is upgraded in place"""
+        # Arrange
+        driver_path = _make_executable(tmp_path / "chromedriver")
+        cache_path = tmp_path / "chromedriver.json"
+        cache_path.write_text(json.dumps({'driver_path': driver_path}))
+
+        # Act
+        resolve_chromedriver_path(Mock(), str(cache_path))
+
+        # Assert
+        assert json.loads(cache_path.read_text())['driver_sha256'] == file_checksum(driver_path)
+
+    def test_chrome_path_is_cached(self, tmp_path):
+        """Test that the Chrome binary lookup is cached until the file changes"""
+        # Arrange
+        driver_path = _make_executable(tmp_path / "chromedriver")
+        chrome_path = _make_executable(tmp_path / "chrome")
+        cache_path = str(tmp_path / "chromedriver.json")
+        chrome_finder = Mock(return_value=chrome_path)
+
+        # Act
+        first = resolve_browser_paths(Mock(return_value=driver_path), cache_path, chrome_finder)
+        second = resolve_browser_paths(Mock(), cache_path, chrome_finder)
+        (tmp_path / "chrome").write_text("#!/bin/sh\necho updated\n")
+        installer = Mock(return_value=driver_path)
+        resolve_browser_paths(installer, cache_path, chrome_finder)
+
+        # Assert
+        assert first == second == (driver_path, chrome_path)
+        assert chrome_finder.call_count == 2
+        # A Chrome upgrade also re-checks chromedriver for a matching version
+        installer.assert_called_once()
+
+    def test_missing_chrome_is_searched_again(self, tmp_path):
+        """Test that a cached 'Chrome not found' does not hide a Chrome installed later"""
+        # Arrange
+        driver_path = _make_executable(tmp_path / "chromedriver")
+        chrome_path = _make_executable(tmp_path / "chrome")
+        cache_path = str(tmp_path / "chromedriver.json")
+        chrome_finder = Mock(side_effect=[None, chrome_path, chrome_path])
+        installer = Mock(return_value=driver_path)
+
+        # Act
+        first = resolve_browser_paths(installer, cache_path, chrome_finder)
+        second = resolve_browser_paths(installer, cache_path, chrome_finder)
+        third = resolve_browser_paths(installer, cache_path, chrome_finder)
+
+        # Assert
+        assert first == (driver_path, None)
+        assert second == third == (driver_path, chrome_path)
+        assert chrome_finder.call_count == 2
+        # The newly found Chrome re-checks chromedriver once
+        assert installer.call_count == 2
@@ -0,0 +1,112 @@
+"""
+Unit tests for DriverPool
+"""
+import pytest
+from unittest.mock import Mock
+from src.driver_pool import DriverPool
+
+
+class TestDriverPool:
+    """Test suite for DriverPool"""
+
+    def test_reuses_warm_driver(self):
+        """Test that a returned driver is handed out again instead of launching a new one"""
+        # Arrange
+        factory = Mock(side_effect=lambda: Mock())
+        pool = DriverPool(size=1, factory=factory)
+
+        # Act
+        with pool.acquire() as first:
+            pass
+        with pool.acquire() as second:
+            pass
+
+        # Assert
+        assert first is second
+        assert factory.call_count == 1
+        first.quit.assert_not_called()
+        first.switch_to.default_content.assert_called()
+
+    def test_recycles_after_max_uses(self):
+        """Test that a driver is quit and replaced after max_uses"""
+        # Arrange
+        factory = Mock(side_effect=lambda: Mock())
+        pool = DriverPool(size=1, max_uses=2, factory=factory)
+
+        # Act
+        with pool.acquire() as first:
+            pass
+        with pool.acquire():
+            pass
+        with pool.acquire() as third:
+            pass
+
+        # Assert
+        first.quit.assert_called_once()
+        assert third is not first
+        assert factory.call_count == 2
+
+    def test_unhealthy_driver_is_replaced(self):
+        """Test that a driver failing its health check is discarded on checkout"""
+        # Arrange
+        factory = Mock(side_effect=lambda: Mock())
+        pool = DriverPool(size=1, factory=factory)
+        with pool.acquire() as first:
+            pass
+        first.execute_script.side_effect = Exception("chrome not reachable")
+
+        # Act
+        with pool.acquire() as second:
+            pass
+
+        # Assert
+        assert second is not first
+        first.quit.assert_called_once()
+
+    def test_warm_up_and_close(self):
+        """Test warm_up launches size drivers and close quits them"""
+        # Arrange
+        drivers = [Mock(), Mock()]
+        pool = DriverPool(size=2, factory=Mock(side_effect=drivers))
+
+        # Act
+        with pool:
+            pool.warm_up()
+
+        # Assert
+        for driver in drivers:
+            driver.quit.assert_called_once()
+        with pytest.raises(RuntimeError):
+            with pool.acquire():
+                pass
+
+    def test_acquire_timeout_when_exhausted(self):
+        """Test that acquire raises when every slot is checked out"""
+        pool = DriverPool(size=1, factory=Mock(side_effect=lambda: Mock()))
+
+        with pool.acquire():
+            with pytest.raises(TimeoutError):
+                with pool.acquire(timeout=0.01):
+                    pass
+
+    def test_invalid_size(self):
+        """Test that size must be at least one"""
+        with pytest.raises(ValueError):
+            DriverPool(size=0, factory=Mock())
+
+    def test_force_close_quits_borrowed_drivers(self):
+        """Test that close(force=True) also quits drivers that are checked out"""
+        # Arrange
+        factory = Mock(side_effect=lambda: Mock())
+        pool = DriverPool(size=1, factory=factory)
+
+        # Act
+        with pool.acquire() as driver:
+            pool.close(force=True)
+            driver.quit.assert_called_once()
+
+        # Assert
+        driver.quit.assert_called_once()
+        with pytest.raises(RuntimeError):
+            with pool.acquire():
+                pass
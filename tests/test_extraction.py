@@ -0,0 +1,90 @@
+"""
+Unit tests for table row extraction
+"""
+from unittest.mock import Mock
+from src.extraction import (
+    ERROR_TEXT_SELECTOR,
+    NAME_SELECTOR,
+    STOCK_ID_SELECTOR,
+    extract_rows,
+    extract_rows_bulk,
+    extract_rows_per_element,
+)
+
+
+def _element(text):
+    element = Mock()
+    element.text = text
+    return element
+
+
+class TestExtraction:
+    """Test suite for bulk and per-element extraction"""
+
+    def test_extract_rows_bulk_single_round_trip(self):
+        """Test bulk extraction returns all rows from one script call"""
+        # Arrange
+        driver = Mock()
+        driver.execute_script.return_value = [
+            {'name': '科嶠', 'stock_id': '4542', 'entry_date': '2026/2/6',
+             'profit_percentage': '▴ 10.00%', 'current_weight': '20.0%'},
+            {'name': '青雲', 'stock_id': '5386', 'entry_date': None,
+             'profit_percentage': '▴ 42.31%', 'current_weight': '20.0%'},
+        ]
+
+        # Act
+        result = extract_rows_bulk(driver)
+
+        # Assert
+        driver.execute_script.assert_called_once()
+        driver.find_elements.assert_not_called()
+        assert result[0]['stock_id'] == '4542'
+        assert result[1]['entry_date'] == 'N/A'
+        assert set(result[1]) == {'name', 'stock_id', 'entry_date', 'profit_percentage', 'current_weight'}
+
+    def test_extract_rows_bulk_rejects_unexpected_payload(self):
+        """Test bulk extraction returns None when the script result is not a list of dicts"""
+        driver = Mock()
+        driver.execute_script.return_value = "not a list"
+
+        assert extract_rows_bulk(driver) is None
+
+    def test_extract_rows_per_element(self):
+        """Test per-element extraction fills N/A for missing selectors without raising per cell"""
+        # Arrange
+        cells = {
+            NAME_SELECTOR: [_element(' 科嶠 ')],
+            STOCK_ID_SELECTOR: [_element('4542')],
+            ERROR_TEXT_SELECTOR: [_element('▴ 10.00%')],
+        }
+        row = Mock()
+        row.find_elements.side_effect = lambda by, selector: cells.get(selector, [])
+        driver = Mock()
+        driver.find_elements.return_value = [row]
+
+        # Act
+        result = extract_rows_per_element(driver)
+
+        # Assert
+        assert result == [{
+            'name': '科嶠',
+            'stock_id': '4542',
+            'entry_date': 'N/A',
+            'profit_percentage': '▴ 10.00%',
+            'current_weight': 'N/A',
+        }]
+        row.find_element.assert_not_called()
+
+    def test_extract_rows_falls_back_when_script_fails(self):
+        """Test extract_rows uses the per-element path when the bulk script raises"""
+        # Arrange
+        driver = Mock()
+        driver.execute_script.side_effect = Exception("javascript error")
+        driver.find_elements.return_value = []
+
+        # Act
+        result = extract_rows(driver)
+
+        # Assert
+        assert result == []
+        driver.find_elements.assert_called_once()
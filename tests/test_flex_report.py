@@ -0,0 +1,107 @@
+"""
+Unit tests for the Flex Message report renderer
+"""
+import json
+import time
+import pytest
+from src.flex_report import (
+    BUBBLES_PER_CAROUSEL,
+    CAROUSEL_SIZE_LIMIT,
+    PROFIT_DOWN_COLOR,
+    PROFIT_UP_COLOR,
+    compile_template,
+    render_flex_report,
+)
+from src.line_delivery import text_message
+from src.line_notification import LineNotification
+from src.utils.message_packer import pack_blocks
+
+
+def make_rows(count):
+    return [
+        {
+            'name': f'股票{i}',
+            'stock_id': str(1000 + i),
+            'entry_date': '2026/2/6',
+            'profit_percentage': '▴ 10.00%' if i % 2 else '▾ 3.20%',
+            'current_weight': '1.0%',
+        }
+        for i in range(count)
+    ]
+
+
+def body_columns(bubble):
+    return bubble['body']['contents'][2]['contents']
+
+
+class TestFlexReport:
+    """Test suite for render_flex_report"""
+
+    def test_compile_template_fills_slots(self):
+        """Test that "@slot@" values become format fields and other braces are escaped"""
+        template = compile_template({'type': 'text', 'text': '@label@', 'nested': {'a': 1}})
+
+        filled = template.format(label=json.dumps('hi'))
+
+        assert json.loads(filled) == {'type': 'text', 'text': 'hi', 'nested': {'a': 1}}
+
+    def test_renders_table_bubble(self):
+        """Test that each column lists one line per holding and profits are colored by direction"""
+        # Act
+        messages = render_flex_report(make_rows(3), strategy='https://example.com')
+
+        # Assert
+        assert len(messages) == 1
+        assert messages[0]['type'] == 'flex'
+        assert 'https://example.com' in messages[0]['altText']
+        bubble = messages[0]['contents']['contents'][0]
+        names, dates, profits, weights = body_columns(bubble)
+        assert names['text'].split('\n') == ['1000 股票0', '1001 股票1', '1002 股票2']
+        assert weights['text'] == '1.0%\n1.0%\n1.0%'
+        assert [span.get('color') for span in profits['contents']] == [
+            PROFIT_DOWN_COLOR, PROFIT_UP_COLOR, PROFIT_DOWN_COLOR
+        ]
+        assert ''.join(span['text'] for span in profits['contents']) == '▾ 3.20%\n▴ 10.00%\n▾ 3.20%'
+
+    def test_large_report_respects_carousel_limits(self):
+        """Test that bubbles are packed into carousels within LINE's count and size limits"""
+        # Act
+        messages = render_flex_report(make_rows(1000))
+
+        # Assert
+        carousels = [message['contents'] for message in messages]
+        assert all(len(carousel['contents']) <= BUBBLES_PER_CAROUSEL for carousel in carousels)
+        assert all(len(json.dumps(carousel)) <= CAROUSEL_SIZE_LIMIT for carousel in carousels)
+        names = [
+            line
+            for carousel in carousels
+            for bubble in carousel['contents']
+            for line in body_columns(bubble)[0]['text'].split('\n')
+        ]
+        assert len(names) == 1000
+
+    def test_oversized_holding_raises(self):
+        """Test that a holding that cannot fit in a bubble raises ValueError"""
+        rows = [{'name': 'x', 'stock_id': '1', 'current_weight': 'w' * 40000}]
+
+        with pytest.raises(ValueError):
+            render_flex_report(rows)
+
+    def test_flex_payload_is_smaller_and_fast(self):
+        """Test that 1,000 holdings render in milliseconds into a smaller payload than text"""
+        # Arrange
+        rows = make_rows(1000)
+        notifier = LineNotification('token', 'user')
+        texts = pack_blocks(notifier._stock_message_blocks(rows))
+
+        # Act
+        start = time.perf_counter()
+        messages = render_flex_report(rows)
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        flex_bytes = sum(len(json.dumps(message)) for message in messages)
+        text_bytes = sum(len(json.dumps(text_message(text))) for text in texts)
+        assert flex_bytes < text_bytes
+        assert len(messages) < len(texts)
+        assert elapsed < 0.5
@@ -0,0 +1,194 @@
+"""
+Unit tests for scroll-and-harvest extraction of virtualized or paginated tables
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from src.extraction import EXTRACT_ROWS_SCRIPT
+from src.harvest import (
+    NEXT_PAGE_SCRIPT,
+    ROWS_SIGNATURE_SCRIPT,
+    SCROLL_STEP_SCRIPT,
+    harvest_rows,
+    iter_harvest_batches,
+)
+from src.scraper import FinlabStrategyScraper
+
+
+def make_row(index):
+    return {
+        'name': f'股票{index}',
+        'stock_id': str(1000 + index),
+        'entry_date': '2026/2/6',
+        'profit_percentage': '▴ 1.00%',
+        'current_weight': '1.0%',
+    }
+
+
+class FakeTableDriver:
+    """
+    A driver whose table renders only `window` rows at a time.
+
+    Scrolling moves the window by `scroll_by` rows; when pages is > 1 the rows
+    are split into pages that are reached through the next-page script.
+    """
+
+    def __init__(self, total, window, scroll_by=None, pages=1):
+        self.rows = [make_row(i) for i in range(total)]
+        self.window = window
+        self.scroll_by = scroll_by
+        self.page_size = -(-total // pages)
+        self.page = 0
+        self.offset = 0
+        self.scrolls = 0
+        self.page_clicks = 0
+
+    def _page_rows(self):
+        start = self.page * self.page_size
+        return self.rows[start:start + self.page_size]
+
+    def _visible(self):
+        return self._page_rows()[self.offset:self.offset + self.window]
+
+    def execute_script(self, script, *args):
+        if script == EXTRACT_ROWS_SCRIPT:
+            return [dict(row) for row in self._visible()]
+        if script == SCROLL_STEP_SCRIPT:
+            if not self.scroll_by or self.offset + self.window >= len(self._page_rows()):
+                return False
+            self.offset += self.scroll_by
+            self.scrolls += 1
+            return True
+        if script == NEXT_PAGE_SCRIPT:
+            if (self.page + 1) * self.page_size >= len(self.rows):
+                return False
+            self.page += 1
+            self.offset = 0
+            self.page_clicks += 1
+            return True
+        if script == ROWS_SIGNATURE_SCRIPT:
+            visible = self._visible()
+            return f"{self.page}|{len(visible)}|{visible[0]['stock_id'] if visible else ''}"
+        return None
+
+    def execute_async_script(self, script, *args):
+        return len(self._visible())
+
+
+class TestHarvestRows:
+    """Test suite for harvest_rows"""
+
+    def test_virtualized_table_is_captured_completely(self):
+        """Test that scrolling collects every row once, despite overlapping windows"""
+        # Arrange
+        driver = FakeTableDriver(total=95, window=20, scroll_by=19)
+
+        # Act
+        rows = harvest_rows(driver)
+
+        # Assert
+        assert [row['stock_id'] for row in rows] == [str(1000 + i) for i in range(95)]
+        assert driver.scrolls == 4
+
+    def test_paginated_table_steps_through_pages(self):
+        """Test that a table that cannot scroll is read page by page"""
+        # Arrange
+        driver = FakeTableDriver(total=25, window=10, pages=3)
+
+        # Act
+        rows = harvest_rows(driver)
+
+        # Assert
+        assert len(rows) == 25
+        assert len({row['stock_id'] for row in rows}) == 25
+        assert driver.page_clicks == 2
+
+    def test_stops_when_scrolling_reveals_no_new_rows(self):
+        """Test that a fully rendered table costs a single extra extraction"""
+        # Arrange: the container scrolls, but every row is already in the DOM
+        driver = FakeTableDriver(total=30, window=30, scroll_by=5)
+        calls = []
+        original = driver.execute_script
+
+        def execute_script(script, *args):
+            calls.append(script)
+            if script == SCROLL_STEP_SCRIPT:
+                return True
+            return original(script, *args)
+
+        driver.execute_script = execute_script
+
+        # Act
+        rows = harvest_rows(driver)
+
+        # Assert
+        assert len(rows) == 30
+        assert calls.count(EXTRACT_ROWS_SCRIPT) == 2
+
+    def test_max_steps_bounds_endless_tables(self):
+        """Test that harvesting gives up after max_steps scrolls"""
+        # Arrange
+        driver = FakeTableDriver(total=1000, window=10, scroll_by=10)
+
+        # Act
+        rows = harvest_rows(driver, max_steps=3)
+
+        # Assert
+        assert len(rows) == 40
+        assert driver.scrolls == 3
+
+    def test_settle_timeout_does_not_stop_harvesting(self):
+        """Test that a table that never settles after a scroll is still read"""
+        # Arrange
+        driver = FakeTableDriver(total=30, window=10, scroll_by=10)
+
+        # Act
+        with patch('src.harvest.ReadinessWaiter.wait_for', side_effect=TimeoutException()):
+            rows = harvest_rows(driver)
+
+        # Assert
+        assert len(rows) == 30
+
+    def test_browser_errors_while_settling_are_raised(self):
+        """Test that errors other than a timeout are not swallowed after scrolling or paging"""
+        for pages, scroll_by in ((1, 10), (3, None)):
+            # Arrange
+            driver = FakeTableDriver(total=30, window=10, scroll_by=scroll_by, pages=pages)
+            driver.execute_async_script = MagicMock(side_effect=WebDriverException("chrome not reachable"))
+
+            # Act / Assert
+            with pytest.raises(WebDriverException, match="chrome not reachable"):
+                harvest_rows(driver)
+
+    def test_batches_only_contain_new_rows(self):
+        """Test that each yielded batch holds the rows first seen at that step"""
+        driver = FakeTableDriver(total=12, window=5, scroll_by=4)
+
+        batches = list(iter_harvest_batches(driver))
+
+        assert [[row['stock_id'] for row in batch] for batch in batches] == [
+            ['1000', '1001', '1002', '1003', '1004'],
+            ['1005', '1006', '1007', '1008'],
+            ['1009', '1010', '1011'],
+        ]
+
+
+class TestScraperHarvest:
+    """Test suite for FinlabStrategyScraper harvest mode"""
+
+    @patch('src.scraper.FinlabStrategyScraper._load_page')
+    def test_scrape_uses_harvest_when_enabled(self, mock_load_page):
+        """Test that harvest=True collects rows beyond the rendered window"""
+        # Arrange
+        driver = FakeTableDriver(total=50, window=20, scroll_by=19)
+        driver.switch_to = MagicMock()
+        driver.quit = MagicMock()
+        pool = MagicMock()
+        pool.acquire.return_value.__enter__.return_value = driver
+        scraper = FinlabStrategyScraper(pool=pool, harvest=True)
+
+        # Act
+        rows = scraper.scrape('https://example.com')
+
+        # Assert
+        assert len(rows) == 50
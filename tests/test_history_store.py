@@ -0,0 +1,81 @@
+"""
+Unit tests for HoldingsHistoryStore
+"""
+from datetime import date, datetime, timezone
+import pytest
+from src.history_store import HoldingsHistoryStore
+
+
+STRATEGY = 'https://finlab.tw/strategy/1'
+
+
+def _row(stock_id, weight, profit='▴ 10.00%'):
+    return {
+        'name': f'股票{stock_id}',
+        'stock_id': stock_id,
+        'entry_date': '2026/2/6',
+        'profit_percentage': profit,
+        'current_weight': weight,
+    }
+
+
+def _at(day):
+    return datetime(2026, 3, day, 8, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HoldingsHistoryStore(str(tmp_path / "history.sqlite3")) as history:
+        history.append_run(STRATEGY, [_row('2330', '20.0%'), _row('4542', '20.0%')], scraped_at=_at(1))
+        history.append_run(STRATEGY, [_row('2330', '25.0%')], scraped_at=_at(2))
+        history.append_run(STRATEGY, [_row('2330', '30.0%'), _row('5386', '10.0%')], scraped_at=_at(3))
+        yield history
+
+
+class TestHoldingsHistoryStore:
+    """Test suite for HoldingsHistoryStore"""
+
+    def test_uses_wal_mode(self, store):
+        """Test that the database runs in WAL journal mode"""
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    def test_stock_history_parses_numeric_fields(self, store):
+        """Test per-stock weight history is returned with parsed values"""
+        history = store.stock_history('2330')
+
+        assert [row['current_weight'] for row in history] == [20.0, 25.0, 30.0]
+        assert history[0]['profit_percentage'] == 10.0
+        assert history[0]['entry_date'] == date(2026, 2, 6)
+        assert history[0]['scraped_at'] == _at(1)
+
+    def test_stock_history_time_range(self, store):
+        """Test time-range filtering with dates and datetimes"""
+        assert len(store.stock_history('2330', start=date(2026, 3, 2))) == 2
+        assert len(store.stock_history('2330', end=date(2026, 3, 2))) == 2
+        assert len(store.stock_history('2330', start=_at(2), end=_at(2))) == 1
+
+    def test_first_seen(self, store):
+        """Test when a stock first entered the strategy"""
+        assert store.first_seen('5386', strategy=STRATEGY)['scraped_at'] == _at(3)
+        assert store.first_seen('9999') is None
+
+    def test_holdings_at(self, store):
+        """Test holdings as of a point in time"""
+        assert {row['stock_id'] for row in store.holdings_at(STRATEGY, date(2026, 3, 1))} == {'2330', '4542'}
+        assert {row['stock_id'] for row in store.holdings_at(STRATEGY)} == {'2330', '5386'}
+        assert store.holdings_at('unknown') == []
+
+    def test_runs(self, store):
+        """Test run listing"""
+        runs = store.runs(strategy=STRATEGY, start=date(2026, 3, 2))
+
+        assert [run['row_count'] for run in runs] == [1, 2]
+
+    def test_append_runs_batches_strategies(self, tmp_path):
+        """Test several strategies are written in one call"""
+        with HoldingsHistoryStore(str(tmp_path / "h.sqlite3")) as history:
+            run_ids = history.append_runs({'a': [_row('1', '1%')], 'b': []}, scraped_at=_at(1))
+
+            assert set(run_ids) == {'a', 'b'}
+            assert len(history.runs()) == 2
+            assert history.holdings_at('b') == []
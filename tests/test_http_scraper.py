@@ -0,0 +1,113 @@
+"""
+Unit tests for the browser-free HTTP fast path
+"""
+from unittest.mock import Mock
+from src.http_scraper import (
+    HttpStrategyScraper,
+    parse_holdings_html,
+    parse_holdings_json,
+)
+
+
+class TestHttpStrategyScraper:
+    """Test suite for HttpStrategyScraper against local fixture pages"""
+
+    def test_scrape_follows_report_iframe(self, fixture_server):
+        """Test that the iframe document is fetched and its table parsed"""
+        # Arrange
+        fallback = Mock()
+        scraper = HttpStrategyScraper(fallback=fallback)
+
+        # Act
+        result = scraper.scrape(f"{fixture_server}/strategy_page.html")
+
+        # Assert
+        assert result == [
+            {
+                'name': '科嶠',
+                'stock_id': '4542',
+                'entry_date': '2026/2/6',
+                'profit_percentage': '▴ 10.00%',
+                'current_weight': '20.0%',
+            },
+            {
+                'name': '青雲',
+                'stock_id': '5386',
+                'entry_date': 'N/A',
+                'profit_percentage': '▴ 42.31%',
+                'current_weight': 'N/A',
+            },
+        ]
+        fallback.scrape.assert_not_called()
+
+    def test_scrape_json_payload(self, fixture_server):
+        """Test that a JSON response is parsed directly"""
+        scraper = HttpStrategyScraper()
+
+        result = scraper.scrape(f"{fixture_server}/holdings.json")
+
+        assert result[0]['stock_id'] == '4542'
+        assert result[0]['current_weight'] == '20.0%'
+
+    def test_falls_back_when_page_is_client_rendered(self, fixture_server):
+        """Test that an empty fast path hands over to the fallback scraper"""
+        # Arrange
+        fallback = Mock()
+        fallback.scrape.return_value = [{'name': 'from browser'}]
+        scraper = HttpStrategyScraper(fallback=fallback)
+        url = f"{fixture_server}/spa_page.html"
+
+        # Act
+        result = scraper.scrape(url)
+
+        # Assert
+        assert result == [{'name': 'from browser'}]
+        fallback.scrape.assert_called_once_with(url)
+
+    def test_falls_back_on_http_error(self, fixture_server):
+        """Test that HTTP errors also trigger the fallback"""
+        fallback = Mock()
+        fallback.scrape.return_value = []
+        scraper = HttpStrategyScraper(fallback=fallback)
+
+        scraper.scrape(f"{fixture_server}/missing.html")
+
+        fallback.scrape.assert_called_once()
+
+
+class TestParsers:
+    """Test suite for the HTML and JSON holdings parsers"""
+
+    def test_parse_ignores_rows_outside_tbody(self):
+        """Test that header rows are not treated as holdings"""
+        html = "<table><thead><tr><th>x</th></tr></thead><tbody></tbody></table>"
+
+        assert parse_holdings_html(html) == []
+
+    def test_parse_holdings_json_list(self):
+        """Test that a plain list of holdings is normalised to the row keys"""
+        result = parse_holdings_json([{'name': 'A', 'stock_id': 1}])
+
+        assert result == [{
+            'name': 'A',
+            'stock_id': '1',
+            'entry_date': 'N/A',
+            'profit_percentage': 'N/A',
+            'current_weight': 'N/A',
+        }]
+
+    def test_unrelated_table_is_a_miss(self):
+        """Test that rows without a name or stock id are dropped so the browser fallback runs"""
+        # Arrange
+        fallback = Mock()
+        fallback.scrape.return_value = [{'name': 'from browser'}]
+        scraper = HttpStrategyScraper(fallback=fallback)
+        html = "<table><tbody><tr><td>foo</td></tr><tr><td>bar</td></tr></tbody></table>"
+        scraper.fetch_holdings = Mock(side_effect=lambda url: parse_holdings_html(html))
+
+        # Act
+        result = scraper.scrape('https://example.com')
+
+        # Assert
+        assert parse_holdings_json({'data': [{'weight': 1}, {'name': None}]}) == []
+        assert result == [{'name': 'from browser'}]
@@ -0,0 +1,115 @@
+"""
+Unit tests for selector probing and fail-fast layout detection
+"""
+import time
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from src.layout import (
+    PROBE_SCRIPT,
+    SELECTOR_STRATEGIES,
+    LayoutChangedError,
+    check_cells,
+    layout_ready,
+    probe_layout,
+)
+from src.multi_scraper import scrape_strategies
+from src.readiness import ReadinessWaiter
+from src.scraper import FinlabStrategyScraper
+
+
+class ProbeDriver:
+    """Fake driver answering the probe script from a fixed set of matching selectors"""
+
+    def __init__(self, present, settled=True):
+        self.present = set(present)
+        self.settled = settled
+        self.probes = 0
+        self.async_calls = 0
+
+    def execute_script(self, script, *args):
+        if script != PROBE_SCRIPT:
+            return True
+        self.probes += 1
+        strategies, fields = args[0], args[1]
+        matches = {
+            field: next((selector for selector in strategies[field] if selector in self.present), None)
+            for field in fields
+        }
+        return {'matches': matches, 'settled': self.settled}
+
+    def execute_async_script(self, script, *args):
+        self.async_calls += 1
+        return 1
+
+    def get(self, url):
+        pass
+
+
+class TestProbeLayout:
+    """Test suite for probe_layout and layout_ready"""
+
+    def test_fallback_selector_is_reported(self):
+        """Test that the first matching selector per field is used and unknown payloads mean 'cannot tell'"""
+        fallback = SELECTOR_STRATEGIES['stockId'][1]
+        driver = ProbeDriver({SELECTOR_STRATEGIES['row'][0], fallback})
+
+        probe = probe_layout(driver, ('row', 'name', 'stockId'))
+
+        assert probe.selector('stockId') == fallback
+        assert probe.missing(('name', 'stockId')) == ['name']
+        assert probe.extraction_selectors()['name'] is None
+        assert probe_layout(Mock(), ('row',)).selector('row') == SELECTOR_STRATEGIES['row'][0]
+
+    def test_absent_selectors_fail_fast_once_page_is_idle(self):
+        """Test that a settled page without critical selectors raises well before the timeout"""
+        # Arrange
+        waiter = ReadinessWaiter(ProbeDriver(set()))
+        start = time.perf_counter()
+
+        # Act
+        with pytest.raises(LayoutChangedError) as exc_info:
+            waiter.wait_for(layout_ready(('tab', 'row'), timeout=8))
+
+        # Assert
+        assert time.perf_counter() - start < 2
+        assert exc_info.value.to_dict()['missing'] == ['tab', 'row']
+
+    def test_missing_key_cells_raise(self):
+        """Test that rows without name or stock id cells are a layout change, other gaps are not"""
+        row = SELECTOR_STRATEGIES['row'][0]
+
+        with pytest.raises(LayoutChangedError):
+            check_cells(ProbeDriver({row, SELECTOR_STRATEGIES['errorText'][0]}))
+        probe = check_cells(ProbeDriver({row, SELECTOR_STRATEGIES['name'][0]}))
+        assert probe.selector('entryDate') is None
+        assert check_cells(ProbeDriver(set())).selector('row') is None
+
+
+class TestScraperLayout:
+    """Test suite for fail-fast scraping"""
+
+    def test_missing_iframe_stops_before_later_waits(self):
+        """Test that a page without the report iframe stops without waiting for tabs or rows"""
+        # Arrange
+        driver = ProbeDriver(set())
+        pool = MagicMock()
+        pool.acquire.return_value.__enter__.return_value = driver
+        scraper = FinlabStrategyScraper(pool=pool)
+
+        # Act
+        with pytest.raises(LayoutChangedError):
+            scraper.scrape('https://example.com')
+
+        # Assert
+        assert driver.async_calls == 0
+        assert set(scraper.phase_timings) == {'network_idle', 'iframe_attached'}
+
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_layout_change_is_reported_in_results(self, mock_scraper_cls):
+        """Test that scrape_strategies returns a structured layout_changed entry"""
+        mock_scraper_cls.return_value.iter_holdings.side_effect = LayoutChangedError(['iframe'])
+
+        results = scrape_strategies(['https://a'], pool=Mock())
+
+        assert results['https://a']['layout_changed'] == {'missing': ['iframe'], 'matches': {}}
+        assert results['https://a']['data'] is None
@@ -0,0 +1,246 @@
+"""
+Unit tests for AsyncLineClient against a local stub LINE API server
+"""
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch
+from src.line_delivery import (
+    AsyncLineClient,
+    LineDeliveryError,
+    parse_retry_after,
+    text_message,
+)
+from src.line_notification import LineNotification
+from src.outbox import Outbox
+
+
+class StubLineApi:
+    """Local stand-in for the LINE Messaging API that replays scripted responses"""
+
+    def __init__(self, responses=None):
+        # Each response is (status, headers); once exhausted every request returns 200
+        self.responses = list(responses or [])
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append({
+            'path': request.path,
+            'headers': dict(request.headers),
+            'json': await request.json(),
+        })
+        if self.responses:
+            status, headers = self.responses.pop(0)
+            return web.json_response({'message': 'error'}, status=status, headers=headers)
+        return web.json_response({})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/v2/bot/message/{kind}', self.handle)
+        return app
+
+
+class SlowStubLineApi(StubLineApi):
+    """Stub that holds each request briefly and records the peak number of requests in flight"""
+
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def handle(self, request):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return await super().handle(request)
+        finally:
+            self.in_flight -= 1
+
+
+def run_with_stub(stub, scenario):
+    """Start the stub server, run scenario(base_url) and shut the server down"""
+    async def runner():
+        server = TestServer(stub.app())
+        await server.start_server()
+        try:
+            return await scenario(str(server.make_url('')))
+        finally:
+            await server.close()
+    return asyncio.run(runner())
+
+
+class TestAsyncLineClient:
+    """Test suite for AsyncLineClient"""
+
+    def test_push_message_success(self):
+        """Test a push is sent with auth, retry key and recorded latency"""
+        stub = StubLineApi()
+
+        async def scenario(base_url):
+            async with AsyncLineClient('token', base_url=base_url) as client:
+                await client.push_message('U1', [text_message('hello')])
+                return client
+
+        client = run_with_stub(stub, scenario)
+
+        request = stub.requests[0]
+        assert request['path'] == '/v2/bot/message/push'
+        assert request['headers']['Authorization'] == 'Bearer token'
+        assert request['json'] == {'to': 'U1', 'messages': [{'type': 'text', 'text': 'hello'}]}
+        assert request['headers']['X-Line-Retry-Key']
+        assert len(client.latencies) == 1
+        assert client.latencies[0][1] == 200
+
+    def test_retries_429_honoring_retry_after(self):
+        """Test that 429 and 5xx are retried with the same retry key"""
+        stub = StubLineApi([(429, {'Retry-After': '0'}), (503, {})])
+
+        async def scenario(base_url):
+            async with AsyncLineClient('token', base_url=base_url, backoff_base=0.001) as client:
+                await client.push_message('U1', [text_message('hello')])
+                return client
+
+        client = run_with_stub(stub, scenario)
+
+        assert len(stub.requests) == 3
+        retry_keys = {request['headers']['X-Line-Retry-Key'] for request in stub.requests}
+        assert len(retry_keys) == 1
+        assert [status for _, status, _ in client.latencies] == [429, 503, 200]
+        assert client.retry_count == 2
+
+    def test_gives_up_after_max_retries(self):
+        """Test that persistent 429s raise after max_retries"""
+        stub = StubLineApi([(429, {'Retry-After': '0'})] * 3)
+
+        async def scenario(base_url):
+            async with AsyncLineClient('token', base_url=base_url, max_retries=2) as client:
+                await client.push_message('U1', [text_message('hello')])
+
+        with pytest.raises(LineDeliveryError) as exc_info:
+            run_with_stub(stub, scenario)
+
+        assert exc_info.value.status == 429
+        assert len(stub.requests) == 3
+
+    def test_client_error_is_not_retried(self):
+        """Test that a 400 fails immediately"""
+        stub = StubLineApi([(400, {})])
+
+        async def scenario(base_url):
+            async with AsyncLineClient('token', base_url=base_url) as client:
+                await client.push_message('U1', [text_message('hello')])
+
+        with pytest.raises(LineDeliveryError):
+            run_with_stub(stub, scenario)
+
+        assert len(stub.requests) == 1
+
+    def test_concurrent_pushes_are_bounded(self):
+        """Test that many pushes complete through a bounded pool"""
+        stub = StubLineApi()
+
+        async def scenario(base_url):
+            async with AsyncLineClient('token', base_url=base_url, max_concurrency=3) as client:
+                await asyncio.gather(*(
+                    client.push_message(f'U{i}', [text_message('hi')]) for i in range(20)
+                ))
+                return client
+
+        client = run_with_stub(stub, scenario)
+
+        assert len(stub.requests) == 20
+        assert len(client.latencies) == 20
+
+    def test_parse_retry_after(self):
+        """Test Retry-After accepts seconds and HTTP dates"""
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('Thu, 01 Jan 1970 00:00:10 GMT', now=4) == 6.0
+        assert parse_retry_after('soon') is None
+        assert parse_retry_after(None) is None
+
+
+class TestLineNotificationAsyncDelivery:
+    """Test suite for LineNotification on top of AsyncLineClient"""
+
+    @patch('src.line_notification.LineBotApi')
+    def test_send_stock_data_async(self, mock_api):
+        """Test send_stock_data delivers through the async client"""
+        stub = StubLineApi([(429, {'Retry-After': '0'})])
+
+        async def scenario(base_url):
+            notifier = LineNotification('token', 'U1', async_delivery=True, api_base_url=base_url)
+            # send_stock_data blocks until delivery, so run it outside the stub's loop
+            await asyncio.to_thread(notifier.send_stock_data, [{'name': '科嶠', 'stock_id': '4542'}])
+            return notifier
+
+        notifier = run_with_stub(stub, scenario)
+
+        assert len(stub.requests) == 2
+        assert '科嶠' in stub.requests[-1]['json']['messages'][0]['text']
+        assert len(notifier.delivery_latencies) == 2
+        mock_api.return_value.push_message.assert_not_called()
+
+    @patch('src.line_notification.LineBotApi')
+    def test_send_from_a_running_event_loop(self, mock_api):
+        """Test that a synchronous send works when called inside another running event loop"""
+        stub = StubLineApi()
+
+        async def scenario(base_url):
+            notifier = LineNotification('token', 'U1', async_delivery=True, api_base_url=base_url)
+
+            async def handler():
+                # e.g. an aiohttp handler calling the synchronous API directly
+                return notifier.send_text_message('hi')
+
+            # The caller's loop lives in its own thread so the stub server keeps serving
+            return await asyncio.to_thread(asyncio.run, handler())
+
+        assert run_with_stub(stub, scenario) is True
+        assert stub.requests[0]['json'] == {'to': 'U1', 'messages': [text_message('hi')]}
+
+    @patch('src.line_notification.LineBotApi')
+    def test_batches_for_different_recipients_are_sent_concurrently(self, mock_api):
+        """Test that recipients are sent in parallel while each recipient keeps its order"""
+        stub = SlowStubLineApi()
+        calls = [
+            ('U1', [text_message('U1 first')]),
+            ('U2', [text_message('U2 first')]),
+            ('U1', [text_message('U1 second')]),
+            ('U3', [text_message('U3 first')]),
+        ]
+
+        async def scenario(base_url):
+            notifier = LineNotification('token', 'U1', async_delivery=True, api_base_url=base_url)
+            await notifier._push_batches_async(calls)
+
+        run_with_stub(stub, scenario)
+
+        assert stub.peak_in_flight == 3
+        u1_texts = [r['json']['messages'][0]['text'] for r in stub.requests if r['json']['to'] == 'U1']
+        assert u1_texts == ['U1 first', 'U1 second']
+
+    @patch('src.line_notification.LineBotApi')
+    def test_outbox_flush_is_concurrent_across_recipients(self, mock_api):
+        """Test that the async outbox flush sends recipients in parallel and in order per recipient"""
+        stub = SlowStubLineApi()
+        outbox = Outbox(':memory:')
+        outbox.enqueue([
+            ('U1', [text_message('U1 first')]),
+            (['U2', 'U3'], [text_message('group')]),
+            ('U1', [text_message('U1 second')]),
+        ])
+
+        async def scenario(base_url):
+            notifier = LineNotification('token', 'U1', async_delivery=True, api_base_url=base_url, outbox=outbox)
+            return await asyncio.to_thread(notifier.flush_outbox)
+
+        result = run_with_stub(stub, scenario)
+
+        assert result == {'sent': 3, 'pending': 0, 'dead': {}}
+        assert stub.peak_in_flight == 2
+        u1_texts = [r['json']['messages'][0]['text'] for r in stub.requests if r['json']['to'] == 'U1']
+        assert u1_texts == ['U1 first', 'U1 second']
+        assert outbox.pending_count() == 0
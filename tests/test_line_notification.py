@@ -199,3 +199,138 @@ class TestLineNotification:
         mock_text_msg.assert_called_once()
         call_args = mock_text_msg.call_args
         assert "目前無持股資料" in call_args.kwargs['text']
+
+    def test_format_stock_message_with_strategy(self):
+        """Test that the strategy label is included when given"""
+        with patch('src.line_notification.LineBotApi'):
+            notifier = LineNotification("test_token", "test_user_id")
+
+            message = notifier.format_stock_message([{'name': '科嶠'}], strategy='https://a.com/1')
+
+            assert '策略: https://a.com/1' in message
+            assert '總計: 1 檔股票' in message
+
+    def test_format_diff_message(self):
+        """Test the compact delta message lists each change section"""
+        from src.diff import diff_holdings
+
+        with patch('src.line_notification.LineBotApi'):
+            notifier = LineNotification("test_token", "test_user_id")
+            previous = [
+                {'name': '科嶠', 'stock_id': '4542', 'current_weight': '20.0%', 'profit_percentage': '▴ 10.00%'},
+                {'name': '青雲', 'stock_id': '5386', 'current_weight': '20.0%', 'profit_percentage': '▴ 42.31%'},
+            ]
+            current = [
+                {'name': '科嶠', 'stock_id': '4542', 'current_weight': '25.0%', 'profit_percentage': '▴ 10.00%'},
+                {'name': '台積電', 'stock_id': '2330', 'current_weight': '10.0%', 'profit_percentage': '▴ 0.00%'},
+            ]
+
+            message = notifier.format_diff_message(diff_holdings(previous, current))
+
+            assert '🟢 新進場 (1)' in message
+            assert '台積電 (2330)' in message
+            assert '🔴 出場 (1)' in message
+            assert '青雲 (5386)' in message
+            assert '20.0% → 25.0%' in message
+            assert '獲利變動' not in message
+
+    @patch('src.line_notification.LineBotApi')
+    @patch('src.line_notification.TextSendMessage')
+    def test_send_diff_without_changes(self, mock_text_msg, mock_api):
+        """Test that an empty diff still renders a no-change message"""
+        from src.diff import HoldingsDiff
+
+        notifier = LineNotification("test_token", "test_user_id")
+
+        assert notifier.send_diff(HoldingsDiff()) is True
+        assert '持股無異動' in mock_text_msg.call_args.kwargs['text']
+
+    @patch('src.line_notification.LineBotApi')
+    @patch('src.line_notification.TextSendMessage')
+    def test_send_stock_data_large_report_is_packed(self, mock_text_msg, mock_api):
+        """Test that a report over 5000 characters is split and batched five per push"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        notifier = LineNotification("test_token", "test_user_id")
+        test_data = [
+            {
+                'name': f'股票{i}',
+                'stock_id': str(1000 + i),
+                'entry_date': '2026/2/6',
+                'profit_percentage': '▴ 10.00%',
+                'current_weight': '1.0%'
+            }
+            for i in range(600)
+        ]
+
+        # Act
+        result = notifier.send_stock_data(test_data)
+
+        # Assert
+        assert result is True
+        texts = [call.kwargs['text'] for call in mock_text_msg.call_args_list]
+        assert len(texts) > 5
+        assert all(len(text) <= 5000 for text in texts)
+        pushed = [call.args[1] for call in mock_api_instance.push_message.call_args_list]
+        assert all(len(batch) <= 5 for batch in pushed if isinstance(batch, list))
+        assert mock_api_instance.push_message.call_count == -(-len(texts) // 5)
+
+    def test_format_stock_message_with_holdings(self):
+        """Test that typed Holding records format like dict rows"""
+        from src.models import parse_holdings
+
+        with patch('src.line_notification.LineBotApi'):
+            notifier = LineNotification("test_token", "test_user_id")
+            rows = [{
+                'name': '科嶠',
+                'stock_id': '4542',
+                'entry_date': '2026/2/6',
+                'profit_percentage': '▴ 10.00%',
+                'current_weight': '20.0%'
+            }]
+
+            assert notifier.format_stock_message(parse_holdings(rows)) == notifier.format_stock_message(rows)
+
+    @patch('src.line_notification.LineBotApi')
+    def test_send_stock_data_as_flex_report(self, mock_api):
+        """Test that flex_reports pushes Flex carousels instead of text"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        notifier = LineNotification("test_token", "test_user_id", flex_reports=True)
+        rows = [{'name': '科嶠', 'stock_id': '4542', 'entry_date': '2026/2/6',
+                 'profit_percentage': '▴ 10.00%', 'current_weight': '20.0%'}]
+
+        # Act
+        result = notifier.send_stock_data(rows)
+
+        # Assert
+        assert result is True
+        message = mock_api_instance.push_message.call_args.args[1]
+        assert message.type == 'flex'
+        assert message.contents.type == 'carousel'
+
+    @patch('src.line_notification.LineBotApi')
+    @patch('src.line_notification.TextSendMessage')
+    def test_rejected_flex_report_falls_back_to_text(self, mock_text_msg, mock_api):
+        """Test that a 400 response to the Flex message resends the report as text"""
+        # Arrange
+        from linebot.exceptions import LineBotApiError
+        from linebot.models.error import Error
+
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        mock_api_instance.push_message.side_effect = [
+            LineBotApiError(400, {}, error=Error(message='invalid flex')),
+            None,
+        ]
+        notifier = LineNotification("test_token", "test_user_id", flex_reports=True)
+
+        # Act
+        result = notifier.send_stock_data([{'name': '科嶠', 'stock_id': '4542'}])
+
+        # Assert
+        assert result is True
+        assert mock_api_instance.push_message.call_count == 2
+        assert '科嶠' in mock_text_msg.call_args.kwargs['text']
@@ -0,0 +1,98 @@
+"""
+Unit tests for LINE message packing
+"""
+from src.utils.message_packer import BlockPacker, batch_messages, pack_blocks
+
+
+class TestPackBlocks:
+    """Test suite for pack_blocks"""
+
+    def test_small_report_is_one_message(self):
+        """Test that text under the limit is returned unchanged"""
+        blocks = ["header\n", "block 1\n", "total"]
+
+        assert pack_blocks(blocks) == ["header\n\nblock 1\n\ntotal"]
+
+    def test_splits_only_on_block_boundaries(self):
+        """Test that every block stays whole and every message fits the limit"""
+        blocks = [f"[{i}] " + "x" * 40 for i in range(100)]
+
+        messages = pack_blocks(blocks, limit=500)
+
+        assert len(messages) > 1
+        assert all(len(message) <= 500 for message in messages)
+        joined = "\n".join(messages)
+        for block in blocks:
+            assert block in joined
+        assert messages[0].endswith(f"(1/{len(messages)})")
+        assert messages[-1].endswith(f"({len(messages)}/{len(messages)})")
+
+    def test_fills_messages_greedily(self):
+        """Test that messages are packed as full as possible"""
+        blocks = ["a" * 100] * 10
+
+        messages = pack_blocks(blocks, limit=350)
+
+        # 3 blocks (302 chars) fit under 350 - 16 reserved for the page label
+        assert len(messages) == 4
+
+    def test_oversized_block_is_split(self):
+        """Test that a single block larger than the limit is still delivered"""
+        blocks = ["\n".join(["line"] * 50), "y" * 250]
+
+        messages = pack_blocks(blocks, limit=100)
+
+        assert all(len(message) <= 100 for message in messages)
+        assert sum(message.count("line") for message in messages) == 50
+
+    def test_deterministic(self):
+        """Test identical input produces identical paging"""
+        blocks = [f"block {i}" * 20 for i in range(50)]
+
+        assert pack_blocks(blocks, limit=1000) == pack_blocks(blocks, limit=1000)
+
+
+class TestBlockPacker:
+    """Test suite for the streaming BlockPacker"""
+
+    def test_emits_full_messages_before_finish(self):
+        """Test that messages leave the packer as soon as they fill, with the same paging as pack_blocks"""
+        # Arrange
+        messages = []
+        packer = BlockPacker(messages.append, limit=350)
+        blocks = ["a" * 100] * 10
+
+        # Act
+        for block in blocks[:4]:
+            packer.add(block)
+        emitted = list(messages)
+        for block in blocks[4:]:
+            packer.add(block)
+        total = packer.finish()
+
+        # Assert
+        assert emitted == ["\n".join(["a" * 100] * 3) + "\n(1)"]
+        assert total == 4
+        assert messages[-1].endswith("(4/4)")
+        assert [m.rsplit("\n", 1)[0] for m in messages] == [m.rsplit("\n", 1)[0] for m in pack_blocks(blocks, limit=350)]
+
+    def test_single_message_has_no_label(self):
+        """Test that a report that fits in one message is emitted unlabeled"""
+        messages = []
+        packer = BlockPacker(messages.append)
+
+        packer.add("header\n")
+        packer.add("total")
+
+        assert packer.finish() == 1
+        assert messages == ["header\n\ntotal"]
+
+
+class TestBatchMessages:
+    """Test suite for batch_messages"""
+
+    def test_batches_of_five(self):
+        """Test that messages are grouped five per push"""
+        batches = batch_messages(list(range(12)))
+
+        assert [len(batch) for batch in batches] == [5, 5, 2]
@@ -0,0 +1,88 @@
+"""
+Unit tests for RunMetrics
+"""
+import json
+import pytest
+from src.utils.metrics import RunMetrics
+
+
+class TestRunMetrics:
+    """Test suite for RunMetrics"""
+
+    def test_disabled_metrics_record_nothing(self):
+        """Test that a disabled recorder hands out a no-op span and keeps no data"""
+        metrics = RunMetrics()
+
+        with metrics.span("navigate", strategy="https://a"):
+            pass
+        metrics.increment("rows_scraped", 10)
+        metrics.set_gauge("run_success", 1)
+
+        assert metrics.span("navigate") is metrics.span("extract")
+        assert metrics.spans == []
+        assert metrics.counters == {}
+        assert metrics.gauges == {}
+
+    def test_span_records_duration_and_error(self):
+        """Test that spans record their duration and the exception type on failure"""
+        metrics = RunMetrics(enabled=True)
+
+        with metrics.span("navigate", strategy="https://a"):
+            pass
+        with pytest.raises(ValueError):
+            with metrics.span("extract", strategy="https://a"):
+                raise ValueError("boom")
+
+        navigate, extract = metrics.spans
+        assert navigate["name"] == "navigate"
+        assert navigate["labels"] == {"strategy": "https://a"}
+        assert navigate["seconds"] >= 0
+        assert navigate["error"] is None
+        assert extract["error"] == "ValueError"
+
+    def test_counters_accumulate_per_label_set(self):
+        """Test that counters with the same labels are summed"""
+        metrics = RunMetrics(enabled=True)
+
+        metrics.increment("rows_scraped", 3, strategy="https://a")
+        metrics.increment("rows_scraped", 4, strategy="https://a")
+        metrics.increment("rows_scraped", 5, strategy="https://b")
+
+        counters = {c["labels"]["strategy"]: c["value"] for c in metrics.to_dict()["counters"]}
+        assert counters == {"https://a": 7, "https://b": 5}
+
+    def test_prometheus_export(self, tmp_path):
+        """Test the Prometheus textfile format"""
+        metrics = RunMetrics(enabled=True)
+        metrics.record("rows_stable", 0.25, strategy='https://a/"x"')
+        metrics.record("rows_stable", 0.5, error="TimeoutException", strategy='https://a/"x"')
+        metrics.increment("line_retries", 2)
+        metrics.set_gauge("run_success", 1)
+
+        path = tmp_path / "finlab.prom"
+        metrics.export_prometheus(str(path))
+        text = path.read_text(encoding="utf-8")
+
+        labels = '{phase="rows_stable",strategy="https://a/\\"x\\""}'
+        assert f"finlab_phase_duration_seconds{labels} 0.750000" in text
+        assert f"finlab_phase_runs{labels} 2" in text
+        assert f"finlab_phase_errors{labels} 1" in text
+        assert "finlab_line_retries 2" in text
+        assert "finlab_run_success 1" in text
+        assert "finlab_last_run_timestamp_seconds" in text
+        assert text.endswith("\n")
+
+    def test_json_export_and_reset(self, tmp_path):
+        """Test that the JSON run report is written and reset clears it"""
+        metrics = RunMetrics(enabled=True)
+        metrics.record("navigate", 1.5, strategy="https://a")
+
+        path = tmp_path / "reports" / "run.json"
+        metrics.export_json(str(path))
+        report = json.loads(path.read_text(encoding="utf-8"))
+
+        assert report["spans"][0]["name"] == "navigate"
+        assert report["spans"][0]["seconds"] == 1.5
+
+        metrics.reset()
+        assert metrics.spans == []
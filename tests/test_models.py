@@ -0,0 +1,111 @@
+"""
+Unit tests for typed holding records
+"""
+import math
+from datetime import date
+import pytest
+from src.models import (
+    Holding,
+    holdings_to_arrays,
+    holdings_to_dataframe,
+    parse_holdings,
+)
+from src.utils.formatter import print_scrape_results
+
+
+ROWS = [
+    {
+        'name': '科嶠',
+        'stock_id': '4542',
+        'entry_date': '2026/2/6',
+        'profit_percentage': '▴ 10.00%',
+        'current_weight': '20.0%'
+    },
+    {
+        'name': '青雲',
+        'stock_id': '5386',
+        'entry_date': 'N/A',
+        'profit_percentage': '▾ 3.50%',
+        'current_weight': 'N/A'
+    },
+]
+
+
+class TestHolding:
+    """Test suite for Holding"""
+
+    def test_from_row_parses_numeric_fields(self):
+        """Test percentages and dates are parsed once at construction"""
+        holding = Holding.from_row(ROWS[0])
+
+        assert holding.entry_date == date(2026, 2, 6)
+        assert holding.profit_percentage == 10.0
+        assert holding.current_weight == 20.0
+
+    def test_missing_values_become_none(self):
+        """Test N/A fields are stored as None"""
+        holding = Holding.from_row(ROWS[1])
+
+        assert holding.entry_date is None
+        assert holding.current_weight is None
+        assert holding.profit_percentage == -3.5
+
+    def test_uses_slots(self):
+        """Test that Holding has no per-instance __dict__"""
+        holding = Holding.from_row(ROWS[0])
+
+        assert not hasattr(holding, '__dict__')
+        with pytest.raises(AttributeError):
+            holding.extra = 1
+
+    def test_dict_compatible_access(self):
+        """Test get/[] return the original display text"""
+        holding = Holding.from_row(ROWS[0])
+
+        assert holding.get('profit_percentage') == '▴ 10.00%'
+        assert holding['name'] == '科嶠'
+        assert holding.get('unknown', 'x') == 'x'
+        assert holding.to_dict() == ROWS[0]
+
+    def test_display_without_source_text(self):
+        """Test holdings built from values still render"""
+        holding = Holding('台積電', '2330', date(2026, 1, 5), 1.5, None)
+
+        assert holding.get('entry_date') == '2026/1/5'
+        assert holding.get('profit_percentage') == '1.50%'
+        assert holding.get('current_weight') == 'N/A'
+
+
+class TestColumnarViews:
+    """Test suite for NumPy and pandas conversions"""
+
+    def test_holdings_to_arrays(self):
+        """Test columnar arrays use NaN/NaT for missing values"""
+        arrays = holdings_to_arrays(parse_holdings(ROWS))
+
+        assert arrays['profit_percentage'].tolist() == [10.0, -3.5]
+        assert math.isnan(arrays['current_weight'][1])
+        assert str(arrays['entry_date'][1]) == 'NaT'
+
+    def test_holdings_to_dataframe(self):
+        """Test DataFrame conversion keeps one row per holding"""
+        frame = holdings_to_dataframe(ROWS)
+
+        assert list(frame['stock_id']) == ['4542', '5386']
+        assert frame['current_weight'].sum() == 20.0
+
+    def test_empty(self):
+        """Test empty scrapes convert to empty frames"""
+        assert len(holdings_to_dataframe([])) == 0
+
+
+class TestFormatterAcceptsHolding:
+    """Test suite for formatter compatibility with Holding"""
+
+    def test_print_scrape_results_with_holdings(self, capsys):
+        """Test print_scrape_results renders Holding records"""
+        print_scrape_results(parse_holdings(ROWS))
+
+        output = capsys.readouterr().out
+        assert '股票名稱: 科嶠' in output
+        assert '獲利趴數: ▴ 10.00%' in output
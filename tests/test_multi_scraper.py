@@ -0,0 +1,155 @@
+"""
+Unit tests for concurrent multi-strategy scraping
+"""
+import threading
+import time
+from unittest.mock import Mock, patch
+from src.models import parse_holdings
+from src.multi_scraper import scrape_strategies
+from src.pipeline import DiffStage
+
+
+def row(stock_id, profit='1.00%'):
+    return {'name': f'Stock {stock_id}', 'stock_id': stock_id, 'entry_date': '2024/1/2',
+            'profit_percentage': profit, 'current_weight': '10.00%'}
+
+
+def batches(*rows):
+    """Holding batches as yielded by FinlabStrategyScraper.iter_holdings, one row per batch"""
+    return iter([parse_holdings([r]) for r in rows])
+
+
+class TestScrapeStrategies:
+    """Test suite for scrape_strategies"""
+
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_results_keyed_by_strategy_in_input_order(self, mock_scraper_cls):
+        """Test that results are keyed by URL and keep the input order"""
+        # Arrange
+        mock_scraper_cls.return_value.iter_holdings.side_effect = lambda url: batches(row(url[-1]))
+        urls = ['https://a/1', 'https://a/2', 'https://a/1']
+
+        # Act
+        results = scrape_strategies(urls, max_workers=2, pool=Mock())
+
+        # Assert
+        assert list(results) == ['https://a/1', 'https://a/2']
+        assert results['https://a/2'] == {'data': [row('2')], 'error': None}
+
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_failing_strategy_does_not_abort_others(self, mock_scraper_cls):
+        """Test that one failure is recorded while the rest still succeed"""
+        # Arrange
+        def iter_holdings(url):
+            if url.endswith('bad'):
+                raise RuntimeError("layout changed")
+            return batches()
+        mock_scraper_cls.return_value.iter_holdings.side_effect = iter_holdings
+
+        # Act
+        results = scrape_strategies(['https://ok', 'https://bad'], max_workers=2, pool=Mock())
+
+        # Assert
+        assert results['https://ok'] == {'data': [], 'error': None}
+        assert results['https://bad']['data'] is None
+        assert results['https://bad']['error'] == "layout changed"
+
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_runs_concurrently_up_to_max_workers(self, mock_scraper_cls):
+        """Test that at most max_workers scrapes run at the same time"""
+        # Arrange
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def iter_holdings(url):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.02)
+            with lock:
+                state['active'] -= 1
+            return batches()
+        mock_scraper_cls.return_value.iter_holdings.side_effect = iter_holdings
+
+        # Act
+        scrape_strategies([f'https://s/{i}' for i in range(8)], max_workers=3, pool=Mock())
+
+        # Assert
+        assert state['peak'] == 3
+
+    @patch('src.multi_scraper.DriverPool')
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_owned_pool_is_closed(self, mock_scraper_cls, mock_pool_cls):
+        """Test that a pool created by scrape_strategies is sized and closed"""
+        # Arrange
+        mock_scraper_cls.return_value.iter_holdings.side_effect = lambda url: batches()
+
+        # Act
+        scrape_strategies(['https://a', 'https://b'], max_workers=4)
+
+        # Assert
+        mock_pool_cls.assert_called_once_with(size=2, profile=None, supervisor=None, backend='selenium')
+        mock_pool_cls.return_value.close.assert_called_once()
+
+    @patch('src.multi_scraper.create_session')
+    @patch('src.multi_scraper.HttpStrategyScraper')
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_http_fast_path_skips_browser(self, mock_scraper_cls, mock_http_cls, mock_session):
+        """Test that rows from the HTTP fast path are used without starting a browser"""
+        # Arrange
+        mock_http_cls.return_value.scrape.return_value = [row('2330')]
+
+        # Act
+        results = scrape_strategies(['https://a'], pool=Mock(), http_fast_path=True)
+
+        # Assert
+        assert results['https://a']['data'] == [row('2330')]
+        mock_scraper_cls.return_value.iter_holdings.assert_not_called()
+        mock_session.return_value.close.assert_called_once()
+
+    @patch('src.multi_scraper.create_session')
+    @patch('src.multi_scraper.HttpStrategyScraper')
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_http_miss_falls_back_to_browser(self, mock_scraper_cls, mock_http_cls, mock_session):
+        """Test that the browser is used when the HTTP fast path finds no holdings"""
+        # Arrange
+        mock_http_cls.return_value.scrape.return_value = []
+        mock_scraper_cls.return_value.iter_holdings.side_effect = lambda url: batches(row('2330'))
+
+        # Act
+        results = scrape_strategies(['https://a'], pool=Mock(), http_fast_path=True)
+
+        # Assert
+        assert results['https://a']['data'] == [row('2330')]
+        mock_scraper_cls.return_value.iter_holdings.assert_called_once_with('https://a')
+
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_stages_consume_batches_while_scraping(self, mock_scraper_cls):
+        """Test that per-strategy stages see every batch and their results are returned"""
+        # Arrange
+        mock_scraper_cls.return_value.iter_holdings.side_effect = lambda url: batches(row('1', '20.00%'), row('2'))
+        previous = [row('1'), row('3')]
+
+        # Act
+        results = scrape_strategies(['https://a'], pool=Mock(), stages=lambda url: [DiffStage(previous)])
+
+        # Assert
+        diff = results['https://a']['stages'][0]
+        assert [change.key for change in diff.entries] == ['2']
+        assert [change.key for change in diff.exits] == ['3']
+        assert [change.key for change in diff.profit_moves] == ['1']
+        assert results['https://a']['data'] == [row('1', '20.00%'), row('2')]
+
+    @patch('src.multi_scraper.FinlabStrategyScraper')
+    def test_rows_are_not_kept_without_collect(self, mock_scraper_cls):
+        """Test that collect=False returns only the stage results"""
+        # Arrange
+        mock_scraper_cls.return_value.iter_holdings.side_effect = lambda url: batches(row('1'), row('2'))
+
+        # Act
+        results = scrape_strategies(['https://a'], pool=Mock(), collect=False,
+                                    stages=lambda url: [DiffStage([row('1')])])
+
+        # Assert
+        assert results['https://a']['data'] is None
+        assert [change.key for change in results['https://a']['stages'][0].entries] == ['2']
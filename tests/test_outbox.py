@@ -0,0 +1,173 @@
+"""
+Unit tests for the LINE delivery outbox
+"""
+from unittest.mock import Mock, patch
+from linebot.exceptions import LineBotApiError
+from linebot.models.error import Error
+from src.line_notification import LineNotification
+from src.outbox import DEAD, PENDING, Outbox
+
+
+def api_error(status):
+    return LineBotApiError(status, {}, error=Error(message=f'status {status}'))
+
+
+class TestOutbox:
+    """Test suite for Outbox storage"""
+
+    def test_entries_survive_reopen_in_order(self, tmp_path):
+        """Test that pending entries are persisted and returned in enqueue order"""
+        # Arrange
+        path = str(tmp_path / 'outbox.sqlite3')
+        with Outbox(path) as outbox:
+            first, second = outbox.enqueue([('U1', [{'type': 'text', 'text': '一'}]),
+                                            (['U2', 'U3'], [{'type': 'text', 'text': '二'}])])
+            outbox.mark_sent(first)
+
+        # Act
+        with Outbox(path) as outbox:
+            due = outbox.due()
+            pending = outbox.pending_count()
+
+        # Assert
+        assert [entry.id for entry in due] == [second]
+        assert due[0].to == ['U2', 'U3']
+        assert due[0].messages[0]['text'] == '二'
+        assert due[0].message_count == 2
+        assert pending == 1
+
+    def test_mark_replaced_skips_sent_entries(self):
+        """Test that replaced entries leave the queue and dead-letter list but sent ones are kept"""
+        # Arrange
+        outbox = Outbox(':memory:')
+        sent, dead, pending = outbox.enqueue([('U1', [{'type': 'text', 'text': str(i)}]) for i in range(3)])
+        outbox.mark_sent(sent)
+        outbox.mark_failed(dead, 'status 400', retryable=False)
+
+        # Act
+        count = outbox.mark_replaced([sent, dead, pending], '改送文字')
+
+        # Assert
+        assert count == 2
+        assert outbox.due() == []
+        assert outbox.dead_letters() == []
+
+    def test_backoff_and_dead_letter(self):
+        """Test exponential backoff, max attempts and non-retryable failures"""
+        # Arrange
+        outbox = Outbox(':memory:', max_attempts=3, backoff_base=10)
+        retried, rejected = outbox.enqueue([('U1', []), ('U2', [])], now=0)
+
+        # Act
+        statuses = [outbox.mark_failed(retried, 'timeout', now=0)]
+        due_too_early = outbox.due(now=9)
+        due_after_backoff = outbox.due(now=10)
+        statuses.append(outbox.mark_failed(retried, 'timeout', now=10))
+        statuses.append(outbox.mark_failed(retried, 'timeout', now=30))
+        rejected_status = outbox.mark_failed(rejected, 'bad request', retryable=False, now=0)
+
+        # Assert
+        assert statuses == [PENDING, PENDING, DEAD]
+        assert [entry.id for entry in due_too_early] == [rejected]
+        assert [entry.id for entry in due_after_backoff] == [retried, rejected]
+        assert rejected_status == DEAD
+        assert [(dead['id'], dead['attempts']) for dead in outbox.dead_letters()] == [(retried, 3), (rejected, 1)]
+        assert outbox.pending_count() == 0
+
+    def test_purge_sent(self):
+        """Test that only sent entries past the retention period are purged"""
+        outbox = Outbox(':memory:')
+        old, recent, pending = outbox.enqueue([('U1', []), ('U1', []), ('U1', [])], now=0)
+        outbox.mark_sent(old, now=0)
+        outbox.mark_sent(recent, now=100)
+
+        assert outbox.purge_sent(older_than=50, now=120) == 1
+        assert outbox.pending_count() == 1
+
+
+class TestLineNotificationOutbox:
+    """Test suite for LineNotification delivery through the outbox"""
+
+    @patch('src.line_notification.LineBotApi')
+    def test_transient_failure_is_kept_and_resent_with_same_retry_key(self, mock_api):
+        """Test that a 5xx keeps the message for the next flush instead of raising"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        mock_api_instance.push_message.side_effect = [api_error(503), None]
+        outbox = Outbox(':memory:', backoff_base=0)
+        notifier = LineNotification('token', 'U1', outbox=outbox)
+
+        # Act
+        sent = notifier.send_text_message('hello')
+        pending = outbox.pending_count()
+        result = notifier.flush_outbox()
+
+        # Assert
+        assert sent is True
+        assert pending == 1
+        assert result == {'sent': 1, 'pending': 0, 'dead': {}}
+        keys = [call.kwargs['retry_key'] for call in mock_api_instance.push_message.call_args_list]
+        assert keys[0] == keys[1]
+        assert outbox.pending_count() == 0
+
+    @patch('src.line_notification.LineBotApi')
+    def test_failure_blocks_later_messages_for_the_same_recipient(self, mock_api):
+        """Test that messages to a recipient are not delivered out of order"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        mock_api_instance.push_message.side_effect = [api_error(429), None]
+        outbox = Outbox(':memory:')
+        outbox.enqueue([('U1', [{'type': 'text', 'text': '1'}]),
+                        ('U1', [{'type': 'text', 'text': '2'}]),
+                        ('U2', [{'type': 'text', 'text': '3'}])])
+        notifier = LineNotification('token', None, outbox=outbox)
+
+        # Act
+        result = notifier.flush_outbox()
+
+        # Assert
+        assert result == {'sent': 1, 'pending': 2, 'dead': {}}
+        assert [call.args[0] for call in mock_api_instance.push_message.call_args_list] == ['U1', 'U2']
+
+    @patch('src.line_notification.LineBotApi')
+    def test_rejected_flex_is_replaced_and_resent_as_text(self, mock_api):
+        """Test that a 400 marks the Flex message as replaced and the text fallback is delivered"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        mock_api_instance.push_message.side_effect = [api_error(400), None]
+        outbox = Outbox(':memory:')
+        notifier = LineNotification('token', 'U1', flex_reports=True, outbox=outbox)
+
+        # Act
+        result = notifier.send_stock_data([{'name': '科嶠', 'stock_id': '4542'}])
+
+        # Assert
+        assert result is True
+        assert outbox.dead_letters() == []
+        assert mock_api_instance.push_message.call_args.args[1].type == 'text'
+        assert outbox.pending_count() == 0
+
+    @patch('src.line_notification.LineBotApi')
+    def test_text_fallback_only_goes_to_rejected_group(self, mock_api):
+        """Test that only the multicast group whose Flex push was rejected gets the text report"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        mock_api_instance.multicast.side_effect = [None, api_error(400), None]
+        outbox = Outbox(':memory:')
+        notifier = LineNotification('token', None, flex_reports=True, outbox=outbox)
+        recipients = [f'U{i}' for i in range(502)]
+
+        # Act
+        notifier.send_stock_data([{'name': '科嶠', 'stock_id': '4542'}], recipients=recipients)
+
+        # Assert
+        calls = mock_api_instance.multicast.call_args_list
+        assert [len(call.args[0]) for call in calls] == [500, 2, 2]
+        assert calls[2].args[0] == ['U500', 'U501']
+        assert calls[2].args[1].type == 'text'
+        assert outbox.dead_letters() == []
+        assert outbox.pending_count() == 0
@@ -0,0 +1,211 @@
+"""
+Unit tests for streaming extraction and the batch pipeline
+"""
+import tracemalloc
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from src.diff import diff_holdings
+from src.extraction import COUNT_ROWS_SCRIPT, EXTRACT_ROWS_SCRIPT, extract_rows_bulk, iter_row_batches
+from src.line_notification import format_stock_block, stock_report_blocks
+from src.pipeline import CollectStage, DiffStage, PipelineStage, PrintStage, ReportStage, run_pipeline
+from src.scraper import FinlabStrategyScraper
+
+
+def make_row(index):
+    return {
+        'name': f'股票{index}',
+        'stock_id': str(1000 + index),
+        'entry_date': '2026/2/6',
+        'profit_percentage': f'▴ {index % 50}.00%',
+        'current_weight': '1.0%',
+    }
+
+
+def table_driver(row_count):
+    """A mock driver whose page holds row_count rows, generated on demand"""
+    def execute_script(script, *args):
+        if script == COUNT_ROWS_SCRIPT:
+            return row_count
+        if script == EXTRACT_ROWS_SCRIPT:
+            start, end = args[2], args[3]
+            return [make_row(i) for i in range(start, min(end, row_count))]
+        return True
+
+    driver = Mock()
+    driver.execute_script.side_effect = execute_script
+    return driver
+
+
+class TestIterRowBatches:
+    """Test suite for batched extraction"""
+
+    def test_batches_cover_table_in_order(self):
+        """Test that slices are requested batch by batch"""
+        driver = table_driver(5)
+
+        batches = list(iter_row_batches(driver, batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [row['stock_id'] for batch in batches for row in batch] == ['1000', '1001', '1002', '1003', '1004']
+
+    def test_unknown_row_count_falls_back_to_single_batch(self):
+        """Test that a driver that cannot count rows yields one full extraction"""
+        driver = Mock()
+        driver.find_elements.return_value = []
+
+        assert list(iter_row_batches(driver, batch_size=2)) == [[]]
+
+
+class TestIterHoldings:
+    """Test suite for FinlabStrategyScraper.iter_holdings"""
+
+    @patch('src.scraper.create_chrome_driver')
+    @patch('src.scraper.resolve_browser_paths', return_value=('/path/to/chromedriver', None))
+    def test_browser_closes_before_last_batch_is_consumed(self, mock_resolve, mock_create):
+        """Test that the browser is quit as soon as the last batch has been extracted"""
+        # Arrange
+        driver = table_driver(5)
+        mock_create.return_value = driver
+        scraper = FinlabStrategyScraper()
+        quit_before_batch = []
+
+        # Act
+        for batch in scraper.iter_holdings('https://example.com', batch_size=2):
+            quit_before_batch.append(driver.quit.called)
+
+        # Assert
+        assert quit_before_batch == [False, False, True]
+        driver.quit.assert_called_once()
+        assert scraper.driver is None
+
+    @patch('src.scraper.collect_page_load_stats', return_value=None)
+    @patch('src.scraper.create_chrome_driver')
+    @patch('src.scraper.resolve_browser_paths', return_value=('/path/to/chromedriver', None))
+    def test_empty_table_is_reported(self, mock_resolve, mock_create, mock_stats, capsys):
+        """Test that a table without rows still logs the result, records page stats and closes the browser"""
+        # Arrange
+        driver = table_driver(0)
+        mock_create.return_value = driver
+        scraper = FinlabStrategyScraper()
+
+        # Act
+        batches = list(scraper.iter_holdings('https://example.com', batch_size=2))
+
+        # Assert
+        assert batches == []
+        assert '成功抓取 0 筆資料' in capsys.readouterr().out
+        mock_stats.assert_called_once()
+        driver.quit.assert_called_once()
+
+    def test_pooled_driver_is_returned_on_early_exit(self):
+        """Test that stopping early releases the pooled driver"""
+        # Arrange
+        driver = table_driver(10)
+        pool = MagicMock()
+        pool.acquire.return_value.__enter__.return_value = driver
+        scraper = FinlabStrategyScraper(pool=pool)
+
+        # Act
+        batches = scraper.iter_holdings('https://example.com', batch_size=3)
+        first = next(batches)
+        batches.close()
+
+        # Assert
+        assert [h.stock_id for h in first] == ['1000', '1001', '1002']
+        pool.acquire.return_value.__exit__.assert_called_once()
+        driver.quit.assert_not_called()
+
+
+class TestPipeline:
+    """Test suite for the batch pipeline stages"""
+
+    def test_stages_match_list_based_results(self, capsys):
+        """Test that streaming stages produce the same diff and report as the list-based code"""
+        # Arrange
+        current = [make_row(i) for i in range(7)]
+        previous = [make_row(i) for i in range(2, 9)]
+        previous[0]['current_weight'] = '3.0%'
+        batches = [current[:3], current[3:6], current[6:]]
+        blocks = []
+
+        # Act
+        count, diff, reported, rows = run_pipeline(
+            iter(batches), [PrintStage(), DiffStage(previous), ReportStage(blocks.append, 'https://s'), CollectStage()]
+        )
+
+        # Assert
+        expected = diff_holdings(previous, current)
+        assert count == 7
+        assert [c.key for c in diff.entries] == [c.key for c in expected.entries]
+        assert [c.key for c in diff.exits] == [c.key for c in expected.exits]
+        assert [c.key for c in diff.weight_changes] == ['1002']
+        assert reported == 7
+        assert blocks == stock_report_blocks([format_stock_block(i, row) for i, row in enumerate(current, 1)], 'https://s')
+        assert rows == current
+        assert '共 7 筆資料' in capsys.readouterr().out
+
+    def test_report_blocks_are_emitted_per_batch(self):
+        """Test that ReportStage hands blocks on as batches arrive instead of at finish"""
+        # Arrange
+        blocks = []
+        stage = ReportStage(blocks.append)
+
+        # Act
+        stage.consume([make_row(0), make_row(1)])
+        emitted = len(blocks)
+        stage.finish()
+        empty = []
+        run_pipeline(iter([]), [ReportStage(empty.append, 'https://s')])
+
+        # Assert
+        assert emitted == 3
+        assert blocks[-1] == '總計: 2 檔股票'
+        assert empty == ['目前無持股資料\n策略: https://s']
+
+    def test_stage_must_implement_consume(self):
+        """Test that PipelineStage is abstract over consume"""
+        class Incomplete(PipelineStage):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+    def test_streaming_keeps_less_in_memory(self):
+        """Test that streaming a large table peaks well below materialising it as one list"""
+        driver = FakeTableDriver(20_000)
+
+        def peak(func):
+            tracemalloc.start()
+            func()
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return result
+
+        streaming = peak(lambda: run_pipeline(iter_row_batches(driver, batch_size=200), [PrintCountStage()]))
+        materialised = peak(lambda: extract_rows_bulk(driver))
+
+        assert streaming < materialised / 10
+
+
+class FakeTableDriver:
+    """Minimal driver without call recording, so memory measurements only see the rows"""
+
+    def __init__(self, row_count):
+        self.row_count = row_count
+
+    def execute_script(self, script, *args):
+        if script == COUNT_ROWS_SCRIPT:
+            return self.row_count
+        start = args[2]
+        end = self.row_count if args[3] is None else min(args[3], self.row_count)
+        return [make_row(i) for i in range(start, end)]
+
+
+class PrintCountStage(PrintStage):
+    """PrintStage that counts rows without printing them"""
+
+    def consume(self, batch):
+        self.count += len(batch)
+
+    def finish(self):
+        self.result = self.count
@@ -0,0 +1,105 @@
+"""
+Unit tests for readiness conditions
+"""
+import pytest
+from unittest.mock import Mock
+from selenium.common.exceptions import TimeoutException
+from src.readiness import (
+    ReadinessCondition,
+    ReadinessWaiter,
+    network_idle,
+    rows_stable,
+    tab_active,
+)
+
+
+class TestReadinessWaiter:
+    """Test suite for ReadinessWaiter"""
+
+    def test_wait_for_returns_predicate_value(self):
+        """Test that the predicate's truthy value is returned"""
+        # Arrange
+        waiter = ReadinessWaiter(Mock())
+        condition = ReadinessCondition("ready", lambda driver: 42, timeout=1)
+
+        # Act
+        result = waiter.wait_for(condition)
+
+        # Assert
+        assert result == 42
+        assert 'ready' in waiter.timings
+
+    def test_wait_for_polls_until_ready(self):
+        """Test that the condition is polled until it becomes truthy"""
+        # Arrange
+        answers = iter([False, False, True])
+        waiter = ReadinessWaiter(Mock())
+        condition = ReadinessCondition("ready", lambda driver: next(answers), timeout=1, poll_frequency=0.01)
+
+        # Act & Assert
+        assert waiter.wait_for(condition) is True
+
+    def test_wait_for_timeout_still_records_timing(self):
+        """Test that a timed-out condition raises and records its wait"""
+        # Arrange
+        waiter = ReadinessWaiter(Mock())
+        condition = ReadinessCondition("never", lambda driver: False, timeout=0.05, poll_frequency=0.01)
+
+        # Act & Assert
+        with pytest.raises(TimeoutException):
+            waiter.wait_for(condition)
+        assert waiter.timings['never'] >= 0.05
+
+    def test_report_lists_each_phase(self):
+        """Test report formatting"""
+        waiter = ReadinessWaiter(Mock())
+        waiter.timings = {'network_idle': 0.5, 'rows_stable': 0.25}
+
+        assert waiter.report() == "network_idle=0.50s, rows_stable=0.25s"
+
+
+class TestConditions:
+    """Test suite for the built-in readiness conditions"""
+
+    def test_network_idle_passes_quiet_window(self):
+        """Test network idle evaluates the in-page script with the quiet window"""
+        driver = Mock()
+        driver.execute_script.return_value = True
+
+        condition = network_idle(timeout=3, quiet_ms=250)
+
+        assert condition.predicate(driver) is True
+        assert driver.execute_script.call_args[0][1] == 250
+        assert condition.timeout == 3
+
+    def test_tab_active_uses_selector(self):
+        """Test tab active checks the given tab selector"""
+        driver = Mock()
+        driver.execute_script.return_value = False
+
+        condition = tab_active("div[role='tablist'] > a:last-child", timeout=2)
+
+        assert condition.predicate(driver) is False
+        assert driver.execute_script.call_args[0][1] == "div[role='tablist'] > a:last-child"
+
+    def test_rows_stable_uses_async_script(self):
+        """Test rows stable waits across animation frames via async script"""
+        driver = Mock()
+        driver.execute_async_script.return_value = 12
+
+        condition = rows_stable("table tbody tr", timeout=2)
+
+        assert condition.predicate(driver) == 12
+        assert 'requestAnimationFrame' in driver.execute_async_script.call_args[0][0]
+
+    def test_rows_stable_passes_quiet_window_for_empty_tables(self):
+        """Test rows stable hands the network quiet window to the script so an empty table can settle"""
+        driver = Mock()
+        driver.execute_async_script.return_value = True
+
+        condition = rows_stable("table tbody tr", timeout=2, quiet_ms=250)
+
+        assert condition.predicate(driver) is True
+        script, selector, quiet_ms = driver.execute_async_script.call_args[0]
+        assert 'networkIdle(quietMs)' in script
+        assert (selector, quiet_ms) == ("table tbody tr", 250)
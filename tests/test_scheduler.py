@@ -0,0 +1,62 @@
+"""
+Unit tests for MarketSchedule
+"""
+from datetime import date, datetime, time, timezone
+import pytest
+from src.scheduler import TAIPEI_TZ, MarketSchedule, parse_holidays, parse_run_times
+
+
+def taipei(*args):
+    return datetime(*args, tzinfo=TAIPEI_TZ)
+
+
+class TestMarketSchedule:
+    """Test suite for MarketSchedule"""
+
+    def test_parse_run_times(self):
+        """Test that run times are parsed, deduplicated and sorted"""
+        assert parse_run_times("13:45, 08:30,8:30") == [time(8, 30), time(13, 45)]
+        with pytest.raises(ValueError):
+            parse_run_times("25:00")
+
+    def test_next_run_same_day(self):
+        """Test picking the next slot later on the same trading day"""
+        schedule = MarketSchedule(run_times=parse_run_times("08:30,13:45"))
+
+        # 2026-10-13 is a Tuesday
+        assert schedule.next_run(taipei(2026, 10, 13, 10, 0)) == taipei(2026, 10, 13, 13, 45)
+        assert schedule.next_run(taipei(2026, 10, 13, 8, 30)) == taipei(2026, 10, 13, 13, 45)
+
+    def test_next_run_skips_weekends_and_holidays(self):
+        """Test that weekends and configured holidays are skipped"""
+        schedule = MarketSchedule(
+            run_times=parse_run_times("08:30"),
+            holidays=parse_holidays("2026-10-19"),
+        )
+
+        # Friday evening -> Monday is a holiday -> Tuesday morning
+        assert schedule.next_run(taipei(2026, 10, 16, 18, 0)) == taipei(2026, 10, 20, 8, 30)
+
+    def test_next_run_converts_timezones(self):
+        """Test that a UTC 'now' is evaluated in Taipei time"""
+        schedule = MarketSchedule(run_times=parse_run_times("08:30"))
+
+        # 2026-10-13 00:00 UTC is 08:00 in Taipei
+        now = datetime(2026, 10, 13, 0, 0, tzinfo=timezone.utc)
+        assert schedule.next_run(now) == taipei(2026, 10, 13, 8, 30)
+
+    def test_interval_slots_cover_market_session(self):
+        """Test that interval slots only fall inside the trading session"""
+        schedule = MarketSchedule(run_times=[], interval_minutes=90)
+
+        slots = [slot.time() for slot in schedule.slots(date(2026, 10, 13))]
+
+        assert slots == [time(9, 0), time(10, 30), time(12, 0), time(13, 30)]
+        assert schedule.slots(date(2026, 10, 17)) == []
+        assert schedule.is_market_open(taipei(2026, 10, 13, 13, 30))
+        assert not schedule.is_market_open(taipei(2026, 10, 13, 13, 31))
+
+    def test_empty_schedule_raises(self):
+        """Test that a schedule without any slot is rejected"""
+        with pytest.raises(ValueError):
+            MarketSchedule(run_times=[]).next_run(taipei(2026, 10, 13, 8, 0))
@@ -3,7 +3,9 @@ Unit tests for FinlabStrategyScraper
 """
 import pytest
 from unittest.mock import Mock, patch, MagicMock
-from src.scraper import FinlabStrategyScraper
+from selenium.common.exceptions import SessionNotCreatedException
+from src.scraper import FinlabStrategyScraper, launch_browser
+from src.utils.metrics import RunMetrics
 
 
 class TestFinlabStrategyScraper:
@@ -14,7 +16,7 @@ class TestFinlabStrategyScraper:
         scraper = FinlabStrategyScraper()
         assert scraper.driver is None
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     def test_setup_driver(self, mock_chrome, mock_driver_manager):
         """Test WebDriver setup with correct options"""
@@ -42,8 +44,11 @@ class TestFinlabStrategyScraper:
         assert '--disable-gpu' in options.arguments
         # Check user-agent is set
         assert any('user-agent=' in arg for arg in options.arguments)
+        # Lean profile and request blocking are on by default
+        assert '--disable-extensions' in options.arguments
+        mock_driver_instance.execute_cdp_cmd.assert_any_call('Network.enable', {})
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     @patch('src.scraper.time.sleep')
     def test_scrape_success(self, mock_sleep, mock_chrome, mock_driver_manager):
@@ -66,7 +71,7 @@ class TestFinlabStrategyScraper:
         assert isinstance(result, list)
         assert result == []  # Empty list when no rows found
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     def test_scrape_exception_handling(self, mock_chrome, mock_driver_manager):
         """Test scraper handles exceptions properly"""
@@ -89,7 +94,7 @@ class TestFinlabStrategyScraper:
         # Verify driver was still closed
         mock_driver.quit.assert_called_once()
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     def test_scrape_driver_cleanup_on_error(self, mock_chrome, mock_driver_manager):
         """Test that driver is cleaned up even when errors occur"""
@@ -111,7 +116,7 @@ class TestFinlabStrategyScraper:
         # Verify cleanup happened
         mock_driver.quit.assert_called_once()
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     @patch('src.scraper.time.sleep')
     def test_scrape_url_is_accessed(self, mock_sleep, mock_chrome, mock_driver_manager):
@@ -130,10 +135,10 @@ class TestFinlabStrategyScraper:
 
         # Assert
         mock_driver.get.assert_called_once_with(test_url)
-        # Verify that sleep was called with 5 (initial page load wait)
-        assert any(call[0][0] == 5 for call in mock_sleep.call_args_list)
+        # Fixed sleeps were replaced by readiness conditions
+        mock_sleep.assert_not_called()
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     def test_scrape_no_driver_before_setup(self, mock_chrome, mock_driver_manager):
         """Test that driver is None before setup"""
@@ -143,7 +148,7 @@ class TestFinlabStrategyScraper:
         # Assert
         assert scraper.driver is None
 
-    @patch('src.scraper.ChromeDriverManager')
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
     @patch('src.scraper.webdriver.Chrome')
     @patch('src.scraper.time.sleep')
     def test_scrape_sets_driver_after_setup(self, mock_sleep, mock_chrome, mock_driver_manager):
@@ -162,3 +167,94 @@ class TestFinlabStrategyScraper:
 
         # Assert - driver should have been set (but then quit in finally)
         mock_chrome.assert_called_once()
+
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
+    @patch('src.scraper.webdriver.Chrome')
+    def test_scrape_records_phase_timings(self, mock_chrome, mock_driver_manager):
+        """Test that each readiness phase reports how long it waited"""
+        # Arrange
+        mock_driver = Mock()
+        mock_driver.find_elements.return_value = []
+        mock_chrome.return_value = mock_driver
+        mock_driver_manager.return_value.install.return_value = '/path/to/chromedriver'
+
+        scraper = FinlabStrategyScraper()
+
+        # Act
+        scraper.scrape("https://example.com")
+
+        # Assert
+        assert set(scraper.phase_timings) == {
+            'network_idle', 'iframe_attached', 'layout_probe', 'tab_active', 'rows_stable'
+        }
+        assert all(seconds >= 0 for seconds in scraper.phase_timings.values())
+
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
+    @patch('src.scraper.webdriver.Chrome')
+    def test_scrape_reports_phases_to_metrics(self, mock_chrome, mock_driver_manager):
+        """Test that each phase is exported as a metrics span when enabled"""
+        # Arrange
+        mock_driver = Mock()
+        mock_driver.find_elements.return_value = []
+        mock_chrome.return_value = mock_driver
+        mock_driver_manager.return_value.install.return_value = '/path/to/chromedriver'
+        recorder = RunMetrics(enabled=True)
+
+        scraper = FinlabStrategyScraper()
+
+        # Act
+        with patch('src.scraper.metrics', recorder):
+            scraper.scrape("https://example.com")
+
+        # Assert
+        phases = [span['name'] for span in recorder.spans]
+        assert phases == [
+            'driver_setup', 'navigate', 'network_idle', 'iframe_attached',
+            'layout_probe', 'tab_active', 'rows_stable', 'extract'
+        ]
+        assert recorder.spans[1]['labels'] == {'strategy': "https://example.com"}
+
+    def test_custom_timeouts_override_defaults(self):
+        """Test that per-condition timeouts can be overridden"""
+        scraper = FinlabStrategyScraper(timeouts={'rows_stable': 2})
+
+        assert scraper.timeouts['rows_stable'] == 2
+        assert scraper.timeouts['iframe_attached'] == 8
+
+    @patch('webdriver_manager.chrome.ChromeDriverManager')
+    @patch('src.scraper.webdriver.Chrome')
+    def test_scrape_with_pool_keeps_browser_open(self, mock_chrome, mock_driver_manager):
+        """Test that a pooled driver is borrowed and not quit after scraping"""
+        # Arrange
+        mock_driver = Mock()
+        mock_driver.find_elements.return_value = []
+        pool = MagicMock()
+        pool.acquire.return_value.__enter__.return_value = mock_driver
+
+        scraper = FinlabStrategyScraper(pool=pool)
+
+        # Act
+        scraper.scrape("https://example.com")
+
+        # Assert
+        mock_driver.get.assert_called_once_with("https://example.com")
+        mock_driver.quit.assert_not_called()
+        mock_chrome.assert_not_called()
+        assert scraper.driver is None
+
+    @patch('src.scraper.clear_driver_cache')
+    @patch('src.scraper.resolve_browser_paths', return_value=('/path/to/chromedriver', None))
+    @patch('src.scraper.create_chrome_driver')
+    def test_version_mismatch_clears_cache_and_retries(self, mock_create, mock_resolve, mock_clear):
+        """Test that SessionNotCreatedException clears the driver cache and retries once"""
+        # Arrange
+        driver = Mock()
+        mock_create.side_effect = [SessionNotCreatedException('version mismatch'), driver]
+
+        # Act
+        result = launch_browser(cache_path='/tmp/cache.json')
+
+        # Assert
+        assert result is driver
+        mock_clear.assert_called_once_with('/tmp/cache.json')
+        assert mock_resolve.call_count == 2
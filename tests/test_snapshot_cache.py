@@ -0,0 +1,62 @@
+"""
+Unit tests for SnapshotCache
+"""
+from src.snapshot_cache import SnapshotCache, content_hash
+
+
+ROWS = [{'name': '科嶠', 'stock_id': '4542', 'current_weight': '20.0%'}]
+
+
+class TestSnapshotCache:
+    """Test suite for SnapshotCache"""
+
+    def test_content_hash_ignores_key_order(self):
+        """Test that the hash only depends on content"""
+        reordered = [{'current_weight': '20.0%', 'stock_id': '4542', 'name': '科嶠'}]
+
+        assert content_hash(ROWS) == content_hash(reordered)
+        assert content_hash(ROWS) != content_hash([])
+
+    def test_put_reports_changes(self, tmp_path):
+        """Test that put returns True only when the content hash changes"""
+        cache = SnapshotCache(str(tmp_path / "snapshots.json"))
+
+        assert cache.put('https://a', ROWS) is True
+        assert cache.has_changed('https://a', ROWS) is False
+        assert cache.put('https://a', ROWS) is False
+        assert cache.put('https://a', []) is True
+
+    def test_get_fresh_respects_ttl(self, tmp_path):
+        """Test that snapshots are only served within the TTL"""
+        cache = SnapshotCache(str(tmp_path / "snapshots.json"), ttl=60)
+        cache.put('https://a', ROWS, now=1000)
+
+        assert cache.get_fresh('https://a', now=1059)['rows'] == ROWS
+        assert cache.get_fresh('https://a', now=1061) is None
+        assert cache.get('https://a')['rows'] == ROWS
+
+    def test_size_and_age_eviction(self, tmp_path):
+        """Test that the oldest entries are evicted beyond max_entries or max_age"""
+        cache = SnapshotCache(str(tmp_path / "snapshots.json"), max_entries=2, max_age=100)
+        cache.put('https://a', ROWS, now=1000)
+        cache.put('https://b', ROWS, now=1010)
+        cache.put('https://c', ROWS, now=1020)
+
+        assert cache.get('https://a') is None
+        assert cache.get('https://b') is not None
+
+        cache.put('https://d', ROWS, now=1115)
+
+        assert cache.get('https://b') is None
+        assert cache.get('https://c') is not None
+
+    def test_save_and_reload(self, tmp_path):
+        """Test that snapshots persist across instances"""
+        path = str(tmp_path / "nested" / "snapshots.json")
+        cache = SnapshotCache(path)
+        cache.put('https://a', ROWS)
+        cache.save()
+
+        reloaded = SnapshotCache(path)
+
+        assert reloaded.get('https://a')['hash'] == content_hash(ROWS)
@@ -0,0 +1,79 @@
+"""
+Unit tests for the cold start profiler
+"""
+import os
+import subprocess
+import sys
+from unittest.mock import Mock, patch
+from src.startup_profile import profile_startup
+
+
+CONFIG = {
+    'target_url': 'https://example.com',
+    'chrome_lean_profile': True,
+    'blocked_resource_types': ('image',),
+    'blocked_url_patterns': (),
+}
+
+
+class TestStartupProfile:
+    """Test suite for profile_startup"""
+
+    @patch('src.scraper.webdriver.Chrome')
+    @patch('src.startup_profile.resolve_browser_paths')
+    def test_reports_each_phase(self, mock_resolve, mock_chrome):
+        """Test that path resolution, launch and first navigation are timed"""
+        # Arrange
+        mock_resolve.return_value = ('/path/to/chromedriver', None)
+        driver = Mock()
+        mock_chrome.return_value = driver
+
+        # Act
+        profile = profile_startup(CONFIG, process_start=0.0)
+
+        # Assert
+        phases = [name for name, _ in profile.timings]
+        assert phases[0] == 'main.py 載入與設定'
+        assert phases[-3:] == ['解析 chromedriver / Chrome', '啟動瀏覽器', '第一次導覽']
+        driver.get.assert_called_once_with('https://example.com')
+        driver.quit.assert_called_once()
+
+    @patch('src.startup_profile.resolve_browser_paths', side_effect=OSError("no chromedriver"))
+    def test_failure_still_reports(self, mock_resolve):
+        """Test that a failing step is reported instead of raised"""
+        profile = profile_startup(CONFIG)
+
+        assert profile.timings[-1][0] == '解析 chromedriver / Chrome'
+
+    def test_heavy_imports_are_timed_from_a_clean_state(self):
+        """Test that selenium's import cost is reported rather than loaded before the timing loop"""
+        code = (
+            "import src.startup_profile as startup; "
+            "startup.resolve_browser_paths = lambda installer, cache_path: ('/path/to/chromedriver', None); "
+            "profile = startup.profile_startup({}, navigate=False); "
+            "print('|'.join(name for name, _ in profile.timings))"
+        )
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=repo_root, capture_output=True, text=True, check=True
+        )
+
+        phases = result.stdout.strip().splitlines()[-1].split('|')
+        assert 'import selenium.webdriver' in phases
+        assert phases.index('import selenium.webdriver') < phases.index('import src.scraper')
+
+    def test_main_defers_heavy_imports(self):
+        """Test that importing main.py and loading the config does not load the browser or LINE stacks"""
+        code = (
+            "import sys, main; "
+            "main.load_config(); "
+            "print([m for m in ('selenium', 'webdriver_manager', 'linebot', 'aiohttp', 'requests', 'psutil') "
+            "if m in sys.modules])"
+        )
+        repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, TARGET_URL='https://example.com')
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=repo_root, env=env, capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,129 @@
+"""
+Unit tests for subscriber filters, payload grouping and multicast fan-out
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+from src.diff import ENTRY, EXIT, diff_holdings
+from src.line_notification import LineNotification
+from src.subscribers import (
+    Subscriber,
+    SubscriberRegistry,
+    group_recipients,
+    select_diff,
+    select_report,
+)
+
+PREVIOUS = [
+    {'name': '台積電', 'stock_id': '2330', 'profit_percentage': '▴ 1.00%', 'current_weight': '50.0%'},
+    {'name': '鴻海', 'stock_id': '2317', 'profit_percentage': '▴ 1.00%', 'current_weight': '50.0%'},
+]
+CURRENT = [
+    {'name': '台積電', 'stock_id': '2330', 'profit_percentage': '▴ 1.00%', 'current_weight': '50.0%'},
+    {'name': '聯發科', 'stock_id': '2454', 'profit_percentage': '▴ 1.00%', 'current_weight': '50.0%'},
+]
+
+
+class TestSubscriber:
+    """Test suite for Subscriber filters"""
+
+    def test_filters_rows_and_diff(self):
+        """Test that stock and change type filters narrow the payload"""
+        subscriber = Subscriber('U1', stock_ids=['2454', '2317'], change_types=[EXIT])
+        diff = diff_holdings(PREVIOUS, CURRENT)
+
+        filtered = subscriber.filter_diff(diff)
+
+        assert [row['stock_id'] for row in subscriber.filter_rows(CURRENT)] == ['2454']
+        assert filtered.entries == []
+        assert [change.key for change in filtered.exits] == ['2317']
+
+    def test_unknown_change_type_raises(self):
+        """Test that an unsupported change type is rejected"""
+        with pytest.raises(ValueError):
+            Subscriber('U1', change_types=['split'])
+
+    def test_registry_from_file(self, tmp_path):
+        """Test loading subscribers, strategy filtering and LINE_USER_ID as an unfiltered subscriber"""
+        # Arrange
+        path = tmp_path / 'subscribers.json'
+        path.write_text(json.dumps([
+            {'user_id': 'U1', 'strategies': ['https://a.com']},
+            {'user_id': 'U2'},
+            {'user_id': 'U1', 'strategies': ['https://b.com']},
+        ]), encoding='utf-8')
+
+        # Act
+        registry = SubscriberRegistry.from_file(str(path), default_user_id='U3')
+
+        # Assert
+        assert [s.user_id for s in registry.subscribers] == ['U1', 'U2', 'U3']
+        assert [s.user_id for s in registry.for_strategy('https://b.com')] == ['U2', 'U3']
+
+
+class TestGroupRecipients:
+    """Test suite for payload grouping"""
+
+    def test_identical_payloads_share_a_group(self):
+        """Test that different filters yielding the same payload are merged and selected once per filter"""
+        # Arrange
+        subscribers = [
+            Subscriber('U1'),
+            Subscriber('U2', stock_ids=['2330', '2454']),
+            Subscriber('U3', stock_ids=['2330']),
+            Subscriber('U4', stock_ids=['2330']),
+            Subscriber('U5', stock_ids=['9999']),
+        ]
+        select = Mock(side_effect=select_report(CURRENT))
+
+        # Act
+        groups = group_recipients(subscribers, select)
+
+        # Assert
+        assert [user_ids for _, user_ids in groups] == [['U1', 'U2'], ['U3', 'U4']]
+        assert [row['stock_id'] for row in groups[1][0]] == ['2330']
+        assert select.call_count == 4
+
+    def test_subscribers_without_matching_changes_are_skipped(self):
+        """Test that diff grouping drops subscribers whose filter leaves no changes"""
+        diff = diff_holdings(PREVIOUS, CURRENT)
+        subscribers = [Subscriber('U1', change_types=[ENTRY]), Subscriber('U2', stock_ids=['2330'])]
+
+        groups = group_recipients(subscribers, select_diff(diff))
+
+        assert [user_ids for _, user_ids in groups] == [['U1']]
+
+
+class TestMulticast:
+    """Test suite for LineNotification recipients"""
+
+    @patch('src.line_notification.LineBotApi')
+    def test_recipients_are_multicast_in_chunks_of_500(self, mock_api):
+        """Test that API calls scale with recipient chunks, not recipients"""
+        # Arrange
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        notifier = LineNotification('token', None)
+        recipients = [f'U{i}' for i in range(1200)]
+
+        # Act
+        result = notifier.send_text_message('hello', recipients=recipients)
+
+        # Assert
+        assert result is True
+        chunks = [call.args[0] for call in mock_api_instance.multicast.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [500, 500, 200]
+        assert sum(chunks, []) == recipients
+        mock_api_instance.push_message.assert_not_called()
+
+    @patch('src.line_notification.LineBotApi')
+    def test_single_recipient_uses_push(self, mock_api):
+        """Test that a group of one is sent with push_message"""
+        mock_api_instance = Mock()
+        mock_api.return_value = mock_api_instance
+        notifier = LineNotification('token', None)
+
+        notifier.send_text_message('hello', recipients=['U1'])
+
+        assert mock_api_instance.push_message.call_args.args[0] == 'U1'
+        mock_api_instance.multicast.assert_not_called()
@@ -0,0 +1,213 @@
+"""
+Unit tests for the LINE webhook server and its in-memory holdings index
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from src.history_store import HoldingsHistoryStore
+from src.scheduler import TAIPEI_TZ
+from src.snapshot_cache import SnapshotCache
+from src.webhook_server import (
+    HELP_TEXT,
+    HoldingsIndex,
+    HoldingsIndexLoader,
+    WebhookServer,
+    sign_body,
+    verify_signature,
+    webhook_path,
+)
+
+SECRET = 'test-secret'
+URL = 'https://www.finlab.tw/strategy/a'
+ROWS = [
+    {'name': '台積電', 'stock_id': '2330', 'entry_date': '2026/2/6',
+     'profit_percentage': '▴ 10.00%', 'current_weight': '50.0%'},
+    {'name': '聯發科', 'stock_id': '2454', 'entry_date': '2026/2/4',
+     'profit_percentage': '▾ 2.00%', 'current_weight': '50.0%'},
+]
+
+
+def texts(messages):
+    return '\n'.join(message['text'] for message in messages)
+
+
+def event_body(*commands):
+    events = [
+        {'type': 'message', 'replyToken': f'token{i}', 'message': {'type': 'text', 'text': command}}
+        for i, command in enumerate(commands)
+    ]
+    return json.dumps({'events': events}).encode('utf-8')
+
+
+class StubReplies:
+    """Local stand-in for the LINE reply endpoint"""
+
+    def __init__(self):
+        self.replies = []
+
+    async def handle(self, request):
+        self.replies.append(await request.json())
+        return web.json_response({})
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post('/v2/bot/message/{kind}', self.handle)
+        return app
+
+
+class StaticLoader:
+    """Loader that always returns the same index"""
+
+    def __init__(self, index):
+        self.index = index
+        self.loads = 0
+
+    def signature(self):
+        return ('static',)
+
+    def load(self):
+        self.loads += 1
+        return self.index
+
+
+def run_webhook(index, scenario):
+    """Start a stub LINE API and the webhook server, then run scenario(client, stub, server)"""
+    async def runner():
+        stub = StubReplies()
+        stub_server = TestServer(stub.app())
+        await stub_server.start_server()
+        server = WebhookServer(SECRET, 'token', StaticLoader(index),
+                               api_base_url=str(stub_server.make_url('')), refresh_interval=0)
+        client = TestClient(TestServer(server.make_app()))
+        await client.start_server()
+        try:
+            return await scenario(client, stub, server)
+        finally:
+            await client.close()
+            await stub_server.close()
+    return asyncio.run(runner())
+
+
+async def drain(server):
+    await asyncio.gather(*server._tasks)
+
+
+class TestSignature:
+    """Test suite for X-Line-Signature handling"""
+
+    def test_verify_signature(self):
+        """Test that only the signature computed with the channel secret is accepted"""
+        body = b'{"events":[]}'
+
+        assert verify_signature(SECRET, body, sign_body(SECRET, body)) is True
+        assert verify_signature(SECRET, body, sign_body('other', body)) is False
+        assert verify_signature(SECRET, body, None) is False
+
+    def test_webhook_path(self):
+        """Test that the route path comes from LINE_WEBHOOK_URL"""
+        assert webhook_path('https://bot.example.com/line/callback/') == '/line/callback'
+        assert webhook_path(None) == '/callback'
+
+
+class TestHoldingsIndex:
+    """Test suite for HoldingsIndex"""
+
+    def test_answers_commands(self):
+        """Test holdings, stock id, stock name and unknown commands"""
+        index = HoldingsIndex({URL: {'rows': ROWS, 'timestamp': 0}})
+
+        assert '2454 聯發科' in texts(index.answer('持股'))
+        assert index.answer('  Holdings ') == index.answer('持股')
+        assert '獲利 ▴ 10.00%' in texts(index.answer('2330'))
+        assert '2454' in texts(index.answer('聯發科'))
+        assert '沒有 9999' in texts(index.answer('9999'))
+        assert texts(index.answer('hello')) == HELP_TEXT
+
+    def test_changes_today_against_baseline(self):
+        """Test that changes today diffs the snapshot against the baseline"""
+        baseline = [ROWS[0], {'name': '鴻海', 'stock_id': '2317', 'profit_percentage': '▴ 1.00%'}]
+        index = HoldingsIndex({URL: {'rows': ROWS, 'timestamp': 0}}, baselines={URL: baseline})
+
+        answer = texts(index.answer('changes today'))
+
+        assert '新進場' in answer and '聯發科' in answer
+        assert '出場' in answer and '鴻海' in answer
+
+    def test_flex_holdings(self):
+        """Test that flex=True answers the holdings command with Flex messages"""
+        index = HoldingsIndex({URL: {'rows': ROWS, 'timestamp': 0}}, flex=True)
+
+        assert index.answer('持股')[0]['type'] == 'flex'
+
+
+class TestHoldingsIndexLoader:
+    """Test suite for HoldingsIndexLoader"""
+
+    def test_load_uses_last_run_before_today(self, tmp_path):
+        """Test that the baseline for changes today is the last run before Taipei midnight"""
+        # Arrange
+        now = datetime(2026, 3, 10, 10, 0, tzinfo=TAIPEI_TZ)
+        cache = SnapshotCache(str(tmp_path / 'snapshots.json'))
+        cache.put(URL, ROWS)
+        cache.save()
+        db_path = str(tmp_path / 'history.sqlite3')
+        with HoldingsHistoryStore(db_path) as history:
+            history.append_run(URL, [ROWS[0]], scraped_at=now - timedelta(days=1))
+            history.append_run(URL, ROWS, scraped_at=now - timedelta(hours=1))
+        loader = HoldingsIndexLoader(cache.path, db_path)
+
+        # Act
+        index = loader.load(now=now)
+
+        # Assert
+        answer = texts(index.answer('今日異動'))
+        assert '新進場 (1)' in answer and '聯發科' in answer
+        assert loader.signature(now=now) != loader.signature(now=now + timedelta(days=1))
+
+
+class TestWebhookServer:
+    """Test suite for WebhookServer"""
+
+    def test_signed_event_is_answered(self):
+        """Test that a signed message event is acknowledged and answered through the reply API"""
+        async def scenario(client, stub, server):
+            body = event_body('2330')
+            response = await client.post('/callback', data=body, headers={'X-Line-Signature': sign_body(SECRET, body)})
+            await drain(server)
+            return response.status, stub.replies
+
+        status, replies = run_webhook(HoldingsIndex({URL: {'rows': ROWS, 'timestamp': 0}}), scenario)
+
+        assert status == 200
+        assert replies[0]['replyToken'] == 'token0'
+        assert '台積電' in replies[0]['messages'][0]['text']
+
+    def test_invalid_signature_is_rejected(self):
+        """Test that an unsigned request gets 400 and no reply"""
+        async def scenario(client, stub, server):
+            response = await client.post('/callback', data=event_body('2330'), headers={'X-Line-Signature': 'bad'})
+            return response.status, stub.replies
+
+        status, replies = run_webhook(HoldingsIndex({}), scenario)
+
+        assert status == 400
+        assert replies == []
+
+    def test_concurrent_deliveries(self):
+        """Test that hundreds of concurrent deliveries are all acknowledged and answered"""
+        async def scenario(client, stub, server):
+            async def deliver(i):
+                body = event_body(f'{2330 if i % 2 else 2454}')
+                response = await client.post('/callback', data=body,
+                                             headers={'X-Line-Signature': sign_body(SECRET, body)})
+                return response.status
+            statuses = await asyncio.gather(*(deliver(i) for i in range(300)))
+            await drain(server)
+            return statuses, stub.replies
+
+        statuses, replies = run_webhook(HoldingsIndex({URL: {'rows': ROWS, 'timestamp': 0}}), scenario)
+
+        assert statuses == [200] * 300
+        assert len(replies) == 300